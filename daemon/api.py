@@ -30,6 +30,7 @@ import sys
 
 sys.path.insert(0, str(Path(__file__).parent))
 
+import cache_compactor
 from task_queue import TaskQueue, TaskPriority
 from coherence import GoalCoherenceLayer, GoalTimeframe
 from registry import create_default_registry
@@ -331,6 +332,7 @@ class APIHandler(BaseHTTPRequestHandler):
 
 def run_api(port: int = 5000):
     server = HTTPServer(('0.0.0.0', port), APIHandler)
+    cache_compactor.start()
     print(f"API server running on port {port}")
     print("Endpoints:")
     print("  GET  /health         - Health check")
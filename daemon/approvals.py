@@ -22,6 +22,8 @@ from enum import Enum
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, asdict
 
+import db_pool
+
 
 class ApprovalType(str, Enum):
     INSTALL_PACKAGE = "install_package"
@@ -98,7 +100,7 @@ class ApprovalQueue:
 
     def _init_db(self):
         """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
 
         conn.execute("""
@@ -130,7 +132,7 @@ class ApprovalQueue:
         conn.close()
 
     def _get_conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
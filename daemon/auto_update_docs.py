@@ -16,16 +16,17 @@ Usage:
 
 import argparse
 import json
-import sqlite3
 from datetime import datetime
 from pathlib import Path
 
+import db_pool
+
 DB_PATH = Path(__file__).parent / "doc_updates.db"
 PROJECT_ROOT = Path(__file__).parent.parent
 
 def init_db():
     """Initialize the doc updates database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.execute("""
         CREATE TABLE IF NOT EXISTS doc_updates (
             id INTEGER PRIMARY KEY,
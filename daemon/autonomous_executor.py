@@ -16,14 +16,17 @@ import sys
 import time
 import json
 import signal
-import sqlite3
 import hashlib
+from llm_cache import LLMCache
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List
 from dataclasses import dataclass
 import logging
 
+import db_pool
+import write_behind
+
 # Check for anthropic SDK
 try:
     import anthropic
@@ -36,13 +39,15 @@ PROJECT_DIR = DAEMON_DIR.parent
 DB_PATH = DAEMON_DIR / "autonomous_executor.db"
 PID_FILE = DAEMON_DIR / "autonomous_executor.pid"
 LOG_FILE = DAEMON_DIR / "autonomous_executor.log"
-CACHE_DB = DAEMON_DIR / "prompt_cache.db"
 
 # Configuration
 POLL_INTERVAL = 30
 MAX_TOKENS = 4096
 MODEL = "claude-sonnet-4-20250514"  # Cost-effective for autonomous tasks
 
+# Shared L1/L2 response cache (llm_cache)
+_response_cache = LLMCache("autonomous")
+
 logging.basicConfig(
     level=logging.INFO,
     format='%(asctime)s [%(levelname)s] %(message)s',
@@ -63,7 +68,7 @@ class Task:
     created_at: str
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS tasks (
             id TEXT PRIMARY KEY,
@@ -82,47 +87,16 @@ def init_db():
     conn.commit()
     conn.close()
 
-def init_cache():
-    conn = sqlite3.connect(CACHE_DB)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS prompt_cache (
-            hash TEXT PRIMARY KEY,
-            response TEXT,
-            created_at TEXT,
-            hits INTEGER DEFAULT 0
-        )
-    """)
-    conn.commit()
-    conn.close()
-
 def get_cached(prompt: str) -> Optional[str]:
-    h = hashlib.sha256(prompt.encode()).hexdigest()[:32]
     try:
-        conn = sqlite3.connect(CACHE_DB)
-        cur = conn.execute("SELECT response FROM prompt_cache WHERE hash = ?", (h,))
-        row = cur.fetchone()
-        if row:
-            conn.execute("UPDATE prompt_cache SET hits = hits + 1 WHERE hash = ?", (h,))
-            conn.commit()
-            conn.close()
-            return row[0]
-        conn.close()
-    except:
-        pass
-    return None
+        return _response_cache.get(_response_cache.key(prompt, MODEL))
+    except Exception:
+        return None
 
 def set_cached(prompt: str, response: str):
-    h = hashlib.sha256(prompt.encode()).hexdigest()[:32]
     try:
-        init_cache()
-        conn = sqlite3.connect(CACHE_DB)
-        conn.execute("""
-            INSERT OR REPLACE INTO prompt_cache (hash, response, created_at, hits)
-            VALUES (?, ?, ?, 0)
-        """, (h, response, datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
-    except:
+        _response_cache.set(_response_cache.key(prompt, MODEL), response)
+    except Exception:
         pass
 
 class AutonomousExecutor:
@@ -157,6 +131,7 @@ class AutonomousExecutor:
         finally:
             if PID_FILE.exists():
                 PID_FILE.unlink()
+            write_behind.flush()  # Buffered telemetry, in case exit is forced
             logger.info("Autonomous Executor stopped")
 
     def _shutdown(self, signum, frame):
@@ -164,7 +139,7 @@ class AutonomousExecutor:
         self.running = False
 
     def _get_next_task(self) -> Optional[Task]:
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cur = conn.execute("""
             SELECT id, prompt, source, priority, status, created_at
             FROM tasks WHERE status = 'pending'
@@ -212,13 +187,13 @@ class AutonomousExecutor:
             self._fail(task.id, str(e))
 
     def _update_status(self, task_id: str, status: str):
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("UPDATE tasks SET status = ? WHERE id = ?", (status, task_id))
         conn.commit()
         conn.close()
 
     def _complete(self, task_id: str, result: str, tokens: int):
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             UPDATE tasks SET status = 'complete', completed_at = ?, result = ?, tokens_used = ?
             WHERE id = ?
@@ -227,7 +202,7 @@ class AutonomousExecutor:
         conn.close()
 
     def _fail(self, task_id: str, error: str):
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             UPDATE tasks SET status = 'failed', completed_at = ?, error = ?
             WHERE id = ?
@@ -239,7 +214,7 @@ class AutonomousExecutor:
     def submit(prompt: str, source: str = 'user', priority: int = 5) -> str:
         init_db()
         task_id = f"auto_{datetime.now().strftime('%Y%m%d%H%M%S')}_{hashlib.md5(prompt.encode()).hexdigest()[:8]}"
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             INSERT INTO tasks (id, prompt, source, priority, status, created_at)
             VALUES (?, ?, ?, ?, 'pending', ?)
@@ -262,7 +237,7 @@ class AutonomousExecutor:
             except OSError:
                 pass
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cur = conn.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status")
         status["tasks"] = {row[0]: row[1] for row in cur.fetchall()}
 
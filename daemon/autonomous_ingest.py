@@ -17,6 +17,7 @@ Usage:
     python autonomous_ingest.py --query "X"    # Hierarchical retrieval (HiRAG)
 """
 
+import atexit
 import os
 import sys
 import json
@@ -26,9 +27,13 @@ import sqlite3
 import requests
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, Dict, List, Any
+from typing import Optional, Dict, List, Any, Tuple
 from dataclasses import dataclass, asdict
 
+import db_pool
+import kg_store
+import write_behind
+
 # MarkItDown for document conversion
 try:
     from markitdown import MarkItDown
@@ -58,12 +63,8 @@ try:
 except ImportError:
     MINERU_AVAILABLE = False
 
-# Dragonfly/Redis cache (Phase 13.3)
-try:
-    import redis
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
+# Shared L1/L2 LLM response cache
+from llm_cache import LLMCache
 
 # Configuration
 WATCH_FOLDER = Path(os.environ.get("BOOK_WATCH_FOLDER", str(Path.home() / "Documents" / "GateofTruth")))
@@ -71,9 +72,7 @@ LOCALAI_URL = os.environ.get("LOCALAI_URL", "http://localhost:8080/v1")
 USE_UTF_SCHEMA = os.environ.get("USE_UTF_SCHEMA", "true").lower() == "true"
 OBSIDIAN_VAULT = Path(os.environ.get("OBSIDIAN_VAULT", str(Path.home() / "Documents" / "Obsidian" / "ClaudeKnowledge")))
 LOCALAI_MODEL = "mistral-7b-instruct-v0.3"  # Phase 13.1: docker-compose now uses THREADS=10
-DRAGONFLY_URL = os.environ.get("DRAGONFLY_URL", "redis://localhost:6379")
 LLM_CACHE_TTL = 86400  # 24 hours for LLM response cache
-KG_PATH = Path.home() / ".claude" / "memory" / "knowledge-graph.jsonl"
 DB_PATH = Path(__file__).parent / "ingest.db"
 UTF_DB_PATH = Path(__file__).parent / "utf_knowledge.db"
 
@@ -92,71 +91,52 @@ except ImportError:
     def notify_localai_summary(*args, **kwargs): pass
 
 # ============================================================================
-# Phase 13.3: Dragonfly LLM Response Cache
+# Phase 13.3: LLM Response Cache (llm_cache: in-process L1 + SQLite L2)
 # ============================================================================
 
-_dragonfly_client = None
-_cache_stats = {"hits": 0, "misses": 0, "writes": 0}
-
-def get_dragonfly():
-    """Get or create Dragonfly connection."""
-    global _dragonfly_client
-    if _dragonfly_client is None and REDIS_AVAILABLE:
-        try:
-            _dragonfly_client = redis.from_url(DRAGONFLY_URL)
-            _dragonfly_client.ping()
-        except Exception:
-            _dragonfly_client = None
-    return _dragonfly_client
+_llm_cache = LLMCache("ingest", ttl=LLM_CACHE_TTL)
 
 def get_cache_stats() -> Dict:
     """Get cache efficiency statistics."""
-    total = _cache_stats["hits"] + _cache_stats["misses"]
-    hit_rate = (_cache_stats["hits"] / total * 100) if total > 0 else 0
+    stats = _llm_cache.stats()
+    hits = stats["l1_hits"] + stats["l2_hits"]
     return {
-        "hits": _cache_stats["hits"],
-        "misses": _cache_stats["misses"],
-        "writes": _cache_stats["writes"],
-        "hit_rate": f"{hit_rate:.1f}%",
-        "total_queries": total
+        "hits": hits,
+        "misses": stats["misses"],
+        "writes": stats["writes"],
+        "coalesced": stats["coalesced"],
+        "hit_rate": stats["hit_rate"],
+        "total_queries": hits + stats["misses"]
     }
 
-def cache_llm_response(prompt_hash: str, response: str, ttl: int = LLM_CACHE_TTL):
-    """Cache LLM response in Dragonfly."""
-    global _cache_stats
-    client = get_dragonfly()
-    if client:
-        try:
-            cache_key = f"llm:ingest:{prompt_hash}"
-            client.setex(cache_key, ttl, json.dumps(response))
-            _cache_stats["writes"] += 1
-            return True
-        except Exception:
-            pass
-    return False
-
-def get_cached_llm_response(prompt_hash: str) -> Optional[Dict]:
-    """Get cached LLM response from Dragonfly."""
-    global _cache_stats
-    client = get_dragonfly()
-    if client:
-        try:
-            cache_key = f"llm:ingest:{prompt_hash}"
-            result = client.get(cache_key)
-            if result:
-                _cache_stats["hits"] += 1
-                return json.loads(result.decode())
-            _cache_stats["misses"] += 1
-        except Exception:
-            _cache_stats["misses"] += 1
-    else:
-        _cache_stats["misses"] += 1
-    return None
+def localai_cached(prompt: str, max_tokens: int, timeout: int) -> Tuple[str, int, bool]:
+    """LocalAI completion through the shared cache.
+
+    Returns (content, tokens, cached). Concurrent identical prompts share one
+    request; tokens is 0 when the answer came from the cache. Request errors
+    propagate to the caller.
+    """
+    # tokens_used is filled in by complete() before the entry is stored, so
+    # cost-aware eviction knows what a cached answer saves
+    meta = {"model_id": LOCALAI_MODEL, "tokens_used": 0}
+
+    def complete() -> str:
+        response = requests.post(
+            f"{LOCALAI_URL}/chat/completions",
+            json={
+                "model": LOCALAI_MODEL,
+                "messages": [{"role": "user", "content": prompt}],
+                "max_tokens": max_tokens
+            },
+            timeout=timeout
+        )
+        result = response.json()
+        meta["tokens_used"] = result['usage']['total_tokens']
+        return result['choices'][0]['message']['content']
 
-def make_prompt_hash(prompt: str, model: str = LOCALAI_MODEL) -> str:
-    """Create deterministic hash for prompt caching."""
-    key = f"{model}:{prompt[:1000]}"  # First 1000 chars for key
-    return hashlib.sha256(key.encode()).hexdigest()[:16]
+    content, cached = _llm_cache.get_or_compute(
+        _llm_cache.key(prompt, LOCALAI_MODEL), complete, metadata=meta)
+    return content or "", 0 if cached else meta["tokens_used"], cached
 
 # ============================================================================
 # LeanRAG: Knowledge Structures (Semantic Aggregation)
@@ -203,7 +183,7 @@ class HierarchicalKG:
 
 def init_db() -> sqlite3.Connection:
     """Initialize tracking database with hierarchical schema."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # File tracking
@@ -419,31 +399,9 @@ FUTURE_WORK: <suggested future directions>
 DOMAIN: <research domain: ML, NLP, CV, systems, theory, etc.>
 """
 
-    # Phase 13.3: Check cache first
-    prompt_hash = make_prompt_hash(prompt)
-    cached = get_cached_llm_response(prompt_hash)
-    if cached:
-        return {"raw": cached.get("content", ""), "tokens": 0, "success": True, "cached": True}
-
     try:
-        response = requests.post(
-            f"{LOCALAI_URL}/chat/completions",
-            json={
-                "model": LOCALAI_MODEL,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 800
-            },
-            timeout=180
-        )
-
-        result = response.json()
-        content = result['choices'][0]['message']['content']
-        tokens = result['usage']['total_tokens']
-
-        # Cache successful response
-        cache_llm_response(prompt_hash, {"content": content, "tokens": tokens})
-
-        return {"raw": content, "tokens": tokens, "success": True, "cached": False}
+        content, tokens, cached = localai_cached(prompt, max_tokens=800, timeout=180)
+        return {"raw": content, "tokens": tokens, "success": True, "cached": cached}
     except Exception as e:
         return {"raw": "", "tokens": 0, "success": False, "error": str(e)}
 
@@ -496,32 +454,10 @@ FACT: <atomic fact>
 KEYWORDS: <relevant keywords for this chunk, comma-separated>
 """
 
-    # Phase 13.3: Check cache first
-    prompt_hash = make_prompt_hash(prompt)
-    cached = get_cached_llm_response(prompt_hash)
-    if cached:
-        content = cached.get("content", "")
-        tokens = 0
-    else:
-        try:
-            response = requests.post(
-                f"{LOCALAI_URL}/chat/completions",
-                json={
-                    "model": LOCALAI_MODEL,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": 500
-                },
-                timeout=120
-            )
-
-            result = response.json()
-            content = result['choices'][0]['message']['content']
-            tokens = result['usage']['total_tokens']
-
-            # Cache successful response
-            cache_llm_response(prompt_hash, {"content": content, "tokens": tokens})
-        except Exception as e:
-            return {"facts": [], "keywords": [], "tokens": 0, "success": False}
+    try:
+        content, tokens, _ = localai_cached(prompt, max_tokens=500, timeout=120)
+    except Exception:
+        return {"facts": [], "keywords": [], "tokens": 0, "success": False}
 
     # Parse facts
     facts = []
@@ -567,42 +503,15 @@ SYNTHESIS: <2-3 paragraph summary that integrates the facts>
 KEY_INSIGHT: <the single most important takeaway>
 """
 
-    # Phase 13.3: Check cache first
-    prompt_hash = make_prompt_hash(prompt)
-    cached = get_cached_llm_response(prompt_hash)
-    if cached:
-        return {
-            "summary": cached.get("content", ""),
-            "tokens": 0,
-            "level": level,
-            "fact_count": len(all_facts),
-            "cached": True
-        }
-
     try:
-        response = requests.post(
-            f"{LOCALAI_URL}/chat/completions",
-            json={
-                "model": LOCALAI_MODEL,
-                "messages": [{"role": "user", "content": prompt}],
-                "max_tokens": 600
-            },
-            timeout=120
-        )
-
-        result = response.json()
-        content = result['choices'][0]['message']['content']
-        tokens = result['usage']['total_tokens']
-
-        # Cache successful response
-        cache_llm_response(prompt_hash, {"content": content, "tokens": tokens})
+        content, tokens, cached = localai_cached(prompt, max_tokens=600, timeout=120)
 
         return {
             "summary": content,
             "tokens": tokens,
             "level": level,
             "fact_count": len(all_facts),
-            "cached": False
+            "cached": cached
         }
     except Exception as e:
         return {"summary": "", "tokens": 0, "error": str(e)}
@@ -734,8 +643,7 @@ def store_hierarchical(doc_id: str, filepath: str, academic: Dict,
 
 def store_to_kg_jsonl(doc_id: str, filepath: str, academic: Dict,
                       local_facts: List[Dict], global_summary: Dict):
-    """Store to JSONL KG for MCP compatibility."""
-    KG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    """Store to the KG (JSONL log for MCP compatibility, indexed by kg_store)."""
 
     # Parse academic structure
     parsed = {}
@@ -768,8 +676,7 @@ def store_to_kg_jsonl(doc_id: str, filepath: str, academic: Dict,
         ]
     }
 
-    with open(KG_PATH, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(entity) + '\n')
+    kg_store.add_entities([entity])
 
 
 # ============================================================================
@@ -848,9 +755,25 @@ def process_document_utf(path: Path, text: str, conn: sqlite3.Connection, method
     }
 
 
+# Claim index with links not saved yet (saved on a timer, per batch and at exit)
+_unsaved_claim_index = None
+
+
+def flush_claim_index():
+    """Save the claim similarity index if store_utf_to_sqlite linked claims since the last save."""
+    if _unsaved_claim_index is not None:
+        try:
+            _unsaved_claim_index.flush()
+        except Exception as e:
+            print(f"    [UTF] Claim index save failed: {e}")
+
+
+atexit.register(flush_claim_index)
+
+
 def init_utf_db():
     """Initialize UTF knowledge SQLite database for claim similarity."""
-    conn = sqlite3.connect(UTF_DB_PATH)
+    conn = db_pool.connect(UTF_DB_PATH)
     c = conn.cursor()
 
     c.execute('''CREATE TABLE IF NOT EXISTS sources (
@@ -907,10 +830,11 @@ def init_utf_db():
 
 def store_utf_to_sqlite(result: 'UTFExtractionResult'):
     """Store UTF extraction result to SQLite for claim similarity."""
+    global _unsaved_claim_index
     import json
 
     init_utf_db()
-    conn = sqlite3.connect(UTF_DB_PATH)
+    conn = db_pool.connect(UTF_DB_PATH)
     c = conn.cursor()
 
     # Store source
@@ -957,6 +881,18 @@ def store_utf_to_sqlite(result: 'UTFExtractionResult'):
     conn.commit()
     conn.close()
 
+    # Link the new claims into the similarity clusters (incremental, see claim_similarity).
+    # The whole index file is rewritten on save, so not after every paper.
+    try:
+        from memory import get_claim_index
+        index = get_claim_index()
+        if index:
+            index.add_from_db([claim.claim_id for claim in result.claims])
+            _unsaved_claim_index = index
+            index.save_if_due()
+    except Exception as e:
+        print(f"    [UTF] Claim index update failed: {e}")
+
 
 # ============================================================================
 # Self-Model: System knows itself to recognize improvements
@@ -979,13 +915,26 @@ def get_self_model() -> Dict:
     return _self_model
 
 
+_metrics_ready = False
+
+
 def track_metric(name: str, value: float, conn: Optional[sqlite3.Connection] = None):
     """Track performance metric - built into core flow, not separate.
 
     Metrics are stored in existing ingest.db to avoid database proliferation.
+    Without a conn the row goes through write_behind (batched commits);
+    with one it is written inside the caller's transaction.
     """
+    global _metrics_ready
+    sql = 'INSERT INTO performance_metrics (timestamp, metric_name, value) VALUES (?, ?, ?)'
+    params = (datetime.now().isoformat(), name, value)
+
+    if conn is None and _metrics_ready:
+        write_behind.submit(METRICS_DB, sql, params)
+        return
+
     if conn is None:
-        conn = sqlite3.connect(METRICS_DB)
+        conn = db_pool.connect(METRICS_DB)
         close_after = True
     else:
         close_after = False
@@ -997,17 +946,18 @@ def track_metric(name: str, value: float, conn: Optional[sqlite3.Connection] = N
         metric_name TEXT,
         value REAL
     )''')
-    c.execute('INSERT INTO performance_metrics (timestamp, metric_name, value) VALUES (?, ?, ?)',
-              (datetime.now().isoformat(), name, value))
+    c.execute(sql, params)
     conn.commit()
 
     if close_after:
         conn.close()
+        _metrics_ready = True
 
 
 def get_efficiency_trend(metric: str, days: int = 7) -> Dict:
     """Get efficiency trend for a metric - detect bloat or improvement."""
-    conn = sqlite3.connect(METRICS_DB)
+    write_behind.flush(METRICS_DB)
+    conn = db_pool.connect(METRICS_DB)
     c = conn.cursor()
 
     try:
@@ -1110,7 +1060,6 @@ def detect_upgrade_potential(claim_statement: str, source_id: str) -> Optional[D
 
 def store_utf_to_kg(result: 'UTFExtractionResult'):
     """Store UTF extraction result to knowledge graph."""
-    import json
     from dataclasses import asdict
 
     # Check claims for upgrade potential (integrated, not separate)
@@ -1140,51 +1089,52 @@ def store_utf_to_kg(result: 'UTFExtractionResult'):
         ]
     }
 
-    with open(KG_PATH, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(source_entity) + '\n')
-
-        # Store claims
-        for claim in result.claims:
-            claim_entity = {
-                "name": f"Claim: {claim.statement[:50]}...",
-                "entityType": "Claim",
-                "observations": [
-                    f"Statement: {claim.statement}",
-                    f"Form: {claim.claim_form}",
-                    f"Grounding: {claim.grounding}",
-                    f"Confidence: {claim.confidence}",
-                    f"SOURCE_ID:{claim.source_id}",
-                    f"CLAIM_ID:{claim.claim_id}"
-                ]
-            }
-            f.write(json.dumps(claim_entity) + '\n')
-
-        # Store concepts
-        for concept in result.concepts:
-            concept_entity = {
-                "name": concept.name,
-                "entityType": "Concept",
-                "observations": [
-                    f"Definition: {concept.definition_1liner}",
-                    f"Domain: {concept.domain}",
-                    f"CONCEPT_ID:{concept.concept_id}"
-                ]
-            }
-            f.write(json.dumps(concept_entity) + '\n')
-
-        # Store assumptions
-        for assumption in result.assumptions:
-            assumption_entity = {
-                "name": f"Assumption: {assumption.statement[:40]}...",
-                "entityType": "Assumption",
-                "observations": [
-                    f"Statement: {assumption.statement}",
-                    f"Type: {assumption.assumption_type}",
-                    f"Violations: {assumption.violations}",
-                    f"ASSUMPTION_ID:{assumption.assumption_id}"
-                ]
-            }
-            f.write(json.dumps(assumption_entity) + '\n')
+    entities = [source_entity]
+
+    # Store claims
+    for claim in result.claims:
+        claim_entity = {
+            "name": f"Claim: {claim.statement[:50]}...",
+            "entityType": "Claim",
+            "observations": [
+                f"Statement: {claim.statement}",
+                f"Form: {claim.claim_form}",
+                f"Grounding: {claim.grounding}",
+                f"Confidence: {claim.confidence}",
+                f"SOURCE_ID:{claim.source_id}",
+                f"CLAIM_ID:{claim.claim_id}"
+            ]
+        }
+        entities.append(claim_entity)
+
+    # Store concepts
+    for concept in result.concepts:
+        concept_entity = {
+            "name": concept.name,
+            "entityType": "Concept",
+            "observations": [
+                f"Definition: {concept.definition_1liner}",
+                f"Domain: {concept.domain}",
+                f"CONCEPT_ID:{concept.concept_id}"
+            ]
+        }
+        entities.append(concept_entity)
+
+    # Store assumptions
+    for assumption in result.assumptions:
+        assumption_entity = {
+            "name": f"Assumption: {assumption.statement[:40]}...",
+            "entityType": "Assumption",
+            "observations": [
+                f"Statement: {assumption.statement}",
+                f"Type: {assumption.assumption_type}",
+                f"Violations: {assumption.violations}",
+                f"ASSUMPTION_ID:{assumption.assumption_id}"
+            ]
+        }
+        entities.append(assumption_entity)
+
+    kg_store.add_entities(entities)
 
 
 def process_document_legacy(path: Path, text: str, conn: sqlite3.Connection, method: str = "Unknown") -> Dict:
@@ -1302,7 +1252,7 @@ def run_ingest(watch: bool = False, interval: int = 300):
     print(f"  3. PyMuPDF:    {'[OK] Fallback text extraction' if PYMUPDF_AVAILABLE else '[--] Not installed'}")
     print()
     print("Efficiency Features:")
-    print(f"  - Dragonfly Cache: {'[OK] 24h TTL' if REDIS_AVAILABLE and get_dragonfly() else '[--] Disabled'}")
+    print(f"  - LLM Cache:       [OK] L1 + SQLite L2, {LLM_CACHE_TTL // 3600}h TTL")
     print(f"  - UTF Schema:      {'[OK] Enabled' if USE_UTF_SCHEMA and UTF_AVAILABLE else '[--] Disabled'}")
     print()
 
@@ -1333,6 +1283,7 @@ def run_ingest(watch: bool = False, interval: int = 300):
                         print(f"    [SKIP] {result.get('error', 'Unknown error')}")
                 except Exception as e:
                     print(f"    [ERR] {e}")
+            flush_claim_index()
 
         if not watch:
             print("\nDone. Use --watch for continuous monitoring.")
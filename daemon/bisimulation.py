@@ -27,6 +27,8 @@ from datetime import datetime
 from collections import defaultdict
 import math
 
+import db_pool
+
 # ============================================================================
 # Configuration
 # ============================================================================
@@ -110,7 +112,7 @@ class TransferResult:
 
 def init_db():
     """Initialize bisimulation database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -313,7 +315,7 @@ class BisimulationEngine:
 
         Returns list of (state, distance) tuples, sorted by distance.
         """
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -404,7 +406,7 @@ class BisimulationEngine:
         2. Goals have similar structure (same prefix or type)
         3. Source state had successful outcome
         """
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -490,7 +492,7 @@ class BisimulationEngine:
         )
 
         # Log transfer attempt
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute("""
             INSERT INTO transfer_history
@@ -509,7 +511,7 @@ class BisimulationEngine:
 
     def store_state(self, state: BisimulationState):
         """Store state in database."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO states
@@ -528,7 +530,7 @@ class BisimulationEngine:
 
     def get_transfer_stats(self) -> Dict[str, Any]:
         """Get statistics on policy transfer."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
 
         cursor.execute("SELECT COUNT(*) FROM transfer_history")
@@ -556,7 +558,7 @@ class BisimulationEngine:
 
     def get_state_abstractions(self, limit: int = 20) -> List[Dict[str, Any]]:
         """Get state abstraction classes for dashboard display."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -584,7 +586,7 @@ class BisimulationEngine:
 
     def get_recent_transfers(self, limit: int = 10) -> List[Dict[str, Any]]:
         """Get recent policy transfer attempts for dashboard display."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
 
         cursor.execute("""
@@ -30,6 +30,8 @@ import hashlib
 import sqlite3
 import threading
 
+import db_pool
+
 # Fix Windows encoding for Unicode filenames
 if sys.platform == 'win32':
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8', errors='replace')
@@ -71,7 +73,7 @@ PROCESSING_QUEUE = Queue()
 
 def init_watcher_db() -> sqlite3.Connection:
     """Initialize the watcher tracking database."""
-    conn = sqlite3.connect(WATCHER_DB)
+    conn = db_pool.connect(WATCHER_DB)
     c = conn.cursor()
 
     c.execute('''CREATE TABLE IF NOT EXISTS watched_files (
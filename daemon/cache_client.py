@@ -5,6 +5,13 @@ Unified Cache Client for Dragonfly
 Provides a simple interface for all caching needs across hooks and daemon modules.
 Uses Dragonfly (Redis-compatible) running on localhost:6379.
 
+- One connection pool per process, shared by every DragonflyCache
+- Batched calls: mget/mset and pipeline() send many commands in one round trip
+- SCAN-based key iteration (KEYS blocks the server on large keyspaces)
+- Any redis-py compatible client can be injected (e.g. fakeredis for offline tests)
+- Without Dragonfly, falls back to an embedded SQLite store (SQLiteFallback)
+  with the same semantics: TTLs, hashes, glob scans, pipelines
+
 Usage:
     from cache_client import cache
 
@@ -14,17 +21,36 @@ Usage:
     # Get
     value = cache.get("key")
 
+    # Many keys, one round trip
+    cache.mset({"a": 1, "b": {"x": 2}}, ttl=600)
+    a, b = cache.mget(["a", "b"])
+
+    pipe = cache.pipeline()
+    pipe.get("a").hgetall("file:path/to/file")
+    a, file_data = pipe.execute()
+
     # Hash operations for structured data
     cache.hset("file:path/to/file", {"content": "...", "mtime": 123})
     data = cache.hgetall("file:path/to/file")
+
+    for key in cache.scan_iter("file:*"):
+        ...
 """
 
 import json
 import hashlib
-from typing import Any, Optional, Dict
+import os
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from pathlib import Path
 
-# Try redis, fallback to file-based
+import db_pool
+
+# Try redis, fallback to embedded SQLite store
 try:
     import redis
     REDIS_AVAILABLE = True
@@ -35,61 +61,417 @@ except ImportError:
 DRAGONFLY_HOST = "localhost"
 DRAGONFLY_PORT = 6379
 DRAGONFLY_DB = 0
+DRAGONFLY_MAX_CONNECTIONS = 32
+SCAN_COUNT = 500
 
-# Fallback file cache
+# Fallback store (used when Dragonfly is unreachable)
 FALLBACK_CACHE_DIR = Path.home() / ".atlas-cache"
+FALLBACK_CACHE_DB = FALLBACK_CACHE_DIR / "cache.db"
+FALLBACK_MMAP_BYTES = 64 * 1024 * 1024
+FALLBACK_PURGE_INTERVAL = 60
+
+_pool = None
+
+
+def _get_pool():
+    """Process-wide connection pool (redis-py re-creates it after fork)."""
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool(
+            host=DRAGONFLY_HOST,
+            port=DRAGONFLY_PORT,
+            db=DRAGONFLY_DB,
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+            max_connections=DRAGONFLY_MAX_CONNECTIONS
+        )
+    return _pool
+
+
+def _encode(value: Any) -> str:
+    """Values are stored as strings; dicts/lists as JSON."""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value if isinstance(value, str) else str(value)
+
+
+def _encode_mapping(mapping: Dict[str, Any]) -> Dict[str, str]:
+    return {k: (json.dumps(v) if isinstance(v, (dict, list)) else str(v) if v is not None else "")
+            for k, v in mapping.items()}
+
+
+class QueuedPipeline:
+    """
+    Pipeline for backends without one: queues calls, execute() runs them in
+    order inside the backend's batch() (one transaction).
+    """
+
+    def __init__(self, backend):
+        self._backend = backend
+        self._calls = []
+
+    def __getattr__(self, name: str):
+        method = getattr(self._backend, name)
+
+        def queue(*args, **kwargs):
+            self._calls.append((method, args, kwargs))
+            return self
+        return queue
+
+    def execute(self) -> list:
+        calls, self._calls = self._calls, []
+        with self._backend.batch():
+            return [method(*args, **kwargs) for method, args, kwargs in calls]
+
+    def reset(self):
+        self._calls = []
+
+
+class SQLiteFallback:
+    """
+    Embedded fallback store with the redis-py subset DragonflyCache needs.
+
+    One SQLite file (mmap) shared by every process on the host: keys are
+    a WITHOUT ROWID primary-key B-tree, so get/mget are index lookups and
+    scan_iter(prefix*) is a range scan. TTLs are enforced on read and expired
+    rows are purged every FALLBACK_PURGE_INTERVAL seconds. Hashes are stored
+    as one JSON object per key.
+
+    Nothing touches the disk until the first call: the file (default
+    FALLBACK_CACHE_DB, read at that point) is created then, and per-key JSON
+    files left in the same directory by the old file fallback are imported
+    and deleted.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = Path(path) if path is not None else None
+        self._local = threading.local()
+        self._last_purge = 0.0
+        self._ready: set = set()  # paths whose schema exists
+        self._ready_lock = threading.Lock()
+
+    @property
+    def path(self) -> Path:
+        return self._path if self._path is not None else FALLBACK_CACHE_DB
+
+    def _conn(self) -> sqlite3.Connection:
+        """Per-thread connection (re-opened after fork), opening the store on first use."""
+        local = self._local
+        path = self.path
+        if getattr(local, "pid", None) != os.getpid() or local.path != path:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # db_pool applies the shared pragmas (WAL only with SQLITE_WAL=1)
+            conn = db_pool.connect(path, timeout=5, isolation_level=None,
+                                   check_same_thread=False)
+            conn.execute(f"PRAGMA mmap_size={FALLBACK_MMAP_BYTES}")
+            local.conn, local.pid, local.path, local.depth = conn, os.getpid(), path, 0
+            if path not in self._ready:
+                self._init_schema(conn, path)
+        return local.conn
+
+    def _init_schema(self, conn: sqlite3.Connection, path: Path):
+        with self._ready_lock:
+            if path in self._ready:
+                return
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    type TEXT NOT NULL DEFAULT 'string',
+                    value TEXT,
+                    expires_at REAL
+                ) WITHOUT ROWID;
+                CREATE INDEX IF NOT EXISTS idx_entries_expires
+                    ON entries(expires_at) WHERE expires_at IS NOT NULL;
+            """)
+            self._import_legacy_files(conn, path.parent)
+            self._ready.add(path)
+
+    @staticmethod
+    def _import_legacy_files(conn: sqlite3.Connection, directory: Path) -> int:
+        """
+        Move <md5(key)>.json files of the old per-key file fallback into the
+        store (existing entries win; a value's TTL counts from the file's
+        mtime) and delete them. Other JSON files are left alone.
+        """
+        rows, done = [], []
+        now = time.time()
+        for file in directory.glob("*.json"):
+            try:
+                data = json.loads(file.read_text())
+                key = data["key"]
+                if file.stem != hashlib.md5(key.encode()).hexdigest():
+                    continue
+                if "mapping" in data:
+                    row = (key, "hash", json.dumps(data["mapping"]), None)
+                else:
+                    ttl = data.get("ttl")
+                    row = (key, "string", data["value"], file.stat().st_mtime + ttl if ttl else None)
+            except (OSError, ValueError, KeyError, TypeError, AttributeError):
+                continue
+            done.append(file)
+            if row[3] is None or row[3] > now:
+                rows.append(row)
+        if not done:
+            return 0
+
+        conn.execute("BEGIN IMMEDIATE")
+        conn.executemany(
+            "INSERT OR IGNORE INTO entries (key, type, value, expires_at) VALUES (?, ?, ?, ?)", rows)
+        conn.execute("COMMIT")
+        for file in done:
+            try:
+                file.unlink()
+            except OSError:
+                pass
+        return len(rows)
+
+    @contextmanager
+    def batch(self):
+        """One write transaction for everything inside (re-entrant)."""
+        conn = self._conn()
+        local = self._local
+        if local.depth == 0:
+            conn.execute("BEGIN IMMEDIATE")
+        local.depth += 1
+        try:
+            yield conn
+        except BaseException:
+            local.depth -= 1
+            if local.depth == 0:
+                conn.execute("ROLLBACK")
+            raise
+        local.depth -= 1
+        if local.depth == 0:
+            now = time.time()
+            if now - self._last_purge > FALLBACK_PURGE_INTERVAL:
+                self._last_purge = now
+                conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            conn.execute("COMMIT")
+
+    def _lookup(self, key: str, kind: str) -> Optional[str]:
+        row = self._conn().execute(
+            "SELECT value FROM entries WHERE key = ? AND type = ?"
+            " AND (expires_at IS NULL OR expires_at > ?)",
+            (key, kind, time.time())
+        ).fetchone()
+        return row[0] if row else None
+
+    @staticmethod
+    def _expiry(ttl: Optional[int]) -> Optional[float]:
+        return time.time() + ttl if ttl else None
+
+    def get(self, key: str) -> Optional[str]:
+        return self._lookup(key, "string")
+
+    def set(self, key: str, value: str, ex: Optional[int] = None) -> bool:
+        with self.batch() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries (key, type, value, expires_at)"
+                " VALUES (?, 'string', ?, ?)",
+                (key, value, self._expiry(ex))
+            )
+        return True
+
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        found = {}
+        now = time.time()
+        conn = self._conn()
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            found.update(conn.execute(
+                f"SELECT key, value FROM entries WHERE key IN ({','.join('?' * len(chunk))})"
+                " AND type = 'string' AND (expires_at IS NULL OR expires_at > ?)",
+                (*chunk, now)
+            ).fetchall())
+        return [found.get(key) for key in keys]
+
+    def delete(self, *keys: str) -> int:
+        with self.batch() as conn:
+            return sum(
+                conn.execute(
+                    "DELETE FROM entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                    (key, time.time())
+                ).rowcount
+                for key in keys
+            )
+
+    def exists(self, *keys: str) -> int:
+        now = time.time()
+        conn = self._conn()
+        return sum(
+            conn.execute(
+                "SELECT 1 FROM entries WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (key, now)
+            ).fetchone() is not None
+            for key in keys
+        )
+
+    def expire(self, key: str, ttl: int) -> bool:
+        with self.batch() as conn:
+            now = time.time()
+            return conn.execute(
+                "UPDATE entries SET expires_at = ?"
+                " WHERE key = ? AND (expires_at IS NULL OR expires_at > ?)",
+                (now + ttl, key, now)
+            ).rowcount == 1
+
+    def hset(self, key: str, mapping: Dict[str, str]) -> int:
+        with self.batch():
+            current = self.hgetall(key)
+            added = len(set(mapping) - set(current))
+            current.update(mapping)
+            # Like Redis, HSET on a live hash keeps its TTL
+            self._conn().execute("""
+                INSERT INTO entries (key, type, value, expires_at) VALUES (?, 'hash', ?, NULL)
+                ON CONFLICT(key) DO UPDATE SET
+                    expires_at = CASE WHEN type = 'hash' AND (expires_at IS NULL OR expires_at > ?)
+                                      THEN expires_at END,
+                    type = 'hash',
+                    value = excluded.value
+            """, (key, json.dumps(current), time.time()))
+        return added
+
+    def hgetall(self, key: str) -> Dict[str, str]:
+        value = self._lookup(key, "hash")
+        return json.loads(value) if value else {}
+
+    def hget(self, key: str, field: str) -> Optional[str]:
+        return self.hgetall(key).get(field)
+
+    def scan_iter(self, match: str = "*", count: int = SCAN_COUNT) -> Iterator[str]:
+        """
+        Keys matching a glob, fetched in pages of count. The literal prefix
+        of the pattern bounds an index range scan; GLOB filters the rest.
+        """
+        prefix = re.split(r"[*?\[\\]", match, maxsplit=1)[0]
+        # Smallest string greater than every key starting with prefix
+        upper = prefix[:-1] + chr(ord(prefix[-1]) + 1) if prefix else None
+        bound, op = prefix, ">="
+        conn = self._conn()
+        while True:
+            rows = conn.execute(
+                f"SELECT key FROM entries WHERE key {op} ?"
+                + (" AND key < ?" if upper else "") +
+                " AND key GLOB ? AND (expires_at IS NULL OR expires_at > ?)"
+                " ORDER BY key LIMIT ?",
+                (bound, *([upper] if upper else []), match, time.time(), count)
+            ).fetchall()
+            for (key,) in rows:
+                yield key
+            if len(rows) < count:
+                return
+            bound, op = rows[-1][0], ">"
+
+    def dbsize(self) -> int:
+        return self._conn().execute(
+            "SELECT COUNT(*) FROM entries WHERE expires_at IS NULL OR expires_at > ?",
+            (time.time(),)
+        ).fetchone()[0]
+
+    def pipeline(self, transaction: bool = False) -> QueuedPipeline:
+        return QueuedPipeline(self)
+
+    def ping(self) -> bool:
+        return True
+
+
+class CachePipeline:
+    """
+    Batches DragonflyCache calls into one round trip. Methods chain; execute()
+    returns one result per call, shaped like the matching DragonflyCache method.
+    """
+
+    def __init__(self, pipe):
+        self._pipe = pipe
+        self._ops: List[tuple] = []   # (raw results consumed, postprocess)
+
+    def _add(self, consumed: int, post: Callable[[list], Any]) -> "CachePipeline":
+        self._ops.append((consumed, post))
+        return self
+
+    def get(self, key: str) -> "CachePipeline":
+        self._pipe.get(key)
+        return self._add(1, lambda r: r[0])
+
+    def set(self, key: str, value: Any, ttl: int = 3600) -> "CachePipeline":
+        self._pipe.set(key, _encode(value), ex=ttl if ttl > 0 else None)
+        return self._add(1, lambda r: bool(r[0]))
+
+    def delete(self, key: str) -> "CachePipeline":
+        self._pipe.delete(key)
+        return self._add(1, lambda r: True)
+
+    def exists(self, key: str) -> "CachePipeline":
+        self._pipe.exists(key)
+        return self._add(1, lambda r: bool(r[0]))
+
+    def expire(self, key: str, ttl: int) -> "CachePipeline":
+        self._pipe.expire(key, ttl)
+        return self._add(1, lambda r: bool(r[0]))
+
+    def hset(self, key: str, mapping: Dict[str, Any], ttl: int = 3600) -> "CachePipeline":
+        self._pipe.hset(key, mapping=_encode_mapping(mapping))
+        if ttl > 0:
+            self._pipe.expire(key, ttl)
+            return self._add(2, lambda r: True)
+        return self._add(1, lambda r: True)
+
+    def hgetall(self, key: str) -> "CachePipeline":
+        self._pipe.hgetall(key)
+        return self._add(1, lambda r: r[0] or None)
+
+    def hget(self, key: str, field: str) -> "CachePipeline":
+        self._pipe.hget(key, field)
+        return self._add(1, lambda r: r[0])
+
+    def execute(self) -> list:
+        """Send everything queued. On a connection error every result is None."""
+        ops, self._ops = self._ops, []
+        try:
+            raw = self._pipe.execute()
+        except Exception:
+            self._pipe.reset()
+            return [None] * len(ops)
+
+        results, i = [], 0
+        for consumed, post in ops:
+            chunk = raw[i:i + consumed]
+            i += consumed
+            results.append(None if any(isinstance(r, Exception) for r in chunk) else post(chunk))
+        return results
 
 
 class DragonflyCache:
-    """Dragonfly/Redis cache client with file fallback."""
+    """Dragonfly/Redis cache client with embedded SQLite fallback."""
 
-    def __init__(self):
-        self._client = None
+    def __init__(self, client=None):
+        self._client = client
         self._fallback_mode = False
-        self._connect()
+        if client is None:
+            self._connect()
 
     def _connect(self):
         """Connect to Dragonfly or enable fallback."""
         if not REDIS_AVAILABLE:
-            self._fallback_mode = True
-            FALLBACK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self._enable_fallback()
             return
 
         try:
-            self._client = redis.Redis(
-                host=DRAGONFLY_HOST,
-                port=DRAGONFLY_PORT,
-                db=DRAGONFLY_DB,
-                decode_responses=True,
-                socket_connect_timeout=2,
-                socket_timeout=2
-            )
+            self._client = redis.Redis(connection_pool=_get_pool())
             # Test connection
             self._client.ping()
         except (redis.ConnectionError, redis.TimeoutError):
-            self._fallback_mode = True
-            FALLBACK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            self._enable_fallback()
 
-    def _fallback_path(self, key: str) -> Path:
-        """Get fallback file path for a key."""
-        safe_key = hashlib.md5(key.encode()).hexdigest()
-        return FALLBACK_CACHE_DIR / f"{safe_key}.json"
+    def _enable_fallback(self):
+        self._fallback_mode = True
+        self._client = SQLiteFallback()
 
     def set(self, key: str, value: Any, ttl: int = 3600) -> bool:
         """Set a value with optional TTL (seconds)."""
         try:
-            if self._fallback_mode:
-                data = {"value": value, "ttl": ttl}
-                self._fallback_path(key).write_text(json.dumps(data))
-                return True
-
-            if isinstance(value, (dict, list)):
-                value = json.dumps(value)
-
-            if ttl > 0:
-                self._client.setex(key, ttl, value)
-            else:
-                self._client.set(key, value)
+            self._client.set(key, _encode(value), ex=ttl if ttl > 0 else None)
             return True
         except Exception:
             return False
@@ -97,17 +479,32 @@ class DragonflyCache:
     def get(self, key: str) -> Optional[str]:
         """Get a value."""
         try:
-            if self._fallback_mode:
-                path = self._fallback_path(key)
-                if path.exists():
-                    data = json.loads(path.read_text())
-                    return data.get("value")
-                return None
-
             return self._client.get(key)
         except Exception:
             return None
 
+    def mget(self, keys: List[str]) -> List[Optional[str]]:
+        """Get many values in one round trip (None for missing keys)."""
+        if not keys:
+            return []
+        try:
+            return list(self._client.mget(keys))
+        except Exception:
+            return [None] * len(keys)
+
+    def mset(self, mapping: Dict[str, Any], ttl: int = 3600) -> bool:
+        """Set many values (each with the same TTL) in one round trip."""
+        if not mapping:
+            return True
+        pipe = self.pipeline()
+        for key, value in mapping.items():
+            pipe.set(key, value, ttl)
+        return all(pipe.execute())
+
+    def pipeline(self) -> CachePipeline:
+        """Batch several calls into one round trip (see CachePipeline)."""
+        return CachePipeline(self._client.pipeline(transaction=False))
+
     def get_json(self, key: str) -> Optional[Any]:
         """Get and parse JSON value."""
         value = self.get(key)
@@ -121,12 +518,6 @@ class DragonflyCache:
     def delete(self, key: str) -> bool:
         """Delete a key."""
         try:
-            if self._fallback_mode:
-                path = self._fallback_path(key)
-                if path.exists():
-                    path.unlink()
-                return True
-
             self._client.delete(key)
             return True
         except Exception:
@@ -135,46 +526,26 @@ class DragonflyCache:
     def exists(self, key: str) -> bool:
         """Check if key exists."""
         try:
-            if self._fallback_mode:
-                return self._fallback_path(key).exists()
-
             return bool(self._client.exists(key))
         except Exception:
             return False
 
-    def hset(self, key: str, mapping: Dict[str, Any], ttl: int = 3600) -> bool:
-        """Set hash fields."""
+    def expire(self, key: str, ttl: int) -> bool:
+        """Reset a key's TTL (seconds)."""
         try:
-            if self._fallback_mode:
-                data = {"mapping": mapping, "ttl": ttl}
-                self._fallback_path(key).write_text(json.dumps(data))
-                return True
-
-            # Convert non-string values to JSON
-            clean_mapping = {}
-            for k, v in mapping.items():
-                if isinstance(v, (dict, list)):
-                    clean_mapping[k] = json.dumps(v)
-                else:
-                    clean_mapping[k] = str(v) if v is not None else ""
-
-            self._client.hset(key, mapping=clean_mapping)
-            if ttl > 0:
-                self._client.expire(key, ttl)
-            return True
+            return bool(self._client.expire(key, ttl))
         except Exception:
             return False
 
+    def hset(self, key: str, mapping: Dict[str, Any], ttl: int = 3600) -> bool:
+        """Set hash fields (and the TTL) in one round trip."""
+        pipe = self.pipeline()
+        pipe.hset(key, mapping, ttl)
+        return pipe.execute()[0] is not None
+
     def hgetall(self, key: str) -> Optional[Dict[str, str]]:
         """Get all hash fields."""
         try:
-            if self._fallback_mode:
-                path = self._fallback_path(key)
-                if path.exists():
-                    data = json.loads(path.read_text())
-                    return data.get("mapping", {})
-                return None
-
             result = self._client.hgetall(key)
             return result if result else None
         except Exception:
@@ -183,41 +554,43 @@ class DragonflyCache:
     def hget(self, key: str, field: str) -> Optional[str]:
         """Get single hash field."""
         try:
-            if self._fallback_mode:
-                data = self.hgetall(key)
-                return data.get(field) if data else None
-
             return self._client.hget(key, field)
         except Exception:
             return None
 
-    def keys(self, pattern: str = "*") -> list:
-        """Get keys matching pattern."""
+    def scan_iter(self, pattern: str = "*", count: int = SCAN_COUNT) -> Iterator[str]:
+        """Iterate keys matching pattern with SCAN (never blocks the server)."""
         try:
-            if self._fallback_mode:
-                # Simple pattern matching for fallback
-                return list(FALLBACK_CACHE_DIR.glob("*.json"))
-
-            return self._client.keys(pattern)
+            yield from self._client.scan_iter(match=pattern, count=count)
         except Exception:
-            return []
+            return
+
+    def keys(self, pattern: str = "*", limit: Optional[int] = None) -> list:
+        """Get keys matching pattern (SCAN-based; stops after limit keys)."""
+        found = []
+        for key in self.scan_iter(pattern):
+            found.append(key)
+            if limit is not None and len(found) >= limit:
+                break
+        return found
 
     def info(self) -> Dict[str, Any]:
         """Get cache info/stats."""
         try:
             if self._fallback_mode:
-                files = list(FALLBACK_CACHE_DIR.glob("*.json"))
                 return {
                     "mode": "fallback",
-                    "keys": len(files),
-                    "path": str(FALLBACK_CACHE_DIR)
+                    "keys": self._client.dbsize(),
+                    "path": str(self._client.path)
                 }
 
             info = self._client.info("keyspace")
             stats = self._client.info("stats")
+            memory = self._client.info("memory")
             return {
                 "mode": "dragonfly",
                 "keyspace": info,
+                "memory_used": memory.get("used_memory_human", "unknown"),
                 "hits": stats.get("keyspace_hits", 0),
                 "misses": stats.get("keyspace_misses", 0),
                 "hit_ratio": stats.get("keyspace_hits", 0) / max(1, stats.get("keyspace_hits", 0) + stats.get("keyspace_misses", 0))
@@ -236,6 +609,10 @@ class DragonflyCache:
         except:
             return False
 
+    @property
+    def mode(self) -> str:
+        return "fallback" if self._fallback_mode else "dragonfly"
+
 
 # Global cache instance
 cache = DragonflyCache()
@@ -268,6 +645,7 @@ if __name__ == "__main__":
         print("  python cache_client.py test    - Test cache operations")
         print("  python cache_client.py get <key>")
         print("  python cache_client.py set <key> <value>")
+        print("  python cache_client.py keys [pattern]")
         sys.exit(0)
 
     cmd = sys.argv[1]
@@ -286,8 +664,20 @@ if __name__ == "__main__":
         hval = cache.hgetall("test:hash")
         print(f"  hset/hgetall: {'OK' if hval and 'field1' in hval else 'FAIL'}")
 
-        cache.delete("test:key")
-        cache.delete("test:hash")
+        cache.mset({"test:m1": "a", "test:m2": {"b": 2}}, ttl=60)
+        mval = cache.mget(["test:m1", "test:m2", "test:missing"])
+        print(f"  mset/mget: {'OK' if mval == ['a', json.dumps({'b': 2}), None] else 'FAIL'}")
+
+        pipe = cache.pipeline()
+        pipe.get("test:key").hgetall("test:hash").exists("test:missing")
+        pval = pipe.execute()
+        print(f"  pipeline: {'OK' if pval[0] == 'test_value' and pval[1] and pval[2] is False else 'FAIL'}")
+
+        scanned = set(cache.scan_iter("test:*"))
+        print(f"  scan: {'OK' if {'test:key', 'test:hash', 'test:m1'} <= scanned else 'FAIL'}")
+
+        for key in ("test:key", "test:hash", "test:m1", "test:m2"):
+            cache.delete(key)
         print(f"  Mode: {cache.info().get('mode', 'unknown')}")
         print("Done.")
 
@@ -299,5 +689,9 @@ if __name__ == "__main__":
         cache.set(sys.argv[2], sys.argv[3])
         print("OK")
 
+    elif cmd == "keys":
+        for key in cache.keys(sys.argv[2] if len(sys.argv) > 2 else "*", limit=100):
+            print(key)
+
     else:
         print(f"Unknown command: {cmd}")
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+"""
+Cache Compactor - Size budgets, compression and vacuuming for cache DBs.
+
+The response caches (llm_cache_l2.db, optimizer.db pattern_cache) only
+ever deleted by expiry, stored responses as plain text and never gave
+freed pages back, so they grew without bound and fell out of the page
+cache. This module provides:
+
+- compress()/decompress(): transparent response compression (zstd when
+  the zstandard package is installed, zlib otherwise). Values below
+  CACHE_COMPRESS_MIN_BYTES stay plain text; readers look at the row's
+  encoding column, so old uncompressed rows keep working.
+- evict_to_budget(): delete the least valuable rows until the table's
+  stored bytes are back under a budget (lru, lfu or cost-aware order).
+- vacuum(): switch the DB to incremental auto_vacuum (one full VACUUM)
+  and afterwards return free pages with PRAGMA incremental_vacuum.
+- start(): a daemon thread that runs every registered job every
+  CACHE_COMPACT_INTERVAL seconds. The run is claimed through a row in the
+  DB itself, so only one process compacts per interval. Caches only
+  register their jobs; the long-running daemons (continuous_executor,
+  api, mcp_server) call start(), so short-lived scripts never compact.
+
+The first compaction of a DB created before auto_vacuum was set runs one
+full VACUUM of the whole file (optimizer.db includes every other table
+in it): it rewrites the file and holds the write lock while doing so.
+Run `python cache_compactor.py` once at a quiet time to get it over with.
+
+Usage:
+    import cache_compactor
+
+    value, encoding = cache_compactor.compress(response)
+    cache_compactor.register("llm_cache_l2", db_path, self.compact)
+    cache_compactor.start()             # daemon entry points only
+
+    python cache_compactor.py            # compact all caches now
+    python cache_compactor.py --status   # cache DB file sizes
+"""
+
+import logging
+import os
+import threading
+import time
+import zlib
+from typing import Callable, Dict, Optional, Tuple
+
+import db_pool
+from config import cfg
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Keep-first orderings per eviction policy; rows sorting last are evicted.
+# Tables provide hit_count, last_hit, created_at and size_bytes; "cost"
+# also needs a cost column (tokens spent to produce the response).
+POLICY_ORDER = {
+    "lru": "COALESCE(last_hit, created_at) DESC",
+    "lfu": "hit_count DESC, COALESCE(last_hit, created_at) DESC",
+    "cost": "(hit_count + 1.0) * ({cost} + 1.0) / (size_bytes + 1.0) DESC, "
+            "COALESCE(last_hit, created_at) DESC",
+}
+
+# Evict down to this fraction of the budget, so a full cache isn't
+# trimmed again on every run
+LOW_WATER = 0.9
+
+
+def compress(text: str) -> Tuple[object, str]:
+    """(stored value, encoding) for a response; encoding '' means plain text."""
+    raw = text.encode("utf-8")
+    if len(raw) < cfg.CACHE_COMPRESS_MIN_BYTES:
+        return text, ""
+    if ZSTD_AVAILABLE:
+        return zstandard.ZstdCompressor(level=3).compress(raw), "zstd"
+    return zlib.compress(raw, 6), "zlib"
+
+
+def decompress(value, encoding: Optional[str]) -> str:
+    """Inverse of compress() (plain values pass through)."""
+    if not encoding:
+        return value
+    if encoding == "zstd":
+        return zstandard.ZstdDecompressor().decompress(value).decode("utf-8")
+    if encoding == "zlib":
+        return zlib.decompress(value).decode("utf-8")
+    raise ValueError(f"Unknown cache encoding: {encoding}")
+
+
+def add_columns(conn, table: str, columns: Dict[str, str]):
+    """ALTER TABLE ADD COLUMN for any of columns the table doesn't have yet."""
+    existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    for name, decl in columns.items():
+        if name not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
+
+def evict_to_budget(
+    conn,
+    table: str,
+    key_column: str,
+    max_bytes: int,
+    policy: str = "lfu",
+    cost_column: str = "0"
+) -> int:
+    """
+    Delete rows in eviction order until SUM(size_bytes) <= LOW_WATER * max_bytes
+    (nothing happens while the table is within max_bytes). Returns rows deleted.
+    key_column may list several columns ("model, text_hash") for a composite
+    key. Caller commits.
+    """
+    total = conn.execute(f"SELECT COALESCE(SUM(size_bytes), 0) FROM {table}").fetchone()[0]
+    if total <= max_bytes:
+        return 0
+    order = POLICY_ORDER.get(policy, POLICY_ORDER["lfu"]).format(cost=cost_column)
+    cursor = conn.execute(f"""
+        DELETE FROM {table} WHERE ({key_column}) IN (
+            SELECT {key_column} FROM (
+                SELECT {key_column},
+                       SUM(size_bytes) OVER (ORDER BY {order} ROWS UNBOUNDED PRECEDING) AS kept
+                FROM {table}
+            ) WHERE kept > ?
+        )
+    """, (int(max_bytes * LOW_WATER),))
+    return max(cursor.rowcount, 0)
+
+
+def vacuum(db_path) -> Dict:
+    """Give free pages back to the filesystem. Returns page counts before/after."""
+    conn = db_pool.connect(db_path)
+    try:
+        conn.commit()
+        before = conn.execute("PRAGMA page_count").fetchone()[0]
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            # One-time switch to incremental mode; only takes effect through VACUUM
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            conn.execute("VACUUM")
+        elif free:
+            conn.execute("PRAGMA incremental_vacuum")
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        after = conn.execute("PRAGMA page_count").fetchone()[0]
+    finally:
+        conn.close()
+    return {"pages_before": before, "free_before": free, "pages_after": after}
+
+
+def claim_run(db_path, name: str, interval: float) -> bool:
+    """True for exactly one caller (across processes) per interval per job."""
+    conn = db_pool.connect(db_path)
+    try:
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS cache_compactions (
+                name TEXT PRIMARY KEY,
+                last_run REAL NOT NULL
+            )
+        """)
+        now = time.time()
+        cursor = conn.execute("""
+            INSERT INTO cache_compactions (name, last_run) VALUES (?, ?)
+            ON CONFLICT(name) DO UPDATE SET last_run = excluded.last_run
+            WHERE cache_compactions.last_run <= ?
+        """, (name, now, now - interval))
+        conn.commit()
+        return cursor.rowcount == 1
+    finally:
+        conn.close()
+
+
+# name -> (db_path, job); job() evicts/compacts and returns a summary dict
+_jobs: Dict[str, Tuple[str, Callable[[], Dict]]] = {}
+_jobs_lock = threading.Lock()
+_thread: Optional[threading.Thread] = None
+_thread_pid: Optional[int] = None
+
+
+def register(name: str, db_path, job: Callable[[], Dict]):
+    """Add a compaction job (idempotent per name)."""
+    with _jobs_lock:
+        _jobs[name] = (os.fspath(db_path), job)
+
+
+def run_all(force: bool = False) -> Dict[str, Dict]:
+    """Run every registered job whose interval has passed (or all, with force)."""
+    with _jobs_lock:
+        jobs = dict(_jobs)
+    results = {}
+    for name, (db_path, job) in jobs.items():
+        try:
+            if force or claim_run(db_path, name, cfg.CACHE_COMPACT_INTERVAL):
+                results[name] = job()
+        except Exception as e:
+            logger.warning(f"Cache compaction {name} failed: {e}")
+            results[name] = {"error": str(e)}
+    return results
+
+
+def _run():
+    while True:
+        time.sleep(cfg.CACHE_COMPACT_INTERVAL)
+        run_all()
+
+
+def start():
+    """
+    Start this process's compactor thread (no-op if running or disabled).
+    It runs the jobs registered by then and any registered later.
+    """
+    global _thread, _thread_pid
+    if cfg.CACHE_COMPACT_INTERVAL <= 0:
+        return
+    with _jobs_lock:
+        if _thread is not None and _thread_pid == os.getpid():
+            return
+        _thread = threading.Thread(target=_run, name="cache-compactor", daemon=True)
+        _thread_pid = os.getpid()
+        _thread.start()
+
+
+def _register_defaults():
+    from embedding_cache import get_embedding_cache
+    from llm_cache_l2 import LLMCacheL2
+    from token_optimizer import TokenOptimizer
+
+    LLMCacheL2()                # registers itself
+    TokenOptimizer()
+    get_embedding_cache()
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+
+    _register_defaults()
+    if len(sys.argv) > 1 and sys.argv[1] == "--status":
+        status = {}
+        for name, (db_path, _) in _jobs.items():
+            path = db_pool.resolve(db_path)
+            status[name] = {
+                "db": path,
+                "file_bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+            }
+        print(json.dumps(status, indent=2))
+    else:
+        print(json.dumps(run_all(force=True), indent=2))
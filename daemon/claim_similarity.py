@@ -16,12 +16,23 @@ Usage:
 
 import os
 import json
+import math
 import sqlite3
+import time
+from contextlib import contextmanager
 from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Any
 from pathlib import Path
 from datetime import datetime
-from collections import defaultdict
+from collections import Counter, defaultdict
+
+import db_pool
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:  # Windows: saves aren't serialized across processes
+    FCNTL_AVAILABLE = False
 
 # ============================================================================
 # Configuration
@@ -29,6 +40,8 @@ from collections import defaultdict
 
 DB_PATH = Path(os.environ.get("UTF_DB_PATH", Path(__file__).parent / "utf_knowledge.db"))
 INDEX_PATH = Path(os.environ.get("SIMILARITY_INDEX", Path(__file__).parent / "claim_index.json"))
+CLUSTER_THRESHOLD = 0.6  # Composite utf_closeness linking two claims into one cluster
+SAVE_INTERVAL = 60  # Seconds between incremental saves (save_if_due)
 
 # ============================================================================
 # Data Classes
@@ -71,12 +84,16 @@ class ClaimCluster:
 # Similarity Metrics
 # ============================================================================
 
+def slug_parts(slug: str) -> Set[str]:
+    """Lowercased slug code parts (the terms slug_similarity compares)."""
+    return set(slug.lower().split('-')) if slug else set()
+
 def slug_similarity(slug_a: str, slug_b: str) -> float:
     """Compute Jaccard similarity between slug codes."""
     if not slug_a or not slug_b:
         return 0.0
-    parts_a = set(slug_a.lower().split('-'))
-    parts_b = set(slug_b.lower().split('-'))
+    parts_a = slug_parts(slug_a)
+    parts_b = slug_parts(slug_b)
     intersection = parts_a & parts_b
     union = parts_a | parts_b
     return len(intersection) / len(union) if union else 0.0
@@ -122,12 +139,52 @@ def utf_closeness(claim_a: ClaimIndex, claim_b: ClaimIndex) -> Dict[str, float]:
         "composite": composite
     }
 
+class UnionFind:
+    """Disjoint sets of claim ids (path halving, union by size)."""
+
+    def __init__(self):
+        self.parent: Dict[str, str] = {}
+        self.size: Dict[str, int] = {}
+
+    def find(self, item: str) -> str:
+        parent = self.parent
+        if item not in parent:
+            parent[item] = item
+            self.size[item] = 1
+            return item
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: str, b: str) -> str:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return root_a
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size.pop(root_b)
+        return root_a
+
 # ============================================================================
 # Index Operations
 # ============================================================================
 
 class ClaimSimilarityIndex:
-    """Index for fast claim similarity lookup."""
+    """
+    Index for fast claim similarity lookup.
+
+    Clusters are the connected components of the graph linking claims with
+    utf_closeness >= cluster_threshold, kept in a UnionFind. Pairs are only
+    scored when candidates() (slug/taxonomy blocking) says they can reach the
+    threshold, and add_claims() links just the new claims, so indexing one
+    paper costs O(new claims x candidates) rather than a full rebuild.
+
+    Rewriting the whole file per paper is the expensive part at that point,
+    so ingest calls save_if_due() and flush() at shutdown. save() merges
+    with a copy saved by another process in the meantime.
+    """
 
     def __init__(self, db_path: Path = DB_PATH, index_path: Path = INDEX_PATH):
         self.db_path = db_path
@@ -136,131 +193,332 @@ class ClaimSimilarityIndex:
         self.slug_index: Dict[str, List[str]] = defaultdict(list)  # slug_part -> claim_ids
         self.taxonomy_index: Dict[str, List[str]] = defaultdict(list)  # tag -> claim_ids
         self.clusters: List[ClaimCluster] = []
+        self.cluster_threshold = CLUSTER_THRESHOLD
+        self._components = UnionFind()
+        self._cluster_of: Dict[str, ClaimCluster] = {}  # claim_id -> its cluster
+        self._next_cluster = 0
+        # (slug_part, number of parts) -> claim_ids, for size-aware blocking
+        self._slug_buckets: Dict[Tuple[str, int], List[str]] = defaultdict(list)
+        self._unsaved: Set[str] = set()  # Claims added since the last load/save
+        self._file_stamp = None  # index_path (mtime, size) when last loaded/saved
+        self._saved_at = time.monotonic()
 
     def load(self) -> bool:
         """Load index from file."""
         if not self.index_path.exists():
             return False
         try:
+            stamp = self._stamp()
             with open(self.index_path, 'r') as f:
                 data = json.load(f)
-            self.claims = {k: ClaimIndex(**v) for k, v in data.get("claims", {}).items()}
-            self.slug_index = defaultdict(list, data.get("slug_index", {}))
-            self.taxonomy_index = defaultdict(list, data.get("taxonomy_index", {}))
-            self.clusters = [ClaimCluster(**c) for c in data.get("clusters", [])]
-            return True
+            claims = {k: ClaimIndex(**v) for k, v in data.get("claims", {}).items()}
+            clusters = [ClaimCluster(**c) for c in data.get("clusters", [])]
         except Exception as e:
             print(f"[ERROR] Loading index: {e}")
             return False
+        self.claims = claims
+        self.slug_index = defaultdict(list, data.get("slug_index", {}))
+        self.taxonomy_index = defaultdict(list, data.get("taxonomy_index", {}))
+        self.clusters = clusters
+        self.cluster_threshold = data.get("cluster_threshold", CLUSTER_THRESHOLD)
+        self._slug_buckets.clear()
+        for claim in self.claims.values():
+            self._bucket_claim(claim)
+        self._restore_components()
+        self._unsaved.clear()
+        self._file_stamp = stamp
+        return True
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.index_path.stat()
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    @contextmanager
+    def _file_lock(self):
+        """Serialize saves of index_path across processes."""
+        if not FCNTL_AVAILABLE:
+            yield
+            return
+        with open(f"{self.index_path}.lock", "w") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            yield
 
     def save(self):
-        """Save index to file."""
-        data = {
-            "claims": {k: asdict(v) for k, v in self.claims.items()},
-            "slug_index": dict(self.slug_index),
-            "taxonomy_index": dict(self.taxonomy_index),
-            "clusters": [asdict(c) for c in self.clusters],
-            "updated_at": datetime.now().isoformat()
-        }
-        with open(self.index_path, 'w') as f:
-            json.dump(data, f, indent=2)
+        """
+        Save index to file (compact JSON, replaced atomically). If another
+        process saved since this one loaded, its copy is reloaded and the
+        claims added here are linked into it, so concurrent ingests don't
+        drop each other's claims.
+        """
+        with self._file_lock():
+            if self._unsaved and self._stamp() != self._file_stamp:
+                mine = [self.claims[claim_id] for claim_id in self._unsaved]
+                if self.load():
+                    self.add_claims(mine)
+            data = {
+                "claims": {k: asdict(v) for k, v in self.claims.items()},
+                "slug_index": dict(self.slug_index),
+                "taxonomy_index": dict(self.taxonomy_index),
+                "clusters": [asdict(c) for c in self.clusters],
+                "cluster_threshold": self.cluster_threshold,
+                "updated_at": datetime.now().isoformat()
+            }
+            tmp = self.index_path.with_name(f"{self.index_path.name}.{os.getpid()}.tmp")
+            with open(tmp, 'w') as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.index_path)
+            self._file_stamp = self._stamp()
+        self._unsaved.clear()
+        self._saved_at = time.monotonic()
         print(f"[OK] Index saved: {len(self.claims)} claims, {len(self.clusters)} clusters")
 
-    def rebuild_from_db(self):
-        """Rebuild index from UTF knowledge database."""
-        if not self.db_path.exists():
-            print(f"[ERROR] Database not found: {self.db_path}")
-            return
+    def save_if_due(self, interval: float = SAVE_INTERVAL) -> bool:
+        """Save if claims were added and interval seconds passed since the last save."""
+        if self._unsaved and time.monotonic() - self._saved_at >= interval:
+            self.save()
+            return True
+        return False
 
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        cursor = conn.cursor()
+    def flush(self):
+        """Save claims added since the last save, if any (at shutdown)."""
+        if self._unsaved:
+            self.save()
 
-        # Get all claims with source info
-        cursor.execute("""
+    def _claims_from_db(self, claim_ids: Optional[List[str]] = None) -> List[ClaimIndex]:
+        """Claims (all, or the given ids) with source info from the UTF database."""
+        conn = db_pool.connect(self.db_path)
+        conn.row_factory = sqlite3.Row
+        query = """
             SELECT c.claim_id, c.statement, c.claim_form, c.source_id,
                    c.slug_code, c.taxonomy_tags, s.title as source_title
             FROM claims c
             LEFT JOIN sources s ON c.source_id = s.source_id
-        """)
-
-        self.claims.clear()
-        self.slug_index.clear()
-        self.taxonomy_index.clear()
-
-        for row in cursor.fetchall():
-            taxonomy = json.loads(row["taxonomy_tags"]) if row["taxonomy_tags"] else []
+        """
+        if claim_ids is None:
+            rows = conn.execute(query).fetchall()
+        else:
+            rows = []
+            for i in range(0, len(claim_ids), 500):
+                chunk = claim_ids[i:i + 500]
+                rows.extend(conn.execute(
+                    f"{query} WHERE c.claim_id IN ({','.join('?' * len(chunk))})", chunk).fetchall())
+        conn.close()
 
-            claim = ClaimIndex(
+        return [
+            ClaimIndex(
                 claim_id=row["claim_id"],
                 slug_code=row["slug_code"] or "",
                 statement=row["statement"],
                 source_id=row["source_id"],
                 source_title=row["source_title"] or "Unknown",
-                taxonomy_tags=taxonomy,
+                taxonomy_tags=json.loads(row["taxonomy_tags"]) if row["taxonomy_tags"] else [],
                 claim_form=row["claim_form"]
             )
+            for row in rows
+        ]
 
-            self.claims[claim.claim_id] = claim
-
-            # Index by slug parts
-            if claim.slug_code:
-                for part in claim.slug_code.split('-'):
-                    self.slug_index[part.lower()].append(claim.claim_id)
+    def rebuild_from_db(self):
+        """Rebuild index from UTF knowledge database."""
+        if not db_pool.exists(self.db_path):
+            print(f"[ERROR] Database not found: {self.db_path}")
+            return
 
-            # Index by taxonomy tags
-            for tag in taxonomy:
-                self.taxonomy_index[tag.lower()].append(claim.claim_id)
+        self.claims.clear()
+        self.slug_index.clear()
+        self.taxonomy_index.clear()
+        self._slug_buckets.clear()
 
-        conn.close()
+        for claim in self._claims_from_db():
+            self.claims[claim.claim_id] = claim
+            self._index_claim(claim)
 
         # Build clusters
-        self._build_clusters()
+        self._build_clusters(self.cluster_threshold)
+        self._unsaved.clear()  # Complete as of now: save() overwrites any other copy
 
         print(f"[OK] Rebuilt index: {len(self.claims)} claims")
         self.save()
 
-    def _build_clusters(self, threshold: float = 0.6):
+    def add_from_db(self, claim_ids: List[str]) -> int:
+        """
+        Index claims just stored in the UTF database (store_utf_to_sqlite)
+        and link them into the clusters. Without an index yet, builds it
+        from the whole database instead. Returns the number of claims added.
+        """
+        if not self.claims:
+            self.rebuild_from_db()
+            return len(self.claims)
+        claims = self._claims_from_db(claim_ids)
+        self.add_claims(claims)
+        return len(claims)
+
+    def add_claims(self, claims: List[ClaimIndex]):
+        """
+        Add (or replace) claims and update only the clusters they touch.
+
+        A replaced claim keeps its earlier links until the next rebuild.
+        """
+        for claim in claims:
+            old = self.claims.get(claim.claim_id)
+            if old:
+                self._unindex_claim(old)
+            self.claims[claim.claim_id] = claim
+            self._index_claim(claim)
+            self._unsaved.add(claim.claim_id)
+        self._link([claim.claim_id for claim in claims])
+
+    def _bucket_claim(self, claim: ClaimIndex):
+        parts = slug_parts(claim.slug_code)
+        for part in parts:
+            self._slug_buckets[(part, len(parts))].append(claim.claim_id)
+
+    def _index_claim(self, claim: ClaimIndex):
+        # Index by slug parts
+        for part in slug_parts(claim.slug_code):
+            self.slug_index[part].append(claim.claim_id)
+        self._bucket_claim(claim)
+
+        # Index by taxonomy tags
+        for tag in {t.lower() for t in claim.taxonomy_tags}:
+            self.taxonomy_index[tag].append(claim.claim_id)
+
+    def _unindex_claim(self, claim: ClaimIndex):
+        parts = slug_parts(claim.slug_code)
+        for index, keys in ((self.slug_index, parts),
+                            (self._slug_buckets, {(p, len(parts)) for p in parts}),
+                            (self.taxonomy_index, {t.lower() for t in claim.taxonomy_tags})):
+            for key in keys:
+                ids = index.get(key, [])
+                if claim.claim_id in ids:
+                    ids.remove(claim.claim_id)
+                if not ids:
+                    index.pop(key, None)
+
+    def candidates(self, claim: ClaimIndex, threshold: float) -> Set[str]:
+        """
+        Ids of claims that can reach utf_closeness >= threshold with claim
+        (a superset; the pairs still need scoring).
+
+        composite = 0.5 slug + 0.3 taxonomy + 0.2 form, so above 0.5 a pair
+        needs slug Jaccard j >= 2 * threshold - 1. Against a slug of m parts
+        that means sharing at least ceil(j * (n + m) / (1 + j)) of this
+        claim's n parts, so any n - that + 1 of them must hit: the rarest
+        are looked up in the m-part bucket (size and prefix filtering), which
+        keeps common parts such as the domain out of most lookups. At 0.5 or
+        below any shared slug part or first taxonomy tag can qualify; at 0.2
+        or below form alone can, and every claim is a candidate.
+        """
+        if threshold <= 0.2:
+            return set(self.claims) - {claim.claim_id}
+
+        found = set()
+        parts = slug_parts(claim.slug_code)
+        if threshold > 0.5:
+            if parts:
+                jaccard = 2 * threshold - 1
+                n = len(parts)
+                rarest = sorted(parts, key=lambda p: (len(self.slug_index.get(p, ())), p))
+                for m in range(max(1, math.ceil(jaccard * n - 1e-9)), math.floor(n / jaccard + 1e-9) + 1):
+                    shared = max(1, math.ceil(jaccard * (n + m) / (1 + jaccard) - 1e-9))
+                    if shared > min(n, m):
+                        continue
+                    for part in rarest[:n - shared + 1]:
+                        found.update(self._slug_buckets.get((part, m), ()))
+        else:
+            for part in parts:
+                found.update(self.slug_index.get(part, ()))
+            if claim.taxonomy_tags:
+                found.update(self.taxonomy_index.get(claim.taxonomy_tags[0].lower(), ()))
+        found.discard(claim.claim_id)
+        return found
+
+    def _build_clusters(self, threshold: float = CLUSTER_THRESHOLD):
         """Build clusters of similar claims."""
-        self.clusters.clear()
-        assigned = set()
-
-        for claim_id, claim in self.claims.items():
-            if claim_id in assigned:
+        self.cluster_threshold = threshold
+        self.clusters = []
+        self._components = UnionFind()
+        self._cluster_of.clear()
+        self._next_cluster = 0
+        self._link(list(self.claims))
+
+    def _restore_components(self):
+        """Union-find state and cluster lookup from loaded clusters."""
+        self._components = UnionFind()
+        self._cluster_of.clear()
+        self._next_cluster = 0
+        for cluster in self.clusters:
+            for claim_id in cluster.claims:
+                self._components.union(cluster.claims[0], claim_id)
+                self._cluster_of[claim_id] = cluster
+            suffix = cluster.cluster_id.rsplit("_", 1)[-1]
+            if suffix.isdigit():
+                self._next_cluster = max(self._next_cluster, int(suffix) + 1)
+
+    def _link(self, claim_ids: Iterable[str]):
+        """Union each claim with its close candidates; rebuild the clusters that changed."""
+        components = self._components
+        threshold = self.cluster_threshold
+        touched = set()
+
+        for claim_id in claim_ids:
+            claim = self.claims[claim_id]
+            touched.add(claim_id)
+            for other_id in self.candidates(claim, threshold):
+                if components.find(other_id) == components.find(claim_id):
+                    continue  # Already in one cluster
+                if utf_closeness(claim, self.claims[other_id])["composite"] >= threshold:
+                    components.union(claim_id, other_id)
+                    touched.add(other_id)
+
+        # Members of each changed component: the touched claims plus every
+        # claim of the clusters they were in before
+        groups: Dict[str, Set[str]] = defaultdict(set)
+        replaced: Dict[str, List[ClaimCluster]] = defaultdict(list)
+        for claim_id in touched:
+            root = components.find(claim_id)
+            old = self._cluster_of.get(claim_id)
+            if old is None:
+                groups[root].add(claim_id)
+            elif old not in replaced[root]:
+                replaced[root].append(old)
+                groups[root].update(old.claims)
+
+        dropped = {id(c) for clusters in replaced.values() for c in clusters}
+        self.clusters = [c for c in self.clusters if id(c) not in dropped]
+        for root, members in groups.items():
+            if len(members) < 2:
                 continue
-
-            # Find similar claims
-            cluster_claims = [claim_id]
-            cluster_sources = {claim.source_id}
-
-            for other_id, other in self.claims.items():
-                if other_id == claim_id or other_id in assigned:
-                    continue
-
-                closeness = utf_closeness(claim, other)
-                if closeness["composite"] >= threshold:
-                    cluster_claims.append(other_id)
-                    cluster_sources.add(other.source_id)
-                    assigned.add(other_id)
-
-            if len(cluster_claims) > 1:
-                assigned.add(claim_id)
-
-                # Find common taxonomy
-                all_tags = [self.claims[cid].taxonomy_tags for cid in cluster_claims]
-                common = set(all_tags[0]) if all_tags[0] else set()
-                for tags in all_tags[1:]:
-                    common &= set(tags)
-
-                cluster = ClaimCluster(
-                    cluster_id=f"cluster_{len(self.clusters)}",
-                    centroid_slug=claim.slug_code,
-                    claims=cluster_claims,
-                    sources=list(cluster_sources),
-                    common_taxonomy=list(common),
-                    cohesion_score=threshold
-                )
-                self.clusters.append(cluster)
+            previous = max(replaced[root], key=lambda c: len(c.claims), default=None)
+            if previous is not None:
+                cluster_id = previous.cluster_id
+            else:
+                cluster_id = f"cluster_{self._next_cluster}"
+                self._next_cluster += 1
+            cluster = self._make_cluster(cluster_id, sorted(members))
+            self.clusters.append(cluster)
+            for claim_id in members:
+                self._cluster_of[claim_id] = cluster
+
+    def _make_cluster(self, cluster_id: str, claim_ids: List[str]) -> ClaimCluster:
+        claims = [self.claims[cid] for cid in claim_ids]
+
+        # Find common taxonomy
+        common = set(claims[0].taxonomy_tags)
+        for claim in claims[1:]:
+            common &= set(claim.taxonomy_tags)
+
+        slugs = Counter(c.slug_code for c in claims if c.slug_code)
+        return ClaimCluster(
+            cluster_id=cluster_id,
+            centroid_slug=slugs.most_common(1)[0][0] if slugs else "",
+            claims=claim_ids,
+            sources=sorted({c.source_id for c in claims}),
+            common_taxonomy=sorted(common),
+            cohesion_score=self.cluster_threshold
+        )
 
     def find_similar(self, claim_text: str, top_k: int = 10,
                      threshold: float = 0.3) -> List[SimilarityResult]:
@@ -327,10 +585,8 @@ class ClaimSimilarityIndex:
         target = self.claims[claim_id]
         results = []
 
-        for other_id, other in self.claims.items():
-            if other_id == claim_id:
-                continue
-
+        for other_id in self.candidates(target, threshold):
+            other = self.claims[other_id]
             closeness = utf_closeness(target, other)
             if closeness["composite"] >= threshold:
                 results.append(SimilarityResult(
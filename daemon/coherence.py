@@ -17,6 +17,8 @@ from typing import Optional, List, Dict, Any, Protocol
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+import db_pool
+
 
 class GoalTimeframe(str, Enum):
     LONG = "long"      # Life objectives (years)
@@ -89,7 +91,7 @@ class GoalCoherenceLayer:
         self._modules: Dict[str, CoherenceInterface] = {}
 
     def _init_db(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
 
         conn.execute("""
@@ -135,7 +137,7 @@ class GoalCoherenceLayer:
         conn.close()
 
     def _get_conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
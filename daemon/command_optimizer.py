@@ -15,12 +15,13 @@ Usage:
 """
 
 import json
-import sqlite3
 from pathlib import Path
 from typing import Tuple, Optional, List, Dict
 from dataclasses import dataclass
 from datetime import datetime
 
+import db_pool
+
 DAEMON_DIR = Path(__file__).parent
 DB_PATH = DAEMON_DIR / "optimizer.db"
 
@@ -81,7 +82,7 @@ class CommandOptimizer:
 
     def _init_db(self):
         """Initialize optimizer database."""
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         conn.execute("""
             CREATE TABLE IF NOT EXISTS optimizations (
                 id TEXT PRIMARY KEY,
@@ -134,7 +135,7 @@ class CommandOptimizer:
     def _load_patterns(self):
         """Load optimization patterns from database."""
         self.patterns: List[Optimization] = []
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         cursor = conn.execute("SELECT * FROM optimizations ORDER BY success_count DESC")
         for row in cursor.fetchall():
             self.patterns.append(Optimization(
@@ -214,7 +215,7 @@ class CommandOptimizer:
 
     def _record_usage(self, opt_id: str, original: str, optimized: str):
         """Record that an optimization was used."""
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         conn.execute("""
             INSERT INTO command_history (original_cmd, optimized_cmd, optimization_id, timestamp)
             VALUES (?, ?, ?, ?)
@@ -227,7 +228,7 @@ class CommandOptimizer:
 
     def record_outcome(self, original_cmd: str, success: bool):
         """Record whether an optimization helped."""
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         cursor = conn.execute("""
             SELECT optimization_id FROM command_history
             WHERE original_cmd = ? ORDER BY timestamp DESC LIMIT 1
@@ -245,7 +246,7 @@ class CommandOptimizer:
     def add_discovery(self, trigger: str, transform: str, reason: str, condition: str = "always"):
         """Add a new discovered optimization pattern."""
         opt_id = f"{trigger}_{transform}_{datetime.now().strftime('%Y%m%d')}"
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         conn.execute("""
             INSERT OR REPLACE INTO optimizations
             (id, trigger_pattern, condition, transform, reason, discovered_at)
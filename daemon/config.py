@@ -18,7 +18,7 @@ Usage:
 
 import os
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Optional
 from dataclasses import dataclass, field
 
 
@@ -50,6 +50,7 @@ class Config:
     DB_SYNTHESIS: str = "synthesis.db"
     DB_TOKEN_MONITOR: str = "token_monitor.db"
     DB_BOOKS: str = "books.db"
+    DB_KG: str = "knowledge_graph.db"
 
     # Service URLs
     LOCALAI_URL: str = "http://localhost:8080"
@@ -61,6 +62,52 @@ class Config:
     EMBEDDING_TIMEOUT: int = 60
     TASK_TIMEOUT: int = 600
 
+    # SQLite connection settings (applied by db_pool)
+    # WAL is opt-in: its -shm shared memory isn't coherent when the same DB
+    # files are opened from the host and from containers through a bind mount
+    SQLITE_POOL: bool = True
+    SQLITE_WAL: bool = False
+    SQLITE_SYNCHRONOUS: Optional[str] = None  # Default: NORMAL with WAL, FULL without
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    SQLITE_CACHE_KB: int = 16384
+    SQLITE_MMAP_SIZE: int = 268435456
+    SQLITE_CACHED_STATEMENTS: int = 256
+
+    # Task scheduling (applied by fair_scheduler)
+    SCHED_SOURCE_WEIGHTS: Dict[str, float] = field(default_factory=lambda: {
+        "interactive": 8.0, "scheduled": 4.0, "emergent": 2.0, "ingest": 1.0,
+    })
+    SCHED_TYPE_CAPS: Dict[str, int] = field(default_factory=lambda: {"localai": 1})
+    SCHED_AGING_SECONDS: int = 900
+    SCHED_FAIRNESS_WINDOW: int = 3600
+
+    # Telemetry write-behind buffer (applied by write_behind)
+    TELEMETRY_BUFFER: bool = True
+    TELEMETRY_FLUSH_ROWS: int = 500
+    TELEMETRY_FLUSH_SECONDS: float = 1.0
+    TELEMETRY_MAX_PENDING: int = 100000
+
+    # LLM response cache (applied by llm_cache)
+    LLM_CACHE_L1_ENTRIES: int = 4096
+    LLM_CACHE_L1_BYTES: int = 67108864
+    LLM_CACHE_TTL: int = 604800
+    LLM_CACHE_WAIT_SECONDS: float = 900.0
+
+    # Cache size budgets and compaction (applied by cache_compactor)
+    LLM_CACHE_MAX_BYTES: int = 268435456
+    LLM_CACHE_EVICTION: str = "lfu"          # lru | lfu | cost
+    PATTERN_CACHE_MAX_BYTES: int = 67108864
+    EMBEDDING_CACHE_MAX_BYTES: int = 268435456
+    EMBEDDING_CACHE_TTL: int = 7776000       # Seconds unused before an embedding expires (0 = never)
+    CACHE_COMPRESS_MIN_BYTES: int = 512
+    CACHE_COMPACT_INTERVAL: int = 900
+
+    # Semantic query cache (applied by semantic_cache)
+    SEMANTIC_CACHE_HIGH: float = 0.85        # Confident match
+    SEMANTIC_CACHE_LOW: float = 0.5          # Below this never matches; between is the gray zone
+    SEMANTIC_CACHE_MAX_ENTRIES: int = 10000  # Per namespace, per process index
+    SEMANTIC_CACHE_REFRESH: float = 30.0     # Seconds between index syncs with the shared store
+
     # Feature flags
     DEBUG: bool = False
     USE_LOCALAI: bool = True
@@ -100,6 +147,53 @@ class Config:
         self.USE_LOCALAI = os.environ.get("USE_LOCALAI", "1").lower() not in ("0", "false", "no")
         self.USE_DRAGONFLY_CACHE = os.environ.get("USE_DRAGONFLY_CACHE", "1").lower() not in ("0", "false", "no")
 
+        # SQLite overrides
+        self.SQLITE_POOL = os.environ.get("SQLITE_POOL", "1").lower() not in ("0", "false", "no")
+        self.SQLITE_WAL = os.environ.get("SQLITE_WAL", "").lower() in ("1", "true", "yes")
+        if synchronous := os.environ.get("SQLITE_SYNCHRONOUS"):
+            self.SQLITE_SYNCHRONOUS = synchronous.upper()
+        if busy := os.environ.get("SQLITE_BUSY_TIMEOUT_MS"):
+            self.SQLITE_BUSY_TIMEOUT_MS = int(busy)
+        if mmap_size := os.environ.get("SQLITE_MMAP_SIZE"):
+            self.SQLITE_MMAP_SIZE = int(mmap_size)
+
+        # Scheduling overrides ("interactive=8,emergent=1" / "localai=1,ingest=2")
+        if weights := os.environ.get("SCHED_SOURCE_WEIGHTS"):
+            self.SCHED_SOURCE_WEIGHTS.update(
+                {k.strip(): float(v) for k, v in (item.split("=") for item in weights.split(","))})
+        if caps := os.environ.get("SCHED_TYPE_CAPS"):
+            self.SCHED_TYPE_CAPS.update(
+                {k.strip(): int(v) for k, v in (item.split("=") for item in caps.split(","))})
+        if aging := os.environ.get("SCHED_AGING_SECONDS"):
+            self.SCHED_AGING_SECONDS = int(aging)
+
+        # Telemetry buffer overrides
+        self.TELEMETRY_BUFFER = os.environ.get("TELEMETRY_BUFFER", "1").lower() not in ("0", "false", "no")
+        if flush_seconds := os.environ.get("TELEMETRY_FLUSH_SECONDS"):
+            self.TELEMETRY_FLUSH_SECONDS = float(flush_seconds)
+
+        # LLM cache overrides
+        if l1_bytes := os.environ.get("LLM_CACHE_L1_BYTES"):
+            self.LLM_CACHE_L1_BYTES = int(l1_bytes)
+        if max_bytes := os.environ.get("LLM_CACHE_MAX_BYTES"):
+            self.LLM_CACHE_MAX_BYTES = int(max_bytes)
+        if eviction := os.environ.get("LLM_CACHE_EVICTION"):
+            self.LLM_CACHE_EVICTION = eviction.lower()
+        if pattern_bytes := os.environ.get("PATTERN_CACHE_MAX_BYTES"):
+            self.PATTERN_CACHE_MAX_BYTES = int(pattern_bytes)
+        if embedding_bytes := os.environ.get("EMBEDDING_CACHE_MAX_BYTES"):
+            self.EMBEDDING_CACHE_MAX_BYTES = int(embedding_bytes)
+        if embedding_ttl := os.environ.get("EMBEDDING_CACHE_TTL"):
+            self.EMBEDDING_CACHE_TTL = int(embedding_ttl)
+        if compact_interval := os.environ.get("CACHE_COMPACT_INTERVAL"):
+            self.CACHE_COMPACT_INTERVAL = int(compact_interval)
+
+        # Semantic cache overrides
+        if high := os.environ.get("SEMANTIC_CACHE_HIGH"):
+            self.SEMANTIC_CACHE_HIGH = float(high)
+        if low := os.environ.get("SEMANTIC_CACHE_LOW"):
+            self.SEMANTIC_CACHE_LOW = float(low)
+
     # Database path helpers
     def db_path(self, name: str) -> Path:
         """Get full path to a database file."""
@@ -174,6 +268,8 @@ class Config:
             "debug": self.DEBUG,
             "use_localai": self.USE_LOCALAI,
             "use_dragonfly": self.USE_DRAGONFLY_CACHE,
+            "sqlite_pool": self.SQLITE_POOL,
+            "sqlite_wal": self.SQLITE_WAL,
         }
 
 
@@ -20,7 +20,6 @@ WIRING (2026-01-28): Added headroom compression for WARM tier content.
 """
 
 import json
-import sqlite3
 import hashlib
 from datetime import datetime
 from pathlib import Path
@@ -29,6 +28,8 @@ from dataclasses import dataclass, asdict
 import re
 import sys
 
+import db_pool
+
 # Ensure daemon is in path
 sys.path.insert(0, str(Path(__file__).parent))
 
@@ -66,7 +67,7 @@ class ContextEntry:
 
 def init_db():
     """Initialize context router database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS context_scores (
             path TEXT PRIMARY KEY,
@@ -126,7 +127,7 @@ class ContextRouter:
             - warm: headers/signatures only
             - cold: just the path reference
         """
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.execute(
             "SELECT score, tier, tokens_full, tokens_warm FROM context_scores WHERE path = ?",
             (path,)
@@ -149,7 +150,7 @@ class ContextRouter:
 
     def record_access(self, path: str, query_context: str = ""):
         """Record file access and update scores."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         now = datetime.now().isoformat()
 
         # Check if exists
@@ -196,7 +197,7 @@ class ContextRouter:
     def decay_scores(self):
         """Apply decay to all scores. Call at end of each turn."""
         self.turn_number += 1
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
 
         # Decay all scores
         conn.execute("""
@@ -217,7 +218,7 @@ class ContextRouter:
 
     def get_hot_files(self) -> List[str]:
         """Get list of HOT tier files."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.execute("SELECT path FROM context_scores WHERE tier = 'hot' ORDER BY score DESC")
         files = [row[0] for row in cursor.fetchall()]
         conn.close()
@@ -225,7 +226,7 @@ class ContextRouter:
 
     def get_warm_files(self) -> List[str]:
         """Get list of WARM tier files."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.execute("SELECT path FROM context_scores WHERE tier = 'warm' ORDER BY score DESC")
         files = [row[0] for row in cursor.fetchall()]
         conn.close()
@@ -233,7 +234,7 @@ class ContextRouter:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get context router statistics."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
 
         cursor = conn.execute("""
             SELECT tier, COUNT(*), SUM(tokens_full), SUM(tokens_warm)
@@ -392,7 +393,7 @@ class ContextRouter:
         if len(self._recent_accesses) < 2:
             return
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
 
         # Get last two accessed files
         for i in range(len(self._recent_accesses) - 1):
@@ -37,7 +37,6 @@ import sys
 import time
 import json
 import signal
-import sqlite3
 import subprocess
 import threading
 import hashlib
@@ -49,6 +48,11 @@ from typing import Optional, Dict, List, Tuple, Any
 from dataclasses import dataclass
 import logging
 
+import cache_compactor
+import db_pool
+import task_wakeup
+import write_behind
+
 # MANDATORY: LocalAI autorouter for intelligent routing (the orchestrator)
 # No fallback - if this fails, fix it don't ignore it
 from local_autorouter import route_request, record_outcome, get_best_agent
@@ -60,129 +64,39 @@ DAEMON_DIR = Path(__file__).parent
 PROJECT_DIR = DAEMON_DIR.parent
 
 # MANDATORY: Shared task queue for unified task management
-from task_queue import TaskQueue, TaskStatus, TaskPriority
-CACHE_DB = DAEMON_DIR / "prompt_cache.db"
-DRAGONFLY_URL = os.environ.get("DRAGONFLY_URL", "redis://localhost:6379")
+from task_queue import TaskQueue, TaskStatus, TaskPriority, default_worker_id
+from llm_cache import LLMCache
 CACHE_TTL = 86400 * 7  # 7 days
 
-# Try to import redis, fallback to SQLite if unavailable
-try:
-    import redis
-    _redis_client = redis.from_url(DRAGONFLY_URL, decode_responses=True)
-    _redis_client.ping()
-    USE_DRAGONFLY = True
-except Exception:
-    USE_DRAGONFLY = False
-    _redis_client = None
-
-def init_cache_db():
-    """Initialize SQLite cache (fallback)."""
-    conn = sqlite3.connect(CACHE_DB)
-    conn.execute("""
-        CREATE TABLE IF NOT EXISTS prompt_cache (
-            prompt_hash TEXT PRIMARY KEY,
-            prompt TEXT,
-            response TEXT,
-            created_at TEXT,
-            hit_count INTEGER DEFAULT 0
-        )
-    """)
-    conn.commit()
-    conn.close()
+# Shared L1/L2 response cache (llm_cache)
+_response_cache = LLMCache("executor", ttl=CACHE_TTL)
 
 def get_cached_response(prompt: str) -> Optional[str]:
-    """Check cache for existing response (Dragonfly first, SQLite fallback)."""
-    prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()[:32]
-    cache_key = f"executor:prompt:{prompt_hash}"
-
-    # Try Dragonfly first
-    if USE_DRAGONFLY and _redis_client:
-        try:
-            cached = _redis_client.get(cache_key)
-            if cached:
-                _redis_client.hincrby("executor:stats", "hits", 1)
-                return cached
-        except Exception:
-            pass
-
-    # Fallback to SQLite
+    """Check cache for existing response."""
     try:
-        conn = sqlite3.connect(CACHE_DB)
-        cursor = conn.execute(
-            "SELECT response FROM prompt_cache WHERE prompt_hash = ?",
-            (prompt_hash,)
-        )
-        row = cursor.fetchone()
-        if row:
-            conn.execute(
-                "UPDATE prompt_cache SET hit_count = hit_count + 1 WHERE prompt_hash = ?",
-                (prompt_hash,)
-            )
-            conn.commit()
-            conn.close()
-            return row[0]
-        conn.close()
+        return _response_cache.get(_response_cache.key(prompt))
     except Exception:
-        pass
-    return None
+        return None
 
 def cache_response(prompt: str, response: str):
-    """Cache a prompt-response pair (Dragonfly + SQLite)."""
-    prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()[:32]
-    cache_key = f"executor:prompt:{prompt_hash}"
-
-    # Store in Dragonfly
-    if USE_DRAGONFLY and _redis_client:
-        try:
-            _redis_client.setex(cache_key, CACHE_TTL, response)
-            _redis_client.hincrby("executor:stats", "writes", 1)
-        except Exception:
-            pass
-
-    # Also store in SQLite for persistence
+    """Cache a prompt-response pair."""
     try:
-        init_cache_db()
-        conn = sqlite3.connect(CACHE_DB)
-        conn.execute("""
-            INSERT OR REPLACE INTO prompt_cache (prompt_hash, prompt, response, created_at, hit_count)
-            VALUES (?, ?, ?, ?, 0)
-        """, (prompt_hash, prompt[:1000], response, datetime.now().isoformat()))
-        conn.commit()
-        conn.close()
+        _response_cache.set(_response_cache.key(prompt), response)
     except Exception:
         pass
 
 def get_cache_stats() -> Dict:
     """Get cache statistics."""
-    stats = {"dragonfly": USE_DRAGONFLY, "entries": 0, "hits": 0}
-
-    if USE_DRAGONFLY and _redis_client:
-        try:
-            redis_stats = _redis_client.hgetall("executor:stats")
-            stats["dragonfly_hits"] = int(redis_stats.get("hits", 0))
-            stats["dragonfly_writes"] = int(redis_stats.get("writes", 0))
-        except Exception:
-            pass
-
-    try:
-        conn = sqlite3.connect(CACHE_DB)
-        cursor = conn.execute("SELECT COUNT(*), SUM(hit_count) FROM prompt_cache")
-        row = cursor.fetchone()
-        conn.close()
-        stats["entries"] = row[0] or 0
-        stats["sqlite_hits"] = row[1] or 0
-    except Exception:
-        pass
-
-    return stats
+    return _response_cache.stats()
 DB_PATH = DAEMON_DIR / "continuous_executor.db"
 PID_FILE = DAEMON_DIR / "continuous_executor.pid"
 LOG_FILE = DAEMON_DIR / "continuous_executor.log"
 
 # Configuration
-POLL_INTERVAL = 30  # seconds between checks
+POLL_INTERVAL = 30  # fallback seconds between checks; submitted tasks wake the loop
 MAX_TASK_DURATION = 600  # 10 minutes max per task
 IDLE_THRESHOLD = 60  # 1 minute idle before background tasks
+WAKEUP_CHANNEL = task_wakeup.channel_for("continuous_tasks", DB_PATH)
 CLAUDE_CMD = "claude"  # CLI command
 MAX_RETRIES = 2  # Retry failed tasks
 
@@ -216,7 +130,7 @@ class ContinuousTask:
     status: str  # 'pending', 'running', 'complete', 'failed'
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS continuous_tasks (
             id TEXT PRIMARY KEY,
@@ -259,6 +173,7 @@ class ContinuousExecutor:
         self.running = False
         self.current_task: Optional[ContinuousTask] = None
         self.last_activity = datetime.now()
+        self.worker_id = default_worker_id("executor")
         self._child_processes: Dict[int, subprocess.Popen] = {}
         self._child_lock = threading.Lock()
         self._tool_registry = {
@@ -443,10 +358,9 @@ class ContinuousExecutor:
 
     def _queue_agent_task(self, task: ContinuousTask, agent_name: str):
         """Queue a task for a specific agent."""
-        import hashlib
         agent_task_id = f"agent_{agent_name}_{datetime.now().strftime('%Y%m%d%H%M%S')}_{hashlib.md5(task.prompt.encode()).hexdigest()[:8]}"
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             INSERT INTO continuous_tasks (id, prompt, source, priority, status, created_at)
             VALUES (?, ?, ?, ?, 'pending', ?)
@@ -454,6 +368,7 @@ class ContinuousExecutor:
         conn.commit()
         conn.close()
 
+        task_wakeup.notify(WAKEUP_CHANNEL)
         logger.info(f"Queued agent task: {agent_task_id}")
 
     def _debug_log(self, msg):
@@ -509,6 +424,7 @@ class ContinuousExecutor:
         """Handle shutdown signal."""
         logger.info(f"Shutdown signal received ({signum})")
         self.running = False
+        task_wakeup.notify(WAKEUP_CHANNEL)  # Interrupt the idle wait
 
     def _cleanup(self):
         """Cleanup on exit."""
@@ -516,12 +432,15 @@ class ContinuousExecutor:
         if PID_FILE.exists():
             PID_FILE.unlink()
         self._log_event("daemon_stop", None, {})
+        write_behind.flush()  # Buffered telemetry, in case exit is forced
         logger.info("Continuous Executor stopped")
 
     def _main_loop(self):
         """Main execution loop."""
         self._debug_log(f"Entered _main_loop, self.running={self.running}")
         iteration = 0
+        # Listen before the first check so no submission is missed
+        wakeup = task_wakeup.Waiter(TaskQueue().channel, WAKEUP_CHANNEL)
         while self.running:
             iteration += 1
             self._debug_log(f"Loop iteration {iteration}, running={self.running}")
@@ -536,29 +455,30 @@ class ContinuousExecutor:
                 if task:
                     self._execute_task(task)
                     self.last_activity = datetime.now()
-                else:
-                    # Check if we should run background tasks (generation)
-                    idle_time = (datetime.now() - self.last_activity).total_seconds()
-                    if idle_time > IDLE_THRESHOLD:
-                        self._run_background_tasks()
+                    continue  # More work may be queued: check again right away
 
-                self._debug_log(f"About to sleep {POLL_INTERVAL}s")
-                time.sleep(POLL_INTERVAL)
+                # Check if we should run background tasks (generation)
+                idle_time = (datetime.now() - self.last_activity).total_seconds()
+                if idle_time > IDLE_THRESHOLD:
+                    self._run_background_tasks()
+
+                self._debug_log(f"Waiting up to {POLL_INTERVAL}s for new tasks")
+                wakeup.wait(POLL_INTERVAL)
 
             except Exception as e:
                 self._debug_log(f"Exception in loop: {e}")
                 logger.error(f"Error in main loop: {e}")
                 time.sleep(POLL_INTERVAL)
+        wakeup.close()
         self._debug_log(f"Exited main loop, self.running={self.running}")
 
     def _get_next_task(self) -> Optional[ContinuousTask]:
         """Get next pending task from UNIFIED queue (checks both DBs)."""
         # 1. First check shared task queue (tasks.db) - where strategies push
         shared_queue = TaskQueue()
-        shared_task = shared_queue.get_next_pending()
+        shared_task = shared_queue.claim_next(self.worker_id)
         if shared_task:
-            # Mark as in progress in shared queue
-            shared_queue.mark_in_progress(shared_task.id)
+            # Claimed atomically; leased to this executor until completed/failed
             return ContinuousTask(
                 id=shared_task.id,
                 prompt=shared_task.prompt,
@@ -569,7 +489,7 @@ class ContinuousExecutor:
             )
 
         # 2. Fallback to local continuous_tasks table
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.execute("""
             SELECT id, prompt, source, priority, created_at
             FROM continuous_tasks
@@ -766,6 +686,13 @@ class ContinuousExecutor:
         return False, "Exceeded maximum sequential tool steps", tool_used
 
     def _execute_task(self, task: ContinuousTask):
+        """Execute a task, keeping the shared-queue lease alive while it runs."""
+        if task.source == 'shared_queue':
+            with TaskQueue().keep_alive(task.id, self.worker_id):
+                return self._run_task(task)
+        return self._run_task(task)
+
+    def _run_task(self, task: ContinuousTask):
         """Execute a task using intelligent routing (LocalAI first, Claude for complex)."""
         logger.info(f"Executing task {task.id[:8]} from {task.source}")
         self._update_task_status(task.id, 'running')
@@ -872,7 +799,7 @@ class ContinuousExecutor:
 
     def _get_retry_count(self, task_id: str) -> int:
         """Get current retry count for a task."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.execute(
             "SELECT COUNT(*) FROM execution_log WHERE task_id = ? AND event = 'task_retry'",
             (task_id,)
@@ -908,12 +835,11 @@ class ContinuousExecutor:
 
     def _queue_continuation(self, parent_task: ContinuousTask, context: str):
         """Queue a continuation task."""
-        import hashlib
         task_id = f"cont_{datetime.now().strftime('%Y%m%d%H%M%S')}_{hashlib.md5(context.encode()).hexdigest()[:8]}"
 
         prompt = f"Continue from previous task. Context:\n{context[:1000]}\n\nProceed with the next step."
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             INSERT INTO continuous_tasks (id, prompt, source, priority, status, created_at)
             VALUES (?, ?, 'continuation', ?, 'pending', ?)
@@ -921,6 +847,7 @@ class ContinuousExecutor:
         conn.commit()
         conn.close()
 
+        task_wakeup.notify(WAKEUP_CHANNEL)
         logger.info(f"Queued continuation task {task_id[:8]}")
 
     def _ensure_queue_filled(self):
@@ -1003,7 +930,7 @@ class ContinuousExecutor:
             logger.debug(f"Optimization failed: {e}")
 
     def _update_task_status(self, task_id: str, status: str):
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         if status == 'running':
             conn.execute("UPDATE continuous_tasks SET status = ?, started_at = ? WHERE id = ?",
                         (status, datetime.now().isoformat(), task_id))
@@ -1014,7 +941,7 @@ class ContinuousExecutor:
 
     def _complete_task(self, task_id: str, result: str):
         # Update continuous_tasks table
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             UPDATE continuous_tasks SET status = 'complete', completed_at = ?, result = ?
             WHERE id = ?
@@ -1025,13 +952,13 @@ class ContinuousExecutor:
         # Also update shared task queue (tasks.db) if task came from there
         try:
             shared_queue = TaskQueue()
-            shared_queue.mark_completed(task_id, result[:10000])
+            shared_queue.mark_completed(task_id, result[:10000], worker_id=self.worker_id)
         except Exception:
             pass  # Task may not exist in shared queue
 
     def _fail_task(self, task_id: str, error: str):
         # Update continuous_tasks table
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             UPDATE continuous_tasks SET status = 'failed', completed_at = ?, error = ?
             WHERE id = ?
@@ -1042,12 +969,12 @@ class ContinuousExecutor:
         # Also update shared task queue (tasks.db) if task came from there
         try:
             shared_queue = TaskQueue()
-            shared_queue.mark_failed(task_id, error[:2000])
+            shared_queue.mark_failed(task_id, error[:2000], worker_id=self.worker_id)
         except Exception:
             pass  # Task may not exist in shared queue
 
     def _log_event(self, event: str, task_id: Optional[str], details: Dict):
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             INSERT INTO execution_log (timestamp, event, task_id, details)
             VALUES (?, ?, ?, ?)
@@ -1058,10 +985,9 @@ class ContinuousExecutor:
     @staticmethod
     def submit(prompt: str, source: str = 'user', priority: int = 5) -> str:
         """Submit a task to the queue."""
-        import hashlib
         task_id = f"task_{datetime.now().strftime('%Y%m%d%H%M%S')}_{hashlib.md5(prompt.encode()).hexdigest()[:8]}"
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             INSERT INTO continuous_tasks (id, prompt, source, priority, status, created_at)
             VALUES (?, ?, ?, ?, 'pending', ?)
@@ -1069,6 +995,7 @@ class ContinuousExecutor:
         conn.commit()
         conn.close()
 
+        task_wakeup.notify(WAKEUP_CHANNEL)
         return task_id
 
     @staticmethod
@@ -1106,7 +1033,7 @@ class ContinuousExecutor:
                 status["pid"] = pid
 
         # Task counts
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.execute("""
             SELECT status, COUNT(*) FROM continuous_tasks GROUP BY status
         """)
@@ -1174,6 +1101,7 @@ def main():
                 f.write("Child process starting\n")
 
         executor = ContinuousExecutor()
+        cache_compactor.start()
         executor.start()
 
     elif args.action == 'stop':
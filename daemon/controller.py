@@ -28,6 +28,8 @@ from typing import Optional, Dict, List, Any
 from enum import Enum
 import statistics
 
+import db_pool
+
 CONTROLLER_DB = Path(__file__).parent / "controller.db"
 
 # ============================================================================
@@ -92,7 +94,7 @@ class Outcome:
 
 def init_db() -> sqlite3.Connection:
     """Initialize controller database."""
-    conn = sqlite3.connect(CONTROLLER_DB)
+    conn = db_pool.connect(CONTROLLER_DB)
     c = conn.cursor()
 
     # Metrics history
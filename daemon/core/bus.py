@@ -17,9 +17,9 @@ import threading
 from datetime import datetime
 from typing import Any, Callable, Dict, List, Optional, Set
 from dataclasses import asdict
-import sqlite3
 from pathlib import Path
 
+import db_pool
 from .base import Signal, Action, Outcome, Learning
 
 
@@ -190,7 +190,7 @@ class PersistentMessageBus(MessageBus):
 
     def _init_db(self):
         """Initialize persistence database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
 
         c.execute('''CREATE TABLE IF NOT EXISTS messages (
@@ -217,7 +217,7 @@ class PersistentMessageBus(MessageBus):
             data = message
 
         # Persist
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
 
         message_id = f"msg_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}"
@@ -239,7 +239,7 @@ class PersistentMessageBus(MessageBus):
             since: ISO timestamp to replay from
             channel_filter: Optional channel pattern to filter
         """
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
 
         query = "SELECT channel, data, timestamp FROM messages"
@@ -1,36 +1,58 @@
 #!/usr/bin/env python3
 """
-Database Consolidation - 23 SQLite → 4 SQLite (then → 1 PostgreSQL)
-
-Phase 1: Consolidate related databases
-Phase 2: Migrate to PostgreSQL (future)
+Database Consolidation - per-module SQLite files → a few shared databases
+
+Stop the daemons first: a source that another process still has open is
+skipped, since a connection opened before the merge would keep writing to
+the retired file. Each source database is then merged into its group database:
+
+1. Lock the source for writing (writers wait on busy_timeout, readers continue)
+2. Copy tables with their original names (rowids preserved), then FTS
+   content, indexes, triggers and views; merge _schema_migrations rows
+3. Record the merge in the group's _schema_migrations ("consolidate:<file>")
+4. Publish the redirect in db_redirects.json - db_pool.connect(old_path) now
+   opens the group database, so modules keep their old paths unchanged
+5. Commit, catch up rows written by writers that were already waiting on the
+   lock, then move the source file into the backup folder
+
+Table, index and trigger names must stay unique within a group; sources
+whose names clash with objects already in the group are skipped (--check).
+The knowledge stores keep their own files (they share table names like
+chunks/claims); join across any databases with db_pool.connect_schemas().
+
+Re-running is safe: merged sources are recorded and skipped. Group
+databases use WAL only when SQLITE_WAL=1 (see config.py).
 """
 
+import json
+import os
 import sqlite3
 import shutil
+import time
 from pathlib import Path
 from datetime import datetime
+from typing import Dict, List
+
+import db_pool
+from config import cfg
+from schema_migrations import init_migrations_table, get_current_version
 
 DAEMON_DIR = Path(__file__).parent
 BACKUP_DIR = DAEMON_DIR / "db_backup" / datetime.now().strftime("%Y%m%d_%H%M%S")
+REDIRECTS_FILE = db_pool.REDIRECTS_FILE
+DAEMON_PID_FILE = DAEMON_DIR / "continuous_executor.pid"
 
-# Consolidation plan: 23 → 4
+# Consolidation plan: group database → member databases (table names unique per group)
 CONSOLIDATION = {
-    "knowledge.db": [
-        "books.db",
-        "utf_knowledge.db",
-        "openmemory.db",
-        "synthesis.db",
-        "ingest.db",
-    ],
     "cognitive.db": [
         "coherence.db",
         "decisions.db",
         "metacognition.db",
         "self_improvement.db",
         "bisimulation.db",
-        "gcrl.db",
-        "memory.db",
+        "synthesis.db",
+        "lazy_rag.db",
+        "context_router.db",
     ],
     "operations.db": [
         "tasks.db",
@@ -39,17 +61,49 @@ CONSOLIDATION = {
         "approvals.db",
         "controller.db",
         "token_monitor.db",
-        "outcomes.db",
         "strategies.db",
-        "book_watcher.db",
+        "deferred_tasks.db",
+        "spine.db",
+        "sequential_executor.db",
+        "localai_scheduler.db",
     ],
     "routing.db": [
         "router.db",
+        "optimizer.db",
+        "mcp_health.db",
+        "module_registry.db",
+        "prompt_cache.db",
+    ],
+    "telemetry.db": [
+        "errors.db",
+        "tool_tracking.db",
+        "efficiency.db",
+        "analytics.db",
+        "outcomes.db",
+        "overseer.db",
     ],
 }
 
-# Keep separate (for now)
-KEEP_SEPARATE = ["overseer.db"]
+# Keep separate (overlapping table names or large hot stores); use connect_schemas to join
+KEEP_SEPARATE = [
+    "books.db",
+    "ingest.db",
+    "utf_knowledge.db",
+    "openmemory.db",
+    "memory.db",
+    "gcrl.db",
+    "task_queue.db",
+    "handoffs.db",
+    "continue.db",
+    "doc_updates.db",
+    "orchestrator.db",
+    "autonomous_executor.db",
+    "book_watcher.db",          # idx_status clashes with tasks.db
+    "continuous_executor.db",   # idx_tasks_status clashes with tasks.db
+]
+
+# Tables that are merged row-wise rather than owned by one source
+SHARED_TABLES = {"_schema_migrations"}
 
 
 def backup_all():
@@ -57,7 +111,11 @@ def backup_all():
     BACKUP_DIR.mkdir(parents=True, exist_ok=True)
 
     for db_file in DAEMON_DIR.glob("*.db"):
-        shutil.copy(db_file, BACKUP_DIR / db_file.name)
+        src = sqlite3.connect(db_file)
+        dst = sqlite3.connect(BACKUP_DIR / db_file.name)
+        src.backup(dst)  # Consistent even while the daemon is writing
+        dst.close()
+        src.close()
         print(f"  Backed up: {db_file.name}")
 
     print(f"\nBackups saved to: {BACKUP_DIR}")
@@ -65,78 +123,334 @@ def backup_all():
 
 
 def get_tables(db_path: Path) -> list:
-    """Get all tables in a database."""
+    """Get all user tables in a database (FTS shadow tables excluded)."""
     if not db_path.exists():
         return []
 
     conn = sqlite3.connect(db_path)
-    c = conn.cursor()
-    c.execute("SELECT name FROM sqlite_master WHERE type='table'")
-    tables = [r[0] for r in c.fetchall()]
+    tables = _tables(conn, "main")
     conn.close()
-    return tables
+    return [t["name"] for t in tables]
 
 
-def consolidate(target_name: str, source_dbs: list, dry_run: bool = True):
-    """Consolidate multiple databases into one."""
-    target_path = DAEMON_DIR / target_name
+def get_objects(db_path: Path) -> list:
+    """Names of all tables, indexes, triggers and views (one namespace in SQLite)."""
+    if not db_path.exists():
+        return []
 
-    if dry_run:
-        print(f"\n[DRY RUN] Would consolidate into {target_name}:")
-        for src in source_dbs:
-            src_path = DAEMON_DIR / src
-            if src_path.exists():
-                tables = get_tables(src_path)
-                print(f"  {src}: {len(tables)} tables - {tables}")
-        return
+    conn = sqlite3.connect(db_path)
+    names = _object_names(conn, "main")
+    conn.close()
+    return names
+
+
+def _object_names(conn: sqlite3.Connection, schema: str) -> List[str]:
+    shadow = {row[1] for row in conn.execute(f"PRAGMA {schema}.table_list")
+              if row[0] == schema and row[2] == "shadow"}
+    return [name for (name, tbl_name) in conn.execute(
+                f"SELECT name, tbl_name FROM {schema}.sqlite_master")
+            if not name.startswith("sqlite_") and name not in shadow
+            and tbl_name not in SHARED_TABLES]
+
+
+def _tables(conn: sqlite3.Connection, schema: str) -> List[Dict]:
+    """[{name, type, wr, sql}] for user tables in schema, in creation order."""
+    info = {row[1]: {"type": row[2], "wr": row[4]}
+            for row in conn.execute(f"PRAGMA {schema}.table_list") if row[0] == schema}
+    tables = []
+    for name, sql in conn.execute(
+            f"SELECT name, sql FROM {schema}.sqlite_master WHERE type = 'table' ORDER BY rowid"):
+        kind = info.get(name, {}).get("type")
+        if name.startswith("sqlite_") or kind == "shadow":
+            continue
+        tables.append({"name": name, "type": kind, "wr": info[name]["wr"], "sql": sql})
+    return tables
 
-    # Create new consolidated database
-    target_conn = sqlite3.connect(target_path)
 
+def _columns(conn: sqlite3.Connection, schema: str, table: str) -> List[str]:
+    return ['"' + row[1].replace('"', '""') + '"'
+            for row in conn.execute(f'PRAGMA {schema}.table_info("{table}")')]
+
+
+def _load_redirects() -> Dict[str, str]:
+    try:
+        with open(REDIRECTS_FILE) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_redirects(redirects: Dict[str, str]):
+    """Atomically replace db_redirects.json."""
+    tmp = REDIRECTS_FILE.with_suffix(".json.tmp")
+    with open(tmp, "w") as f:
+        json.dump(redirects, f, indent=2, sort_keys=True)
+    os.replace(tmp, REDIRECTS_FILE)
+
+
+def pending_sources() -> List[str]:
+    """Planned source databases that still exist and are not merged yet."""
+    redirects = _load_redirects()
+    return [src for target, sources in CONSOLIDATION.items() for src in sources
+            if redirects.get(src) != target and (DAEMON_DIR / src).exists()]
+
+
+def daemon_running() -> bool:
+    """True if the continuous executor's PID file points at a live process."""
+    if os.name == "nt":
+        return False  # os.kill(pid, 0) terminates on Windows; open_elsewhere() covers it
+    try:
+        pid = int(DAEMON_PID_FILE.read_text().strip())
+        os.kill(pid, 0)
+    except (OSError, ValueError):
+        return False
+    return True
+
+
+def open_elsewhere(db_path: Path) -> List[str]:
+    """
+    Other processes that have the database open (best effort).
+
+    Linux: compares /proc/<pid>/fd targets by inode, so processes in a
+    container that bind-mounts the daemon directory are found too.
+    Windows: an open file can't be renamed. Elsewhere nothing is detected.
+    """
+    if os.path.isdir("/proc/self/fd"):
+        try:
+            st = os.stat(db_path)
+        except OSError:
+            return []
+        holders = []
+        for pid in os.listdir("/proc"):
+            if not pid.isdigit() or int(pid) == os.getpid():
+                continue
+            try:
+                fds = os.listdir(f"/proc/{pid}/fd")
+            except OSError:
+                continue  # Gone, or not ours to inspect
+            for fd in fds:
+                fd_path = f"/proc/{pid}/fd/{fd}"
+                try:
+                    if os.path.basename(os.readlink(fd_path)) != db_path.name:
+                        continue
+                    fd_st = os.stat(fd_path)
+                except OSError:
+                    continue
+                if (fd_st.st_dev, fd_st.st_ino) == (st.st_dev, st.st_ino):
+                    holders.append(pid)
+                    break
+        return holders
+    if os.name == "nt":
+        probe = db_path.with_name(db_path.name + ".consolidate-check")
+        try:
+            os.rename(db_path, probe)
+        except OSError:
+            return ["another process"]
+        os.rename(probe, db_path)
+    return []
+
+
+def find_conflicts(target_name: str, source_dbs: list) -> Dict[str, List[str]]:
+    """Source → table/index/trigger names that clash with the group or an earlier member."""
+    seen = set(get_objects(DAEMON_DIR / target_name))
+    conflicts = {}
     for src in source_dbs:
         src_path = DAEMON_DIR / src
-        if not src_path.exists():
+        if _load_redirects().get(src) == target_name or not src_path.exists():
             continue
+        names = set(get_objects(src_path))
+        clash = sorted(names & seen)
+        if clash:
+            conflicts[src] = clash
+        else:
+            seen |= names
+    return conflicts
+
+
+def _copy_rows(conn: sqlite3.Connection, tables: List[Dict]) -> Dict[str, int]:
+    """
+    Copy table rows src → main (rowids preserved so FTS/external refs stay
+    valid). Returns each rowid table's high-water rowid for the catch-up pass.
+    """
+    high_water = {}
+    for table in tables:
+        name = '"' + table["name"].replace('"', '""') + '"'
+        cols = ", ".join(_columns(conn, "src", table["name"]))
+        if table["type"] == "virtual":
+            if "content=" in (table["sql"] or "").replace(" ", "").lower():
+                continue  # External-content FTS is rebuilt from its content table
+            conn.execute(f"INSERT INTO main.{name} (rowid, {cols}) SELECT rowid, {cols} FROM src.{name}")
+        elif table["wr"]:
+            conn.execute(f"INSERT INTO main.{name} ({cols}) SELECT {cols} FROM src.{name}")
+        else:
+            conn.execute(f"INSERT INTO main.{name} (rowid, {cols}) SELECT rowid, {cols} FROM src.{name}")
+            high_water[table["name"]] = conn.execute(
+                f"SELECT COALESCE(MAX(rowid), 0) FROM src.{name}").fetchone()[0]
+    return high_water
+
+
+def _catch_up(conn: sqlite3.Connection, tables: List[Dict], high_water: Dict[str, int]) -> int:
+    """
+    Copy rows inserted into the source after the main copy (writers that were
+    already waiting on the lock). They get fresh rowids in the group database;
+    primary keys de-duplicate. Updates/deletes in that window are not replayed.
+    """
+    copied = 0
+    for table in tables:
+        if table["type"] == "virtual":
+            continue  # Kept in sync by the copied triggers
+        name = '"' + table["name"].replace('"', '""') + '"'
+        info = list(conn.execute(f'PRAGMA src.table_info({name})'))
+        pk = [row for row in info if row[5]]
+        rowid_alias = len(pk) == 1 and pk[0][2].upper() == "INTEGER"
+        cols = ", ".join('"' + row[1].replace('"', '""') + '"' for row in info
+                         if not (rowid_alias and row[5]))
+        if table["wr"]:
+            cursor = conn.execute(f"INSERT OR IGNORE INTO main.{name} ({cols}) SELECT {cols} FROM src.{name}")
+        else:
+            cursor = conn.execute(
+                f"INSERT OR IGNORE INTO main.{name} ({cols}) SELECT {cols} FROM src.{name} WHERE rowid > ?",
+                (high_water.get(table["name"], 0),))
+        copied += max(cursor.rowcount, 0)
+    return copied
+
+
+def migrate_source(target_name: str, src: str, grace: float = 1.0) -> str:
+    """Merge one source database into its group database online. Returns a status."""
+    target_path = DAEMON_DIR / target_name
+    src_path = DAEMON_DIR / src
+    migration_name = f"consolidate:{src}"
+    redirects = _load_redirects()
+
+    if redirects.get(src) == target_name:
+        return "already merged"
+    if not src_path.exists():
+        # Not created yet: new tables will be created in the group database
+        redirects[src] = target_name
+        _save_redirects(redirects)
+        return "redirected (no data)"
+
+    holders = open_elsewhere(src_path)
+    if holders:
+        return f"skipped: open in {', '.join(holders)} (stop the daemons and retry)"
+
+    conn = sqlite3.connect(target_path, timeout=30, isolation_level=None)
+    if cfg.SQLITE_WAL:
+        conn.execute("PRAGMA journal_mode = WAL")
+    init_migrations_table(conn)
+    if get_current_version(conn, migration_name) >= 1:
+        conn.close()
+        redirects[src] = target_name
+        _save_redirects(redirects)
+        return "redirect restored"
+
+    conn.execute("ATTACH DATABASE ? AS src", (str(src_path),))
+    conn.execute("BEGIN IMMEDIATE")  # Write-locks the attached source as well
+    try:
+        src_tables = [t for t in _tables(conn, "src") if t["name"] not in SHARED_TABLES]
+        clash = sorted(set(_object_names(conn, "src")) & set(_object_names(conn, "main")))
+        if clash:
+            conn.execute("ROLLBACK")
+            conn.close()
+            return f"skipped: name conflict {clash}"
+
+        for table in src_tables:
+            conn.execute(table["sql"])
+        high_water = _copy_rows(conn, src_tables)
+
+        for table in src_tables:
+            if table["type"] == "virtual" and "content=" in table["sql"].replace(" ", "").lower():
+                name = '"' + table["name"].replace('"', '""') + '"'
+                try:
+                    conn.execute(f"INSERT INTO main.{name} ({name}) VALUES ('rebuild')")
+                except sqlite3.OperationalError as e:
+                    print(f"  [warn] {src}: could not rebuild {table['name']}: {e}")
+
+        # Indexes, triggers (after the copy so they don't fire on it), views
+        for kind in ("index", "trigger", "view"):
+            for (sql,) in conn.execute(
+                    "SELECT sql FROM src.sqlite_master WHERE type = ? AND sql IS NOT NULL "
+                    "AND tbl_name != '_schema_migrations' ORDER BY rowid",
+                    (kind,)).fetchall():
+                conn.execute(sql)
+
+        if conn.execute("SELECT 1 FROM src.sqlite_master WHERE name = 'sqlite_sequence'").fetchone():
+            for name, seq in conn.execute("SELECT name, seq FROM src.sqlite_sequence").fetchall():
+                conn.execute("UPDATE main.sqlite_sequence SET seq = MAX(seq, ?) WHERE name = ?", (seq, name))
+        if conn.execute("SELECT 1 FROM src.sqlite_master WHERE name = '_schema_migrations'").fetchone():
+            conn.execute("INSERT OR IGNORE INTO main._schema_migrations SELECT * FROM src._schema_migrations")
+
+        conn.execute("""
+            INSERT INTO main._schema_migrations (db_name, version, description, applied_at)
+            VALUES (?, 1, ?, ?)
+        """, (migration_name, f"Merged {src} into {target_name}", datetime.now().isoformat()))
+
+        # Publish the redirect while writers are still blocked
+        redirects[src] = target_name
+        _save_redirects(redirects)
+        data_version = conn.execute("PRAGMA src.data_version").fetchone()[0]
+        conn.execute("COMMIT")
+    except Exception:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        redirects.pop(src, None)
+        _save_redirects(redirects)
+        conn.close()
+        raise
+
+    # Writers that were already waiting on the lock commit to the old file
+    time.sleep(grace)
+    status = "merged"
+    if conn.execute("PRAGMA src.data_version").fetchone()[0] != data_version:
+        conn.execute("BEGIN IMMEDIATE")
+        late = _catch_up(conn, src_tables, high_water)
+        conn.execute("COMMIT")
+        status = f"merged (caught up {late} late rows)"
+
+    conn.execute("DETACH DATABASE src")
+    conn.close()
 
-        # Get source schema and data
-        src_conn = sqlite3.connect(src_path)
-        src_cursor = src_conn.cursor()
-
-        # Get all tables
-        src_cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [r[0] for r in src_cursor.fetchall()]
-
-        for table in tables:
-            # Prefix table name with source db name to avoid conflicts
-            prefix = src.replace(".db", "")
-            new_table = f"{prefix}_{table}"
-
-            # Get create statement
-            src_cursor.execute(f"SELECT sql FROM sqlite_master WHERE type='table' AND name='{table}'")
-            create_sql = src_cursor.fetchone()[0]
-
-            # Modify to new name
-            create_sql = create_sql.replace(f"CREATE TABLE {table}", f"CREATE TABLE {new_table}", 1)
+    holders = open_elsewhere(src_path)
+    if holders:
+        # Opened during the merge: keep the file so its writes aren't lost unseen
+        return f"{status}; source still open in {', '.join(holders)}, left in place"
 
-            # Create in target
+    BACKUP_DIR.mkdir(parents=True, exist_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        path = Path(str(src_path) + suffix)
+        if path.exists():
             try:
-                target_conn.execute(create_sql)
-            except sqlite3.OperationalError:
-                pass  # Table already exists
-
-            # Copy data
-            src_cursor.execute(f"SELECT * FROM {table}")
-            rows = src_cursor.fetchall()
+                shutil.move(str(path), BACKUP_DIR / path.name)
+            except OSError:
+                pass  # Still open elsewhere (Windows); the redirect already applies
+    return status
 
-            if rows:
-                placeholders = ",".join(["?" for _ in rows[0]])
-                target_conn.executemany(f"INSERT OR IGNORE INTO {new_table} VALUES ({placeholders})", rows)
 
-        src_conn.close()
-        print(f"  Merged: {src} → {target_name}")
+def consolidate(target_name: str, source_dbs: list, dry_run: bool = True, grace: float = 1.0):
+    """Consolidate multiple databases into one."""
+    if dry_run:
+        print(f"\n[DRY RUN] Would consolidate into {target_name}:")
+        conflicts = find_conflicts(target_name, source_dbs)
+        redirects = _load_redirects()
+        for src in source_dbs:
+            src_path = DAEMON_DIR / src
+            holders = open_elsewhere(src_path)
+            if redirects.get(src) == target_name:
+                print(f"  {src}: already merged")
+            elif src in conflicts:
+                print(f"  {src}: SKIP - name conflict {conflicts[src]}")
+            elif holders:
+                print(f"  {src}: SKIP - open in {', '.join(holders)}")
+            elif src_path.exists():
+                tables = get_tables(src_path)
+                print(f"  {src}: {len(tables)} tables - {tables}")
+            else:
+                print(f"  {src}: not created yet (redirect only)")
+        return
 
-    target_conn.commit()
-    target_conn.close()
+    for src in source_dbs:
+        status = migrate_source(target_name, src, grace)
+        print(f"  {src} → {target_name}: {status}")
 
 
 def show_plan():
@@ -144,15 +458,16 @@ def show_plan():
     print("=" * 60)
     print("DATABASE CONSOLIDATION PLAN")
     print("=" * 60)
-    print(f"\nCurrent: 23 SQLite databases")
-    print(f"Target:  4 SQLite databases\n")
 
+    redirects = _load_redirects()
     total_source = 0
     for target, sources in CONSOLIDATION.items():
         print(f"\n{target}:")
         for src in sources:
             src_path = DAEMON_DIR / src
-            if src_path.exists():
+            if redirects.get(src) == target:
+                print(f"  ← {src} (merged)")
+            elif src_path.exists():
                 tables = get_tables(src_path)
                 size_kb = src_path.stat().st_size / 1024
                 print(f"  ← {src} ({len(tables)} tables, {size_kb:.1f}KB)")
@@ -161,36 +476,67 @@ def show_plan():
                 print(f"  ← {src} (not found)")
 
     print(f"\n{len(KEEP_SEPARATE)} databases kept separate: {KEEP_SEPARATE}")
-    print(f"\nTotal: {total_source} → 4 databases")
+    print(f"\nTotal: {total_source} → {len(CONSOLIDATION)} databases")
 
 
-def run_consolidation(dry_run: bool = True):
+def show_status():
+    """Show published redirects and recorded merges."""
+    status = {"redirects": _load_redirects(), "merged": {}}
+    for target in CONSOLIDATION:
+        path = DAEMON_DIR / target
+        if path.exists():
+            conn = sqlite3.connect(path)
+            try:
+                status["merged"][target] = [row[0] for row in conn.execute(
+                    "SELECT description FROM _schema_migrations WHERE db_name LIKE 'consolidate:%'")]
+            except sqlite3.OperationalError:
+                status["merged"][target] = []
+            conn.close()
+    print(json.dumps(status, indent=2))
+
+
+def run_consolidation(dry_run: bool = True, grace: float = 1.0):
     """Run the consolidation."""
+    if not dry_run and daemon_running():
+        print("\n✗ The continuous executor is running (continuous_executor.pid).")
+        print("  Stop the daemons before consolidating: connections they already")
+        print("  hold would keep writing to the retired files.")
+        return
+
     if not dry_run:
         print("\n⚠️  BACKING UP ALL DATABASES FIRST...")
         backup_all()
 
     for target, sources in CONSOLIDATION.items():
-        consolidate(target, sources, dry_run=dry_run)
+        consolidate(target, sources, dry_run=dry_run, grace=grace)
 
     if not dry_run:
         print("\n✓ Consolidation complete!")
-        print("  Old databases preserved in backup folder.")
-        print("  Update module imports to use new database names.")
+        print("  Old databases moved to the backup folder.")
+        print("  Old paths resolve through db_redirects.json (db_pool).")
 
 
 if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser(description="Database Consolidation")
     parser.add_argument("--plan", action="store_true", help="Show consolidation plan")
+    parser.add_argument("--check", action="store_true", help="Report name conflicts per group")
+    parser.add_argument("--status", action="store_true", help="Show redirects and completed merges")
     parser.add_argument("--dry-run", action="store_true", help="Dry run (show what would happen)")
     parser.add_argument("--execute", action="store_true", help="Actually run consolidation")
+    parser.add_argument("--grace", type=float, default=1.0,
+                        help="Seconds to wait for in-flight writers before retiring a source")
 
     args = parser.parse_args()
 
     if args.plan:
         show_plan()
+    elif args.check:
+        print(json.dumps({target: find_conflicts(target, sources)
+                          for target, sources in CONSOLIDATION.items()}, indent=2))
+    elif args.status:
+        show_status()
     elif args.execute:
-        run_consolidation(dry_run=False)
+        run_consolidation(dry_run=False, grace=args.grace)
     else:
         run_consolidation(dry_run=True)
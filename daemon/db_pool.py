@@ -0,0 +1,343 @@
+#!/usr/bin/env python3
+"""
+DB Pool - Shared SQLite connection layer for all daemon stores.
+
+Most stores open a fresh sqlite3 connection per call and close it right
+after, paying the open/schema-parse cost every time. db_pool.connect() is
+a drop-in replacement for sqlite3.connect():
+
+- Idle connections are kept per (thread, database file) and reused
+- Each checkout has its connection to itself until close(), so its
+  transaction is its own: a nested checkout of the same file (a helper
+  called while the caller's connection is open) gets a second connection,
+  exactly as two plain sqlite3.connect() calls would
+- Pragmas applied once per connection: synchronous, cache_size, mmap_size,
+  temp_store, busy_timeout (settings in config.py); WAL only when
+  SQLITE_WAL=1, since DB files shared with the host through a container
+  bind mount can't use WAL's shared memory safely
+- Larger prepared-statement cache per connection
+- close() returns the connection to the pool; an uncommitted transaction
+  is rolled back, exactly as closing a plain connection would
+- row_factory set on a checkout applies only to that checkout
+
+Connections are dropped when the DB file is replaced or deleted, and after
+fork (children open their own). ":memory:" and URI databases are not pooled.
+
+Databases merged by db_consolidate are listed in db_redirects.json; connect()
+follows those redirects, so modules keep using their old paths. Stores that
+need to join across modules can open one connection with several databases
+attached as schemas (connect_schemas).
+
+Usage:
+    import db_pool
+
+    conn = db_pool.connect(DB_PATH)
+    conn.row_factory = sqlite3.Row
+    rows = conn.execute("SELECT ...").fetchall()
+    conn.commit()
+    conn.close()
+
+    conn = db_pool.connect_schemas({"decisions": DECISIONS_DB, "tasks": TASKS_DB})
+    conn.execute("SELECT ... FROM decisions.outcomes o JOIN tasks.tasks t ON ...")
+
+    print(db_pool.stats())
+"""
+
+import atexit
+import json
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from config import cfg
+
+REDIRECTS_FILE = cfg.DAEMON_DIR / "db_redirects.json"
+IDLE_PER_DATABASE = 2  # Idle connections kept per (thread, file) for reuse
+
+_local = threading.local()
+_stats_lock = threading.Lock()
+_stats = {"opened": 0, "reused": 0, "reopened": 0, "unpooled": 0, "redirected": 0}
+_wal_checked = set()
+_redirects: Dict[str, str] = {}
+_redirects_mtime: Optional[float] = None
+
+
+def _count(key: str):
+    with _stats_lock:
+        _stats[key] += 1
+
+
+def _file_id(path: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _apply_pragmas(conn: sqlite3.Connection, path: str, schema: str = "main"):
+    """Per-connection tuning; journal_mode is persistent so it's set once per file."""
+    conn.execute(f"PRAGMA busy_timeout = {int(cfg.SQLITE_BUSY_TIMEOUT_MS)}")
+    if cfg.SQLITE_WAL and path not in _wal_checked:
+        try:
+            conn.execute(f"PRAGMA {schema}.journal_mode = WAL")
+            _wal_checked.add(path)
+        except sqlite3.OperationalError:
+            pass  # Locked or read-only: keep the current journal mode
+    synchronous = cfg.SQLITE_SYNCHRONOUS or ("NORMAL" if cfg.SQLITE_WAL else "FULL")
+    conn.execute(f"PRAGMA {schema}.synchronous = {synchronous}")
+    conn.execute(f"PRAGMA {schema}.cache_size = -{int(cfg.SQLITE_CACHE_KB)}")
+    conn.execute(f"PRAGMA {schema}.mmap_size = {int(cfg.SQLITE_MMAP_SIZE)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+
+
+def _load_redirects() -> Dict[str, str]:
+    """db_redirects.json (old file name -> consolidated file name), reloaded on change."""
+    global _redirects, _redirects_mtime
+    try:
+        mtime = os.stat(REDIRECTS_FILE).st_mtime
+    except OSError:
+        mtime = None
+    if mtime != _redirects_mtime:
+        try:
+            with open(REDIRECTS_FILE) as f:
+                _redirects = json.load(f)
+        except (OSError, ValueError):
+            _redirects = {}
+        _redirects_mtime = mtime
+    return _redirects
+
+
+def resolve(database) -> str:
+    """Absolute path a database is stored at (after consolidation redirects)."""
+    path = os.path.abspath(os.fspath(database))
+    if os.path.dirname(path) == os.path.abspath(cfg.DAEMON_DIR):
+        target = _load_redirects().get(os.path.basename(path))
+        if target:
+            return os.path.join(os.path.dirname(path), target)
+    return path
+
+
+def exists(database) -> bool:
+    """Path.exists() that follows consolidation redirects."""
+    return os.path.exists(resolve(database))
+
+
+class _PoolEntry:
+    """A pooled connection and its bookkeeping (path is the pool key)."""
+
+    def __init__(self, path: str, schemas: Dict[str, str] = None):
+        self.path = path
+        self.schemas = schemas
+        if schemas is None:
+            self.conn = sqlite3.connect(path, timeout=cfg.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                                        cached_statements=cfg.SQLITE_CACHED_STATEMENTS)
+            _apply_pragmas(self.conn, path)
+        else:
+            self.conn = sqlite3.connect(":memory:", timeout=cfg.SQLITE_BUSY_TIMEOUT_MS / 1000,
+                                        cached_statements=cfg.SQLITE_CACHED_STATEMENTS)
+            for alias, schema_path in schemas.items():
+                self.conn.execute("ATTACH DATABASE ? AS " + _quote(alias), (schema_path,))
+                _apply_pragmas(self.conn, schema_path, _quote(alias))
+        self.file_id = self.current_file_id()
+        self.busy_timeout_ms = cfg.SQLITE_BUSY_TIMEOUT_MS
+        self.in_use = False
+        self.pooled = True  # False once dropped from the pool (closed on release)
+
+    def current_file_id(self):
+        if self.schemas is None:
+            return _file_id(self.path)
+        return tuple(_file_id(p) for p in self.schemas.values())
+
+    def set_busy_timeout(self, timeout_ms: int):
+        if timeout_ms != self.busy_timeout_ms:
+            self.conn.execute(f"PRAGMA busy_timeout = {int(timeout_ms)}")
+            self.busy_timeout_ms = timeout_ms
+
+
+class PooledConnection:
+    """
+    Checkout handle for a pooled connection.
+
+    Behaves like sqlite3.Connection (other attributes are delegated), except
+    that row_factory is private to this handle and close() releases the
+    connection back to the pool instead of closing it.
+    """
+
+    __slots__ = ("_entry", "row_factory", "_released")
+
+    def __init__(self, entry: _PoolEntry):
+        self._entry = entry
+        self._released = False
+        self.row_factory = None
+        entry.in_use = True
+
+    def cursor(self) -> sqlite3.Cursor:
+        cursor = self._entry.conn.cursor()
+        cursor.row_factory = self.row_factory
+        return cursor
+
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters) -> sqlite3.Cursor:
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, script: str) -> sqlite3.Cursor:
+        return self.cursor().executescript(script)
+
+    def __getattr__(self, name: str):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(self._entry.conn, name)
+
+    def __enter__(self):
+        self._entry.conn.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        return self._entry.conn.__exit__(*exc)
+
+    def close(self):
+        """Release to the pool, rolling back a transaction left open."""
+        if self._released:
+            return
+        self._released = True
+        entry = self._entry
+        if entry.conn.in_transaction:
+            entry.conn.rollback()
+        entry.in_use = False
+        if not entry.pooled:
+            entry.conn.close()
+            return
+        idle = [e for e in _pool().get(entry.path, ()) if not e.in_use]
+        if len(idle) > IDLE_PER_DATABASE:
+            _drop(entry)
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+def _pool() -> Dict[str, List[_PoolEntry]]:
+    """This thread's pool: key -> connections, idle or checked out (reset after fork)."""
+    pid = os.getpid()
+    if getattr(_local, "pid", None) != pid:
+        _local.pid = pid
+        _local.entries = {}
+    return _local.entries
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _drop(entry: _PoolEntry):
+    """Remove an entry from the pool; closed now if idle, else on release."""
+    entries = _pool().get(entry.path, [])
+    if entry in entries:
+        entries.remove(entry)
+    entry.pooled = False
+    if not entry.in_use:
+        entry.conn.close()
+
+
+def _checkout(key: str, timeout: Optional[float], schemas: Dict[str, str] = None) -> PooledConnection:
+    entries = _pool().setdefault(key, [])
+    if entries and entries[0].current_file_id() != entries[0].file_id:
+        # File deleted or replaced underneath us
+        for stale in list(entries):
+            _drop(stale)
+        _wal_checked.discard(key)
+        _count("reopened")
+
+    entry = next((e for e in entries if not e.in_use), None)
+    if entry is None:
+        entry = _PoolEntry(key, schemas)
+        entries.append(entry)
+        _count("opened")
+    else:
+        _count("reused")
+
+    entry.set_busy_timeout(int(timeout * 1000) if timeout is not None
+                           else cfg.SQLITE_BUSY_TIMEOUT_MS)
+    return PooledConnection(entry)
+
+
+def connect(database, timeout: float = None, **kwargs):
+    """
+    Pooled replacement for sqlite3.connect(database, timeout).
+
+    Extra sqlite3.connect options, ":memory:" and URI databases, or
+    SQLITE_POOL=0 fall back to a plain (but still tuned) connection.
+    """
+    path = os.fspath(database)
+    if path == ":memory:" or path.startswith("file:"):
+        _count("unpooled")
+        return sqlite3.connect(path, timeout=timeout if timeout is not None else 5.0, **kwargs)
+
+    requested = os.path.abspath(path)
+    path = resolve(requested)
+    if path != requested:
+        _count("redirected")
+        for stale in list(_pool().get(requested, ())):
+            _drop(stale)
+
+    if kwargs or not cfg.SQLITE_POOL:
+        _count("unpooled")
+        conn = sqlite3.connect(path, timeout=timeout if timeout is not None else 5.0, **kwargs)
+        _apply_pragmas(conn, path)
+        return conn
+    return _checkout(path, timeout)
+
+
+def connect_schemas(schemas: Dict[str, object], timeout: float = None) -> PooledConnection:
+    """
+    One pooled connection with each database attached under its alias.
+
+    Tables are addressed as alias.table, so queries can join across stores
+    that live in different files (redirects are followed).
+    """
+    resolved = {alias: resolve(path) for alias, path in schemas.items()}
+    key = "schemas:" + "|".join(f"{alias}={path}" for alias, path in sorted(resolved.items()))
+    return _checkout(key, timeout, resolved)
+
+
+def close_all():
+    """Close this thread's idle pooled connections."""
+    for entries in list(_pool().values()):
+        for entry in list(entries):
+            if not entry.in_use:
+                _drop(entry)
+
+
+def stats() -> Dict:
+    """Pool counters (process-wide) and this thread's open connections."""
+    with _stats_lock:
+        counters = dict(_stats)
+    checkouts = counters["opened"] + counters["reused"]
+    counters["reuse_rate"] = round(counters["reused"] / checkouts, 4) if checkouts else 0.0
+    counters["thread_connections"] = sorted(key for key, entries in _pool().items() if entries)
+    return counters
+
+
+atexit.register(close_all)
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Report journal mode / pragmas for the given DB files
+    report = {}
+    for arg in sys.argv[1:]:
+        conn = connect(arg)
+        report[arg] = {
+            pragma: conn.execute(f"PRAGMA {pragma}").fetchone()[0]
+            for pragma in ("journal_mode", "synchronous", "cache_size", "mmap_size", "busy_timeout")
+        }
+        conn.close()
+    report["pool"] = stats()
+    print(json.dumps(report, indent=2))
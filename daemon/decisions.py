@@ -22,6 +22,8 @@ from dataclasses import dataclass, asdict
 from enum import Enum
 import math
 
+import db_pool
+
 
 class ConfidenceLevel(str, Enum):
     VERY_LOW = "very_low"    # <20% - Highly uncertain
@@ -74,7 +76,7 @@ class DecisionEngine:
         self._init_db()
 
     def _init_db(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS decisions (
                 id TEXT PRIMARY KEY,
@@ -192,7 +194,7 @@ class DecisionEngine:
             recorded_at=datetime.now().isoformat()
         )
 
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT INTO outcomes (id, decision_id, actual_result, satisfaction, lessons, recorded_at)
             VALUES (?, ?, ?, ?, ?, ?)
@@ -206,7 +208,7 @@ class DecisionEngine:
 
     def get_learned_weights(self, domain: str) -> Dict[str, float]:
         """Get learned criterion weights for a domain."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         rows = conn.execute("""
             SELECT criterion, learned_weight FROM preferences
@@ -260,7 +262,7 @@ class DecisionEngine:
             return f"Acceptable option. Moderate value ({ev}/10)."
 
     def _save_decision(self, decision: Decision):
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT INTO decisions (id, title, context, criteria, expected_value,
                                   risk_adjusted_value, confidence_level, recommendation, created_at)
@@ -275,7 +277,7 @@ class DecisionEngine:
 
     def _update_preferences(self, decision_id: str, satisfaction: float):
         """Update learned preferences based on outcome."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
 
         # Get decision criteria
@@ -376,7 +378,7 @@ class DecisionEngine:
         learner = GoalConditionedLearner()
 
         # Get decision details
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         row = conn.execute("SELECT * FROM decisions WHERE id = ?", (decision_id,)).fetchone()
         conn.close()
@@ -426,7 +428,7 @@ class DecisionEngine:
         )
 
         # Get past decisions
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         rows = conn.execute("""
             SELECT d.*, o.satisfaction FROM decisions d
@@ -18,13 +18,14 @@ Triggers for capture:
 """
 
 import json
-import sqlite3
 import re
 from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 from datetime import datetime, timedelta
 from dataclasses import dataclass
 
+import db_pool
+
 DAEMON_DIR = Path(__file__).parent
 DB_PATH = DAEMON_DIR / "deferred_tasks.db"
 
@@ -65,7 +66,7 @@ class DeferredTaskCapture:
 
     def _init_db(self):
         """Initialize database."""
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         conn.execute("""
             CREATE TABLE IF NOT EXISTS deferred_tasks (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -97,7 +98,7 @@ class DeferredTaskCapture:
             tags.append("has_url")
             source = "url" if source == "user" else source
 
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         cursor = conn.execute("""
             INSERT INTO deferred_tasks (content, source, context, priority, captured_at, tags)
             VALUES (?, ?, ?, ?, ?, ?)
@@ -145,7 +146,7 @@ class DeferredTaskCapture:
 
     def _is_duplicate(self, content: str, threshold: float = 0.7) -> bool:
         """Check if similar task already exists."""
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         cursor = conn.execute("""
             SELECT content FROM deferred_tasks
             WHERE completed = 0 AND captured_at > ?
@@ -167,7 +168,7 @@ class DeferredTaskCapture:
 
     def get_pending(self, limit: int = 10) -> List[DeferredTask]:
         """Get pending (incomplete) tasks, ordered by priority."""
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         cursor = conn.execute("""
             SELECT * FROM deferred_tasks
             WHERE completed = 0
@@ -194,7 +195,7 @@ class DeferredTaskCapture:
 
     def complete(self, task_id: int):
         """Mark a task as complete."""
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         conn.execute("""
             UPDATE deferred_tasks
             SET completed = 1, completed_at = ?
@@ -205,7 +206,7 @@ class DeferredTaskCapture:
 
     def get_urls(self) -> List[str]:
         """Get all pending URLs that were recommended but not fetched."""
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         cursor = conn.execute("""
             SELECT content FROM deferred_tasks
             WHERE completed = 0 AND tags LIKE '%has_url%'
@@ -221,7 +222,7 @@ class DeferredTaskCapture:
 
     def summary(self) -> Dict:
         """Get summary of deferred tasks."""
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
 
         total = conn.execute("SELECT COUNT(*) FROM deferred_tasks").fetchone()[0]
         pending = conn.execute("SELECT COUNT(*) FROM deferred_tasks WHERE completed = 0").fetchone()[0]
@@ -12,13 +12,14 @@ Features:
 
 import hashlib
 import json
-import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Any, Tuple
 from dataclasses import dataclass, field, asdict
 import yaml
 
+import db_pool
+
 DB_PATH = Path(__file__).parent / "handoffs.db"
 HANDOFF_DIR = Path(__file__).parent.parent / "thoughts" / "handoffs"
 
@@ -74,7 +75,7 @@ class DeltaHandoffManager:
 
     def _init_db(self):
         """Initialize handoff tracking database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.executescript("""
             CREATE TABLE IF NOT EXISTS states (
                 hash TEXT PRIMARY KEY,
@@ -118,7 +119,7 @@ class DeltaHandoffManager:
 
     def save_state(self, state: HandoffState) -> str:
         """Save a full state snapshot."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT OR REPLACE INTO states (hash, session_id, timestamp, full_state)
             VALUES (?, ?, ?, ?)
@@ -129,7 +130,7 @@ class DeltaHandoffManager:
 
     def get_state(self, state_hash: str) -> Optional[HandoffState]:
         """Retrieve a state by hash."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         row = conn.execute(
             "SELECT full_state FROM states WHERE hash = ?", (state_hash,)
         ).fetchone()
@@ -142,7 +143,7 @@ class DeltaHandoffManager:
 
     def get_latest_state(self) -> Optional[HandoffState]:
         """Get the most recent state."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         row = conn.execute(
             "SELECT full_state FROM states ORDER BY timestamp DESC LIMIT 1"
         ).fetchone()
@@ -325,7 +326,7 @@ class DeltaHandoffManager:
 
     def summarize_session(self, session_id: str) -> str:
         """Generate summary of a single session."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         rows = conn.execute("""
             SELECT full_state FROM states
             WHERE session_id = ?
@@ -351,7 +352,7 @@ class DeltaHandoffManager:
 
     def summarize_period(self, level: str, start: datetime, end: datetime) -> str:
         """Summarize all states in a time period."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         rows = conn.execute("""
             SELECT full_state FROM states
             WHERE timestamp >= ? AND timestamp < ?
@@ -372,7 +373,7 @@ class DeltaHandoffManager:
         # Store summary
         summary = f"{level.title()} Summary ({start.date()} - {end.date()}): {len(states)} sessions, {len(all_learnings)} unique learnings"
 
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT INTO summaries (level, period_start, period_end, summary, source_hashes)
             VALUES (?, ?, ?, ?, ?)
@@ -385,7 +386,7 @@ class DeltaHandoffManager:
 
     def get_hierarchical_context(self, depth: str = "session") -> Dict:
         """Get context at specified depth (session/day/week/archive)."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
 
         if depth == "session":
             # Latest session only
@@ -548,7 +549,7 @@ if __name__ == '__main__':
 
         def stats(self):
             """Show handoff statistics."""
-            conn = sqlite3.connect(self.manager.db_path)
+            conn = db_pool.connect(self.manager.db_path)
             states = conn.execute("SELECT COUNT(*) FROM states").fetchone()[0]
             deltas = conn.execute("SELECT COUNT(*) FROM deltas").fetchone()[0]
             summaries = conn.execute("SELECT COUNT(*) FROM summaries").fetchone()[0]
@@ -11,15 +11,18 @@ Provides:
 
 import json
 import sys
-import hashlib
 from datetime import datetime
-from typing import Any, Optional
+from pathlib import Path
+from typing import Any
 
-try:
-    import redis
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
+sys.path.insert(0, str(Path(__file__).parent))
+from cache_client import cache
+from semantic_cache import SemanticCache
+
+PREFIX = "claude:"
+
+# Shared with MemoryRouter (semantic_cache); exact answers only, no gray zone
+semantic = SemanticCache("mcp")
 
 # MCP Protocol helpers
 def send_response(id: str, result: Any):
@@ -30,78 +33,47 @@ def send_error(id: str, code: int, message: str):
     response = {"jsonrpc": "2.0", "id": id, "error": {"code": code, "message": message}}
     print(json.dumps(response), flush=True)
 
-# Redis connection
-def get_redis() -> Optional[redis.Redis]:
-    if not REDIS_AVAILABLE:
-        return None
-    try:
-        r = redis.Redis(host='localhost', port=6379, decode_responses=True)
-        r.ping()
-        return r
-    except:
-        return None
-
-# Tool implementations
+# Tool implementations (shared pooled client; local fallback store when Dragonfly is down)
 def cache_set(key: str, value: str, ttl: int = 3600) -> dict:
     """Store a value in cache with optional TTL."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
-    r.setex(f"claude:{key}", ttl, value)
+    if not cache.set(f"{PREFIX}{key}", value, ttl):
+        return {"success": False, "error": "Cache write failed"}
     return {"success": True, "key": key, "ttl": ttl}
 
 def cache_get(key: str) -> dict:
     """Retrieve a value from cache."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
-    value = r.get(f"claude:{key}")
+    value = cache.get(f"{PREFIX}{key}")
     if value is None:
         return {"success": False, "found": False}
     return {"success": True, "found": True, "value": value}
 
 def cache_delete(key: str) -> dict:
     """Delete a key from cache."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
-    deleted = r.delete(f"claude:{key}")
-    return {"success": True, "deleted": deleted > 0}
+    pipe = cache.pipeline()
+    pipe.exists(f"{PREFIX}{key}").delete(f"{PREFIX}{key}")
+    existed, _ = pipe.execute()
+    return {"success": True, "deleted": bool(existed)}
 
 def cache_keys(pattern: str = "*") -> dict:
     """List keys matching pattern."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
-    keys = r.keys(f"claude:{pattern}")
+    keys = cache.keys(f"{PREFIX}{pattern}", limit=100)  # SCAN, stops at 100
     # Strip prefix
-    keys = [k.replace("claude:", "", 1) for k in keys]
-    return {"success": True, "keys": keys[:100]}  # Limit to 100
+    keys = [k.replace(PREFIX, "", 1) for k in keys]
+    return {"success": True, "keys": keys}
 
 def session_save(session_id: str, data: dict) -> dict:
     """Save session state."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
     key = f"session:{session_id}"
     data["_updated"] = datetime.now().isoformat()
-    r.hset(f"claude:{key}", mapping={k: json.dumps(v) for k, v in data.items()})
-    r.expire(f"claude:{key}", 86400 * 7)  # 7 days
+    # HSET + EXPIRE in one round trip
+    if not cache.hset(f"{PREFIX}{key}", {k: json.dumps(v) for k, v in data.items()}, ttl=86400 * 7):
+        return {"success": False, "error": "Cache write failed"}
     return {"success": True, "session_id": session_id}
 
 def session_load(session_id: str) -> dict:
     """Load session state."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
     key = f"session:{session_id}"
-    data = r.hgetall(f"claude:{key}")
+    data = cache.hgetall(f"{PREFIX}{key}")
     if not data:
         return {"success": False, "found": False}
 
@@ -116,10 +88,6 @@ def session_load(session_id: str) -> dict:
 
 def context_offload(context_id: str, content: str, metadata: dict = None) -> dict:
     """Offload large context to cache for token reduction."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
     key = f"context:{context_id}"
     payload = {
         "content": content,
@@ -127,7 +95,8 @@ def context_offload(context_id: str, content: str, metadata: dict = None) -> dic
         "tokens_approx": len(content) // 4,
         "stored_at": datetime.now().isoformat()
     }
-    r.setex(f"claude:{key}", 3600 * 24, json.dumps(payload))  # 24 hours
+    if not cache.set(f"{PREFIX}{key}", json.dumps(payload), ttl=3600 * 24):  # 24 hours
+        return {"success": False, "error": "Cache write failed"}
 
     return {
         "success": True,
@@ -138,12 +107,8 @@ def context_offload(context_id: str, content: str, metadata: dict = None) -> dic
 
 def context_recall(context_id: str) -> dict:
     """Recall offloaded context."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
     key = f"context:{context_id}"
-    data = r.get(f"claude:{key}")
+    data = cache.get(f"{PREFIX}{key}")
     if not data:
         return {"success": False, "found": False}
 
@@ -152,54 +117,44 @@ def context_recall(context_id: str) -> dict:
 
 def semantic_cache_set(query: str, response: str, ttl: int = 1800) -> dict:
     """Cache a query-response pair for semantic deduplication."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
-    # Simple hash-based key (for exact matches)
-    query_hash = hashlib.sha256(query.lower().strip().encode()).hexdigest()[:16]
-    key = f"semantic:{query_hash}"
-
-    payload = {
-        "query": query,
-        "response": response,
-        "cached_at": datetime.now().isoformat()
-    }
-    r.setex(f"claude:{key}", ttl, json.dumps(payload))
-    return {"success": True, "cache_key": query_hash}
+    if not semantic.set(query, response, ttl=ttl):
+        return {"success": False, "error": "Cache write failed"}
+    return {"success": True, "cache_key": semantic.key(query)[len(semantic.prefix):]}
 
 def semantic_cache_get(query: str) -> dict:
-    """Check if a similar query has been cached."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
-    query_hash = hashlib.sha256(query.lower().strip().encode()).hexdigest()[:16]
-    key = f"semantic:{query_hash}"
-
-    data = r.get(f"claude:{key}")
-    if not data:
+    """Check if a similar query has been cached (exact, then nearest cached query)."""
+    hit = semantic.get(query)
+    if not hit:
         return {"success": False, "found": False}
 
-    payload = json.loads(data)
-    return {"success": True, "found": True, **payload}
+    return {
+        "success": True,
+        "found": True,
+        "query": hit.query,
+        "response": hit.value,
+        "similarity": round(hit.similarity, 3),
+        "match": hit.kind
+    }
 
 def stats() -> dict:
     """Get cache statistics."""
-    r = get_redis()
-    if not r:
-        return {"success": False, "error": "Redis not available"}
-
-    info = r.info("memory")
-    keys = r.keys("claude:*")
-
+    counts = {"total": 0, "context": 0, "session": 0, "semantic": 0}
+    for key in cache.scan_iter(f"{PREFIX}*"):  # One pass, no blocking KEYS
+        counts["total"] += 1
+        kind = key[len(PREFIX):].split(":", 1)[0]
+        if kind in counts:
+            counts[kind] += 1
+
+    info = cache.info()
     return {
         "success": True,
-        "total_keys": len(keys),
-        "memory_used": info.get("used_memory_human", "unknown"),
-        "contexts_cached": len([k for k in keys if b"context:" in k.encode() if isinstance(k, str) else k]),
-        "sessions_active": len([k for k in keys if "session:" in k]),
-        "semantic_cache_entries": len([k for k in keys if "semantic:" in k])
+        "mode": cache.mode,
+        "total_keys": counts["total"],
+        "memory_used": info.get("memory_used", "unknown"),
+        "contexts_cached": counts["context"],
+        "sessions_active": counts["session"],
+        "semantic_cache_entries": counts["semantic"],
+        "semantic_cache": semantic.stats()
     }
 
 # MCP Tool definitions
@@ -391,10 +346,9 @@ def handle_request(request: dict):
 
 def main():
     """Main MCP server loop."""
-    # Check Redis availability
-    r = get_redis()
-    if not r:
-        sys.stderr.write("Warning: Redis/Dragonfly not available. Install redis-py: pip install redis\n")
+    # Check Dragonfly availability
+    if not cache.is_connected:
+        sys.stderr.write(f"Warning: Redis/Dragonfly not available, using the local {cache.mode} store\n")
 
     for line in sys.stdin:
         try:
@@ -13,12 +13,14 @@ Auto-stores alerts in deferred_tasks for review.
 """
 
 import json
-import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 
+import db_pool
+import write_behind
+
 DAEMON_DIR = Path(__file__).parent
 DB_PATH = DAEMON_DIR / "efficiency.db"
 
@@ -57,7 +59,7 @@ class EfficiencyMonitor:
 
     def _init_db(self):
         """Initialize efficiency database."""
-        conn = sqlite3.connect(str(DB_PATH))
+        conn = db_pool.connect(str(DB_PATH))
         conn.execute("""
             CREATE TABLE IF NOT EXISTS efficiency_log (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -196,8 +198,7 @@ class EfficiencyMonitor:
         try:
             import os
             session_id = os.environ.get("CLAUDE_SESSION_ID", datetime.now().strftime("%Y%m%d_%H%M"))
-            conn = sqlite3.connect(str(DB_PATH))
-            conn.execute("""
+            write_behind.submit(DB_PATH, """
                 INSERT INTO efficiency_log
                 (session_id, tool_calls, unique_tools, errors_count, repeated_errors,
                  tokens_estimate, tasks_completed, alerts, timestamp)
@@ -213,8 +214,6 @@ class EfficiencyMonitor:
                 json.dumps(alerts),
                 metrics.timestamp
             ))
-            conn.commit()
-            conn.close()
         except Exception:
             pass  # Silent failure
 
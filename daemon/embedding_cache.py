@@ -0,0 +1,378 @@
+#!/usr/bin/env python3
+"""
+Embedding Cache - Content-addressed embeddings shared across the daemon.
+
+The same chunk text gets embedded again on re-ingestion, on cache lookups
+and on every query comparison. This cache keys embeddings by
+(model, sha256(normalized text)) so each distinct text is embedded once:
+
+- L1: in-process LRU (OrderedDict), bounded by entry count
+- L2: SQLite (embedding_cache.db), float32 blobs, survives restarts.
+  compact() (run by cache_compactor) drops rows unused for
+  EMBEDDING_CACHE_TTL seconds, then evicts least recently used rows down
+  to EMBEDDING_CACHE_MAX_BYTES. L2 hits are recorded through write_behind.
+- Hit/miss counters per tier
+
+Usage:
+    from embedding_cache import get_embedding_cache
+    cache = get_embedding_cache()
+
+    vec = cache.get_or_compute("all-MiniLM-L6-v2", text, embed_fn)
+    vecs = cache.get_or_compute_many("all-MiniLM-L6-v2", texts, embed_batch_fn)
+    print(cache.stats())
+
+    vecs = embed_texts(texts)   # shared sentence-transformers model, or None
+"""
+
+import hashlib
+import importlib.util
+import re
+import threading
+import unicodedata
+from array import array
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+import cache_compactor
+import db_pool
+import write_behind
+from config import cfg
+
+EMBEDDING_CACHE_DB = Path(__file__).parent / "embedding_cache.db"
+DEFAULT_L1_SIZE = 10000
+
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for hashing: NFC, collapsed whitespace, stripped."""
+    return _WHITESPACE.sub(' ', unicodedata.normalize('NFC', text or '')).strip()
+
+
+def text_hash(text: str) -> str:
+    """sha256 of the normalized text."""
+    return hashlib.sha256(normalize_text(text).encode('utf-8')).hexdigest()
+
+
+class EmbeddingCache:
+    """Two-tier (LRU + SQLite) embedding cache keyed by (model, text hash)."""
+
+    def __init__(self, db_path: Optional[Path] = None, l1_size: int = DEFAULT_L1_SIZE):
+        self.db_path = db_path or EMBEDDING_CACHE_DB
+        self.l1_size = l1_size
+        self._l1: "OrderedDict[tuple, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.l1_hits = 0
+        self.l2_hits = 0
+        self.misses = 0
+        self._init_schema()
+        cache_compactor.register(f"embedding_cache:{Path(self.db_path).name}",
+                                 self.db_path, self.compact)
+
+    def _init_schema(self):
+        """Initialize database schema."""
+        conn = db_pool.connect(self.db_path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS embeddings (
+                model TEXT NOT NULL,
+                text_hash TEXT NOT NULL,
+                dim INTEGER NOT NULL,
+                embedding BLOB NOT NULL,
+                created_at TEXT NOT NULL,
+                PRIMARY KEY (model, text_hash)
+            ) WITHOUT ROWID
+        """)
+        cache_compactor.add_columns(conn, "embeddings", {
+            "size_bytes": "INTEGER",
+            "hit_count": "INTEGER DEFAULT 0",
+            "last_hit": "TEXT",
+        })
+        conn.execute("UPDATE embeddings SET size_bytes = length(embedding) WHERE size_bytes IS NULL")
+        conn.commit()
+        conn.close()
+
+    def _count(self, l1_hits: int = 0, l2_hits: int = 0, misses: int = 0):
+        with self._lock:
+            self.l1_hits += l1_hits
+            self.l2_hits += l2_hits
+            self.misses += misses
+
+    # ------------------------------------------------------------------
+    # L1 helpers
+    # ------------------------------------------------------------------
+
+    def _l1_get(self, key: tuple) -> Optional[List[float]]:
+        with self._lock:
+            value = self._l1.get(key)
+            if value is not None:
+                self._l1.move_to_end(key)
+            return value
+
+    def _l1_put(self, key: tuple, embedding: List[float]):
+        with self._lock:
+            self._l1[key] = embedding
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_size:
+                self._l1.popitem(last=False)
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get_many(self, model: str, texts: Sequence[str]) -> List[Optional[List[float]]]:
+        """Cached embeddings aligned with texts (None for misses)."""
+        hashes = [text_hash(t) for t in texts]
+        results: List[Optional[List[float]]] = [None] * len(texts)
+
+        missing: Dict[str, List[int]] = {}
+        l1_hits = 0
+        for i, h in enumerate(hashes):
+            value = self._l1_get((model, h))
+            if value is not None:
+                results[i] = value
+                l1_hits += 1
+            else:
+                missing.setdefault(h, []).append(i)
+
+        l2_hits = misses = 0
+        if missing:
+            found = {}
+            conn = db_pool.connect(self.db_path)
+            keys = list(missing)
+            for start in range(0, len(keys), 900):
+                chunk = keys[start:start + 900]
+                placeholders = ",".join("?" * len(chunk))
+                rows = conn.execute(f"""
+                    SELECT text_hash, embedding FROM embeddings
+                    WHERE model = ? AND text_hash IN ({placeholders})
+                """, [model] + chunk).fetchall()
+                for h, blob in rows:
+                    found[h] = array('f', blob).tolist()
+            conn.close()
+
+            now = datetime.now().isoformat()
+            for h, positions in missing.items():
+                value = found.get(h)
+                if value is None:
+                    misses += len(positions)
+                    continue
+                self._l1_put((model, h), value)
+                write_behind.submit(self.db_path, """
+                    UPDATE embeddings SET hit_count = hit_count + 1, last_hit = ?
+                    WHERE model = ? AND text_hash = ?
+                """, (now, model, h))
+                l2_hits += len(positions)
+                for i in positions:
+                    results[i] = value
+
+        self._count(l1_hits, l2_hits, misses)
+        return results
+
+    def get(self, model: str, text: str) -> Optional[List[float]]:
+        """Cached embedding for text, or None."""
+        return self.get_many(model, [text])[0]
+
+    def put_many(self, model: str, texts: Sequence[str],
+                 embeddings: Sequence[Optional[List[float]]]):
+        """Store embeddings for texts (None entries are skipped)."""
+        rows = []
+        now = datetime.now().isoformat()
+        for text, embedding in zip(texts, embeddings):
+            if embedding is None or len(embedding) == 0:
+                continue
+            embedding = [float(x) for x in embedding]
+            h = text_hash(text)
+            self._l1_put((model, h), embedding)
+            blob = array('f', embedding).tobytes()
+            rows.append((model, h, len(embedding), blob, now, len(blob)))
+        if not rows:
+            return
+
+        conn = db_pool.connect(self.db_path)
+        conn.executemany("""
+            INSERT OR REPLACE INTO embeddings
+            (model, text_hash, dim, embedding, created_at, size_bytes)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, rows)
+        conn.commit()
+        conn.close()
+
+    def put(self, model: str, text: str, embedding: List[float]):
+        """Store one embedding."""
+        self.put_many(model, [text], [embedding])
+
+    def get_or_compute_many(self, model: str, texts: Sequence[str],
+                            compute: Callable[[List[str]], Sequence[Optional[List[float]]]],
+                            cached: Optional[List[Optional[List[float]]]] = None
+                            ) -> List[Optional[List[float]]]:
+        """
+        Embeddings for texts, calling compute(missing_texts) once for misses.
+
+        Duplicate texts within the call are computed once. Pass the result of
+        an earlier get_many as cached to skip a second lookup.
+        """
+        results = list(cached) if cached is not None else self.get_many(model, texts)
+        pending: Dict[str, List[int]] = {}
+        for i, value in enumerate(results):
+            if value is None:
+                pending.setdefault(normalize_text(texts[i]), []).append(i)
+        if not pending:
+            return results
+
+        todo = [texts[positions[0]] for positions in pending.values()]
+        computed = list(compute(todo))
+        self.put_many(model, todo, computed)
+        for positions, value in zip(pending.values(), computed):
+            value = [float(x) for x in value] if value is not None and len(value) else None
+            for i in positions:
+                results[i] = value
+        return results
+
+    def get_or_compute(self, model: str, text: str,
+                       compute: Callable[[str], Optional[List[float]]]) -> Optional[List[float]]:
+        """Embedding for text, calling compute(text) on a miss."""
+        return self.get_or_compute_many(model, [text], lambda ts: [compute(ts[0])])[0]
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def clear(self, model: Optional[str] = None):
+        """Drop cached embeddings (all, or one model's)."""
+        with self._lock:
+            if model is None:
+                self._l1.clear()
+            else:
+                for key in [key for key in self._l1 if key[0] == model]:
+                    del self._l1[key]
+        conn = db_pool.connect(self.db_path)
+        if model is None:
+            conn.execute("DELETE FROM embeddings")
+        else:
+            conn.execute("DELETE FROM embeddings WHERE model = ?", (model,))
+        conn.commit()
+        conn.close()
+
+    def cleanup_expired(self, ttl: Optional[int] = None) -> int:
+        """Drop rows not written or hit for ttl seconds (EMBEDDING_CACHE_TTL; 0 = keep)."""
+        ttl = cfg.EMBEDDING_CACHE_TTL if ttl is None else ttl
+        if ttl <= 0:
+            return 0
+        write_behind.flush(self.db_path)
+        cutoff = (datetime.now() - timedelta(seconds=ttl)).isoformat()
+        conn = db_pool.connect(self.db_path)
+        deleted = conn.execute("DELETE FROM embeddings WHERE COALESCE(last_hit, created_at) < ?",
+                               (cutoff,)).rowcount
+        conn.commit()
+        conn.close()
+        return deleted
+
+    def evict(self, max_bytes: Optional[int] = None) -> int:
+        """Evict least recently used rows until the L2 fits the byte budget."""
+        write_behind.flush(self.db_path)  # Pending hits inform the order
+        conn = db_pool.connect(self.db_path)
+        evicted = cache_compactor.evict_to_budget(
+            conn, "embeddings", "model, text_hash",
+            max_bytes or cfg.EMBEDDING_CACHE_MAX_BYTES, "lru")
+        conn.commit()
+        conn.close()
+        return evicted
+
+    def compact(self) -> Dict:
+        """Expire, evict to budget, then return free pages (run by cache_compactor)."""
+        expired = self.cleanup_expired()
+        evicted = self.evict()
+        return {"expired": expired, "evicted": evicted, **cache_compactor.vacuum(self.db_path)}
+
+    def stats(self) -> Dict:
+        """Hit/miss counters and tier sizes."""
+        conn = db_pool.connect(self.db_path)
+        by_model = {row[0]: row[1] for row in conn.execute(
+            "SELECT model, COUNT(*) FROM embeddings GROUP BY model")}
+        stored_bytes = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM embeddings").fetchone()[0]
+        conn.close()
+
+        with self._lock:
+            l1_entries = len(self._l1)
+            l1_hits, l2_hits, misses = self.l1_hits, self.l2_hits, self.misses
+        lookups = l1_hits + l2_hits + misses
+        return {
+            "l1_entries": l1_entries,
+            "l1_capacity": self.l1_size,
+            "l2_entries": by_model,
+            "l2_bytes": stored_bytes,
+            "l2_budget_bytes": cfg.EMBEDDING_CACHE_MAX_BYTES,
+            "l1_hits": l1_hits,
+            "l2_hits": l2_hits,
+            "misses": misses,
+            "hit_rate": round((l1_hits + l2_hits) / lookups, 4) if lookups else 0.0,
+        }
+
+
+# Process-wide shared instance
+_cache: Optional[EmbeddingCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """Shared EmbeddingCache for this process."""
+    global _cache
+    if _cache is None:
+        with _cache_lock:
+            if _cache is None:
+                _cache = EmbeddingCache()
+    return _cache
+
+
+# Shared sentence-transformers model (optional dependency, loaded on first use:
+# importing it pulls in torch, which most users of this module never need)
+SENTENCE_TRANSFORMERS_AVAILABLE = importlib.util.find_spec("sentence_transformers") is not None
+DEFAULT_MODEL_NAME = "all-MiniLM-L6-v2"
+
+_model = None
+_model_lock = threading.Lock()
+
+
+def _get_model():
+    global _model
+    if _model is None:
+        with _model_lock:
+            if _model is None:
+                from sentence_transformers import SentenceTransformer
+                _model = SentenceTransformer(DEFAULT_MODEL_NAME)
+    return _model
+
+
+def embed_texts(texts: Sequence[str]) -> Optional[List[Optional[List[float]]]]:
+    """
+    Embeddings of texts with the shared DEFAULT_MODEL_NAME model, through the
+    cache (one batched encode for the misses). None when sentence-transformers
+    isn't installed.
+    """
+    if not SENTENCE_TRANSFORMERS_AVAILABLE:
+        return None
+    model = _get_model()
+    return get_embedding_cache().get_or_compute_many(
+        DEFAULT_MODEL_NAME, list(texts), lambda todo: model.encode(todo).tolist())
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description='Embedding Cache')
+    parser.add_argument('--stats', action='store_true', help='Show cache stats')
+    parser.add_argument('--clear', nargs='?', const='*', help='Clear cache (optionally one model)')
+    parser.add_argument('--compact', action='store_true', help='Expire and evict to budget now')
+    args = parser.parse_args()
+
+    cache = get_embedding_cache()
+    if args.compact:
+        print(json.dumps(cache.compact(), indent=2))
+    elif args.clear:
+        cache.clear(None if args.clear == '*' else args.clear)
+        print("Cleared")
+    else:
+        print(json.dumps(cache.stats(), indent=2))
@@ -23,6 +23,8 @@ from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass, asdict
 from collections import defaultdict
 
+import db_pool
+
 # Ensure daemon directory is in path for imports
 DAEMON_DIR = Path(__file__).parent
 sys.path.insert(0, str(DAEMON_DIR))
@@ -88,7 +90,7 @@ class LearningTarget:
 
 def init_db() -> sqlite3.Connection:
     """Initialize emergent behaviors database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Patterns table
@@ -163,16 +165,22 @@ def detect_patterns(lookback_days: int = 7) -> List[Pattern]:
     patterns = []
     cutoff = (datetime.now() - timedelta(days=lookback_days)).isoformat()
 
+    # One connection with both stores attached as schemas (redirects followed)
+    schemas = {name: path for name, path in (("decisions", DECISIONS_DB), ("tasks", TASKS_DB))
+               if db_pool.exists(path)}
+    if not schemas:
+        return patterns
+    conn = db_pool.connect_schemas(schemas)
+    c = conn.cursor()
+
     # Check decisions database for outcome patterns
-    if DECISIONS_DB.exists():
-        conn = sqlite3.connect(DECISIONS_DB)
-        c = conn.cursor()
+    if "decisions" in schemas:
 
         # Recurring failures
         try:
             c.execute("""
                 SELECT decision_id, COUNT(*) as count, AVG(satisfaction) as avg_sat
-                FROM outcomes
+                FROM decisions.outcomes
                 WHERE recorded_at > ?
                 GROUP BY decision_id
                 HAVING COUNT(*) >= 2 AND AVG(satisfaction) < 0.4
@@ -196,7 +204,7 @@ def detect_patterns(lookback_days: int = 7) -> List[Pattern]:
         try:
             c.execute("""
                 SELECT decision_id, COUNT(*) as count, AVG(satisfaction) as avg_sat
-                FROM outcomes
+                FROM decisions.outcomes
                 WHERE recorded_at > ? AND satisfaction > 0.8
                 GROUP BY decision_id
                 HAVING COUNT(*) >= 2
@@ -216,19 +224,14 @@ def detect_patterns(lookback_days: int = 7) -> List[Pattern]:
                 suggested_action=f"Replicate {row[0]} approach elsewhere"
             ))
 
-        conn.close()
-
     # Check tasks database for bottlenecks
-    if TASKS_DB.exists():
-        conn = sqlite3.connect(TASKS_DB)
-        c = conn.cursor()
-
+    if "tasks" in schemas:
         # Long-running tasks (bottlenecks)
         try:
             c.execute("""
                 SELECT description,
                        julianday(completed_at) - julianday(created_at) as duration
-                FROM tasks
+                FROM tasks.tasks
                 WHERE completed_at IS NOT NULL
                 AND julianday(completed_at) - julianday(created_at) > 0.5
                 ORDER BY duration DESC
@@ -250,8 +253,7 @@ def detect_patterns(lookback_days: int = 7) -> List[Pattern]:
         except sqlite3.OperationalError:
             pass  # Table structure different
 
-        conn.close()
-
+    conn.close()
     return patterns
 
 
@@ -454,10 +456,10 @@ def analyze_goals_for_refinement() -> List[GoalRefinement]:
     """
     refinements = []
 
-    if not COHERENCE_DB.exists():
+    if not db_pool.exists(COHERENCE_DB):
         return refinements
 
-    conn = sqlite3.connect(COHERENCE_DB)
+    conn = db_pool.connect(COHERENCE_DB)
     c = conn.cursor()
 
     # Get goals with their coherence scores
@@ -538,8 +540,8 @@ def identify_learning_targets() -> List[LearningTarget]:
 
     # Check metacognition for low capabilities
     metacog_db = Path(__file__).parent / "metacognition.db"
-    if metacog_db.exists():
-        conn = sqlite3.connect(metacog_db)
+    if db_pool.exists(metacog_db):
+        conn = db_pool.connect(metacog_db)
         c = conn.cursor()
 
         try:
@@ -24,7 +24,6 @@ Usage:
         log_error("module", "operation", e)
 """
 
-import sqlite3
 import logging
 import functools
 import traceback
@@ -33,6 +32,9 @@ from datetime import datetime
 from typing import Optional, Any, Callable
 from contextlib import contextmanager
 
+import db_pool
+import write_behind
+
 DAEMON_DIR = Path(__file__).parent
 ERROR_DB = DAEMON_DIR / "errors.db"
 
@@ -46,7 +48,7 @@ if not logger.handlers:
 
 def init_db():
     """Initialize error tracking database."""
-    conn = sqlite3.connect(ERROR_DB)
+    conn = db_pool.connect(ERROR_DB)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS errors (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -95,27 +97,23 @@ def log_error(module: str, operation: str, error: Exception,
     # Log to stderr
     logger.error(f"[{module}:{operation}] {error_type}: {error_msg}")
 
-    # Store in database
+    # Store in database (buffered, committed in batches by write_behind)
     try:
-        conn = sqlite3.connect(ERROR_DB)
-        conn.execute("""
+        now = datetime.now().isoformat()
+        write_behind.submit(ERROR_DB, """
             INSERT INTO errors (timestamp, module, operation, error_type,
                               error_message, traceback, context)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        """, (datetime.now().isoformat(), module, operation, error_type,
-              error_msg, tb, context))
+        """, (now, module, operation, error_type, error_msg, tb, context))
 
         # Update stats
-        conn.execute("""
+        write_behind.submit(ERROR_DB, """
             INSERT INTO error_stats (module, operation, count, last_error)
             VALUES (?, ?, 1, ?)
             ON CONFLICT(module, operation) DO UPDATE SET
                 count = count + 1,
                 last_error = excluded.last_error
-        """, (module, operation, datetime.now().isoformat()))
-
-        conn.commit()
-        conn.close()
+        """, (module, operation, now))
     except Exception as db_error:
         logger.warning(f"Failed to log error to DB: {db_error}")
 
@@ -182,7 +180,8 @@ def ErrorTracker(module: str, operation: str, default: Any = None,
 
 def get_error_stats() -> dict:
     """Get error statistics by module."""
-    conn = sqlite3.connect(ERROR_DB)
+    write_behind.flush(ERROR_DB)
+    conn = db_pool.connect(ERROR_DB)
 
     # Stats by module
     cursor = conn.execute("""
@@ -216,7 +215,8 @@ def get_error_stats() -> dict:
 
 def get_frequent_errors(limit: int = 10) -> list:
     """Get most frequent error patterns."""
-    conn = sqlite3.connect(ERROR_DB)
+    write_behind.flush(ERROR_DB)
+    conn = db_pool.connect(ERROR_DB)
     cursor = conn.execute("""
         SELECT module, operation, error_type, COUNT(*) as freq
         FROM errors
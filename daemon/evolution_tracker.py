@@ -11,13 +11,14 @@ Usage:
     python daemon/evolution_tracker.py progress   # Progress report
 """
 
-import sqlite3
 import json
 import argparse
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 
+import db_pool
+
 PROJECT_DIR = Path(__file__).parent.parent
 STRATEGY_DB = Path(__file__).parent / "strategies.db"
 OUTCOME_DB = Path(__file__).parent / "outcomes.db"
@@ -53,10 +54,10 @@ STRATEGY_TO_SCIFI = {
 
 def get_strategy_status() -> List[Dict]:
     """Get status of all strategies."""
-    if not STRATEGY_DB.exists():
+    if not db_pool.exists(STRATEGY_DB):
         return []
 
-    conn = sqlite3.connect(STRATEGY_DB)
+    conn = db_pool.connect(STRATEGY_DB)
     c = conn.cursor()
 
     c.execute('''SELECT strategy_id, name, status, metrics, updated_at
@@ -80,10 +81,10 @@ def get_strategy_status() -> List[Dict]:
 
 def get_outcome_stats() -> Dict:
     """Get outcome statistics."""
-    if not OUTCOME_DB.exists():
+    if not db_pool.exists(OUTCOME_DB):
         return {"total": 0, "successes": 0, "rate": 0}
 
-    conn = sqlite3.connect(OUTCOME_DB)
+    conn = db_pool.connect(OUTCOME_DB)
     c = conn.cursor()
 
     c.execute('''SELECT COUNT(*), SUM(CASE WHEN result = 'success' THEN 1 ELSE 0 END)
@@ -7,13 +7,15 @@ Flow: TaskGenerator → RetrievalPolicy → Executor → OutcomeTracker → Memo
 This is the backbone that ties all autonomous systems together.
 """
 
-import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass, asdict
 
+import db_pool
+import write_behind
+
 DAEMON_DIR = Path(__file__).parent
 SPINE_DB = DAEMON_DIR / "spine.db"
 
@@ -29,7 +31,7 @@ class SpineTask:
     result: Dict = None
 
 def init_db():
-    conn = sqlite3.connect(SPINE_DB)
+    conn = db_pool.connect(SPINE_DB)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS spine_tasks (
             id TEXT PRIMARY KEY,
@@ -135,7 +137,7 @@ class ExecutionSpine:
         import hashlib
         task_id = f"spine_{datetime.now().strftime('%Y%m%d%H%M%S')}_{hashlib.md5(task.encode()).hexdigest()[:8]}"
 
-        conn = sqlite3.connect(SPINE_DB)
+        conn = db_pool.connect(SPINE_DB)
         conn.execute("""
             INSERT INTO spine_tasks (id, source, task_type, content, status, created_at, updated_at, context)
             VALUES (?, ?, ?, ?, 'pending', ?, ?, ?)
@@ -150,7 +152,7 @@ class ExecutionSpine:
         """Execute task through the full pipeline."""
         import time
 
-        conn = sqlite3.connect(SPINE_DB)
+        conn = db_pool.connect(SPINE_DB)
         cursor = conn.execute("SELECT * FROM spine_tasks WHERE id = ?", (task_id,))
         row = cursor.fetchone()
         if not row:
@@ -176,7 +178,7 @@ class ExecutionSpine:
             "latency_ms": int((time.time() - start) * 1000),
             "items_found": len(context_items)
         }
-        self._log_metric(conn, "retrieval", task_id, result["stages"]["retrieval"]["latency_ms"], True)
+        self._log_metric("retrieval", task_id, result["stages"]["retrieval"]["latency_ms"], True)
 
         # Stage 2: Execution (via orchestrator)
         start = time.time()
@@ -194,7 +196,7 @@ class ExecutionSpine:
             "latency_ms": int((time.time() - start) * 1000),
             "success": exec_result.get("success", False)
         }
-        self._log_metric(conn, "execution", task_id, result["stages"]["execution"]["latency_ms"],
+        self._log_metric("execution", task_id, result["stages"]["execution"]["latency_ms"],
                         exec_result.get("success", False))
 
         # Stage 3: Outcome tracking
@@ -232,16 +234,16 @@ class ExecutionSpine:
                     (status, datetime.now().isoformat(), task_id))
         conn.commit()
 
-    def _log_metric(self, conn, stage: str, task_id: str, latency_ms: int, success: bool):
-        conn.execute("""
+    def _log_metric(self, stage: str, task_id: str, latency_ms: int, success: bool):
+        write_behind.submit(SPINE_DB, """
             INSERT INTO spine_metrics (timestamp, stage, task_id, latency_ms, success)
             VALUES (?, ?, ?, ?, ?)
         """, (datetime.now().isoformat(), stage, task_id, latency_ms, 1 if success else 0))
-        conn.commit()
 
     def get_stats(self) -> Dict:
         """Get spine execution statistics."""
-        conn = sqlite3.connect(SPINE_DB)
+        write_behind.flush(SPINE_DB)
+        conn = db_pool.connect(SPINE_DB)
 
         # Task counts
         cursor = conn.execute("""
@@ -277,7 +279,7 @@ class ExecutionSpine:
 
     def process_pending(self, limit: int = 5) -> List[Dict]:
         """Process pending tasks from the queue."""
-        conn = sqlite3.connect(SPINE_DB)
+        conn = db_pool.connect(SPINE_DB)
         cursor = conn.execute("""
             SELECT id FROM spine_tasks WHERE status = 'pending'
             ORDER BY created_at ASC LIMIT ?
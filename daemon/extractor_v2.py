@@ -204,22 +204,15 @@ def llm_call(
     from pathlib import Path
     import sys
 
-    # Import cache (will implement llm_cache_l2.py next)
+    # Shared L1/L2 cache (llm_cache); cache_key is already a composite key
     try:
         daemon_dir = Path(__file__).parent
         sys.path.insert(0, str(daemon_dir))
-        from llm_cache_l2 import LLMCacheL2
-        cache = LLMCacheL2()
+        from llm_cache import LLMCache
+        cache = LLMCache("extractor_v2", ttl=30 * 86400)
     except ImportError:
         cache = None
 
-    # Check L2 cache
-    if use_cache and cache:
-        cached = cache.get(cache_key)
-        if cached:
-            print(f"[Cache HIT] {cache_key[:12]}...")
-            return {'response': cached, 'cache_hit': True}
-
     # Make LocalAI request
     localai_url = "http://localhost:8080/v1/chat/completions"
 
@@ -230,16 +223,26 @@ def llm_call(
         "max_tokens": 4096
     }
 
-    try:
+    def complete() -> str:
         resp = requests.post(localai_url, json=payload, timeout=timeout)
         resp.raise_for_status()
         data = resp.json()
+        return data['choices'][0]['message']['content']
+
+    try:
+        if use_cache and cache:
+            # Concurrent calls with the same cache_key share one request
+            response_text, cache_hit = cache.get_or_compute(
+                cache_key, complete, metadata={'model_id': model_id})
+            if cache_hit:
+                print(f"[Cache HIT] {cache_key[:12]}...")
+            return {'response': response_text, 'cache_hit': cache_hit}
 
-        response_text = data['choices'][0]['message']['content']
+        response_text = complete()
 
-        # Store in L2 cache
+        # use_cache=False: refresh the cached entry
         if cache:
-            cache.set(cache_key, response_text, ttl_days=30)
+            cache.set(cache_key, response_text, metadata={'model_id': model_id})
 
         return {'response': response_text, 'cache_hit': False}
 
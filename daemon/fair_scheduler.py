@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""
+Fair Scheduler - Weighted-fair task selection for the daemon's queues.
+
+Ordering purely by priority then age lets one busy producer (a flood of
+generated tasks at NORMAL priority) delay everyone else at that priority.
+FairScheduler.select() picks tasks instead by:
+
+- Strict priority with aging: level = priority + wait / aging_seconds, and
+  a task's class is its whole level, capped at the highest base priority
+  waiting. Only the highest class with a runnable task is considered, so
+  a HIGH task always runs before a fresh NORMAL one, but a task moves up
+  a class per aging interval waited - nothing starves.
+- Source fairness within the class: every task has a source (interactive,
+  scheduled, emergent, ingest) with a weight. A source's k-th pick gets
+  the finish tag (served + k) / (weight * 2**level) and the lowest tag
+  runs first, where served counts tasks started from that source in the
+  fairness window. Busy sources get their share, not the whole class.
+- Concurrency caps per task type (e.g. one LocalAI-heavy job at a time),
+  counting tasks already running plus those picked in the same batch.
+
+The queues fetch candidates and counts, call select() inside their claim
+transaction, then claim the chosen ids. Weights, caps and timings come
+from config.py (SCHED_*).
+
+Usage:
+    from fair_scheduler import FairScheduler, Candidate
+
+    sched = FairScheduler()
+    picked = sched.select(candidates, served={"interactive": 3}, running={"localai": 0}, n=1)
+"""
+
+import math
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from config import cfg
+
+SOURCES = ("interactive", "scheduled", "emergent", "ingest")
+
+# metadata["source"] values used by producers -> scheduling source
+SOURCE_ALIASES = {
+    "scheduler": "scheduled",
+    "scheduled": "scheduled",
+    "task_generator": "emergent",
+    "generated": "emergent",
+    "emergent": "emergent",
+    "strategy": "emergent",
+    "spine": "emergent",
+    "ingest": "ingest",
+    "kg_summary": "ingest",
+}
+
+
+def classify_source(metadata: Optional[Dict[str, Any]] = None) -> str:
+    """Scheduling source for a task from its metadata (default: interactive)."""
+    source = str((metadata or {}).get("source", "")).lower()
+    return SOURCE_ALIASES.get(source, "interactive")
+
+
+@dataclass
+class Candidate:
+    """A claimable task as seen by the scheduler."""
+    id: Any
+    source: str
+    task_type: Optional[str]
+    priority: float        # Higher = more important
+    wait_seconds: float
+
+
+class FairScheduler:
+    """Weighted-fair, aging, concurrency-capped task selection."""
+
+    def __init__(
+        self,
+        weights: Optional[Dict[str, float]] = None,
+        caps: Optional[Dict[str, int]] = None,
+        aging_seconds: Optional[float] = None,
+        window_seconds: Optional[float] = None,
+        max_running: Optional[int] = None
+    ):
+        self.weights = dict(weights if weights is not None else cfg.SCHED_SOURCE_WEIGHTS)
+        self.caps = dict(caps if caps is not None else cfg.SCHED_TYPE_CAPS)
+        self.aging_seconds = aging_seconds or cfg.SCHED_AGING_SECONDS
+        self.window_seconds = window_seconds or cfg.SCHED_FAIRNESS_WINDOW
+        self.max_running = max_running
+
+    def level(self, candidate: Candidate) -> float:
+        """Effective priority: base priority plus one step per aging interval waited."""
+        return candidate.priority + max(candidate.wait_seconds, 0.0) / self.aging_seconds
+
+    def priority_class(self, candidate: Candidate, top: float) -> int:
+        """Whole effective level, capped at the highest base priority waiting."""
+        return math.floor(min(self.level(candidate), top))
+
+    def _finish_tag(self, candidate: Candidate, served: float) -> float:
+        weight = self.weights.get(candidate.source, 1.0)
+        # Clamp the exponent: very old tasks already win; avoid float overflow
+        return (served + 1) / (weight * 2 ** min(self.level(candidate), 60))
+
+    def _capped(self, task_type: Optional[str], running: Dict[str, int]) -> bool:
+        cap = self.caps.get(task_type) if task_type else None
+        return cap is not None and running.get(task_type, 0) >= cap
+
+    def select(
+        self,
+        candidates: List[Candidate],
+        served: Optional[Dict[str, int]] = None,
+        running: Optional[Dict[str, int]] = None,
+        n: int = 1
+    ) -> List[Candidate]:
+        """Pick up to n candidates in run order.
+
+        served: tasks started per source within window_seconds.
+        running: tasks currently running per task_type.
+        """
+        served = dict(served or {})
+        running = dict(running or {})
+        total_running = sum(running.values())
+        top = max((c.priority for c in candidates), default=0)
+        remaining = {id(c): (self.priority_class(c, top), c) for c in candidates}
+
+        picked: List[Candidate] = []
+        while len(picked) < n:
+            if self.max_running is not None and total_running >= self.max_running:
+                break
+            runnable = [(cls, c) for cls, c in remaining.values()
+                        if not self._capped(c.task_type, running)]
+            if not runnable:
+                break
+            # Highest class first; weighted fairness (then age) within it
+            top_class = max(cls for cls, _ in runnable)
+            best = min((c for cls, c in runnable if cls == top_class),
+                       key=lambda c: (self._finish_tag(c, served.get(c.source, 0)),
+                                      -c.wait_seconds))
+
+            picked.append(best)
+            del remaining[id(best)]
+            served[best.source] = served.get(best.source, 0) + 1
+            if best.task_type:
+                running[best.task_type] = running.get(best.task_type, 0) + 1
+            total_running += 1
+        return picked
+
+
+def wait_summary(waits: List[float]) -> Dict[str, float]:
+    """count/mean/p50/p95/max of queue wait times (seconds)."""
+    if not waits:
+        return {"count": 0}
+    ordered = sorted(waits)
+
+    def pct(p: float) -> float:
+        k = max(0, math.ceil(p / 100 * len(ordered)) - 1)
+        return round(ordered[k], 3)
+
+    return {
+        "count": len(ordered),
+        "mean": round(sum(ordered) / len(ordered), 3),
+        "p50": pct(50),
+        "p95": pct(95),
+        "max": round(ordered[-1], 3),
+    }
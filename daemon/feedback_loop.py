@@ -11,7 +11,6 @@ Includes:
 - Atlas spine daily loop integration
 """
 
-import sqlite3
 import json
 import time
 import subprocess
@@ -19,6 +18,9 @@ from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional, Tuple
 
+import db_pool
+import write_behind
+
 # Paths
 DAEMON_DIR = Path(__file__).parent
 REPO_ROOT = DAEMON_DIR.parent
@@ -51,10 +53,10 @@ except ImportError:
 
 def get_recent_outcomes(hours: int = 24) -> List[Dict]:
     """Get outcomes from the last N hours."""
-    if not OUTCOME_DB.exists():
+    if not db_pool.exists(OUTCOME_DB):
         return []
 
-    conn = sqlite3.connect(OUTCOME_DB)
+    conn = db_pool.connect(OUTCOME_DB)
     c = conn.cursor()
 
     cutoff = (datetime.now() - timedelta(hours=hours)).isoformat()
@@ -116,10 +118,10 @@ def analyze_patterns(outcomes: List[Dict]) -> Dict:
 
 def update_strategies(analysis: Dict) -> int:
     """Update strategies based on analysis."""
-    if not STRATEGY_DB.exists():
+    if not db_pool.exists(STRATEGY_DB):
         return 0
 
-    conn = sqlite3.connect(STRATEGY_DB)
+    conn = db_pool.connect(STRATEGY_DB)
     c = conn.cursor()
 
     updates = 0
@@ -150,7 +152,7 @@ def store_learnings(analysis: Dict):
     """Store learnings in memory for future recall."""
     MEMORY_DB.parent.mkdir(parents=True, exist_ok=True)
 
-    conn = sqlite3.connect(MEMORY_DB)
+    conn = db_pool.connect(MEMORY_DB)
     c = conn.cursor()
 
     c.execute('''CREATE TABLE IF NOT EXISTS learnings (
@@ -181,7 +183,7 @@ def store_learnings(analysis: Dict):
 
 def init_analytics_db():
     """Initialize analytics database."""
-    conn = sqlite3.connect(ANALYTICS_DB)
+    conn = db_pool.connect(ANALYTICS_DB)
     c = conn.cursor()
     c.executescript('''
         CREATE TABLE IF NOT EXISTS component_health (
@@ -217,51 +219,49 @@ def init_analytics_db():
     conn.close()
 
 
-def track_component(component: str, success: bool, duration_ms: float = 0, notes: str = ''):
-    """Track component health."""
-    init_analytics_db()
-    conn = sqlite3.connect(ANALYTICS_DB)
-    c = conn.cursor()
+_analytics_ready = False
 
-    now = datetime.now().isoformat()
 
-    # Get current stats
-    c.execute('SELECT success_count, failure_count, avg_duration_ms FROM component_health WHERE component = ?', (component,))
-    row = c.fetchone()
+def track_component(component: str, success: bool, duration_ms: float = 0, notes: str = ''):
+    """Track component health.
 
-    if row:
-        success_count, failure_count, avg_dur = row
-        if success:
-            success_count += 1
-            c.execute('UPDATE component_health SET last_success = ?, success_count = ? WHERE component = ?',
-                     (now, success_count, component))
-        else:
-            failure_count += 1
-            c.execute('UPDATE component_health SET last_failure = ?, failure_count = ?, notes = ? WHERE component = ?',
-                     (now, failure_count, notes, component))
-
-        # Update health score (success rate with decay)
-        total = success_count + failure_count
-        health = success_count / total if total > 0 else 1.0
-        c.execute('UPDATE component_health SET health_score = ? WHERE component = ?', (health, component))
-
-        # Update avg duration
-        if duration_ms > 0:
-            new_avg = (avg_dur * (total - 1) + duration_ms) / total
-            c.execute('UPDATE component_health SET avg_duration_ms = ? WHERE component = ?', (new_avg, component))
-    else:
-        c.execute('''INSERT INTO component_health (component, last_success, success_count, failure_count, health_score)
-                     VALUES (?, ?, ?, ?, ?)''',
-                  (component, now if success else None, 1 if success else 0, 0 if success else 1, 1.0 if success else 0.0))
+    One UPSERT computed from the stored row, buffered by write_behind, so
+    hot paths don't wait on a read + commit per call.
+    """
+    global _analytics_ready
+    if not _analytics_ready:
+        init_analytics_db()
+        _analytics_ready = True
 
-    conn.commit()
-    conn.close()
+    now = datetime.now().isoformat()
+    write_behind.submit(ANALYTICS_DB, '''
+        INSERT INTO component_health
+            (component, last_success, last_failure, success_count, failure_count,
+             avg_duration_ms, health_score, notes)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(component) DO UPDATE SET
+            last_success = COALESCE(excluded.last_success, last_success),
+            last_failure = COALESCE(excluded.last_failure, last_failure),
+            notes = CASE WHEN excluded.failure_count > 0 THEN excluded.notes ELSE notes END,
+            success_count = success_count + excluded.success_count,
+            failure_count = failure_count + excluded.failure_count,
+            avg_duration_ms = CASE WHEN excluded.avg_duration_ms > 0
+                THEN (avg_duration_ms * (success_count + failure_count) + excluded.avg_duration_ms)
+                     / (success_count + failure_count + 1)
+                ELSE avg_duration_ms END,
+            health_score = CAST(success_count + excluded.success_count AS REAL)
+                           / (success_count + failure_count + 1)
+    ''', (component, now if success else None, None if success else now,
+          1 if success else 0, 0 if success else 1,
+          duration_ms if duration_ms > 0 else 0, 1.0 if success else 0.0,
+          None if success else notes))
 
 
 def get_weak_components(threshold: float = 0.7) -> List[Dict]:
     """Get components with health below threshold."""
     init_analytics_db()
-    conn = sqlite3.connect(ANALYTICS_DB)
+    write_behind.flush(ANALYTICS_DB)
+    conn = db_pool.connect(ANALYTICS_DB)
     c = conn.cursor()
 
     c.execute('''SELECT component, health_score, failure_count, last_failure, notes
@@ -295,7 +295,8 @@ def analyze_workflow_efficiency() -> Dict:
     results = {'bottlenecks': [], 'slow_components': [], 'failing_components': []}
 
     init_analytics_db()
-    conn = sqlite3.connect(ANALYTICS_DB)
+    write_behind.flush(ANALYTICS_DB)
+    conn = db_pool.connect(ANALYTICS_DB)
     c = conn.cursor()
 
     # Find slow components (> 2x average)
@@ -322,10 +323,10 @@ def check_critical_pipelines() -> List[Dict]:
     ingest_db = DAEMON_DIR / "ingest.db"
     utf_db = DAEMON_DIR / "utf_knowledge.db"
 
-    if ingest_db.exists() and utf_db.exists():
+    if db_pool.exists(ingest_db) and db_pool.exists(utf_db):
         try:
-            conn1 = sqlite3.connect(ingest_db)
-            conn2 = sqlite3.connect(utf_db)
+            conn1 = db_pool.connect(ingest_db)
+            conn2 = db_pool.connect(utf_db)
 
             marked_complete = conn1.execute(
                 'SELECT COUNT(*) FROM processed_files WHERE status="completed"'
@@ -352,9 +353,9 @@ def check_critical_pipelines() -> List[Dict]:
             criticals.append({'component': 'ingest_check', 'severity': 'ERROR', 'issue': str(e)})
 
     # Check 2: Outcome tracking starvation
-    if OUTCOME_DB.exists():
+    if db_pool.exists(OUTCOME_DB):
         try:
-            conn = sqlite3.connect(OUTCOME_DB)
+            conn = db_pool.connect(OUTCOME_DB)
             count = conn.execute('SELECT COUNT(*) FROM outcomes').fetchone()[0]
             if count < 10:
                 criticals.append({
@@ -371,9 +372,9 @@ def check_critical_pipelines() -> List[Dict]:
     critical_dbs = ['synthesis.db', 'books.db']
     for db_name in critical_dbs:
         db_path = DAEMON_DIR / db_name
-        if db_path.exists():
+        if db_pool.exists(db_path):
             try:
-                conn = sqlite3.connect(db_path)
+                conn = db_pool.connect(db_path)
                 tables = conn.execute("SELECT name FROM sqlite_master WHERE type='table'").fetchall()
                 total = 0
                 for t in tables[:3]:
@@ -418,7 +419,7 @@ def run_self_diagnostics() -> Dict:
     # Check 1: Database files exist
     dbs = [OUTCOME_DB, STRATEGY_DB, ANALYTICS_DB]
     for db in dbs:
-        if db.exists():
+        if db_pool.exists(db):
             results['checks'].append({'name': f'{db.name} exists', 'status': 'ok'})
         else:
             results['checks'].append({'name': f'{db.name} exists', 'status': 'missing'})
@@ -473,7 +474,8 @@ def run_self_diagnostics() -> Dict:
 def detect_breakthroughs() -> List[Dict]:
     """Detect components performing significantly above baseline."""
     init_analytics_db()
-    conn = sqlite3.connect(ANALYTICS_DB)
+    write_behind.flush(ANALYTICS_DB)
+    conn = db_pool.connect(ANALYTICS_DB)
     c = conn.cursor()
 
     breakthroughs = []
@@ -22,6 +22,8 @@ from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field, asdict
 
+import db_pool
+
 # Import cognitive modules
 try:
     from decisions import DecisionEngine, DecisionCriteria, DecisionOption
@@ -93,7 +95,7 @@ class StrategyAssessment:
 
 def init_db():
     """Initialize trading database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -232,7 +234,7 @@ class FreqtradeBridge:
 
     def _store_signal(self, signal: TradeSignal):
         """Store signal in database."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO trade_signals
@@ -248,7 +250,7 @@ class FreqtradeBridge:
 
     def record_outcome(self, outcome: TradeOutcome):
         """Record trade outcome for learning."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO trade_outcomes
@@ -283,7 +285,7 @@ class FreqtradeBridge:
 
     def analyze_strategy(self, strategy: str) -> StrategyAssessment:
         """Analyze strategy performance and generate recommendations."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
@@ -352,7 +354,7 @@ class FreqtradeBridge:
         """Get strategy optimization suggestions based on learning."""
         suggestions = []
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
 
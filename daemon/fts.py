@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+FTS - Free text to SQLite FTS5 queries, shared by memory and kg_store.
+
+User text is reduced to quoted terms OR-ed together, so FTS syntax in it
+("c++ -x", unbalanced quotes) can't fail a MATCH. Stop words are dropped,
+and only words of MIN_PREFIX_CHARS or more are prefix-expanded: a bare
+"c"* would match every token starting with c and turn short queries into
+matches on almost anything.
+
+Usage:
+    from fts import fts_query, query_terms
+
+    match = fts_query("connection pool")  # '"connection"* OR "pool"*'
+    conn.execute("SELECT ... WHERE t_fts MATCH ?", (match,))
+"""
+
+import re
+from typing import List, Optional
+
+MIN_PREFIX_CHARS = 3
+
+STOP_WORDS = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
+              'to', 'of', 'and', 'or', 'in', 'on', 'at', 'for', 'with',
+              'it', 'this', 'that', 'by', 'as', 'from', 'how', 'what', 'do'}
+
+
+def query_terms(text: str) -> List[str]:
+    """Lowercased word tokens, stop words dropped."""
+    return [w for w in re.findall(r"\w+", text.lower()) if w not in STOP_WORDS]
+
+
+def fts_query(text: str) -> Optional[str]:
+    """Free text -> FTS5 query: each term quoted, prefix-expanded if long enough, OR-ed."""
+    terms = list(dict.fromkeys(query_terms(text)))
+    if not terms:
+        return None
+    return " OR ".join(f'"{t}"*' if len(t) >= MIN_PREFIX_CHARS else f'"{t}"' for t in terms)
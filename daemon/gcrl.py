@@ -28,6 +28,8 @@ from pathlib import Path
 from datetime import datetime
 from collections import defaultdict
 
+import db_pool
+
 # ============================================================================
 # Configuration
 # ============================================================================
@@ -102,7 +104,7 @@ class CausalFactor:
 
 def init_db():
     """Initialize GCRL database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -172,7 +174,7 @@ class GoalConditionedLearner:
 
     def _load_policies(self):
         """Load policies from database."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM policies")
@@ -191,7 +193,7 @@ class GoalConditionedLearner:
 
     def store_goal(self, goal: Goal):
         """Store goal in database."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO goals
@@ -210,7 +212,7 @@ class GoalConditionedLearner:
 
     def store_trajectory(self, trajectory: Trajectory):
         """Store trajectory for learning."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO trajectories
@@ -278,7 +280,7 @@ class GoalConditionedLearner:
                              actions: List[str]) -> Optional[str]:
         """Infer what goal was achieved based on final state."""
         # Load all goals and check which ones match final state
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.row_factory = sqlite3.Row
         cursor = conn.cursor()
         cursor.execute("SELECT * FROM goals")
@@ -411,7 +413,7 @@ class GoalConditionedLearner:
             self.policies[goal_pattern] = policy
 
         # Save to database
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
         cursor.execute("""
             INSERT OR REPLACE INTO policies
@@ -523,7 +525,7 @@ class GoalConditionedLearner:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get GCRL learning statistics."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.cursor()
 
         cursor.execute("SELECT COUNT(*) FROM goals")
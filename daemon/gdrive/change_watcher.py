@@ -11,13 +11,17 @@ Usage:
     python change_watcher.py reset       # Reset change token
 """
 
+import sys
 import time
-import sqlite3
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Callable
 from dataclasses import dataclass
 
+# db_pool lives in daemon/ (also run from inside daemon/gdrive)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import db_pool
+
 try:
     from .client import GDriveClient, FileMetadata
     from .pack_sync import PackSync
@@ -67,7 +71,7 @@ class ChangeWatcher:
 
     def _init_db(self):
         """Initialize change tracking database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.executescript("""
             CREATE TABLE IF NOT EXISTS change_tokens (
                 id INTEGER PRIMARY KEY,
@@ -105,7 +109,7 @@ class ChangeWatcher:
 
     def get_stored_token(self) -> Optional[str]:
         """Get stored change token from database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         row = conn.execute(
             "SELECT token FROM change_tokens ORDER BY id DESC LIMIT 1"
         ).fetchone()
@@ -114,7 +118,7 @@ class ChangeWatcher:
 
     def store_token(self, token: str):
         """Store change token in database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute(
             "INSERT INTO change_tokens (token, last_used) VALUES (?, ?)",
             (token, datetime.now().isoformat())
@@ -133,7 +137,7 @@ class ChangeWatcher:
 
     def reset_token(self):
         """Reset change token (start fresh)."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("DELETE FROM change_tokens")
         conn.commit()
         conn.close()
@@ -205,7 +209,7 @@ class ChangeWatcher:
 
     def _log_change(self, event: ChangeEvent):
         """Log change to database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT INTO change_log (file_id, file_name, change_type,
                                     parent_folder, is_manifest)
@@ -318,7 +322,7 @@ class ChangeWatcher:
 
     def get_stats(self) -> Dict:
         """Get change watcher statistics."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
 
         # Total changes
         total = conn.execute("SELECT COUNT(*) FROM change_log").fetchone()[0]
@@ -24,11 +24,15 @@ Local cache:
 
 import json
 import hashlib
+import sys
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, field, asdict
-import sqlite3
+
+# db_pool lives in daemon/ (also run as: cd daemon/gdrive && python pack_sync.py)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import db_pool
 
 # Paths
 LOCAL_PACK_CACHE = Path.home() / ".atlas" / "packs"
@@ -99,7 +103,7 @@ class ManifestManager:
 
     def _init_db(self):
         """Initialize manifest tracking database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.executescript("""
             CREATE TABLE IF NOT EXISTS manifests (
                 pack_id TEXT PRIMARY KEY,
@@ -157,7 +161,7 @@ class ManifestManager:
         local_path = self.local_cache / manifest.pack_id
         local_path.mkdir(parents=True, exist_ok=True)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT OR REPLACE INTO manifests
             (pack_id, name, version, checksum, drive_folder_id, local_path,
@@ -194,7 +198,7 @@ class ManifestManager:
 
     def get_manifest(self, pack_id: str) -> Optional[PackManifest]:
         """Get a manifest by pack ID."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         row = conn.execute(
             "SELECT manifest_json FROM manifests WHERE pack_id = ?",
             (pack_id,)
@@ -207,7 +211,7 @@ class ManifestManager:
 
     def list_manifests(self) -> List[Dict]:
         """List all known manifests."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         cursor = conn.execute("""
             SELECT pack_id, name, version, checksum, last_synced
             FROM manifests ORDER BY name
@@ -227,7 +231,7 @@ class ManifestManager:
 
     def delete_manifest(self, pack_id: str):
         """Delete a manifest."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("DELETE FROM pack_files WHERE pack_id = ?", (pack_id,))
         conn.execute("DELETE FROM manifests WHERE pack_id = ?", (pack_id,))
         conn.commit()
@@ -239,7 +243,7 @@ class ManifestManager:
 
     def get_sync_status(self, pack_id: str) -> Dict:
         """Get sync status for a pack."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
 
         # Get manifest info
         row = conn.execute("""
@@ -280,7 +284,7 @@ class ManifestManager:
     def log_sync(self, pack_id: str, action: str, files_synced: int,
                  bytes_transferred: int, duration_ms: int):
         """Log a sync operation."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT INTO sync_log (pack_id, action, files_synced, bytes_transferred, duration_ms)
             VALUES (?, ?, ?, ?, ?)
@@ -298,7 +302,7 @@ class ManifestManager:
 
     def mark_file_synced(self, pack_id: str, file_name: str, local_path: str):
         """Mark a file as synced locally."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             UPDATE pack_files SET synced = 1, local_path = ?
             WHERE pack_id = ? AND file_name = ?
@@ -308,7 +312,7 @@ class ManifestManager:
 
     def get_unsynced_files(self, pack_id: str) -> List[Dict]:
         """Get list of files that haven't been synced."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         cursor = conn.execute("""
             SELECT file_name, drive_id, md5, size
             FROM pack_files
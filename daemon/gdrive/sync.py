@@ -10,12 +10,16 @@ Syncs:
 """
 
 import json
-import sqlite3
+import sys
 from pathlib import Path
 from datetime import datetime
 from typing import List, Dict, Optional
 from dataclasses import dataclass
 
+# db_pool lives in daemon/ (also run from inside daemon/gdrive)
+sys.path.insert(0, str(Path(__file__).parent.parent))
+import db_pool
+
 try:
     from .client import GDriveClient, FileMetadata
 except ImportError:
@@ -120,10 +124,10 @@ class DriveSync:
     def _get_processed_hashes(self) -> set:
         """Get MD5 hashes of already processed files."""
         db_path = Path(__file__).parent.parent / 'ingest.db'
-        if not db_path.exists():
+        if not db_pool.exists(db_path):
             return set()
 
-        conn = sqlite3.connect(db_path)
+        conn = db_pool.connect(db_path)
         try:
             cursor = conn.execute("SELECT file_hash FROM processed_files WHERE status='completed'")
             return {row[0] for row in cursor.fetchall()}
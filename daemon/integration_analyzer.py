@@ -21,6 +21,8 @@ from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Set, Optional, Any
 
+import db_pool
+
 PROJECT_ROOT = Path(__file__).parent.parent
 CLAUDE_DIR = PROJECT_ROOT / ".claude"
 DAEMON_DIR = PROJECT_ROOT / "daemon"
@@ -38,7 +40,7 @@ CAPABILITY_DIRS = {
 
 def init_db():
     """Initialize tracking database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS capability_snapshots (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -7,10 +7,11 @@ Tests all major system integrations and data flows.
 import sys
 import os
 import json
-import sqlite3
 from pathlib import Path
 from datetime import datetime, timedelta
 
+import db_pool
+
 DAEMON_DIR = Path(__file__).parent
 sys.path.insert(0, str(DAEMON_DIR))
 
@@ -61,9 +62,9 @@ def main():
 
     for db_name, expected_tables in databases.items():
         db_path = DAEMON_DIR / db_name
-        if db_path.exists():
+        if db_pool.exists(db_path):
             try:
-                conn = sqlite3.connect(db_path)
+                conn = db_pool.connect(db_path)
                 c = conn.cursor()
                 c.execute("SELECT name FROM sqlite_master WHERE type='table'")
                 tables = [r[0] for r in c.fetchall()]
@@ -161,7 +162,7 @@ def main():
 
     # Test: Emergent -> Task Generator
     try:
-        conn = sqlite3.connect(DAEMON_DIR / 'generated_tasks.db')
+        conn = db_pool.connect(DAEMON_DIR / 'generated_tasks.db')
         c = conn.cursor()
         c.execute("SELECT COUNT(*) FROM generated_tasks WHERE source = ?", ('emergent',))
         emergent_count = c.fetchone()[0]
@@ -216,7 +217,7 @@ def main():
         cr = ContextRouter()
         test('memory', 'ContextRouter init', True)
 
-        conn = sqlite3.connect(DAEMON_DIR / 'context_router.db')
+        conn = db_pool.connect(DAEMON_DIR / 'context_router.db')
         c = conn.cursor()
         c.execute('SELECT COUNT(*) FROM context_scores')  # Fixed table name
         tracked = c.fetchone()[0]
@@ -226,7 +227,7 @@ def main():
         test('memory', 'ContextRouter', False, str(e)[:40])
 
     try:
-        conn = sqlite3.connect(DAEMON_DIR / 'cross_session_memory.db')
+        conn = db_pool.connect(DAEMON_DIR / 'cross_session_memory.db')
         c = conn.cursor()
         # Check what tables exist
         c.execute("SELECT name FROM sqlite_master WHERE type='table'")
@@ -253,7 +254,7 @@ def main():
     print('-' * 70)
 
     try:
-        conn = sqlite3.connect(DAEMON_DIR / 'utf_knowledge.db')
+        conn = db_pool.connect(DAEMON_DIR / 'utf_knowledge.db')
         c = conn.cursor()
 
         c.execute('SELECT COUNT(*) FROM claims')
@@ -278,7 +279,7 @@ def main():
         test('utf', 'UTF Knowledge DB', False, str(e)[:40])
 
     try:
-        conn = sqlite3.connect(DAEMON_DIR / 'utf_embeddings.db')
+        conn = db_pool.connect(DAEMON_DIR / 'utf_embeddings.db')
         c = conn.cursor()
         c.execute('SELECT COUNT(*) FROM claim_embeddings')
         embeddings = c.fetchone()[0]
@@ -344,7 +345,7 @@ def main():
         active = [s for s in strategies if s.status == 'active']
         test('strategy', 'Active strategies', len(active) >= 0, f'{len(active)} active')
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         c = conn.cursor()
         c.execute('SELECT COUNT(*) FROM performance')
         perf_count = c.fetchone()[0]
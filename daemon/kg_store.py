@@ -0,0 +1,470 @@
+#!/usr/bin/env python3
+"""
+KG Store - Indexed storage for the knowledge graph.
+
+~/.claude/memory/knowledge-graph.jsonl is the append-only log shared with
+the knowledge-graph MCP server. Every reader used to re-read and json.loads
+the whole file per query. This module keeps an SQLite index of it
+(knowledge_graph.db):
+
+- entities / observations / relations tables, observations deduplicated
+  per entity, so repeated appends for the same name merge like the MCP
+  server merges them
+- FTS5 over entity names and observations (search())
+- updated_at index: "entries since N hours" is a range scan (recent())
+- Tailing importer: sync() imports only the bytes appended since the last
+  import. If the file was rewritten (the MCP server saves the whole graph)
+  the index is rebuilt from scratch.
+
+The JSONL stays the export/compat log: writers append to it through
+add_entity()/add_relation(), which then sync. Readers call sync() first, so
+entries written by the MCP server are picked up too.
+
+Usage:
+    import kg_store
+
+    kg_store.add_entity("file:foo.py", "file_cache", ["SUMMARY:...", "PATH:..."])
+    hits = kg_store.search("dependency injection", limit=10)
+    recent = kg_store.recent(since_hours=24)
+
+    python kg_store.py stats | sync | rebuild | search <query> | recent [hours]
+"""
+
+import json
+import logging
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+import db_pool
+from config import cfg
+from fts import fts_query
+
+KG_PATH = Path.home() / ".claude" / "memory" / "knowledge-graph.jsonl"
+KG_DB = cfg.DAEMON_DIR / cfg.DB_KG
+
+# Bytes before the import offset remembered to detect a rewritten file
+FINGERPRINT_BYTES = 256
+
+logger = logging.getLogger(__name__)
+
+# Observations like "INGESTED:2025-01-01T..." carry the entry's own timestamp
+TIMESTAMP_PREFIXES = ("TIMESTAMP:", "INGESTED:", "CACHED:")
+
+_schema_ready = False
+
+
+def _connect():
+    global _schema_ready
+    conn = db_pool.connect(KG_DB)
+    if not _schema_ready:
+        conn.executescript("""
+            CREATE TABLE IF NOT EXISTS entities (
+                id INTEGER PRIMARY KEY,
+                name TEXT UNIQUE NOT NULL,
+                entity_type TEXT,
+                created_at TEXT NOT NULL,
+                updated_at TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_entities_updated ON entities(updated_at);
+            CREATE INDEX IF NOT EXISTS idx_entities_type ON entities(entity_type);
+
+            CREATE TABLE IF NOT EXISTS observations (
+                id INTEGER PRIMARY KEY,
+                entity_id INTEGER NOT NULL REFERENCES entities(id),
+                content TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                UNIQUE (entity_id, content)
+            );
+
+            CREATE TABLE IF NOT EXISTS relations (
+                id INTEGER PRIMARY KEY,
+                from_name TEXT NOT NULL,
+                to_name TEXT NOT NULL,
+                relation_type TEXT NOT NULL,
+                created_at TEXT NOT NULL,
+                UNIQUE (from_name, to_name, relation_type)
+            );
+            CREATE INDEX IF NOT EXISTS idx_relations_to ON relations(to_name);
+
+            -- rowid = entities.id; observations joined by newlines
+            CREATE VIRTUAL TABLE IF NOT EXISTS entity_fts USING fts5(
+                name, observations, tokenize = 'unicode61'
+            );
+
+            CREATE TABLE IF NOT EXISTS import_state (
+                path TEXT PRIMARY KEY,
+                offset INTEGER NOT NULL,
+                fingerprint BLOB,
+                imported_at TEXT
+            );
+        """)
+        conn.commit()
+        _schema_ready = True
+    return conn
+
+
+# =============================================================================
+# Import
+# =============================================================================
+
+def _normalize(entry: Dict) -> Optional[Dict]:
+    """
+    One JSONL line -> {"kind", ...}. Accepts the MCP server's flat format,
+    lines without "type" (older ingest writers) and the {"type", "data"}
+    wrapper memory_router used to write.
+    """
+    data = entry.get("data") if isinstance(entry.get("data"), dict) else entry
+    kind = entry.get("type") or ("relation" if "relationType" in data else "entity")
+    timestamp = entry.get("timestamp") or data.get("timestamp")
+
+    if kind == "relation":
+        if not (data.get("from") and data.get("to")):
+            return None
+        return {"kind": "relation", "from": data["from"], "to": data["to"],
+                "relationType": data.get("relationType", ""), "timestamp": timestamp}
+
+    name = data.get("name")
+    if not name:
+        return None
+    observations = [str(o) for o in data.get("observations") or []]
+    if not timestamp:
+        for obs in observations:
+            if obs.startswith(TIMESTAMP_PREFIXES):
+                timestamp = obs.split(":", 1)[1].strip()
+                break
+    return {"kind": "entity", "name": name, "entityType": data.get("entityType"),
+            "observations": observations, "timestamp": timestamp}
+
+
+def _timestamp(value: Any, default: str) -> str:
+    """ISO timestamp from an entry (ISO string or epoch seconds), or default
+    if missing/unparseable."""
+    if value:
+        try:
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                return datetime.fromtimestamp(value).isoformat()
+            return datetime.fromisoformat(value).isoformat()
+        except (TypeError, ValueError, OverflowError, OSError):
+            pass
+    return default
+
+
+def _apply(conn, item: Dict, now: str):
+    ts = _timestamp(item.get("timestamp"), now)
+    if item["kind"] == "relation":
+        conn.execute("""
+            INSERT OR IGNORE INTO relations (from_name, to_name, relation_type, created_at)
+            VALUES (?, ?, ?, ?)
+        """, (item["from"], item["to"], item["relationType"], ts))
+        return
+
+    entity_id = conn.execute("""
+        INSERT INTO entities (name, entity_type, created_at, updated_at)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(name) DO UPDATE SET
+            entity_type = COALESCE(excluded.entity_type, entity_type),
+            updated_at = MAX(updated_at, excluded.updated_at)
+        RETURNING id
+    """, (item["name"], item["entityType"], ts, ts)).fetchone()[0]
+    conn.executemany(
+        "INSERT OR IGNORE INTO observations (entity_id, content, created_at) VALUES (?, ?, ?)",
+        [(entity_id, obs, ts) for obs in item["observations"]]
+    )
+    _index(conn, entity_id, item["name"])
+
+
+def _index(conn, entity_id: int, name: str):
+    """Rewrite the FTS row of one entity."""
+    observations = "\n".join(row[0] for row in conn.execute(
+        "SELECT content FROM observations WHERE entity_id = ? ORDER BY id", (entity_id,)
+    ))
+    conn.execute("DELETE FROM entity_fts WHERE rowid = ?", (entity_id,))
+    conn.execute("INSERT INTO entity_fts (rowid, name, observations) VALUES (?, ?, ?)",
+                 (entity_id, name, observations))
+
+
+def _clear(conn):
+    for table in ("entity_fts", "observations", "relations", "entities", "import_state"):
+        conn.execute(f"DELETE FROM {table}")
+
+
+def _tail(path: Path, offset: int) -> bytes:
+    """The FINGERPRINT_BYTES before offset."""
+    start = max(0, offset - FINGERPRINT_BYTES)
+    with open(path, "rb") as f:
+        f.seek(start)
+        return f.read(offset - start)
+
+
+def sync(path: Path = KG_PATH) -> int:
+    """Import lines appended to the JSONL since the last sync. Returns lines imported."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return 0
+
+    conn = _connect()
+    try:
+        row = conn.execute("SELECT offset, fingerprint FROM import_state WHERE path = ?",
+                           (str(path),)).fetchone()
+        if row and row[0] == size and _tail(path, size) == row[1]:
+            return 0  # Nothing appended (the common case)
+
+        conn.execute("BEGIN IMMEDIATE")
+        # Re-read under the write lock; another process may have just imported
+        row = conn.execute("SELECT offset, fingerprint FROM import_state WHERE path = ?",
+                           (str(path),)).fetchone()
+        offset, fingerprint = row if row else (0, None)
+
+        with open(path, "rb") as f:
+            if offset and (offset > size or _tail(path, offset) != fingerprint):
+                # Truncated or rewritten in place: rebuild
+                _clear(conn)
+                offset, fingerprint = 0, b""
+            f.seek(offset)
+            chunk = f.read(size - offset)
+
+        end = chunk.rfind(b"\n") + 1  # A writer may be mid-line; leave it for next time
+        now = datetime.now().isoformat()
+        imported = skipped = 0
+        for line in chunk[:end].splitlines():
+            try:
+                item = _normalize(json.loads(line))
+            except (ValueError, AttributeError):
+                continue
+            if not item:
+                continue
+            # A line that can't be imported is skipped, not retried forever:
+            # the offset still moves past it
+            conn.execute("SAVEPOINT kg_line")
+            try:
+                _apply(conn, item, now)
+                conn.execute("RELEASE kg_line")
+                imported += 1
+            except Exception as e:
+                conn.execute("ROLLBACK TO kg_line")
+                conn.execute("RELEASE kg_line")
+                skipped += 1
+                logger.debug(f"kg_store: skipped {str(item.get('name') or item.get('from'))[:80]!r}: {e}")
+
+        offset += end
+        fingerprint = ((fingerprint or b"") + chunk[:end])[-FINGERPRINT_BYTES:]
+        conn.execute("""
+            INSERT OR REPLACE INTO import_state (path, offset, fingerprint, imported_at)
+            VALUES (?, ?, ?, ?)
+        """, (str(path), offset, fingerprint, now))
+        conn.commit()
+        if skipped:
+            logger.warning(f"kg_store: skipped {skipped} unimportable lines in {path.name}")
+        return imported
+    finally:
+        conn.close()
+
+
+def rebuild(path: Path = KG_PATH) -> int:
+    """Drop the index and re-import the whole JSONL."""
+    conn = _connect()
+    _clear(conn)
+    conn.commit()
+    conn.close()
+    return sync(path)
+
+
+# =============================================================================
+# Write API (appends to the JSONL, then indexes)
+# =============================================================================
+
+def _append(entries: List[Dict], path: Path = KG_PATH):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(json.dumps(e) + "\n" for e in entries))
+
+
+def add_entities(entities: List[Dict]) -> List[str]:
+    """
+    Append entities ({"name", "entityType", "observations"}) in one write
+    and index them. Returns their names.
+    """
+    now = datetime.now().isoformat()
+    lines = [{
+        "type": "entity",
+        "name": e["name"],
+        "entityType": e.get("entityType", "unknown"),
+        "observations": list(e.get("observations", [])),
+        "timestamp": e.get("timestamp") or now,
+    } for e in entities]
+    if lines:
+        _append(lines)
+        sync()
+    return [line["name"] for line in lines]
+
+
+def add_entity(name: str, entity_type: str, observations: List[str]) -> str:
+    """Append one entity (or new observations for an existing one)."""
+    return add_entities([{"name": name, "entityType": entity_type,
+                          "observations": observations}])[0]
+
+
+def add_relation(from_entity: str, to_entity: str, relation_type: str):
+    """Append one relation."""
+    _append([{"type": "relation", "from": from_entity, "to": to_entity,
+              "relationType": relation_type, "timestamp": datetime.now().isoformat()}])
+    sync()
+
+
+# =============================================================================
+# Read API (entities come back in the MCP shape, plus timestamps)
+# =============================================================================
+
+def _entities(conn, rows) -> List[Dict]:
+    """Entity dicts for (id, name, entity_type, created_at, updated_at) rows."""
+    rows = list(rows)
+    if not rows:
+        return []
+    ids = [r[0] for r in rows]
+    observations: Dict[int, List[str]] = {i: [] for i in ids}
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        for entity_id, content in conn.execute(
+            f"SELECT entity_id, content FROM observations WHERE entity_id IN "
+            f"({','.join('?' * len(chunk))}) ORDER BY id", chunk
+        ):
+            observations[entity_id].append(content)
+    return [{
+        "type": "entity", "name": name, "entityType": entity_type,
+        "observations": observations[entity_id],
+        "created_at": created_at, "timestamp": updated_at,
+    } for entity_id, name, entity_type, created_at, updated_at in rows]
+
+
+def get_entity(name: str) -> Optional[Dict]:
+    sync()
+    conn = _connect()
+    try:
+        found = _entities(conn, conn.execute(
+            "SELECT id, name, entity_type, created_at, updated_at FROM entities WHERE name = ?",
+            (name,)
+        ))
+        return found[0] if found else None
+    finally:
+        conn.close()
+
+
+def search(query: str, limit: int = 10) -> List[Dict]:
+    """Entities matching query, best first (bm25, names weighted 3x)."""
+    match = fts_query(query)
+    if not match:
+        return []
+    sync()
+    conn = _connect()
+    try:
+        rows = conn.execute("""
+            SELECT e.id, e.name, e.entity_type, e.created_at, e.updated_at,
+                   bm25(entity_fts, 3.0, 1.0) AS rank
+            FROM entity_fts JOIN entities e ON e.id = entity_fts.rowid
+            WHERE entity_fts MATCH ?
+            ORDER BY rank LIMIT ?
+        """, (match, limit)).fetchall()
+        found = _entities(conn, [r[:5] for r in rows])
+        for entity, row in zip(found, rows):
+            entity["rank"] = row[5]
+        return found
+    finally:
+        conn.close()
+
+
+def recent(since_hours: float = 24, limit: Optional[int] = None) -> List[Dict]:
+    """Entities added or updated in the last since_hours, newest first."""
+    sync()
+    cutoff = (datetime.now() - timedelta(hours=since_hours)).isoformat()
+    conn = _connect()
+    try:
+        return _entities(conn, conn.execute("""
+            SELECT id, name, entity_type, created_at, updated_at FROM entities
+            WHERE updated_at > ? ORDER BY updated_at DESC LIMIT ?
+        """, (cutoff, -1 if limit is None else limit)))
+    finally:
+        conn.close()
+
+
+def iter_entities(entity_type: Optional[str] = None, batch: int = 500) -> Iterator[Dict]:
+    """All entities (optionally of one type), in insertion order."""
+    sync()
+    last = 0
+    while True:
+        conn = _connect()
+        try:
+            rows = conn.execute(f"""
+                SELECT id, name, entity_type, created_at, updated_at FROM entities
+                WHERE id > ? {"AND entity_type = ?" if entity_type else ""}
+                ORDER BY id LIMIT ?
+            """, (last, *([entity_type] if entity_type else []), batch)).fetchall()
+            found = _entities(conn, rows)
+        finally:
+            conn.close()
+        yield from found
+        if len(rows) < batch:
+            return
+        last = rows[-1][0]
+
+
+def relations(entity: str) -> List[Dict]:
+    """Relations from or to an entity."""
+    sync()
+    conn = _connect()
+    try:
+        return [{"type": "relation", "from": r[0], "to": r[1], "relationType": r[2],
+                 "timestamp": r[3]}
+                for r in conn.execute("""
+                    SELECT from_name, to_name, relation_type, created_at FROM relations
+                    WHERE from_name = ? UNION
+                    SELECT from_name, to_name, relation_type, created_at FROM relations
+                    WHERE to_name = ?
+                """, (entity, entity))]
+    finally:
+        conn.close()
+
+
+def stats() -> Dict[str, Any]:
+    sync()
+    conn = _connect()
+    try:
+        counts = {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                  for table in ("entities", "observations", "relations")}
+        by_type = dict(conn.execute("""
+            SELECT COALESCE(entity_type, 'unknown'), COUNT(*) FROM entities
+            GROUP BY 1 ORDER BY 2 DESC
+        """).fetchall())
+        row = conn.execute("SELECT offset, imported_at FROM import_state WHERE path = ?",
+                           (str(KG_PATH),)).fetchone()
+    finally:
+        conn.close()
+    return {
+        **counts,
+        "by_type": by_type,
+        "jsonl": str(KG_PATH),
+        "jsonl_bytes": KG_PATH.stat().st_size if KG_PATH.exists() else 0,
+        "imported_bytes": row[0] if row else 0,
+        "last_import": row[1] if row else None,
+    }
+
+
+if __name__ == "__main__":
+    import sys
+
+    cmd = sys.argv[1] if len(sys.argv) > 1 else "stats"
+    if cmd == "sync":
+        print(f"Imported {sync()} lines")
+    elif cmd == "rebuild":
+        print(f"Imported {rebuild()} lines")
+    elif cmd == "search" and len(sys.argv) > 2:
+        for e in search(" ".join(sys.argv[2:])):
+            print(f"{e['rank']:.2f}  [{e['entityType']}] {e['name']}")
+    elif cmd == "recent":
+        hours = float(sys.argv[2]) if len(sys.argv) > 2 else 24
+        for e in recent(hours):
+            print(f"{e['timestamp']}  [{e['entityType']}] {e['name']}")
+    else:
+        print(json.dumps(stats(), indent=2))
@@ -19,20 +19,15 @@ Usage:
 Part of token efficiency architecture (Phase 11).
 """
 
-import json
-import time
 import argparse
-from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, Any
 
 # Local imports
-from task_queue import TaskQueue, TaskStatus
+import kg_store
+from task_queue import TaskQueue, TaskStatus, default_worker_id
 from model_router import ModelRouter, TaskType
 
-# Knowledge Graph storage
-KG_PATH = Path.home() / '.claude' / 'memory' / 'knowledge-graph.jsonl'
-
 # Summarization prompt (following claude-context-extender pattern)
 SUMMARIZATION_PROMPT = """Analyze this code/document and provide:
 1. SUMMARY: A concise 2-3 sentence summary of what this file does
@@ -75,9 +70,7 @@ def parse_llm_response(response: str) -> Dict[str, str]:
 
 def store_to_kg(file_name: str, file_path: str, summary: str,
                keywords: str, purpose: str):
-    """Store LLM-generated summary to Knowledge Graph JSONL."""
-    KG_PATH.parent.mkdir(parents=True, exist_ok=True)
-
+    """Store LLM-generated summary to the Knowledge Graph (JSONL + kg_store index)."""
     timestamp = datetime.now().isoformat()
     entity_name = f"file:{file_name}"
 
@@ -96,9 +89,7 @@ def store_to_kg(file_name: str, file_path: str, summary: str,
         ]
     }
 
-    # Append to JSONL
-    with open(KG_PATH, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(entity) + '\n')
+    kg_store.add_entities([entity])
 
     return entity_name
 
@@ -165,6 +156,7 @@ def run_worker(watch: bool = False, interval: int = 30):
     print("=" * 40)
 
     queue = TaskQueue()
+    worker_id = default_worker_id("kg-summary")
     router = ModelRouter()
 
     # Check LocalAI availability
@@ -174,36 +166,34 @@ def run_worker(watch: bool = False, interval: int = 30):
         print("[WARN] LocalAI unavailable (summaries will be skipped)")
 
     while True:
-        # Get pending summarization tasks
-        pending = queue.get_pending_tasks(limit=50)
-        summarization_tasks = [
-            t for t in pending
-            if t.prompt == "SUMMARIZE_FILE"
-        ]
-
-        if summarization_tasks:
-            print(f"\nProcessing {len(summarization_tasks)} tasks...")
-
-            for task in summarization_tasks:
-                # Mark in progress
-                queue.mark_in_progress(task.id)
-
-                try:
+        # Claim one task at a time: only the task being worked on holds a
+        # lease, so queued work isn't stranded behind a slow summary
+        processed = 0
+        while True:
+            task = queue.claim_next(worker_id, prompt="SUMMARIZE_FILE")
+            if task is None:
+                break
+            processed += 1
+            try:
+                with queue.keep_alive(task.id, worker_id):
                     success = process_summarization_task(task, router)
 
-                    if success:
-                        queue.mark_completed(task.id, "Summary stored to KG")
-                    else:
-                        queue.mark_failed(task.id, "Could not generate summary")
-                except Exception as e:
-                    queue.mark_failed(task.id, str(e))
+                if success:
+                    queue.mark_completed(task.id, "Summary stored to KG", worker_id=worker_id)
+                else:
+                    queue.mark_failed(task.id, "Could not generate summary", worker_id=worker_id)
+            except Exception as e:
+                queue.mark_failed(task.id, str(e), worker_id=worker_id)
+
+        if processed:
+            print(f"\nProcessed {processed} tasks")
 
         if not watch:
             print("\nDone. Run with --watch for continuous mode.")
             break
 
-        print(f"\nWaiting {interval}s for new tasks...")
-        time.sleep(interval)
+        print(f"\nWaiting up to {interval}s for new tasks...")
+        queue.wait_for_task(interval)
 
 
 def main():
@@ -17,13 +17,14 @@ Usage:
 
 import math
 import hashlib
-import sqlite3
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 from datetime import datetime
 import json
 
+import db_pool
+
 DB_PATH = Path(__file__).parent / "lazy_rag.db"
 
 
@@ -83,7 +84,7 @@ class LazyRAG:
 
     def _init_db(self):
         """Initialize tracking database."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.executescript("""
             CREATE TABLE IF NOT EXISTS retrieval_decisions (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -283,7 +284,7 @@ class LazyRAG:
         """Log retrieval decision for learning."""
         query_hash = hashlib.md5(query.encode()).hexdigest()[:16]
 
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT INTO retrieval_decisions
             (query_hash, query_type, entropy_score, complexity_score,
@@ -310,7 +311,7 @@ class LazyRAG:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get retrieval decision statistics."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
 
         # Overall stats
         cursor = conn.execute("""
@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+LLM Cache - One response cache for every LLM call site.
+
+The executors, ingest, UTF extraction, extractor_v2 and the model router
+each had their own cache (Dragonfly round trip + SQLite read, and an
+UPDATE of hit_count on every hit). They now share LLMCache:
+
+- L1: in-process LRU, bounded by entry count and total bytes
+  (LLM_CACHE_L1_ENTRIES / LLM_CACHE_L1_BYTES), shared by all namespaces.
+- L2: LLMCacheL2 (llm_cache_l2.db), persistent and shared by every daemon
+  process. L2 hits are promoted into L1.
+- Single-flight: get_or_compute() runs one compute() per key in this
+  process; concurrent callers with the same key wait for its result.
+- Hit counts (L1 and L2) go through write_behind, so a hit costs no write.
+
+Keys are namespaced ("ingest:<hash>") so call sites never collide and
+LLMCacheL2.stats() reports per namespace (template_id).
+
+Usage:
+    from llm_cache import LLMCache
+
+    cache = LLMCache("ingest", ttl=86400)
+    key = cache.key(prompt, model=LOCALAI_MODEL)
+    response, cached = cache.get_or_compute(key, lambda: call_localai(prompt))
+"""
+
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Callable, Dict, Optional, Tuple
+
+from config import cfg
+from llm_cache_l2 import LLMCacheL2
+
+
+class LRUCache:
+    """Thread-safe LRU bounded by entry count and total value size (bytes)."""
+
+    def __init__(self, max_entries: int, max_bytes: int):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Tuple[str, float, int]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at, size = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._bytes -= size
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: str, expires_at: float):
+        size = len(value.encode("utf-8", "replace"))
+        if size > self.max_bytes:
+            return  # Would evict everything else; leave it to L2
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while self._entries and (len(self._entries) > self.max_entries
+                                     or self._bytes > self.max_bytes):
+                _, (_, _, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def pop(self, key: str):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes,
+                    "max_entries": self.max_entries, "max_bytes": self.max_bytes,
+                    "evictions": self.evictions}
+
+
+class _Flight:
+    """One in-progress compute() that other callers can wait on."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Optional[str] = None
+        self.stored = False  # value is in the cache (falsy results aren't)
+        self.error: Optional[BaseException] = None
+
+
+_l1: Optional[LRUCache] = None
+_l2: Optional[LLMCacheL2] = None
+_flights: Dict[str, _Flight] = {}
+_state_lock = threading.Lock()
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _get_l1() -> LRUCache:
+    global _l1
+    if _l1 is None:
+        with _state_lock:
+            if _l1 is None:
+                _l1 = LRUCache(cfg.LLM_CACHE_L1_ENTRIES, cfg.LLM_CACHE_L1_BYTES)
+    return _l1
+
+
+def _get_l2() -> LLMCacheL2:
+    global _l2
+    if _l2 is None:
+        with _state_lock:
+            if _l2 is None:
+                _l2 = LLMCacheL2()
+    return _l2
+
+
+class LLMCache:
+    """Namespaced view of the shared L1/L2 response cache."""
+
+    def __init__(self, namespace: str, ttl: Optional[int] = None, l2: Optional[LLMCacheL2] = None):
+        self.namespace = namespace
+        self.ttl = ttl or cfg.LLM_CACHE_TTL
+        self._l2 = l2
+        with _state_lock:
+            self._stats = _stats.setdefault(namespace, {
+                "l1_hits": 0, "l2_hits": 0, "misses": 0, "writes": 0, "coalesced": 0,
+            })
+
+    @property
+    def l2(self) -> LLMCacheL2:
+        return self._l2 or _get_l2()
+
+    @staticmethod
+    def key(prompt: str, model: str = "") -> str:
+        """Stable key for a prompt (and the model that answers it)."""
+        return hashlib.sha256(f"{model}:{prompt}".encode()).hexdigest()[:32]
+
+    def _full(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    def _count(self, field: str):
+        with _state_lock:
+            self._stats[field] += 1
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached response for key, or None."""
+        full = self._full(key)
+        value = _get_l1().get(full)
+        if value is not None:
+            self._count("l1_hits")
+            try:
+                self.l2.record_hit(full)
+            except Exception:
+                pass
+            return value
+
+        try:
+            entry = self.l2.lookup(full)
+        except Exception:
+            entry = None
+        if entry is None:
+            self._count("misses")
+            return None
+
+        value, expires_at = entry
+        _get_l1().put(full, value, expires_at.timestamp())
+        self._count("l2_hits")
+        return value
+
+    def set(self, key: str, value: str, ttl: Optional[int] = None, metadata: Optional[dict] = None):
+        """Store a response in both tiers (empty responses are not cached)."""
+        if not value:
+            return
+        full = self._full(key)
+        ttl = ttl or self.ttl
+        _get_l1().put(full, value, time.time() + ttl)
+        metadata = dict(metadata or {})
+        metadata.setdefault("template_id", self.namespace)
+        try:
+            self.l2.set(full, value, metadata=metadata, ttl_seconds=ttl)
+        except Exception:
+            pass  # L1 still serves this process
+        self._count("writes")
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Optional[str]],
+        ttl: Optional[int] = None,
+        metadata: Optional[dict] = None
+    ) -> Tuple[Optional[str], bool]:
+        """
+        Return (response, cached). On a miss exactly one caller per key runs
+        compute(); concurrent callers wait and share its result (or its
+        exception). Falsy results are returned but not cached.
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, True
+
+        full = self._full(key)
+        with _state_lock:
+            flight = _flights.get(full)
+            leader = flight is None
+            if leader:
+                flight = _flights[full] = _Flight()
+
+        if not leader:
+            self._count("coalesced")
+            if not flight.done.wait(cfg.LLM_CACHE_WAIT_SECONDS):
+                return compute(), False  # Leader is stuck; don't wait forever
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, flight.stored
+
+        try:
+            value = _get_l1().get(full)  # A flight for this key may have just finished
+            if value is None:
+                value = compute()
+                self.set(key, value, ttl, metadata)
+                flight.value, flight.stored = value, bool(value)
+                return value, False
+            flight.value, flight.stored = value, True
+            return value, True
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with _state_lock:
+                _flights.pop(full, None)
+            flight.done.set()
+
+    def invalidate(self, key: str):
+        """Drop key from both tiers."""
+        full = self._full(key)
+        _get_l1().pop(full)
+        self.l2.delete(full)
+
+    def stats(self) -> Dict:
+        """Counters for this namespace in this process, plus the shared L1."""
+        with _state_lock:
+            counts = dict(self._stats)
+        lookups = counts["l1_hits"] + counts["l2_hits"] + counts["misses"]
+        hits = counts["l1_hits"] + counts["l2_hits"]
+        counts["hit_rate"] = f"{(hits / lookups * 100) if lookups else 0:.1f}%"
+        counts["l1"] = _get_l1().stats()
+        return counts
+
+
+def stats() -> Dict:
+    """Per-namespace counters for this process, the shared L1 and L2 totals."""
+    with _state_lock:
+        namespaces = {name: dict(counts) for name, counts in _stats.items()}
+    return {
+        "namespaces": namespaces,
+        "l1": _get_l1().stats(),
+        "l2": _get_l2().stats(),
+    }
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    from concurrent.futures import ThreadPoolExecutor
+
+    if len(sys.argv) > 1 and sys.argv[1] == "stats":
+        print(json.dumps(stats(), indent=2, default=str))
+    else:
+        # Demo: 8 concurrent identical prompts -> one compute
+        cache = LLMCache("selftest", ttl=60)
+        calls = []
+
+        def slow_llm():
+            calls.append(datetime.now())
+            time.sleep(0.5)
+            return "response"
+
+        key = cache.key(f"prompt {time.time()}")
+        with ThreadPoolExecutor(8) as pool:
+            results = list(pool.map(lambda _: cache.get_or_compute(key, slow_llm), range(8)))
+        print(f"computes: {len(calls)}, results: {results}")
+        print(json.dumps(cache.stats(), indent=2))
@@ -3,13 +3,22 @@ LLM Cache L2 - Persistent semantic compute artifacts.
 
 Codex recommendation: cache_key = (template_id + template_version + model_id + span_hashes)
 Expected: 80-95% hit rate vs 40-60% with prompt-hash only.
+
+Responses are stored compressed (cache_compactor) and the table is kept
+under LLM_CACHE_MAX_BYTES by compact(), which the cache_compactor thread of
+the daemon processes runs: expired rows first, then LLM_CACHE_EVICTION order (lru, lfu,
+or cost-aware using tokens_used), then incremental vacuum.
 """
 
-import sqlite3
 import json
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Optional
+from typing import Optional, Tuple
+
+import db_pool
+import write_behind
+import cache_compactor
+from config import cfg
 
 
 class LLMCacheL2:
@@ -22,10 +31,13 @@ class LLMCacheL2:
 
         self.db_path = db_path
         self._init_schema()
+        cache_compactor.register(f"llm_cache_l2:{Path(db_path).name}", db_path, self.compact)
 
     def _init_schema(self):
         """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
+        # Only takes effect on a new file; existing ones are switched by the compactor
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
         conn.execute("""
             CREATE TABLE IF NOT EXISTS llm_cache (
                 cache_key TEXT PRIMARY KEY,
@@ -44,86 +56,135 @@ class LLMCacheL2:
         conn.execute("CREATE INDEX IF NOT EXISTS idx_template ON llm_cache(template_id, template_version)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_expires ON llm_cache(expires_at)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_model ON llm_cache(model_id)")
+
+        cache_compactor.add_columns(conn, "llm_cache", {
+            "encoding": "TEXT DEFAULT ''",
+            "size_bytes": "INTEGER",
+            "last_hit": "TEXT",
+        })
+        conn.execute("UPDATE llm_cache SET size_bytes = length(CAST(response AS BLOB)) WHERE size_bytes IS NULL")
         conn.commit()
         conn.close()
 
-    def get(self, key: str) -> Optional[str]:
-        """Get cached response."""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
+    def lookup(self, key: str) -> Optional[Tuple[str, datetime]]:
+        """Get (response, expires_at) for an unexpired entry.
 
-        c.execute("""
-            SELECT response, expires_at FROM llm_cache
+        The hit is counted through write_behind rather than an UPDATE per read.
+        """
+        conn = db_pool.connect(self.db_path)
+        row = conn.execute("""
+            SELECT response, encoding, expires_at FROM llm_cache
             WHERE cache_key = ? AND expires_at > ?
-        """, (key, datetime.now().isoformat()))
-
-        row = c.fetchone()
-
-        if row:
-            # Increment hit count
-            c.execute("UPDATE llm_cache SET hit_count = hit_count + 1 WHERE cache_key = ?", (key,))
-            conn.commit()
-            conn.close()
-            return row[0]
-
+        """, (key, datetime.now().isoformat())).fetchone()
         conn.close()
-        return None
 
-    def set(self, key: str, value: str, ttl_days: int = 30, metadata: dict = None):
-        """Store response in cache."""
+        if row is None:
+            return None
+        self.record_hit(key)
+        return cache_compactor.decompress(row[0], row[1]), datetime.fromisoformat(row[2])
+
+    def get(self, key: str) -> Optional[str]:
+        """Get cached response."""
+        entry = self.lookup(key)
+        return entry[0] if entry else None
+
+    def record_hit(self, key: str):
+        """Count a hit (also used for hits served from an in-process cache)."""
+        write_behind.submit(self.db_path,
+                            "UPDATE llm_cache SET hit_count = hit_count + 1, last_hit = ? WHERE cache_key = ?",
+                            (datetime.now().isoformat(), key))
+
+    def set(self, key: str, value: str, ttl_days: int = 30, metadata: dict = None,
+            ttl_seconds: Optional[int] = None):
+        """Store response in cache (ttl_seconds, when given, overrides ttl_days)."""
         metadata = metadata or {}
 
-        conn = sqlite3.connect(self.db_path)
-        expires_at = (datetime.now() + timedelta(days=ttl_days)).isoformat()
+        conn = db_pool.connect(self.db_path)
+        ttl = timedelta(seconds=ttl_seconds) if ttl_seconds is not None else timedelta(days=ttl_days)
+        expires_at = (datetime.now() + ttl).isoformat()
+        stored, encoding = cache_compactor.compress(value)
+        size = len(stored) if encoding else len(value.encode("utf-8"))
 
         conn.execute("""
             INSERT OR REPLACE INTO llm_cache
             (cache_key, template_id, template_version, model_id, span_hashes,
-             response, tokens_used, created_at, expires_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+             response, tokens_used, created_at, expires_at, encoding, size_bytes)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             key,
             metadata.get('template_id', 'unknown'),
             metadata.get('template_version', '1.0'),
             metadata.get('model_id', 'unknown'),
             json.dumps(metadata.get('span_hashes', [])),
-            value,
+            stored,
             metadata.get('tokens_used', 0),
             datetime.now().isoformat(),
-            expires_at
+            expires_at,
+            encoding,
+            size
         ))
 
         conn.commit()
         conn.close()
 
+    def delete(self, key: str):
+        """Remove one entry."""
+        conn = db_pool.connect(self.db_path)
+        conn.execute("DELETE FROM llm_cache WHERE cache_key = ?", (key,))
+        conn.commit()
+        conn.close()
+
     def invalidate_template(self, template_id: str, version_before: str):
         """Invalidate all cache entries for template before a version."""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("""
+        conn = db_pool.connect(self.db_path)
+        deleted = conn.execute("""
             DELETE FROM llm_cache
             WHERE template_id = ? AND template_version < ?
-        """, (template_id, version_before))
-        deleted = conn.total_changes
+        """, (template_id, version_before)).rowcount
         conn.commit()
         conn.close()
         return deleted
 
     def cleanup_expired(self):
         """Remove expired entries."""
-        conn = sqlite3.connect(self.db_path)
-        conn.execute("DELETE FROM llm_cache WHERE expires_at < ?", (datetime.now().isoformat(),))
-        deleted = conn.total_changes
+        conn = db_pool.connect(self.db_path)
+        deleted = conn.execute("DELETE FROM llm_cache WHERE expires_at < ?",
+                               (datetime.now().isoformat(),)).rowcount
         conn.commit()
         conn.close()
         return deleted
 
+    def evict(self, max_bytes: Optional[int] = None, policy: Optional[str] = None) -> int:
+        """Evict entries until stored responses fit the byte budget."""
+        write_behind.flush(self.db_path)  # Pending hit counts inform the order
+        conn = db_pool.connect(self.db_path)
+        evicted = cache_compactor.evict_to_budget(
+            conn, "llm_cache", "cache_key",
+            max_bytes or cfg.LLM_CACHE_MAX_BYTES,
+            policy or cfg.LLM_CACHE_EVICTION,
+            cost_column="tokens_used")
+        conn.commit()
+        conn.close()
+        return evicted
+
+    def compact(self) -> dict:
+        """Expire, evict to budget, then return free pages (run by cache_compactor)."""
+        expired = self.cleanup_expired()
+        evicted = self.evict()
+        return {"expired": expired, "evicted": evicted, **cache_compactor.vacuum(self.db_path)}
+
     def stats(self) -> dict:
         """Get cache statistics."""
-        conn = sqlite3.connect(self.db_path)
+        write_behind.flush(self.db_path)
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
 
-        c.execute("SELECT COUNT(*), SUM(hit_count), AVG(hit_count) FROM llm_cache")
-        total, total_hits, avg_hits = c.fetchone()
+        c.execute("""
+            SELECT COUNT(*), SUM(hit_count), AVG(hit_count), SUM(size_bytes),
+                   SUM(encoding != '')
+            FROM llm_cache
+        """)
+        total, total_hits, avg_hits, stored_bytes, compressed = c.fetchone()
 
         c.execute("""
             SELECT template_id, COUNT(*), SUM(hit_count)
@@ -140,6 +201,9 @@ class LLMCacheL2:
             'total_entries': total or 0,
             'total_hits': total_hits or 0,
             'avg_hits_per_entry': round(avg_hits or 0, 2),
+            'stored_bytes': stored_bytes or 0,
+            'budget_bytes': cfg.LLM_CACHE_MAX_BYTES,
+            'compressed_entries': compressed or 0,
             'top_templates': [
                 {'template': t[0], 'entries': t[1], 'hits': t[2]}
                 for t in top_templates
@@ -169,3 +233,5 @@ if __name__ == "__main__":
     # Cleanup
     expired = cache.cleanup_expired()
     print(f"Cleaned up {expired} expired entries")
+
+    print(f"Compact: {json.dumps(cache.compact())}")
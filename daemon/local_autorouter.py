@@ -49,7 +49,12 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass
 import re
 
+import db_pool
+import task_wakeup
+
 DB_PATH = Path(__file__).parent / "router.db"
+OUTCOME_CHANNEL = task_wakeup.channel_for("router_outcomes", DB_PATH)
+OPTIMIZE_AFTER_OUTCOMES = 50  # run a cycle early once this many new outcomes arrive
 LOCALAI_URL = "http://localhost:8080/v1"
 LOCALAI_MODEL = "mistral-7b-instruct-v0.3"
 
@@ -151,7 +156,7 @@ INTENT_KEYWORDS = {
 
 def init_db():
     """Initialize router database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Routing decisions
@@ -328,7 +333,7 @@ def route_request(text: str, use_localai: bool = True) -> Dict:
     confidence = min(1.0, best_score / 100) if best_score > 0 else 0.5
 
     # Check historical performance
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('SELECT successes, total_uses FROM route_performance WHERE route = ?',
               (best_route,))
@@ -342,8 +347,7 @@ def route_request(text: str, use_localai: bool = True) -> Dict:
     decision_id = f"dec_{datetime.now().strftime('%Y%m%d%H%M%S')}_{hashlib.md5(text.encode()).hexdigest()[:8]}"
 
     try:
-        conn = sqlite3.connect(DB_PATH, timeout=30)
-        conn.execute("PRAGMA journal_mode=WAL")
+        conn = db_pool.connect(DB_PATH, timeout=30)
         c = conn.cursor()
         c.execute('''INSERT INTO routing_decisions
             (decision_id, request_hash, request_text, detected_intent, complexity_score,
@@ -371,7 +375,7 @@ def record_outcome(decision_id: str, outcome: str, actual_route: str = None,
                    tokens_used: int = 0):
     """Record the outcome of a routing decision."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Get original decision
@@ -413,6 +417,8 @@ def record_outcome(decision_id: str, outcome: str, actual_route: str = None,
     conn.commit()
     conn.close()
 
+    task_wakeup.notify(OUTCOME_CHANNEL)
+
 
 # =============================================================================
 # CYCLIC OPTIMIZATION
@@ -421,7 +427,7 @@ def record_outcome(decision_id: str, outcome: str, actual_route: str = None,
 def run_optimization_cycle():
     """Run optimization cycle to improve routing."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     print("[Optimization] Starting cycle...")
@@ -485,9 +491,16 @@ def run_optimization_cycle():
 
 
 def run_daemon(interval_minutes: int = 60):
-    """Run continuous optimization daemon."""
-    print(f"[AutoRouter Daemon] Starting (interval: {interval_minutes}min)")
+    """Run continuous optimization daemon.
+
+    A cycle runs every interval_minutes, or earlier once
+    OPTIMIZE_AFTER_OUTCOMES new outcomes have been recorded; the daemon
+    blocks on record_outcome() notifications in between.
+    """
+    print(f"[AutoRouter Daemon] Starting (interval: {interval_minutes}min, "
+          f"or every {OPTIMIZE_AFTER_OUTCOMES} outcomes)")
 
+    waiter = task_wakeup.Waiter(OUTCOME_CHANNEL)
     while True:
         try:
             result = run_optimization_cycle()
@@ -495,7 +508,10 @@ def run_daemon(interval_minutes: int = 60):
         except Exception as e:
             print(f"[Error] {e}")
 
-        time.sleep(interval_minutes * 60)
+        outcomes = 0
+        deadline = time.time() + interval_minutes * 60
+        while outcomes < OPTIMIZE_AFTER_OUTCOMES and time.time() < deadline:
+            outcomes += waiter.wait(deadline - time.time())
 
 
 # =============================================================================
@@ -505,7 +521,7 @@ def run_daemon(interval_minutes: int = 60):
 def get_stats() -> Dict:
     """Get routing statistics."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Overall stats
@@ -1,18 +1,27 @@
 #!/usr/bin/env python3
 """
-LocalAI Task Scheduler - Prioritizes interactive tasks over background ingest.
+LocalAI Task Scheduler - Shares LocalAI between interactive work and background ingest.
 
-Rule: Ingest only runs when LocalAI has no other tasks queued.
+Priority classes run in strict order (interactive, routing, synthesis,
+ingest) through fair_scheduler: a waiting task moves up one class per
+SCHED_AGING_SECONDS, so ingest still runs under sustained interactive
+load instead of waiting for an empty queue. LocalAI runs one job at a
+time (the "localai" cap in SCHED_TYPE_CAPS); other task-type caps apply
+too.
 """
 
-import sqlite3
 import time
 from pathlib import Path
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional
 from enum import Enum
 
+import db_pool
+from config import cfg
+from fair_scheduler import Candidate, FairScheduler
+
 DB_PATH = Path(__file__).parent / "localai_scheduler.db"
+STALE_RUNNING_MINUTES = 30  # running longer than this no longer holds a LocalAI slot
 
 class TaskPriority(int, Enum):
     INTERACTIVE = 0   # User-facing, immediate
@@ -20,8 +29,23 @@ class TaskPriority(int, Enum):
     SYNTHESIS = 2     # Background synthesis
     INGEST = 3        # Book ingestion (lowest)
 
+# Fair-share weight per class (matters once aged tasks share a class)
+CLASS_WEIGHTS = {"interactive": 8.0, "routing": 4.0, "synthesis": 2.0, "ingest": 1.0}
+
+scheduler = FairScheduler(
+    weights=CLASS_WEIGHTS,
+    max_running=cfg.SCHED_TYPE_CAPS.get("localai", 1)
+)
+
+
+def _class_name(priority: int) -> str:
+    try:
+        return TaskPriority(priority).name.lower()
+    except ValueError:
+        return "ingest"
+
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS task_queue (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -35,6 +59,8 @@ def init_db():
         );
         CREATE INDEX IF NOT EXISTS idx_queue_priority ON task_queue(priority, created_at);
         CREATE INDEX IF NOT EXISTS idx_queue_status ON task_queue(status);
+        CREATE INDEX IF NOT EXISTS idx_queue_fair ON task_queue(status, priority, task_type, created_at);
+        CREATE INDEX IF NOT EXISTS idx_queue_started ON task_queue(started_at);
     """)
     conn.commit()
     conn.close()
@@ -43,7 +69,7 @@ init_db()
 
 def queue_task(task_type: str, payload: str, priority: TaskPriority = TaskPriority.ROUTING) -> int:
     """Add task to queue. Returns task ID."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.execute("""
         INSERT INTO task_queue (priority, task_type, payload, created_at)
         VALUES (?, ?, ?, ?)
@@ -53,17 +79,59 @@ def queue_task(task_type: str, payload: str, priority: TaskPriority = TaskPriori
     conn.close()
     return task_id
 
-def get_next_task() -> Optional[dict]:
-    """Get highest priority pending task."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.execute("""
-        SELECT id, priority, task_type, payload
-        FROM task_queue
+def _candidates(conn, now: datetime) -> List[Candidate]:
+    """Oldest pending task of each (class, type) group (INTERACTIVE ranks highest)."""
+    rows = conn.execute("""
+        SELECT id, priority, task_type, MIN(created_at) FROM task_queue
         WHERE status = 'pending'
-        ORDER BY priority ASC, created_at ASC
-        LIMIT 1
-    """)
-    row = cursor.fetchone()
+        GROUP BY priority, task_type
+    """).fetchall()
+    return [
+        Candidate(id=row[0], source=_class_name(row[1]), task_type=row[2],
+                  priority=TaskPriority.INGEST - row[1],
+                  wait_seconds=(now - datetime.fromisoformat(row[3])).total_seconds())
+        for row in rows
+    ]
+
+
+def _load(conn, now: datetime) -> tuple:
+    """(served per class in the fairness window, running per task type)."""
+    since = (now - timedelta(seconds=scheduler.window_seconds)).isoformat()
+    served: Dict[str, int] = {}
+    for priority, count in conn.execute("""
+        SELECT priority, COUNT(*) FROM task_queue
+        WHERE started_at >= ?
+        GROUP BY priority
+    """, (since,)):
+        served[_class_name(priority)] = served.get(_class_name(priority), 0) + count
+    running = dict(conn.execute("""
+        SELECT task_type, COUNT(*) FROM task_queue
+        WHERE status = 'running' AND started_at >= ?
+        GROUP BY task_type
+    """, ((now - timedelta(minutes=STALE_RUNNING_MINUTES)).isoformat(),)).fetchall())
+    return served, running
+
+
+def _pick(conn, extra: List[Candidate] = ()) -> Optional[Candidate]:
+    now = datetime.now()
+    candidates = _candidates(conn, now) + list(extra)
+    if not candidates:
+        return None
+    served, running = _load(conn, now)
+    picked = scheduler.select(candidates, served, running, 1)
+    return picked[0] if picked else None
+
+
+def get_next_task() -> Optional[dict]:
+    """Peek at the task the fair scheduler would run next (None if none may run now)."""
+    conn = db_pool.connect(DB_PATH)
+    choice = _pick(conn)
+    row = None
+    if choice is not None:
+        row = conn.execute(
+            "SELECT id, priority, task_type, payload FROM task_queue WHERE id = ?",
+            (choice.id,)
+        ).fetchone()
     conn.close()
 
     if row:
@@ -71,18 +139,19 @@ def get_next_task() -> Optional[dict]:
     return None
 
 def can_run_ingest() -> bool:
-    """Check if ingest can run (no higher priority tasks pending)."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.execute("""
-        SELECT COUNT(*) FROM task_queue
-        WHERE status = 'pending' AND priority < ?
-    """, (TaskPriority.INGEST.value,))
-    count = cursor.fetchone()[0]
+    """Check if an ingest job may use LocalAI now.
+
+    True when a fresh ingest job would be the scheduler's next pick:
+    LocalAI is free and no higher class (or aged ingest task) is waiting.
+    """
+    conn = db_pool.connect(DB_PATH)
+    probe = Candidate(id=None, source="ingest", task_type="ingest", priority=0, wait_seconds=0.0)
+    choice = _pick(conn, [probe])
     conn.close()
-    return count == 0
+    return choice is probe
 
 def mark_started(task_id: int):
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.execute("""
         UPDATE task_queue SET status = 'running', started_at = ?
         WHERE id = ?
@@ -91,7 +160,7 @@ def mark_started(task_id: int):
     conn.close()
 
 def mark_completed(task_id: int):
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.execute("""
         UPDATE task_queue SET status = 'completed', completed_at = ?
         WHERE id = ?
@@ -100,7 +169,7 @@ def mark_completed(task_id: int):
     conn.close()
 
 def get_queue_stats() -> dict:
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.execute("""
         SELECT priority, status, COUNT(*)
         FROM task_queue
@@ -116,7 +185,7 @@ def get_queue_stats() -> dict:
 
 def cleanup_old_tasks(hours: int = 24):
     """Remove completed tasks older than N hours."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.execute("""
         DELETE FROM task_queue
         WHERE status = 'completed'
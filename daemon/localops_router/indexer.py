@@ -4,12 +4,13 @@ RepoIndexer - Fast indexing via ripgrep and universal-ctags
 
 import json
 import subprocess
-import sqlite3
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional
 import hashlib
 
+import db_pool
+
 class RepoIndexer:
     """Index repository for fast symbol/file lookup."""
 
@@ -24,7 +25,7 @@ class RepoIndexer:
 
     def _init_db(self):
         """Initialize SQLite storage."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.executescript('''
             CREATE TABLE IF NOT EXISTS files (
                 path TEXT PRIMARY KEY,
@@ -75,7 +76,7 @@ class RepoIndexer:
                     for p in self.repo_path.rglob('*')
                     if p.is_file() and '.git' not in str(p)]
 
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         indexed = 0
         for file_path in files:
             if not file_path:
@@ -108,7 +109,7 @@ class RepoIndexer:
         except FileNotFoundError:
             return {'error': 'ctags not installed', 'hint': 'Install universal-ctags'}
 
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         symbols = 0
         for line in result.stdout.strip().split('\n'):
             if not line:
@@ -139,7 +140,7 @@ class RepoIndexer:
 
     def _generate_symbol_artifact(self):
         """Create .repo_artifacts/symbols.md for human review."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         cursor = conn.execute('''
             SELECT kind, COUNT(*) as count FROM symbols GROUP BY kind ORDER BY count DESC
         ''')
@@ -170,7 +171,7 @@ class RepoIndexer:
         """Search using ripgrep with caching."""
         cache_key = f"{pattern}:{file_glob}"
 
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         cursor = conn.execute(
             'SELECT results FROM search_cache WHERE query = ?', (cache_key,)
         )
@@ -214,7 +215,7 @@ class RepoIndexer:
 
     def find_symbol(self, name: str, kind: Optional[str] = None) -> List[Dict]:
         """Find symbol by name."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         if kind:
             cursor = conn.execute(
                 'SELECT name, kind, file_path, line, scope, signature FROM symbols WHERE name LIKE ? AND kind = ?',
@@ -234,7 +235,7 @@ class RepoIndexer:
 
     def get_status(self) -> Dict:
         """Get index status."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         files = conn.execute('SELECT COUNT(*) FROM files').fetchone()[0]
         symbols = conn.execute('SELECT COUNT(*) FROM symbols').fetchone()[0]
         cache_entries = conn.execute('SELECT COUNT(*) FROM search_cache').fetchone()[0]
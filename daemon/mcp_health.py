@@ -17,7 +17,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional
 from dataclasses import dataclass, asdict
-import sqlite3
+
+import db_pool
 
 DAEMON_DIR = Path(__file__).parent
 PROJECT_DIR = DAEMON_DIR.parent
@@ -37,7 +38,7 @@ class ServerHealth:
 
 def init_db():
     """Initialize health tracking database."""
-    conn = sqlite3.connect(HEALTH_DB)
+    conn = db_pool.connect(HEALTH_DB)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS health_checks (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -163,7 +164,7 @@ def check_server(name: str, config: dict) -> ServerHealth:
 def record_health(health: ServerHealth):
     """Record health check result."""
     init_db()
-    conn = sqlite3.connect(HEALTH_DB)
+    conn = db_pool.connect(HEALTH_DB)
 
     # Record check
     conn.execute("""
@@ -252,7 +253,7 @@ def warmup_servers():
 def get_status() -> dict:
     """Get current health status of all servers."""
     init_db()
-    conn = sqlite3.connect(HEALTH_DB)
+    conn = db_pool.connect(HEALTH_DB)
 
     # Get current state
     cursor = conn.execute("""
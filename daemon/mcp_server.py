@@ -27,6 +27,7 @@ from typing import Any
 
 sys.path.insert(0, str(Path(__file__).parent))
 
+import cache_compactor
 from task_queue import TaskQueue, TaskPriority
 from coherence import GoalCoherenceLayer, GoalTimeframe
 from registry import create_default_registry
@@ -337,4 +338,5 @@ if __name__ == "__main__":
             print(f"  {tool['name']}: {tool['description']}")
     else:
         # Run as stdio server
+        cache_compactor.start()
         server.run_stdio()
@@ -2,18 +2,32 @@
 """Memory integration module for persistent learnings and decisions.
 
 Designed for easy swap to OpenMemory SDK later.
-Currently uses SQLite with JSON storage.
+Currently uses SQLite with JSON storage and hybrid (FTS5 + vector) recall.
 """
 
 import sqlite3
 import json
+import queue
+import threading
 import uuid
+from array import array
 from pathlib import Path
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, asdict
 from abc import ABC, abstractmethod
 
+import db_pool
+from fts import fts_query, query_terms
+
+# Embeddings for hybrid recall (optional: needs sentence-transformers)
+try:
+    from embedding_cache import DEFAULT_MODEL_NAME, SENTENCE_TRANSFORMERS_AVAILABLE, embed_texts
+    from vector_index import EmbeddingMatrix
+    VECTORS_AVAILABLE = SENTENCE_TRANSFORMERS_AVAILABLE
+except ImportError:
+    VECTORS_AVAILABLE = False
+
 # Claim similarity integration (lazy import)
 _claim_index = None
 
@@ -83,6 +97,45 @@ class Decision:
         )
 
 
+# =============================================================================
+# Relevance Scores
+# =============================================================================
+# Scored recall returns relevance in [0, 1] so results from different
+# backends (and MemoryRouter sources) can be merged on one scale. Raw FTS5
+# bm25 depends on corpus size and isn't comparable across indexes, so it's
+# used relative to the best hit and blended with query-term coverage;
+# cosine similarity is used as-is.
+
+def term_coverage(query: str, text: str) -> float:
+    """Fraction of distinct query terms that occur in text (0-1)."""
+    terms = set(query_terms(query))
+    if not terms:
+        return 0.0
+    words = set(query_terms(text))
+    return len(terms & words) / len(terms)
+
+
+def bm25_relevance(ranks: List[Optional[float]], texts: List[str], query: str) -> List[float]:
+    """
+    Relevance (0-1) for FTS5 hits: half bm25 relative to the best hit in
+    this result set (FTS5 rank is negative, lower is better), half term
+    coverage. A None rank (non-FTS fallback match) counts as no bm25 signal.
+    """
+    best = min((r for r in ranks if r is not None), default=0.0)
+    return [
+        0.5 * ((rank / best if best < 0 else 1.0) if rank is not None else 0.0)
+        + 0.5 * term_coverage(query, text)
+        for rank, text in zip(ranks, texts)
+    ]
+
+
+def cosine_relevance(similarity: Optional[float]) -> Optional[float]:
+    """Cosine similarity clamped to [0, 1] (None passes through)."""
+    if similarity is None:
+        return None
+    return max(0.0, min(1.0, float(similarity)))
+
+
 # =============================================================================
 # Abstract Backend (for future OpenMemory swap)
 # =============================================================================
@@ -106,24 +159,111 @@ class MemoryBackend(ABC):
     def recall_decisions(self, topic: str) -> List[Decision]:
         pass
 
+    def recall_learnings_scored(self, query: str, k: int = 5) -> List[Tuple[Learning, float]]:
+        """(learning, relevance 0-1) pairs; backends with native scores override."""
+        return [(l, term_coverage(query, f"{l.content} {l.context} {' '.join(l.tags)}"))
+                for l in self.recall_learnings(query, k)]
+
+    def recall_decisions_scored(self, topic: str, k: Optional[int] = None) -> List[Tuple[Decision, float]]:
+        """(decision, relevance 0-1) pairs; backends with native scores override."""
+        return [(d, term_coverage(topic, f"{d.decision} {d.rationale} {d.topic}"))
+                for d in self.recall_decisions(topic)[:k]]
+
 
 # =============================================================================
 # SQLite Backend Implementation
 # =============================================================================
+# Recall is hybrid: FTS5 bm25 candidates plus nearest neighbours from an
+# in-process EmbeddingMatrix, merged on one relevance scale. Embeddings are
+# written off the request path by a background thread (batched encodes) and
+# kept in memory_embeddings; rows stored before that, or while the model was
+# unavailable, are backfilled when the thread starts. Without
+# sentence-transformers recall is FTS only.
+
+EMBED_BATCH = 32            # Texts per encode call
+EMBED_BATCH_WAIT = 0.5      # Seconds to wait for a batch to fill
+CANDIDATE_FACTOR = 3        # FTS and vector candidates fetched per result
+VECTOR_WEIGHT = 0.5         # Share of cosine similarity in hybrid relevance
+MIN_SIMILARITY = 0.3        # Vector-only candidates below this cosine are dropped
+
+# kind -> (table, FTS table, bm25 column weights (id, ...), text columns)
+_RECALL_KINDS = {
+    "learning": ("learnings", "learnings_fts", (0.0, 1.0, 0.5, 0.5), ("content", "context", "tags")),
+    "decision": ("decisions", "decisions_fts", (0.0, 1.0, 0.5, 0.75), ("decision", "rationale", "topic")),
+}
+
+
+class _EmbeddingWriter:
+    """Background thread that embeds new rows in batches (one per backend)."""
+
+    def __init__(self, backend: 'SQLiteMemoryBackend'):
+        self._backend = backend
+        self._queue: queue.Queue = queue.Queue()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._backfilled = threading.Event()
+
+    def submit(self, kind: str, item_id: str, text: str):
+        self.start()
+        self._queue.put((kind, item_id, text))
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="memory-embedder", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        try:
+            for item in self._backend._missing_embeddings():
+                self._queue.put(item)
+        except Exception as e:
+            print(f"[WARN] Embedding backfill failed: {e}")
+        finally:
+            self._backfilled.set()
+
+        while True:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < EMBED_BATCH:
+                    batch.append(self._queue.get(timeout=EMBED_BATCH_WAIT))
+            except queue.Empty:
+                pass
+            try:
+                self._backend._store_embeddings(batch)
+            except Exception as e:
+                print(f"[WARN] Embedding {len(batch)} memories failed: {e}")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def flush(self):
+        """Block until everything submitted so far (and the backfill) is embedded."""
+        if self._thread is not None:
+            self._backfilled.wait()
+            self._queue.join()
+
 
 class SQLiteMemoryBackend(MemoryBackend):
-    """Simple SQLite backend with JSON storage and text search."""
+    """SQLite backend with JSON storage and hybrid FTS5 + embedding recall."""
 
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(self, db_path: Optional[Path] = None, embeddings: Optional[bool] = None):
         if db_path is None:
             db_path = Path(__file__).parent / "memory.db"
 
         self.db_path = db_path
         self._init_db()
 
+        # Hybrid recall state (see _EmbeddingWriter / _vector_candidates)
+        self.embeddings = VECTORS_AVAILABLE if embeddings is None else (embeddings and VECTORS_AVAILABLE)
+        self._writer = _EmbeddingWriter(self) if self.embeddings else None
+        self._vectors: Dict[str, Any] = {}
+        self._loaded_rowid: Dict[str, int] = {}
+        self._vectors_lock = threading.Lock()
+
     def _init_db(self):
         """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
 
         # Learnings table
@@ -181,11 +321,23 @@ class SQLiteMemoryBackend(MemoryBackend):
             END
         """)
 
+        # Embeddings for hybrid recall (float32 blobs; rowid orders writes)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS memory_embeddings (
+                rowid INTEGER PRIMARY KEY,
+                kind TEXT NOT NULL,
+                item_id TEXT NOT NULL,
+                model TEXT NOT NULL,
+                embedding BLOB NOT NULL,
+                UNIQUE(kind, item_id)
+            )
+        """)
+
         conn.commit()
         conn.close()
 
     def _get_conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
@@ -215,32 +367,18 @@ class SQLiteMemoryBackend(MemoryBackend):
         conn.commit()
         conn.close()
 
+        if self._writer:
+            self._writer.submit("learning", learning.id, self._embedding_text(
+                "learning", (learning.content, learning.context, json.dumps(learning.tags))))
         return learning
 
     def recall_learnings(self, query: str, k: int = 5) -> List[Learning]:
         """Recall learnings matching query using FTS."""
-        conn = self._get_conn()
+        return [l for l, _ in self.recall_learnings_scored(query, k)]
 
-        # Use FTS5 for search
-        rows = conn.execute("""
-            SELECT l.* FROM learnings l
-            JOIN learnings_fts f ON l.id = f.id
-            WHERE learnings_fts MATCH ?
-            ORDER BY rank
-            LIMIT ?
-        """, (query, k)).fetchall()
-
-        # Fallback to LIKE if FTS returns nothing
-        if not rows:
-            rows = conn.execute("""
-                SELECT * FROM learnings
-                WHERE content LIKE ? OR context LIKE ? OR tags LIKE ?
-                ORDER BY created_at DESC
-                LIMIT ?
-            """, (f"%{query}%", f"%{query}%", f"%{query}%", k)).fetchall()
-
-        conn.close()
-        return [Learning.from_row(row) for row in rows]
+    def recall_learnings_scored(self, query: str, k: int = 5) -> List[Tuple[Learning, float]]:
+        """Recall learnings with relevance scores (hybrid FTS + vector, see _recall_scored)."""
+        return [(Learning.from_row(row), score) for row, score in self._recall_scored("learning", query, k)]
 
     def store_decision(self, decision: str, rationale: str, topic: str = "") -> Decision:
         """Store a new decision."""
@@ -266,30 +404,153 @@ class SQLiteMemoryBackend(MemoryBackend):
         conn.commit()
         conn.close()
 
+        if self._writer:
+            self._writer.submit("decision", dec.id, self._embedding_text(
+                "decision", (dec.decision, dec.rationale, dec.topic)))
         return dec
 
     def recall_decisions(self, topic: str) -> List[Decision]:
         """Recall decisions for a topic."""
-        conn = self._get_conn()
+        return [d for d, _ in self.recall_decisions_scored(topic)]
 
-        # Try FTS first
-        rows = conn.execute("""
-            SELECT d.* FROM decisions d
-            JOIN decisions_fts f ON d.id = f.id
-            WHERE decisions_fts MATCH ?
-            ORDER BY rank
-        """, (topic,)).fetchall()
+    def recall_decisions_scored(self, topic: str, k: Optional[int] = None) -> List[Tuple[Decision, float]]:
+        """Recall decisions with relevance scores (hybrid FTS + vector, see _recall_scored)."""
+        return [(Decision.from_row(row), score) for row, score in self._recall_scored("decision", topic, k)]
 
-        # Fallback to LIKE
-        if not rows:
-            rows = conn.execute("""
-                SELECT * FROM decisions
-                WHERE topic LIKE ? OR decision LIKE ? OR rationale LIKE ?
-                ORDER BY created_at DESC
-            """, (f"%{topic}%", f"%{topic}%", f"%{topic}%")).fetchall()
+    # -------------------------------------------------------------------------
+    # Hybrid recall
+    # -------------------------------------------------------------------------
 
-        conn.close()
-        return [Decision.from_row(row) for row in rows]
+    @staticmethod
+    def _embedding_text(kind: str, values: Tuple[str, ...]) -> str:
+        if kind == "learning":
+            content, context, tags = values
+            values = (content, context, " ".join(json.loads(tags)))
+        return "\n".join(v for v in values if v)
+
+    def _recall_scored(self, kind: str, query: str, k: Optional[int]) -> List[Tuple[sqlite3.Row, float]]:
+        """
+        Rows of kind matching query with relevance 0-1, best first.
+
+        The query is reduced to quoted terms (fts_query), so FTS
+        syntax in user text can't fail the MATCH. Candidates are the top
+        k * CANDIDATE_FACTOR by bm25 and, with embeddings, by cosine
+        similarity; a candidate's relevance is bm25_relevance blended with
+        its cosine (VECTOR_WEIGHT). Rows not embedded yet score lexically.
+        """
+        table, fts_table, weights, columns = _RECALL_KINDS[kind]
+        match = fts_query(query)
+        if not match:
+            return []
+        limit = -1 if k is None else k * CANDIDATE_FACTOR
+
+        conn = self._get_conn()
+        try:
+            ranks = dict(conn.execute(f"""
+                SELECT id, bm25({fts_table}, {', '.join(map(str, weights))}) AS score
+                FROM {fts_table} WHERE {fts_table} MATCH ?
+                ORDER BY score LIMIT ?
+            """, (match, limit)).fetchall())
+            cosines = self._vector_candidates(kind, query, limit, set(ranks))
+
+            ids = list(ranks.keys() | cosines.keys())
+            rows = {}
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                rows.update((row["id"], row) for row in conn.execute(
+                    f"SELECT * FROM {table} WHERE id IN ({','.join('?' * len(chunk))})", chunk))
+        finally:
+            conn.close()
+
+        ids = [i for i in ids if i in rows]
+        lexical = bm25_relevance(
+            [ranks.get(i) for i in ids],
+            [self._embedding_text(kind, tuple(rows[i][c] for c in columns)) for i in ids],
+            query
+        )
+        scored = []
+        for item_id, score in zip(ids, lexical):
+            cosine = cosine_relevance(cosines.get(item_id))
+            if cosine is not None:
+                score = (1 - VECTOR_WEIGHT) * score + VECTOR_WEIGHT * cosine
+            scored.append((rows[item_id], score))
+        scored.sort(key=lambda pair: pair[1], reverse=True)
+        return scored if k is None else scored[:k]
+
+    def _vector_candidates(self, kind: str, query: str, limit: int, lexical_ids: set) -> Dict[str, float]:
+        """item id -> cosine for the nearest neighbours of query plus the FTS hits ({} without embeddings)."""
+        if not self.embeddings:
+            return {}
+        self._writer.start()  # Backfills rows stored without embeddings
+        vectors = embed_texts([query])
+        if not vectors or vectors[0] is None:
+            return {}
+        index = self._sync_vectors(kind)
+        n = len(index) if limit < 0 else limit
+        cosines = {i: c for i, c in index.search(vectors[0], k=n) if c >= MIN_SIMILARITY}
+        missing = {i for i in lexical_ids if i not in cosines and i in index}
+        if missing:
+            cosines.update(index.search(vectors[0], k=len(missing), allowed_ids=missing))
+        return cosines
+
+    def _sync_vectors(self, kind: str) -> 'EmbeddingMatrix':
+        """In-process index of kind, topped up with rows written since the last call."""
+        with self._vectors_lock:
+            index = self._vectors.setdefault(kind, EmbeddingMatrix())
+            conn = self._get_conn()
+            try:
+                rows = conn.execute("""
+                    SELECT rowid, item_id, embedding FROM memory_embeddings
+                    WHERE kind = ? AND model = ? AND rowid > ?
+                    ORDER BY rowid
+                """, (kind, DEFAULT_MODEL_NAME, self._loaded_rowid.get(kind, 0))).fetchall()
+            finally:
+                conn.close()
+            if rows:
+                index.load_blobs((row["item_id"], row["embedding"]) for row in rows)
+                self._loaded_rowid[kind] = rows[-1]["rowid"]
+            return index
+
+    def _missing_embeddings(self) -> List[Tuple[str, str, str]]:
+        """(kind, id, text) for rows with no embedding from the current model."""
+        conn = self._get_conn()
+        try:
+            items = []
+            for kind, (table, _, _, columns) in _RECALL_KINDS.items():
+                rows = conn.execute(f"""
+                    SELECT t.id, {', '.join(f't.{c}' for c in columns)} FROM {table} t
+                    LEFT JOIN memory_embeddings e
+                        ON e.kind = ? AND e.item_id = t.id AND e.model = ?
+                    WHERE e.item_id IS NULL
+                """, (kind, DEFAULT_MODEL_NAME)).fetchall()
+                items.extend((kind, row[0], self._embedding_text(kind, tuple(row[1:]))) for row in rows)
+            return items
+        finally:
+            conn.close()
+
+    def _store_embeddings(self, items: List[Tuple[str, str, str]]):
+        """Embed (kind, id, text) items in one batch and store the vectors."""
+        vectors = embed_texts([text for _, _, text in items]) or []
+        rows = [
+            (kind, item_id, DEFAULT_MODEL_NAME, array("f", vector).tobytes())
+            for (kind, item_id, _), vector in zip(items, vectors) if vector
+        ]
+        if not rows:
+            return
+        conn = self._get_conn()
+        try:
+            conn.executemany("""
+                INSERT OR REPLACE INTO memory_embeddings (kind, item_id, model, embedding)
+                VALUES (?, ?, ?, ?)
+            """, rows)
+            conn.commit()
+        finally:
+            conn.close()
+
+    def flush_embeddings(self):
+        """Wait for pending embeddings to be written (no-op without embeddings)."""
+        if self._writer:
+            self._writer.flush()
 
     def _extract_topic(self, decision: str) -> str:
         """Extract a simple topic from the decision text."""
@@ -382,6 +643,10 @@ class OpenMemoryBackend(MemoryBackend):
 
     def recall_learnings(self, query: str, k: int = 5) -> List[Learning]:
         """Recall learnings using OpenMemory semantic search (async wrapped)."""
+        return [l for l, _ in self.recall_learnings_scored(query, k)]
+
+    def recall_learnings_scored(self, query: str, k: int = 5) -> List[Tuple[Learning, float]]:
+        """Recall learnings with OpenMemory's similarity score as relevance."""
         async def _search():
             return await self._om.search(query, user_id=self.user_id, limit=k)
 
@@ -405,14 +670,15 @@ class OpenMemoryBackend(MemoryBackend):
                 content = parts[0]
                 context = parts[1] if len(parts) > 1 else context
 
-            learnings.append(Learning(
+            score = cosine_relevance(r.get('score'))
+            learnings.append((Learning(
                 id=r.get('id', str(uuid.uuid4())),
                 content=content,
                 context=context,
                 tags=[t for t in tags if not str(t).startswith(('confidence:', 'type:'))],
                 confidence=meta.get('confidence', 'medium'),
                 created_at=r.get('created_at', datetime.now().isoformat())
-            ))
+            ), score if score is not None else term_coverage(query, content)))
 
         return learnings[:k]
 
@@ -443,6 +709,10 @@ class OpenMemoryBackend(MemoryBackend):
 
     def recall_decisions(self, topic: str) -> List[Decision]:
         """Recall decisions using OpenMemory semantic search (async wrapped)."""
+        return [d for d, _ in self.recall_decisions_scored(topic)]
+
+    def recall_decisions_scored(self, topic: str, k: Optional[int] = None) -> List[Tuple[Decision, float]]:
+        """Recall decisions with OpenMemory's similarity score as relevance."""
         async def _search():
             return await self._om.search(f"decision about {topic}", user_id=self.user_id, limit=10)
 
@@ -457,15 +727,17 @@ class OpenMemoryBackend(MemoryBackend):
 
             meta = r.get('meta', {}) or {}
 
-            decisions.append(Decision(
+            decision = meta.get('decision', r.get('content', ''))
+            score = cosine_relevance(r.get('score'))
+            decisions.append((Decision(
                 id=r.get('id', str(uuid.uuid4())),
-                decision=meta.get('decision', r.get('content', '')),
+                decision=decision,
                 rationale=meta.get('rationale', ''),
                 topic=meta.get('topic', topic),
                 created_at=r.get('created_at', datetime.now().isoformat())
-            ))
+            ), score if score is not None else term_coverage(topic, decision)))
 
-        return decisions
+        return decisions[:k]
 
     def _extract_topic(self, decision: str) -> str:
         """Extract a simple topic from the decision text."""
@@ -528,6 +800,14 @@ class Memory:
         """Recall decisions for a topic."""
         return self._backend.recall_decisions(topic)
 
+    def recall_learnings_scored(self, query: str, k: int = 5) -> List[Tuple[Learning, float]]:
+        """Recall learnings with relevance scores in [0, 1]."""
+        return self._backend.recall_learnings_scored(query, k)
+
+    def recall_decisions_scored(self, topic: str, k: Optional[int] = None) -> List[Tuple[Decision, float]]:
+        """Recall decisions with relevance scores in [0, 1]."""
+        return self._backend.recall_decisions_scored(topic, k)
+
     # Convenience methods for SQLite backend
     def list_learnings(self, limit: int = 50) -> List[Learning]:
         """List all learnings."""
@@ -13,35 +13,24 @@ WIRING (2026-01-26):
 
 import json
 import sys
-import hashlib
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
-from datetime import datetime
 
 # Add daemon directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 # Local imports
-from memory import Memory, Learning, Decision
+from memory import Memory, Learning, Decision, bm25_relevance
+import kg_store
 
-# WIRED: Dragonfly L1 cache
-try:
-    import redis
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
+# WIRED: Dragonfly L1 cache (pooled client; local fallback store when Dragonfly is down)
+from cache_client import cache as dragonfly_cache
 
-# WIRED: Sentence Transformers for true semantic matching
-try:
-    from sentence_transformers import SentenceTransformer
-    import numpy as np
-    EMBEDDINGS_AVAILABLE = True
-    # Load model once at module level (lazy loading)
-    _embedding_model = None
-except ImportError:
-    EMBEDDINGS_AVAILABLE = False
-    _embedding_model = None
+# WIRED: Semantic query cache (embedding index over cached queries)
+from semantic_cache import SemanticCache
 
 # WIRED (2026-01-28): Token compression for cached results
 try:
@@ -52,22 +41,37 @@ except ImportError:
     compress_search_results = None
 
 
-def _get_embedding_model():
-    """Lazy load embedding model."""
-    global _embedding_model
-    if _embedding_model is None and EMBEDDINGS_AVAILABLE:
-        _embedding_model = SentenceTransformer("all-MiniLM-L6-v2")
-    return _embedding_model
-
-KNOWLEDGE_GRAPH_PATH = Path.home() / ".claude" / "memory" / "knowledge-graph.jsonl"
+KNOWLEDGE_GRAPH_PATH = kg_store.KG_PATH
 CACHE_TTL = 300  # 5 minutes for search results
 
-# Two-stage semantic matching thresholds (inspired by prompt-cache)
-SIMILARITY_HIGH = 0.85   # Immediately return cached (high confidence match)
-SIMILARITY_LOW = 0.5     # Bypass cache entirely (too different)
+# Semantic matching band: cfg.SEMANTIC_CACHE_HIGH / SEMANTIC_CACHE_LOW.
+# Gray-zone matches are accepted (search results, not answers).
+CACHE_NAMESPACE = "memory_router"
+
+# Parallel fan-out: every backend is queried at once; a backend that hasn't
+# answered within its deadline (seconds from the start of the search) is
+# left out of the results instead of holding up the others.
+SEARCH_WORKERS = 8
+BACKEND_DEADLINE = 2.0
+BACKEND_DEADLINES = {
+    "daemon:learning": 2.0,
+    "daemon:decision": 2.0,
+    "knowledge_graph": 1.0,
+}
 # Gray zone (0.5-0.85) could trigger LLM verification, but we skip for performance
 
 
+_search_pool: Optional[ThreadPoolExecutor] = None
+
+
+def _get_search_pool() -> ThreadPoolExecutor:
+    """Shared worker pool for backend fan-out (one per process)."""
+    global _search_pool
+    if _search_pool is None:
+        _search_pool = ThreadPoolExecutor(SEARCH_WORKERS, thread_name_prefix="memory-search")
+    return _search_pool
+
+
 @dataclass
 class UnifiedResult:
     """Unified search result across all memory systems."""
@@ -92,172 +96,50 @@ class MemoryRouter:
     WIRED Backends (2026-01-26):
     - L1: Dragonfly/Redis cache - Fast lookup (< 100ms)
     - L2: daemon/memory.py (SQLite) - Learnings & decisions
-    - L3: knowledge-graph.jsonl - Entity relations
+    - L3: knowledge-graph.jsonl (indexed by kg_store) - Entity relations
     """
 
     def __init__(self):
         self._daemon_memory = Memory(backend="auto")
         self._kg_path = KNOWLEDGE_GRAPH_PATH
+        self.last_search: Dict[str, Any] = {}
         # WIRED: L1 Dragonfly cache
         self._cache = self._init_cache()
 
-    def _init_cache(self) -> Optional[Any]:
-        """Initialize Dragonfly/Redis cache connection."""
-        if not REDIS_AVAILABLE:
-            return None
-        try:
-            r = redis.Redis(host='localhost', port=6379, decode_responses=True)
-            r.ping()
-            return r
-        except Exception:
-            return None
+    def _init_cache(self) -> Optional[SemanticCache]:
+        """Semantic cache over the shared Dragonfly client (cache_client)."""
+        return SemanticCache(CACHE_NAMESPACE, ttl=CACHE_TTL, gray_ok=True)
 
-    def _cache_key(self, query: str, k: int) -> str:
-        """Generate cache key for a search query."""
-        query_hash = hashlib.sha256(f"{query}:{k}".encode()).hexdigest()[:16]
-        return f"claude:memory_router:{query_hash}"
-
-    def _normalize_query(self, query: str) -> set:
-        """Normalize query to word set for semantic matching."""
-        # Simple tokenization and normalization
-        words = set(query.lower().split())
-        # Remove common stop words
-        stop_words = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
-                      'to', 'of', 'and', 'or', 'in', 'on', 'at', 'for', 'with'}
-        return words - stop_words
-
-    def _semantic_similarity(self, query1: str, query2: str) -> float:
+    def _cache_get(self, query: str, k: int) -> Optional[List[Dict]]:
         """
-        Calculate semantic similarity between queries.
-
-        Uses embeddings if available (cosine similarity), falls back to Jaccard.
+        Cached results for this query or a similar one (exact key first,
+        then nearest cached query embeddings; see semantic_cache).
+        An entry cached for a larger k is cut to what search returns for k.
         """
-        # Try embeddings first (true semantic matching)
-        if EMBEDDINGS_AVAILABLE:
-            try:
-                model = _get_embedding_model()
-                if model is not None:
-                    embeddings = model.encode([query1, query2])
-                    # Cosine similarity
-                    cos_sim = np.dot(embeddings[0], embeddings[1]) / (
-                        np.linalg.norm(embeddings[0]) * np.linalg.norm(embeddings[1])
-                    )
-                    return float(cos_sim)
-            except Exception:
-                pass  # Fall through to Jaccard
-
-        # Fallback: Jaccard similarity (word overlap)
-        words1 = self._normalize_query(query1)
-        words2 = self._normalize_query(query2)
-        if not words1 or not words2:
-            return 0.0
-        intersection = len(words1 & words2)
-        union = len(words1 | words2)
-        return intersection / union if union > 0 else 0.0
-
-    def _cache_get(self, key: str) -> Optional[List[Dict]]:
-        """Get from L1 cache."""
         if not self._cache:
             return None
-        try:
-            data = self._cache.get(key)
-            if data:
-                return json.loads(data)
-        except Exception:
-            pass
-        return None
-
-    def _cache_get_semantic(self, query: str, k: int) -> Optional[List[Dict]]:
-        """
-        Two-stage semantic cache lookup (inspired by prompt-cache architecture).
+        hit = self._cache.get(query, accept=lambda meta: meta.get("k", 0) >= k)
+        return hit.value[:k * 2] if hit else None
 
-        Stage 1: High similarity (>0.85) → Return immediately
-        Stage 2: Low similarity (<0.5) → Skip entirely
-        Gray zone: Accept for now (could add LLM verification later)
-        """
-        if not self._cache:
-            return None
-
-        try:
-            # Get all cached query keys
-            keys = self._cache.keys("claude:memory_router:*")
-            if not keys:
-                return None
-
-            best_match = None
-            best_similarity = 0
-
-            # Check each cached query for semantic similarity
-            for cached_key in keys[:50]:  # Limit to 50 for performance
-                if ":meta" in str(cached_key):
-                    continue  # Skip metadata keys
-
-                # Get the original query from metadata
-                meta_key = f"{cached_key}:meta"
-                meta = self._cache.get(meta_key)
-                if not meta:
-                    continue
-
-                meta_data = json.loads(meta)
-                cached_query = meta_data.get("query", "")
-                cached_k = meta_data.get("k", 0)
-
-                if cached_k < k:
-                    continue  # Need at least as many results
-
-                # Two-stage similarity check
-                similarity = self._semantic_similarity(query, cached_query)
-
-                if similarity < SIMILARITY_LOW:
-                    continue  # Too different, skip
-
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_match = cached_key
-
-                # High confidence match - return immediately
-                if similarity >= SIMILARITY_HIGH:
-                    data = self._cache.get(cached_key)
-                    if data:
-                        return json.loads(data)
-
-            # Return best gray-zone match if found
-            if best_match and best_similarity >= SIMILARITY_LOW:
-                data = self._cache.get(best_match)
-                if data:
-                    return json.loads(data)
-
-        except Exception:
-            pass
-        return None
-
-    def _cache_set(self, key: str, results: List[Dict], query: str = "", k: int = 0, ttl: int = CACHE_TTL):
-        """Set in L1 cache with metadata for semantic matching."""
+    def _cache_set(self, query: str, results: List[Dict], k: int, ttl: int = CACHE_TTL):
+        """Cache results, keyed by query (k kept for matching)."""
         if not self._cache:
             return
-        try:
-            # WIRED (2026-01-28): Compress large result sets before caching
-            cache_data = results
-            if HEADROOM_AVAILABLE and len(results) > 15:
-                try:
-                    cache_data = compress_search_results(results, query=query, max_results=20)
-                except Exception:
-                    pass  # Keep original on compression error
-
-            self._cache.setex(key, ttl, json.dumps(cache_data))
-            # Store metadata for semantic matching
-            if query:
-                meta_key = f"{key}:meta"
-                self._cache.setex(meta_key, ttl, json.dumps({"query": query, "k": k}))
-        except Exception:
-            pass
+        # WIRED (2026-01-28): Compress large result sets before caching
+        cache_data = results
+        if HEADROOM_AVAILABLE and len(results) > 15:
+            try:
+                cache_data = compress_search_results(results, query=query, max_results=20)
+            except Exception:
+                pass  # Keep original on compression error
+        self._cache.set(query, cache_data, meta={"k": k}, ttl=ttl)
 
     @property
     def active_backends(self) -> List[str]:
         """List active memory backends."""
         backends = []
         if self._cache:
-            backends.append("dragonfly:l1_cache")
+            backends.append(f"{dragonfly_cache.mode}:l1_cache")
         backends.append(f"daemon:{self._daemon_memory.backend_name}")
         if self._kg_path.exists():
             backends.append("knowledge_graph")
@@ -323,166 +205,181 @@ class MemoryRouter:
     # Unified Search Operations
     # =========================================================================
 
-    def search(self, query: str, k: int = 10, sources: Optional[List[str]] = None) -> List[UnifiedResult]:
+    def _search_backends(self, sources: List[str]) -> Dict[str, Callable[[str, int], List[UnifiedResult]]]:
+        """Backend name -> search function for the requested sources."""
+        backends = {}
+        if "daemon" in sources:
+            backends["daemon:learning"] = self._search_learnings
+            backends["daemon:decision"] = self._search_decisions
+        if "knowledge_graph" in sources:
+            backends["knowledge_graph"] = self._search_knowledge_graph
+        return backends
+
+    def search_iter(
+        self,
+        query: str,
+        k: int = 10,
+        sources: Optional[List[str]] = None,
+        deadline: Optional[float] = None,
+        report: Optional[Dict[str, Any]] = None
+    ) -> Iterator[Tuple[str, List[UnifiedResult]]]:
+        """
+        Query all backends concurrently; yield (backend, results) as each one
+        finishes. Backends that fail or miss their deadline (BACKEND_DEADLINES,
+        or deadline for all) yield nothing. Per-backend status and timings
+        go into report (also kept as self.last_search).
+
+        An L1 cache hit yields ("cache", results) and queries nothing.
+        """
+        if sources is None:
+            sources = ["daemon", "knowledge_graph"]
+        if report is None:
+            report = {}
+        report.update(cache_hit=False, backends={}, complete=True)
+        self.last_search = report
+        timings = report["backends"]
+
+        # WIRED: Check L1 cache first (exact match, then semantic)
+        cached = self._cache_get(query, k)
+        if cached:
+            report["cache_hit"] = True
+            yield "cache", [UnifiedResult(**r) for r in cached]
+            return
+
+        start = time.monotonic()
+        backends = self._search_backends(sources)
+        deadlines = {name: start + (deadline if deadline is not None
+                                    else BACKEND_DEADLINES.get(name, BACKEND_DEADLINE))
+                     for name in backends}
+        pending = {_get_search_pool().submit(fn, query, k): name for name, fn in backends.items()}
+
+        while pending:
+            timeout = max(0.0, min(deadlines[name] for name in pending.values()) - time.monotonic())
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = pending.pop(future)
+                elapsed_ms = round((time.monotonic() - start) * 1000, 1)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    timings[name] = {"status": "error", "error": str(e), "ms": elapsed_ms}
+                    report["complete"] = False
+                    continue
+                timings[name] = {"status": "ok", "results": len(results), "ms": elapsed_ms}
+                yield name, results
+
+            now = time.monotonic()
+            for future, name in list(pending.items()):
+                if now >= deadlines[name]:
+                    # Left running in the pool; its result is dropped
+                    del pending[future]
+                    timings[name] = {"status": "timeout", "ms": round((now - start) * 1000, 1)}
+                    report["complete"] = False
+
+    def search(self, query: str, k: int = 10, sources: Optional[List[str]] = None,
+               deadline: Optional[float] = None) -> List[UnifiedResult]:
         """
         Search across all memory systems.
 
         WIRED: Now uses L1 Dragonfly cache for fast repeated queries.
+        Backends are queried in parallel (see search_iter) and merged on
+        their relevance scores, which are all normalized to [0, 1].
 
         Args:
             query: Search query
             k: Max results per source
             sources: List of sources to search ["daemon", "knowledge_graph"]
                      If None, searches all.
+            deadline: Seconds to wait for each backend (default BACKEND_DEADLINES)
 
         Returns:
             List of UnifiedResult sorted by relevance
         """
-        if sources is None:
-            sources = ["daemon", "knowledge_graph"]
-
-        # WIRED: Check L1 cache first (exact match)
-        cache_key = self._cache_key(query, k)
-        cached = self._cache_get(cache_key)
-        if cached:
-            # Reconstruct UnifiedResult from cached dicts
-            return [UnifiedResult(**r) for r in cached]
-
-        # WIRED: Try semantic cache (fuzzy match)
-        semantic_cached = self._cache_get_semantic(query, k)
-        if semantic_cached:
-            return [UnifiedResult(**r) for r in semantic_cached]
-
         results = []
-
-        # Search daemon memory
-        if "daemon" in sources:
-            learnings = self._daemon_memory.recall_learnings(query, k)
-            for i, l in enumerate(learnings):
-                results.append(UnifiedResult(
-                    source="daemon:learning",
-                    content=l.content,
-                    relevance=1.0 - (i * 0.1),  # Decay by rank
-                    metadata={
-                        "id": l.id,
-                        "context": l.context,
-                        "tags": l.tags,
-                        "confidence": l.confidence,
-                        "created_at": l.created_at
-                    }
-                ))
-
-            decisions = self._daemon_memory.recall_decisions(query)
-            for i, d in enumerate(decisions[:k]):
-                results.append(UnifiedResult(
-                    source="daemon:decision",
-                    content=d.decision,
-                    relevance=0.9 - (i * 0.1),
-                    metadata={
-                        "id": d.id,
-                        "rationale": d.rationale,
-                        "topic": d.topic,
-                        "created_at": d.created_at
-                    }
-                ))
-
-        # Search knowledge graph
-        if "knowledge_graph" in sources:
-            kg_results = self._search_knowledge_graph(query, k)
-            results.extend(kg_results)
+        report: Dict[str, Any] = {}
+        for backend, backend_results in self.search_iter(query, k, sources, deadline, report):
+            if backend == "cache":
+                return backend_results
+            results.extend(backend_results)
 
         # Sort by relevance
         results.sort(key=lambda r: r.relevance, reverse=True)
         final_results = results[:k * 2]  # Return up to 2x k across all sources
 
-        # WIRED: Cache results in L1 for next time (with semantic metadata)
-        self._cache_set(cache_key, [r.to_dict() for r in final_results], query=query, k=k)
+        # WIRED: Cache results in L1 for next time (with semantic metadata).
+        # Partial results (a backend timed out or failed) aren't cached.
+        if report["complete"]:
+            self._cache_set(query, [r.to_dict() for r in final_results], k)
 
         return final_results
 
+    def _search_learnings(self, query: str, k: int) -> List[UnifiedResult]:
+        return [
+            UnifiedResult(
+                source="daemon:learning",
+                content=l.content,
+                relevance=score,
+                metadata={
+                    "id": l.id,
+                    "context": l.context,
+                    "tags": l.tags,
+                    "confidence": l.confidence,
+                    "created_at": l.created_at
+                }
+            )
+            for l, score in self._daemon_memory.recall_learnings_scored(query, k)
+        ]
+
+    def _search_decisions(self, query: str, k: int) -> List[UnifiedResult]:
+        return [
+            UnifiedResult(
+                source="daemon:decision",
+                content=d.decision,
+                relevance=score,
+                metadata={
+                    "id": d.id,
+                    "rationale": d.rationale,
+                    "topic": d.topic,
+                    "created_at": d.created_at
+                }
+            )
+            for d, score in self._daemon_memory.recall_decisions_scored(query, k)
+        ]
+
     # =========================================================================
     # Knowledge Graph Operations
     # =========================================================================
 
     def _store_entity(self, name: str, entity_type: str, observations: List[str]) -> str:
         """Store entity in knowledge graph."""
-        self._kg_path.parent.mkdir(parents=True, exist_ok=True)
-
-        entity_id = f"entity_{name.lower().replace(' ', '_')}"
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "type": "entity",
-            "data": {
-                "id": entity_id,
-                "name": name,
-                "entityType": entity_type,
-                "observations": observations
-            }
-        }
-
-        with open(self._kg_path, 'a') as f:
-            f.write(json.dumps(entry) + '\n')
-
-        return entity_id
+        kg_store.add_entity(name, entity_type, observations)
+        return f"entity_{name.lower().replace(' ', '_')}"
 
     def _store_relation(self, from_entity: str, to_entity: str, relation_type: str):
         """Store relation in knowledge graph."""
-        self._kg_path.parent.mkdir(parents=True, exist_ok=True)
-
-        entry = {
-            "timestamp": datetime.now().isoformat(),
-            "type": "relation",
-            "data": {
-                "from": from_entity,
-                "to": to_entity,
-                "relationType": relation_type
-            }
-        }
-
-        with open(self._kg_path, 'a') as f:
-            f.write(json.dumps(entry) + '\n')
+        kg_store.add_relation(from_entity, to_entity, relation_type)
 
     def _search_knowledge_graph(self, query: str, k: int) -> List[UnifiedResult]:
-        """Search knowledge graph for matching entities."""
-        results = []
-        if not self._kg_path.exists():
-            return results
-
-        query_lower = query.lower()
-        with open(self._kg_path, 'r') as f:
-            for line in f:
-                try:
-                    entry = json.loads(line)
-                    if entry.get("type") == "entity":
-                        data = entry.get("data", {})
-                        name = data.get("name", "").lower()
-                        observations = " ".join(data.get("observations", []))
-
-                        # Simple relevance scoring
-                        score = 0.0
-                        if query_lower in name:
-                            score = 0.9
-                        elif query_lower in observations.lower():
-                            score = 0.6
-                        elif any(word in observations.lower() for word in query_lower.split()):
-                            score = 0.4
-
-                        if score > 0:
-                            results.append(UnifiedResult(
-                                source="knowledge_graph:entity",
-                                content=data.get("name", ""),
-                                relevance=score,
-                                metadata={
-                                    "entity_type": data.get("entityType"),
-                                    "observations": data.get("observations", []),
-                                    "timestamp": entry.get("timestamp")
-                                }
-                            ))
-                except json.JSONDecodeError:
-                    continue
-
-        results.sort(key=lambda r: r.relevance, reverse=True)
-        return results[:k]
+        """Search knowledge graph for matching entities (FTS index, see kg_store)."""
+        entities = kg_store.search(query, limit=k)
+        scores = bm25_relevance(
+            [e["rank"] for e in entities],
+            [f"{e['name']} {' '.join(e['observations'])}" for e in entities],
+            query
+        )
+        return [
+            UnifiedResult(
+                source="knowledge_graph:entity",
+                content=entity["name"],
+                relevance=score,
+                metadata={
+                    "entity_type": entity["entityType"],
+                    "observations": entity["observations"],
+                    "timestamp": entity["timestamp"]
+                }
+            )
+            for entity, score in zip(entities, scores)
+        ]
 
     # =========================================================================
     # Status & Diagnostics
@@ -501,8 +398,12 @@ class MemoryRouter:
         }
 
         if self._kg_path.exists():
-            with open(self._kg_path, 'r') as f:
-                status["knowledge_graph"]["entries"] = sum(1 for _ in f)
+            kg_stats = kg_store.stats()
+            status["knowledge_graph"]["entries"] = kg_stats["entities"]
+            status["knowledge_graph"]["relations"] = kg_stats["relations"]
+
+        if self._cache:
+            status["semantic_cache"] = self._cache.stats()
 
         # Count daemon entries
         try:
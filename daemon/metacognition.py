@@ -22,6 +22,8 @@ from typing import Optional, List, Dict, Any, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+import db_pool
+
 
 class CapabilityLevel(str, Enum):
     NONE = "none"           # Cannot do this
@@ -84,7 +86,7 @@ class MetaCognitionEngine:
         self._init_db()
 
     def _init_db(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS predictions (
                 id TEXT PRIMARY KEY,
@@ -141,7 +143,7 @@ class MetaCognitionEngine:
     ) -> str:
         """Record a prediction with confidence for later calibration."""
         pred_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT INTO predictions (id, domain, prediction, confidence, created_at)
             VALUES (?, ?, ?, ?, ?)
@@ -157,7 +159,7 @@ class MetaCognitionEngine:
         was_correct: bool
     ):
         """Resolve a prediction with actual outcome."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             UPDATE predictions
             SET actual_outcome = ?, was_correct = ?, resolved_at = ?
@@ -168,7 +170,7 @@ class MetaCognitionEngine:
 
     def get_calibration(self, domain: Optional[str] = None) -> Dict[str, Any]:
         """Calculate calibration metrics for predictions."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
 
         query = "SELECT * FROM predictions WHERE was_correct IS NOT NULL"
@@ -230,7 +232,7 @@ class MetaCognitionEngine:
     ) -> str:
         """Identify a knowledge gap."""
         gap_id = str(uuid.uuid4())
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT INTO knowledge_gaps (id, domain, topic, description, importance, identified_at)
             VALUES (?, ?, ?, ?, ?, ?)
@@ -241,14 +243,14 @@ class MetaCognitionEngine:
 
     def fill_gap(self, gap_id: str):
         """Mark a knowledge gap as filled."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("UPDATE knowledge_gaps SET filled = 1 WHERE id = ?", (gap_id,))
         conn.commit()
         conn.close()
 
     def get_gaps(self, domain: Optional[str] = None) -> List[KnowledgeGap]:
         """Get unfilled knowledge gaps."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
 
         query = "SELECT * FROM knowledge_gaps WHERE filled = 0"
@@ -275,7 +277,7 @@ class MetaCognitionEngine:
         limitations: List[str] = None
     ):
         """Record or update capability assessment."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
 
         # Check if exists
         existing = conn.execute(
@@ -303,7 +305,7 @@ class MetaCognitionEngine:
 
     def get_capabilities(self) -> List[CapabilityAssessment]:
         """Get all capability assessments."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         rows = conn.execute(
             "SELECT * FROM capabilities ORDER BY level DESC, capability"
@@ -320,7 +322,7 @@ class MetaCognitionEngine:
 
     def can_do(self, capability: str, required_level: CapabilityLevel = CapabilityLevel.BASIC) -> Tuple[bool, str]:
         """Check if a capability meets required level."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         row = conn.execute(
             "SELECT * FROM capabilities WHERE capability = ?",
@@ -355,7 +357,7 @@ class MetaCognitionEngine:
         domain: str = "general"
     ):
         """Record a performance metric."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT INTO metrics (id, name, value, target, domain, recorded_at)
             VALUES (?, ?, ?, ?, ?, ?)
@@ -365,7 +367,7 @@ class MetaCognitionEngine:
 
     def get_performance(self, period_days: int = 30) -> Dict[str, Any]:
         """Get performance summary over period."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
 
         cutoff = (datetime.now() - timedelta(days=period_days)).isoformat()
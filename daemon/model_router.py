@@ -20,12 +20,15 @@ Usage:
 
 import os
 import json
-import hashlib
 from dataclasses import dataclass
+from datetime import datetime, timezone
 from enum import Enum
 from typing import Optional, Dict, Any, List
 from pathlib import Path
-import sqlite3
+
+import db_pool
+import write_behind
+from embedding_cache import get_embedding_cache
 
 # Try imports
 try:
@@ -34,11 +37,7 @@ try:
 except ImportError:
     OPENAI_AVAILABLE = False
 
-try:
-    import redis
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
+from llm_cache import LLMCache
 
 # WIRED (2026-01-28): Token compression for context building
 try:
@@ -236,13 +235,7 @@ class ContextBuilder:
 
     def __init__(self, config: RoutingConfig):
         self.config = config
-        self.dragonfly = None
-        if REDIS_AVAILABLE:
-            try:
-                self.dragonfly = redis.from_url(config.dragonfly_url)
-                self.dragonfly.ping()
-            except:
-                self.dragonfly = None
+        self.cache = LLMCache("router", ttl=3600)
 
     def build(self, task: str, content: str,
               recall_items: List[str] = None,
@@ -291,18 +284,12 @@ class ContextBuilder:
         return context
 
     def cache_result(self, key: str, result: str, ttl: int = 3600):
-        """Cache result in Dragonfly."""
-        if self.dragonfly:
-            cache_key = f"router:{hashlib.md5(key.encode()).hexdigest()}"
-            self.dragonfly.setex(cache_key, ttl, result)
+        """Cache result (in-process L1 + SQLite L2)."""
+        self.cache.set(LLMCache.key(key), result, ttl=ttl)
 
     def get_cached(self, key: str) -> Optional[str]:
-        """Get cached result from Dragonfly."""
-        if self.dragonfly:
-            cache_key = f"router:{hashlib.md5(key.encode()).hexdigest()}"
-            result = self.dragonfly.get(cache_key)
-            return result.decode() if result else None
-        return None
+        """Get cached result."""
+        return self.cache.get(LLMCache.key(key))
 
 # ============================================================================
 # Model Clients
@@ -311,6 +298,8 @@ class ContextBuilder:
 class LocalAIClient:
     """Client for LocalAI inference."""
 
+    embedding_model = "all-MiniLM-L6-v2"  # Common embedding model
+
     def __init__(self, base_url: str, model: str, timeout: float = 10.0):
         self.base_url = base_url
         self.model = model
@@ -352,15 +341,31 @@ class LocalAIClient:
             raise RuntimeError("LocalAI client not available")
 
         response = self.client.embeddings.create(
-            model="all-MiniLM-L6-v2",  # Common embedding model
+            model=self.embedding_model,
             input=text
         )
         return response.data[0].embedding
 
+    def embed_batch(self, texts: List[str], batch_size: int = 64) -> List[List[float]]:
+        """Generate embeddings for many texts, batch_size inputs per request."""
+        if not self.client:
+            raise RuntimeError("LocalAI client not available")
+
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            response = self.client.embeddings.create(
+                model=self.embedding_model,
+                input=texts[start:start + batch_size]
+            )
+            embeddings.extend(d.embedding for d in sorted(response.data, key=lambda d: d.index))
+        return embeddings
+
 
 class OpenAIClient:
     """Client for OpenAI API."""
 
+    embedding_model = "text-embedding-3-small"
+
     def __init__(self, api_key: str, model: str):
         self.model = model
         self.client = None
@@ -388,11 +393,25 @@ class OpenAIClient:
             raise RuntimeError("OpenAI client not available")
 
         response = self.client.embeddings.create(
-            model="text-embedding-3-small",
+            model=self.embedding_model,
             input=text
         )
         return response.data[0].embedding
 
+    def embed_batch(self, texts: List[str], batch_size: int = 256) -> List[List[float]]:
+        """Generate embeddings for many texts, batch_size inputs per request."""
+        if not self.client:
+            raise RuntimeError("OpenAI client not available")
+
+        embeddings = []
+        for start in range(0, len(texts), batch_size):
+            response = self.client.embeddings.create(
+                model=self.embedding_model,
+                input=texts[start:start + batch_size]
+            )
+            embeddings.extend(d.embedding for d in sorted(response.data, key=lambda d: d.index))
+        return embeddings
+
 # ============================================================================
 # Main Router
 # ============================================================================
@@ -433,7 +452,7 @@ class ModelRouter:
 
     def _init_stats_db(self):
         """Initialize routing stats database."""
-        conn = sqlite3.connect(ROUTER_DB)
+        conn = db_pool.connect(ROUTER_DB)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS routing_stats (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -462,16 +481,15 @@ class ModelRouter:
             cost = (input_tokens * 0.00015 + output_tokens * 0.0006) / 1000
         # LocalAI = $0
 
-        conn = sqlite3.connect(ROUTER_DB)
-        conn.execute("""
+        # Buffered: timestamp taken now (same format as SQLite's datetime('now'))
+        write_behind.submit(ROUTER_DB, """
             INSERT INTO routing_stats
             (timestamp, task_type, provider, input_tokens, output_tokens,
              latency_ms, success, cost_estimate)
-            VALUES (datetime('now'), ?, ?, ?, ?, ?, ?, ?)
-        """, (task_type.value, provider.value, input_tokens, output_tokens,
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        """, (datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"),
+              task_type.value, provider.value, input_tokens, output_tokens,
               latency_ms, 1 if success else 0, cost))
-        conn.commit()
-        conn.close()
 
     def select_provider(self, task_type: TaskType) -> Provider:
         """Select best available provider for task."""
@@ -591,26 +609,79 @@ class ModelRouter:
             }
 
     def embed(self, text: str) -> Dict[str, Any]:
-        """Generate embeddings via best available provider."""
+        """
+        Generate embeddings via best available provider.
+
+        Consults the shared embedding cache first, keyed by the provider's
+        embedding model, so repeated texts skip the provider round trip.
+        """
+        cache = get_embedding_cache()
+        cached = cache.get(self.localai.embedding_model, text)
+        if cached is not None:
+            return {"provider": "localai", "embedding": cached, "cached": True}
+
         if self.localai.available():
             try:
                 embedding = self.localai.embed(text)
+                cache.put(self.localai.embedding_model, text, embedding)
                 return {"provider": "localai", "embedding": embedding}
             except:
                 pass
 
+        cached = cache.get(self.openai_client.embedding_model, text)
+        if cached is not None:
+            return {"provider": "openai", "embedding": cached, "cached": True}
+
         if self.openai_client.available():
             try:
                 embedding = self.openai_client.embed(text)
+                cache.put(self.openai_client.embedding_model, text, embedding)
                 return {"provider": "openai", "embedding": embedding}
             except:
                 pass
 
         return {"provider": None, "error": "No embedding provider available"}
 
+    def embed_batch(self, texts: List[str], batch_size: int = 64) -> Dict[str, Any]:
+        """
+        Generate embeddings for many texts via best available provider.
+
+        Cached texts are served from the embedding cache; only the misses
+        are sent to the provider, batch_size per HTTP request. Availability
+        is checked once per call. All embeddings in one result come from the
+        same model.
+
+        Returns:
+            {"provider": "localai|openai|None", "embeddings": [list | None, ...]}
+        """
+        if not texts:
+            return {"provider": None, "embeddings": []}
+
+        cache = get_embedding_cache()
+        cached = cache.get_many(self.localai.embedding_model, texts)
+        if all(e is not None for e in cached):
+            return {"provider": "localai", "embeddings": cached, "cached": len(texts)}
+
+        for name, client, size in (("localai", self.localai, batch_size),
+                                   ("openai", self.openai_client, 256)):
+            if not client.available():
+                continue
+            try:
+                embeddings = cache.get_or_compute_many(
+                    client.embedding_model, texts,
+                    lambda missing: client.embed_batch(missing, size),
+                    cached=cached if client is self.localai else None)
+                return {"provider": name, "embeddings": embeddings}
+            except:
+                pass
+
+        return {"provider": None, "embeddings": [None] * len(texts),
+                "error": "No embedding provider available"}
+
     def get_stats(self) -> Dict[str, Any]:
         """Get routing statistics."""
-        conn = sqlite3.connect(ROUTER_DB)
+        write_behind.flush(ROUTER_DB)
+        conn = db_pool.connect(ROUTER_DB)
 
         # Provider distribution
         cursor = conn.execute("""
@@ -761,7 +832,7 @@ class CascadeRouter:
 
     def _log_escalation(self, task_type: TaskType, from_provider: Provider, to_provider: Provider):
         """Log escalation event for analysis."""
-        conn = sqlite3.connect(ROUTER_DB)
+        conn = db_pool.connect(ROUTER_DB)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS escalations (
                 id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -781,7 +852,8 @@ class CascadeRouter:
 
 def get_routing_summary() -> Dict[str, Any]:
     """Get comprehensive routing statistics including savings."""
-    conn = sqlite3.connect(ROUTER_DB)
+    write_behind.flush(ROUTER_DB)
+    conn = db_pool.connect(ROUTER_DB)
 
     # Total by provider
     cursor = conn.execute("""
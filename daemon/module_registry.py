@@ -11,13 +11,14 @@ Tracks ALL integrated modules/repos/patterns with:
 Run periodically to surface unused capabilities.
 """
 
-import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from dataclasses import dataclass
 
+import db_pool
+
 DB_PATH = Path(__file__).parent / "module_registry.db"
 
 @dataclass
@@ -120,7 +121,7 @@ INTEGRATED_MODULES = [
 ]
 
 def init_db():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS modules (
             id TEXT PRIMARY KEY,
@@ -150,7 +151,7 @@ def init_db():
 def sync_modules():
     """Sync hardcoded modules to database."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
 
     for m in INTEGRATED_MODULES:
         conn.execute("""
@@ -168,7 +169,7 @@ def sync_modules():
 
 def log_usage(module_id: str, context: str = ""):
     """Log module usage."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.execute("""
         INSERT INTO usage_log (module_id, timestamp, context) VALUES (?, ?, ?)
     """, (module_id, datetime.now().isoformat(), context))
@@ -180,7 +181,7 @@ def log_usage(module_id: str, context: str = ""):
 
 def get_dormant_modules(days: int = 7) -> List[Dict]:
     """Get modules not used in N days."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cutoff = (datetime.now() - timedelta(days=days)).isoformat()
     cursor = conn.execute("""
         SELECT id, name, source_repo, category, description, last_used
@@ -197,7 +198,7 @@ def get_dormant_modules(days: int = 7) -> List[Dict]:
 
 def get_module_stats() -> Dict:
     """Get module registry stats."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
 
     cursor = conn.execute("SELECT status, COUNT(*) FROM modules GROUP BY status")
     by_status = {r[0]: r[1] for r in cursor.fetchall()}
@@ -5,7 +5,8 @@ import sys
 from pathlib import Path
 from datetime import datetime
 import json
-import sqlite3
+
+import db_pool
 
 PROJECT_ROOT = Path(__file__).parent.parent
 
@@ -76,6 +77,11 @@ def check_databases():
 
     print(f"Total: {total_size:.1f} KB")
 
+    from db_consolidate import pending_sources
+    pending = pending_sources()
+    if pending:
+        print(f"Not yet consolidated: {len(pending)} (python daemon/db_consolidate.py --plan)")
+
     # Check key databases
     key_dbs = {
         'utf_knowledge.db': ['sources', 'excerpts', 'claims', 'concepts'],
@@ -85,9 +91,9 @@ def check_databases():
 
     for db_name, tables in key_dbs.items():
         db_path = daemon_dir / db_name
-        if db_path.exists():
+        if db_pool.exists(db_path):
             try:
-                conn = sqlite3.connect(db_path)
+                conn = db_pool.connect(db_path)
                 c = conn.cursor()
                 for table in tables:
                     c.execute(f"SELECT COUNT(*) FROM {table}")
@@ -104,12 +110,12 @@ def check_utf_knowledge():
     print("\n=== UTF KNOWLEDGE ===")
     db_path = PROJECT_ROOT / "daemon" / "utf_knowledge.db"
 
-    if not db_path.exists():
+    if not db_pool.exists(db_path):
         print("WARN: utf_knowledge.db not found")
         return 0, 1
 
     try:
-        conn = sqlite3.connect(db_path)
+        conn = db_pool.connect(db_path)
         c = conn.cursor()
 
         c.execute("SELECT COUNT(*) FROM sources")
@@ -15,7 +15,6 @@ This is the BRAIN that coordinates everything automatically.
 import os
 import sys
 import json
-import sqlite3
 import hashlib
 from datetime import datetime, timedelta
 from pathlib import Path
@@ -27,6 +26,7 @@ from enum import Enum
 DAEMON_DIR = Path(__file__).parent
 sys.path.insert(0, str(DAEMON_DIR))
 
+import db_pool
 from model_router import ModelRouter, classify_task, TaskType, Provider, CascadeRouter
 
 # WIRED: Swarms for multi-agent orchestration
@@ -96,7 +96,7 @@ class OrchestratorConfig:
 
 def init_db():
     """Initialize orchestrator database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS decisions (
             id TEXT PRIMARY KEY,
@@ -327,7 +327,7 @@ class Orchestrator:
         if not self.config.strategy_evolution:
             return None
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.execute("""
             SELECT id, name, description, fitness, uses
             FROM active_strategies
@@ -353,7 +353,7 @@ class Orchestrator:
                          classification: Dict, strategy: Optional[Dict],
                          result: Dict, latency: int):
         """Record decision for learning."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             INSERT INTO decisions (id, timestamp, task, task_type, provider,
                                    strategy_id, input_tokens, output_tokens,
@@ -397,7 +397,7 @@ class Orchestrator:
         2. Update strategy fitness
         3. Generate improvement suggestions
         """
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
 
         # Get recent decisions
         cursor = conn.execute("""
@@ -466,7 +466,7 @@ class Orchestrator:
 
     def get_stats(self) -> Dict[str, Any]:
         """Get orchestrator statistics."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
 
         # Total decisions
         cursor = conn.execute("SELECT COUNT(*) FROM decisions")
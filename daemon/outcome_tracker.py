@@ -19,7 +19,6 @@ Usage:
     python daemon/outcome_tracker.py patterns --min-success 0.7
 """
 
-import sqlite3
 import json
 import argparse
 from datetime import datetime
@@ -28,6 +27,8 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 import hashlib
 
+import db_pool
+
 DB_PATH = Path(__file__).parent / "outcomes.db"
 
 
@@ -58,7 +59,7 @@ class Pattern:
 
 def init_db():
     """Initialize the outcomes database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''CREATE TABLE IF NOT EXISTS outcomes (
@@ -138,7 +139,7 @@ def record_outcome(
         timestamp=datetime.now().isoformat()
     )
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''INSERT INTO outcomes
@@ -196,8 +197,7 @@ def _update_strategy_feedback(action: str, result: str, context: str, duration_m
 
             # Check if evolution should be triggered (every 10 outcomes)
             from strategy_evolution import DB_PATH as STRATEGY_DB
-            import sqlite3
-            conn = sqlite3.connect(STRATEGY_DB)
+            conn = db_pool.connect(STRATEGY_DB)
             c = conn.cursor()
             c.execute('SELECT COUNT(*) FROM performance')
             perf_count = c.fetchone()[0]
@@ -215,7 +215,7 @@ def _update_strategy_feedback(action: str, result: str, context: str, duration_m
 
 def update_patterns(action: str):
     """Update success patterns after recording an outcome."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Calculate stats for this action
@@ -254,7 +254,7 @@ def query_success_rates(
 ) -> List[Dict]:
     """Query success rates for actions."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     if action_type:
@@ -315,7 +315,7 @@ def query_success_rates(
 def recommend_action(context: str, action_type: Optional[str] = None) -> List[Dict]:
     """Recommend best action for a given context."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     context_hash = hash_context(context)
@@ -365,7 +365,7 @@ def recommend_action(context: str, action_type: Optional[str] = None) -> List[Di
 def get_patterns(min_success_rate: float = 0.7, min_count: int = 3) -> List[Dict]:
     """Get discovered success patterns."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''SELECT action, success_rate, sample_count, avg_duration_ms, context_pattern
@@ -392,7 +392,7 @@ def get_patterns(min_success_rate: float = 0.7, min_count: int = 3) -> List[Dict
 def get_stats() -> Dict:
     """Get overall outcome statistics."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''SELECT
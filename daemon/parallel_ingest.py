@@ -18,7 +18,6 @@ import os
 import sys
 import json
 import hashlib
-import sqlite3
 import multiprocessing as mp
 from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
@@ -29,6 +28,8 @@ from queue import Queue
 import threading
 import time
 
+import db_pool
+
 # Import extraction modules
 try:
     from markitdown import MarkItDown
@@ -82,7 +83,7 @@ class ProcessingResult:
 
 def init_db():
     """Initialize parallel ingest database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -117,7 +118,7 @@ def get_pending_files() -> List[Path]:
     if not WATCH_FOLDER.exists():
         return []
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("SELECT file_hash FROM processing_results WHERE success = 1")
     processed_hashes = {row[0] for row in cursor.fetchall()}
@@ -255,7 +256,7 @@ def process_with_llm(doc: PreprocessedDoc) -> ProcessingResult:
 
 def save_result(result: ProcessingResult):
     """Save processing result to database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
     cursor.execute("""
         INSERT OR REPLACE INTO processing_results
@@ -332,7 +333,7 @@ def get_status() -> Dict[str, Any]:
     """Get current processing status."""
     init_db()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("SELECT COUNT(*) FROM processing_results WHERE success = 1")
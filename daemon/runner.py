@@ -19,10 +19,12 @@ from typing import Optional
 # Add parent to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
-from task_queue import TaskQueue, Task, TaskStatus
+import task_wakeup
+import write_behind
+from task_queue import TaskQueue, Task, TaskStatus, default_worker_id
 
 # Configuration
-POLL_INTERVAL = 10  # seconds between queue checks
+POLL_INTERVAL = 10  # fallback re-check: tasks added in another container or on Windows send no wakeup
 MAX_RETRIES = 3     # retries for failed tasks
 CLAUDE_TIMEOUT = 1800  # 30 minutes max per task
 
@@ -49,6 +51,7 @@ class ClaudeRunner:
     def __init__(self, project_dir: Path):
         self.project_dir = project_dir
         self.queue = TaskQueue()
+        self.worker_id = default_worker_id("runner")
         self.running = True
         self.current_task: Optional[Task] = None
 
@@ -60,12 +63,14 @@ class ClaudeRunner:
         """Handle shutdown signals gracefully."""
         logger.info(f"Received signal {signum}, shutting down...")
         self.running = False
+        task_wakeup.notify(self.queue.channel)  # Interrupt wait_for_task()
 
         # Mark current task as failed if interrupted
         if self.current_task:
             self.queue.mark_failed(
                 self.current_task.id,
-                "Interrupted by shutdown signal"
+                "Interrupted by shutdown signal",
+                worker_id=self.worker_id
             )
 
     def execute_task(self, task: Task) -> tuple[bool, str]:
@@ -117,28 +122,26 @@ class ClaudeRunner:
         Returns:
             True if a task was processed, False if queue empty.
         """
-        task = self.queue.get_next_pending()
+        # Atomic claim: other runners can't pick the same task
+        task = self.queue.claim_next(self.worker_id)
         if not task:
             return False
 
         self.current_task = task
         logger.info(f"Starting task: {task.id[:8]} | {task.prompt[:50]}...")
 
-        # Mark as in progress
-        if not self.queue.mark_in_progress(task.id):
-            logger.warning(f"Could not mark task {task.id[:8]} as in progress")
-            self.current_task = None
-            return True  # Still processed (skip it)
-
-        # Execute
-        success, output = self.execute_task(task)
+        # Execute (heartbeat keeps the lease while Claude runs)
+        with self.queue.keep_alive(task.id, self.worker_id):
+            success, output = self.execute_task(task)
 
         # Update status
         if success:
-            self.queue.mark_completed(task.id, output)
-            logger.info(f"Completed task: {task.id[:8]}")
+            if self.queue.mark_completed(task.id, output, worker_id=self.worker_id):
+                logger.info(f"Completed task: {task.id[:8]}")
+            else:
+                logger.warning(f"Lease lost before completion: {task.id[:8]}")
         else:
-            self.queue.mark_failed(task.id, output)
+            self.queue.mark_failed(task.id, output, worker_id=self.worker_id)
             logger.error(f"Failed task: {task.id[:8]} | {output[:100]}")
 
         self.current_task = None
@@ -149,19 +152,15 @@ class ClaudeRunner:
         logger.info("=" * 50)
         logger.info("Claude Runner daemon starting...")
         logger.info(f"Project dir: {self.project_dir}")
-        logger.info(f"Poll interval: {POLL_INTERVAL}s")
+        logger.info(f"Fallback poll interval: {POLL_INTERVAL}s")
         logger.info("=" * 50)
 
         while self.running:
             try:
-                # Check for pending tasks
-                pending = self.queue.get_pending_tasks(limit=1)
-
-                if pending:
-                    self.process_next_task()
-                else:
-                    # No tasks, wait before checking again
-                    time.sleep(POLL_INTERVAL)
+                # Claim and run the next task, if any
+                if not self.process_next_task():
+                    # No tasks: block until add_task() signals (or the fallback timeout)
+                    self.queue.wait_for_task(POLL_INTERVAL)
 
             except KeyboardInterrupt:
                 logger.info("Keyboard interrupt received")
@@ -170,16 +169,13 @@ class ClaudeRunner:
                 logger.error(f"Runner error: {e}")
                 time.sleep(POLL_INTERVAL)
 
+        write_behind.flush()  # Buffered telemetry, in case exit is forced
         logger.info("Claude Runner daemon stopped")
 
     def run_once(self):
         """Process one task and exit (useful for testing)."""
         logger.info("Running single task mode...")
-        pending = self.queue.get_pending_tasks(limit=1)
-
-        if pending:
-            self.process_next_task()
-        else:
+        if not self.process_next_task():
             logger.info("No pending tasks")
 
 
@@ -211,7 +207,7 @@ if __name__ == "__main__":
     parser.add_argument("--once", action="store_true",
                        help="Process one task and exit")
     parser.add_argument("--poll-interval", type=int, default=POLL_INTERVAL,
-                       help=f"Seconds between queue checks (default: {POLL_INTERVAL})")
+                       help=f"Fallback seconds between queue checks when no wakeup arrives (default: {POLL_INTERVAL})")
     args = parser.parse_args()
 
     if args.poll_interval:
@@ -17,7 +17,6 @@ Usage:
 
 import sqlite3
 import json
-import time
 from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Optional, List
@@ -25,6 +24,9 @@ from dataclasses import dataclass
 from enum import Enum
 import sys
 
+import db_pool
+import task_wakeup
+
 sys.path.insert(0, str(Path(__file__).parent))
 from task_queue import TaskQueue, TaskPriority
 
@@ -53,10 +55,11 @@ class TaskScheduler:
     def __init__(self, db_path: Optional[Path] = None):
         self.db_path = db_path or Path(__file__).parent / "scheduler.db"
         self.queue = TaskQueue()
+        self.channel = task_wakeup.channel_for("scheduler", self.db_path)
         self._init_db()
 
     def _init_db(self):
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             CREATE TABLE IF NOT EXISTS scheduled_tasks (
                 id TEXT PRIMARY KEY,
@@ -85,7 +88,7 @@ class TaskScheduler:
         task_id = str(uuid.uuid4())
         next_run = self._calculate_next_run(schedule_type, schedule_value, None)
 
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.execute("""
             INSERT INTO scheduled_tasks (id, name, prompt, schedule_type, schedule_value, priority, next_run)
             VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -94,6 +97,8 @@ class TaskScheduler:
         conn.commit()
         conn.close()
 
+        task_wakeup.notify(self.channel)  # Running scheduler recomputes its next wakeup
+
         return ScheduledTask(
             id=task_id, name=name, prompt=prompt, schedule_type=schedule_type,
             schedule_value=json.dumps(schedule_value), priority=priority,
@@ -101,7 +106,7 @@ class TaskScheduler:
         )
 
     def list_tasks(self) -> List[ScheduledTask]:
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         rows = conn.execute("SELECT * FROM scheduled_tasks ORDER BY next_run").fetchall()
         conn.close()
@@ -122,7 +127,7 @@ class TaskScheduler:
         now = datetime.now()
         submitted = 0
 
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         due_tasks = conn.execute("""
             SELECT * FROM scheduled_tasks
@@ -196,17 +201,37 @@ class TaskScheduler:
 
         return now + timedelta(hours=1)
 
+    def seconds_until_next(self) -> Optional[float]:
+        """Seconds until the earliest enabled task is due (None if none scheduled)."""
+        conn = db_pool.connect(self.db_path)
+        row = conn.execute(
+            "SELECT MIN(next_run) FROM scheduled_tasks WHERE enabled = 1"
+        ).fetchone()
+        conn.close()
+
+        if not row or row[0] is None:
+            return None
+        return max(0.0, (datetime.fromisoformat(row[0]) - datetime.now()).total_seconds())
+
     def run(self, check_interval: int = 60):
-        """Run scheduler loop."""
-        print(f"Scheduler running. Checking every {check_interval}s")
+        """Run scheduler loop.
+
+        Sleeps until the next task is due rather than polling; add() wakes
+        the loop early. check_interval caps a single wait.
+        """
+        print(f"Scheduler running. Waking when tasks are due (max wait {check_interval}s)")
+        waiter = task_wakeup.Waiter(self.channel)
         try:
             while True:
                 submitted = self.check_and_submit()
                 if submitted:
                     print(f"Submitted {submitted} scheduled task(s)")
-                time.sleep(check_interval)
+                due_in = self.seconds_until_next()
+                waiter.wait(check_interval if due_in is None else min(due_in, check_interval))
         except KeyboardInterrupt:
             print("\nScheduler stopped")
+        finally:
+            waiter.close()
 
 
 def parse_interval(s: str) -> int:
@@ -243,7 +268,7 @@ if __name__ == "__main__":
 
     # Run
     run_parser = subparsers.add_parser("run", help="Run scheduler")
-    run_parser.add_argument("--interval", type=int, default=60, help="Check interval in seconds")
+    run_parser.add_argument("--interval", type=int, default=60, help="Max seconds between checks")
 
     args = parser.parse_args()
     scheduler = TaskScheduler()
@@ -17,6 +17,8 @@ from datetime import datetime
 from pathlib import Path
 from typing import List, Tuple, Callable, Optional
 
+import db_pool
+
 DAEMON_DIR = Path(__file__).parent
 
 # Migration format: (version, description, sql_or_callable)
@@ -336,8 +338,8 @@ def migrate_all_databases(verbose: bool = True) -> dict:
     ]
 
     for db_path, db_name, migrations in databases:
-        if db_path.exists():
-            conn = sqlite3.connect(db_path)
+        if db_pool.exists(db_path):
+            conn = db_pool.connect(db_path)
             applied = ensure_schema(conn, db_name, migrations, verbose)
             conn.close()
             results[db_name] = applied
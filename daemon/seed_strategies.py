@@ -1,15 +1,16 @@
 #!/usr/bin/env python3
 """Seed strategies linked to Evolution Plan + Sci-Fi List"""
 
-import sqlite3
 import json
 from pathlib import Path
 from datetime import datetime
 
+import db_pool
+
 DB_PATH = Path(__file__).parent / "strategies.db"
 
 def seed():
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     strategies = [
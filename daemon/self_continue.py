@@ -17,7 +17,6 @@ Usage:
     python daemon/self_continue.py context
 """
 
-import sqlite3
 import json
 import argparse
 from datetime import datetime
@@ -26,13 +25,15 @@ from typing import Dict, List, Optional
 import os
 import glob
 
+import db_pool
+
 DB_PATH = Path(__file__).parent / "continue.db"
 PROJECT_DIR = Path(__file__).parent.parent
 
 
 def init_db():
     """Initialize the continuation database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Checkpoints table - snapshots of work state
@@ -74,7 +75,7 @@ def init_db():
 def save_state(key: str, value: str):
     """Save session state for continuation."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''INSERT OR REPLACE INTO session_state (key, value, updated_at)
@@ -87,7 +88,7 @@ def save_state(key: str, value: str):
 def get_state(key: str) -> Optional[str]:
     """Get session state."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('SELECT value FROM session_state WHERE key = ?', (key,))
@@ -111,7 +112,7 @@ def create_checkpoint(
 
     checkpoint_id = f"chk_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''INSERT INTO checkpoints
@@ -130,7 +131,7 @@ def create_checkpoint(
 def get_latest_checkpoint() -> Optional[Dict]:
     """Get the most recent checkpoint."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''SELECT checkpoint_id, phase, task, status, context, next_actions, blockers, priority, created_at
@@ -157,7 +158,7 @@ def get_latest_checkpoint() -> Optional[Dict]:
 def queue_continuation(source: str, action: str, priority: int = 5, context: str = ""):
     """Add a task to the continuation queue."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     queue_id = f"q_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{hash(action) % 10000}"
@@ -174,7 +175,7 @@ def queue_continuation(source: str, action: str, priority: int = 5, context: str
 def get_pending_continuations() -> List[Dict]:
     """Get pending continuation tasks."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''SELECT queue_id, source, action, priority, context, created_at
@@ -200,7 +201,7 @@ def get_pending_continuations() -> List[Dict]:
 def mark_continuation_done(queue_id: str):
     """Mark a continuation task as completed."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''UPDATE continuation_queue
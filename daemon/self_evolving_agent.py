@@ -24,7 +24,6 @@ Usage:
 import os
 import sys
 import json
-import sqlite3
 import hashlib
 from datetime import datetime
 from pathlib import Path
@@ -32,6 +31,8 @@ from typing import Dict, Any, List, Optional, Callable
 from dataclasses import dataclass, field
 from enum import Enum
 
+import db_pool
+
 DAEMON_DIR = Path(__file__).parent
 sys.path.insert(0, str(DAEMON_DIR))
 
@@ -242,7 +243,7 @@ WORKFLOW_TEMPLATES = {
 
 def init_db():
     """Initialize the self-evolving agent database."""
-    conn = sqlite3.connect(EVOLVING_DB)
+    conn = db_pool.connect(EVOLVING_DB)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS workflows (
             id TEXT PRIMARY KEY,
@@ -319,7 +320,7 @@ class PromptEvolver:
     """
 
     def __init__(self):
-        self.conn = sqlite3.connect(EVOLVING_DB)
+        self.conn = db_pool.connect(EVOLVING_DB)
 
     def refine_prompt(self, node_id: str, workflow_id: str,
                       original_prompt: str, feedback: str,
@@ -445,7 +446,7 @@ class WorkflowEvolver:
     """
 
     def __init__(self):
-        self.conn = sqlite3.connect(EVOLVING_DB)
+        self.conn = db_pool.connect(EVOLVING_DB)
 
     def evolve_workflow(self, workflow: Workflow,
                         execution_results: Dict[str, bool]) -> Workflow:
@@ -583,7 +584,7 @@ class SelfEvolvingAgent:
     def __init__(self):
         self.prompt_evolver = PromptEvolver()
         self.workflow_evolver = WorkflowEvolver()
-        self.conn = sqlite3.connect(EVOLVING_DB)
+        self.conn = db_pool.connect(EVOLVING_DB)
 
     def generate_workflow(self, goal: str,
                           template: Optional[str] = None) -> Workflow:
@@ -21,6 +21,8 @@ from typing import Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, asdict
 from enum import Enum
 
+import db_pool
+
 # Database path
 DB_PATH = Path(__file__).parent / "self_improvement.db"
 
@@ -111,7 +113,7 @@ class SessionAnalysis:
 
 def init_db():
     """Initialize the self-improvement database"""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -195,7 +197,7 @@ class SelfImprovementEngine:
 
     def __init__(self):
         init_db()
-        self.conn = sqlite3.connect(DB_PATH)
+        self.conn = db_pool.connect(DB_PATH)
         self.conn.row_factory = sqlite3.Row
 
     def close(self):
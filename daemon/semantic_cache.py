@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Semantic Cache - Query-similarity cache backed by an embedding index.
+
+MemoryRouter used to look for a similar cached query by listing up to 50
+cache keys and comparing each one (two encodes, or Jaccard, per key). Past
+50 keys it simply missed. SemanticCache instead keeps the embeddings of
+cached queries in an in-process EmbeddingMatrix (vector_index):
+
+- Entries (query, value, meta, embedding) live in the shared Dragonfly
+  cache (cache_client) with a TTL, so every process sees them
+- Lookup: exact-key GET first, then one embedding of the query and one
+  matrix-vector product against all cached queries
+- Similarity band: >= SEMANTIC_CACHE_HIGH is a hit; between
+  SEMANTIC_CACHE_LOW and HIGH is the gray zone, a hit only for caches
+  created with gray_ok=True
+- Expired entries leave the index on lookup and on each refresh; the index
+  picks up other processes' entries every SEMANTIC_CACHE_REFRESH seconds
+- Hit/miss counters per namespace (stats())
+
+Embeddings come from sentence-transformers when installed (through the
+shared embedding_cache); otherwise from hashed bag-of-words vectors, whose
+cosine is a word-overlap score like the old Jaccard fallback.
+
+Usage:
+    from semantic_cache import SemanticCache
+
+    cache = SemanticCache("memory_router", ttl=300, gray_ok=True)
+    cache.set("how does WAL work", results, meta={"k": 10})
+    hit = cache.get("how does the WAL work", accept=lambda meta: meta["k"] >= 10)
+    if hit:
+        results, similarity = hit.value, hit.similarity
+"""
+
+import base64
+import hashlib
+import json
+import re
+import threading
+import time
+import zlib
+from array import array
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from cache_client import cache as shared_cache
+from config import cfg
+from embedding_cache import (DEFAULT_MODEL_NAME, SENTENCE_TRANSFORMERS_AVAILABLE,
+                             embed_texts, normalize_text)
+from vector_index import EmbeddingMatrix
+
+HASHED_MODEL_NAME = "hashed-bow-512"
+HASHED_DIM = 512
+KEY_PREFIX = "claude:semantic:"
+CANDIDATES = 5  # Nearest cached queries checked per lookup
+
+STOP_WORDS = {'the', 'a', 'an', 'is', 'are', 'was', 'were', 'be', 'been',
+              'to', 'of', 'and', 'or', 'in', 'on', 'at', 'for', 'with'}
+
+
+def _hashed_embedding(text: str) -> List[float]:
+    """Bag of words hashed into HASHED_DIM buckets (stop words dropped)."""
+    vector = [0.0] * HASHED_DIM
+    for word in set(re.findall(r"\w+", text.lower())) - STOP_WORDS:
+        bucket = zlib.crc32(word.encode("utf-8")) % HASHED_DIM
+        vector[bucket] = 1.0
+    return vector
+
+
+def _model_embedding(text: str) -> Optional[List[float]]:
+    return embed_texts([text])[0]
+
+
+def default_embedder():
+    """(model name, embed function) used when a cache isn't given one."""
+    if SENTENCE_TRANSFORMERS_AVAILABLE:
+        return DEFAULT_MODEL_NAME, _model_embedding
+    return HASHED_MODEL_NAME, _hashed_embedding
+
+
+def _pack(vector: List[float]) -> str:
+    return base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+
+
+def _unpack(data: str) -> List[float]:
+    return array("f", base64.b64decode(data)).tolist()
+
+
+@dataclass
+class CacheHit:
+    """A cached value and how it matched."""
+    value: Any
+    query: str             # The cached query that matched
+    similarity: float      # 1.0 for exact matches
+    kind: str              # "exact", "semantic" or "gray"
+    meta: Dict[str, Any]
+
+
+class SemanticCache:
+    """Namespaced semantic cache; see module docstring."""
+
+    def __init__(
+        self,
+        namespace: str,
+        ttl: int = 1800,
+        gray_ok: bool = False,
+        high: Optional[float] = None,
+        low: Optional[float] = None,
+        max_entries: Optional[int] = None,
+        embedder: Optional[Callable[[str], List[float]]] = None,
+        model_name: Optional[str] = None,
+        store=None
+    ):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.gray_ok = gray_ok
+        self.high = cfg.SEMANTIC_CACHE_HIGH if high is None else high
+        self.low = cfg.SEMANTIC_CACHE_LOW if low is None else low
+        self.max_entries = max_entries or cfg.SEMANTIC_CACHE_MAX_ENTRIES
+        if embedder is None:
+            model_name, embedder = default_embedder()
+        self.model_name = model_name or "custom"
+        self._embed = embedder
+        self._store = store or shared_cache
+        self._index = EmbeddingMatrix()
+        self._expires: Dict[str, float] = {}   # key -> expiry (epoch seconds)
+        self._skipped: Dict[str, float] = {}   # key -> expiry, left out of a full index
+        self._lock = threading.Lock()
+        self._last_refresh = 0.0
+        self._stats = {"exact_hits": 0, "semantic_hits": 0, "gray_hits": 0,
+                       "gray_rejected": 0, "misses": 0, "writes": 0}
+
+    # ------------------------------------------------------------------
+    # Keys and entries
+    # ------------------------------------------------------------------
+
+    @property
+    def prefix(self) -> str:
+        return f"{KEY_PREFIX}{self.namespace}:"
+
+    def key(self, query: str) -> str:
+        """Store key of a query (hash of its normalized, lowercased text)."""
+        digest = hashlib.sha256(normalize_text(query).lower().encode("utf-8")).hexdigest()[:16]
+        return f"{self.prefix}{digest}"
+
+    def _load(self, key: str) -> Optional[Dict]:
+        data = self._store.get(key)
+        if not data:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    def _count(self, field: str):
+        with self._lock:
+            self._stats[field] += 1
+
+    # ------------------------------------------------------------------
+    # Index maintenance
+    # ------------------------------------------------------------------
+
+    def _index_entry(self, key: str, vector: List[float], expires_at: float):
+        with self._lock:
+            if key not in self._expires and len(self._expires) >= self.max_entries:
+                # Full: keep the entries that live longest. An entry expiring
+                # before all of them stays out (still an exact-key hit);
+                # re-adding it would evict another on every refresh
+                oldest = min(self._expires, key=self._expires.get)
+                if self._expires[oldest] >= expires_at:
+                    self._skipped[key] = expires_at
+                    return
+                self._skipped[oldest] = self._expires.pop(oldest)
+                self._index.remove(oldest)
+            self._skipped.pop(key, None)
+            self._expires[key] = expires_at
+        self._index.upsert(key, vector)
+
+    def _drop(self, key: str):
+        with self._lock:
+            self._expires.pop(key, None)
+        self._index.remove(key)
+
+    def _refresh(self, force: bool = False):
+        """Drop expired keys; add entries other processes wrote since the last refresh."""
+        now = time.time()
+        if not force and now - self._last_refresh < cfg.SEMANTIC_CACHE_REFRESH:
+            return
+        self._last_refresh = now
+
+        with self._lock:
+            expired = [k for k, t in self._expires.items() if t <= now]
+            # Skipped entries aren't fetched again until they expire
+            self._skipped = {k: t for k, t in self._skipped.items() if t > now}
+            known = self._expires.keys() | self._skipped.keys()
+        for key in expired:
+            self._drop(key)
+
+        new_keys = [k for k in self._store.scan_iter(f"{self.prefix}*") if k not in known]
+        for i in range(0, len(new_keys), 500):
+            chunk = new_keys[i:i + 500]
+            for key, data in zip(chunk, self._store.mget(chunk)):
+                try:
+                    entry = json.loads(data) if data else None
+                except ValueError:
+                    entry = None
+                if entry and entry.get("model") == self.model_name and entry.get("embedding"):
+                    self._index_entry(key, _unpack(entry["embedding"]),
+                                      entry.get("expires_at", now + self.ttl))
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+
+    def get(self, query: str, accept: Optional[Callable[[Dict], bool]] = None) -> Optional[CacheHit]:
+        """
+        Cached value for query or a similar one. accept(meta) can reject
+        candidates (e.g. cached with fewer results than needed).
+        """
+        accept = accept or (lambda meta: True)
+        try:
+            entry = self._load(self.key(query))
+            if entry and accept(entry.get("meta", {})):
+                self._count("exact_hits")
+                return CacheHit(entry["value"], entry["query"], 1.0, "exact", entry.get("meta", {}))
+
+            self._refresh()
+            if not len(self._index):
+                self._count("misses")
+                return None
+
+            vector = self._embed(normalize_text(query))
+            for key, similarity in self._index.search(vector, k=CANDIDATES):
+                if similarity < self.low:
+                    break  # Best first: the rest are lower
+                with self._lock:
+                    expired = self._expires.get(key, 0) <= time.time()
+                entry = None if expired else self._load(key)
+                if entry is None:
+                    self._drop(key)
+                    continue
+                if not accept(entry.get("meta", {})):
+                    continue
+                if similarity < self.high and not self.gray_ok:
+                    self._count("gray_rejected")
+                    break
+                kind = "semantic" if similarity >= self.high else "gray"
+                self._count(f"{kind}_hits")
+                return CacheHit(entry["value"], entry["query"], similarity, kind, entry.get("meta", {}))
+        except Exception:
+            pass
+        self._count("misses")
+        return None
+
+    def set(self, query: str, value: Any, meta: Optional[Dict] = None, ttl: Optional[int] = None) -> bool:
+        """Cache value (JSON-serializable) for query."""
+        ttl = ttl or self.ttl
+        try:
+            vector = self._embed(normalize_text(query))
+            expires_at = time.time() + ttl
+            key = self.key(query)
+            entry = {
+                "query": query,
+                "value": value,
+                "meta": meta or {},
+                "model": self.model_name,
+                "embedding": _pack(vector),
+                "cached_at": datetime.now().isoformat(),
+                "expires_at": expires_at,
+            }
+            if not self._store.set(key, json.dumps(entry), ttl):
+                return False
+            self._index_entry(key, vector, expires_at)
+            self._count("writes")
+            return True
+        except Exception:
+            return False
+
+    def invalidate(self, query: str):
+        key = self.key(query)
+        self._store.delete(key)
+        self._drop(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters (this process), index size and the similarity band."""
+        with self._lock:
+            counts = dict(self._stats)
+            indexed = len(self._expires)
+        hits = counts["exact_hits"] + counts["semantic_hits"] + counts["gray_hits"]
+        lookups = hits + counts["misses"]
+        return {
+            "namespace": self.namespace,
+            **counts,
+            "hit_rate": f"{(hits / lookups * 100) if lookups else 0:.1f}%",
+            "indexed": indexed,
+            "model": self.model_name,
+            "band": [self.low, self.high],
+            "gray_ok": self.gray_ok,
+        }
+
+
+if __name__ == "__main__":
+    import sys
+
+    ns = sys.argv[1] if len(sys.argv) > 1 else "selftest"
+    cache = SemanticCache(ns, ttl=60, gray_ok=True)
+    if ns == "selftest":
+        cache.set("how does sqlite wal mode work", {"answer": 1}, meta={"k": 5})
+        for q in ("how does sqlite wal mode work", "How does SQLite WAL mode work?",
+                  "sqlite wal mode", "python packaging"):
+            hit = cache.get(q)
+            print(f"{q!r}: {(hit.kind, round(hit.similarity, 3)) if hit else None}")
+    else:
+        cache._refresh(force=True)
+    print(json.dumps(cache.stats(), indent=2))
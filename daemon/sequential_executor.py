@@ -18,7 +18,6 @@ import sys
 import json
 import subprocess
 import uuid
-import sqlite3
 import hashlib
 import logging
 from pathlib import Path
@@ -26,6 +25,8 @@ from datetime import datetime
 from typing import Optional, Dict, List, Any
 from dataclasses import dataclass
 
+import db_pool
+
 DAEMON_DIR = Path(__file__).parent
 PROJECT_DIR = DAEMON_DIR.parent
 DB_PATH = DAEMON_DIR / "sequential_executor.db"
@@ -49,7 +50,7 @@ logger = logging.getLogger(__name__)
 
 def init_db():
     """Initialize database for tracking executions."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     conn.executescript("""
         CREATE TABLE IF NOT EXISTS sequential_tasks (
             id TEXT PRIMARY KEY,
@@ -392,7 +393,7 @@ class SequentialExecutor:
 
     def _record_task(self, task_id: str, prompt: str):
         """Record task in database."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             INSERT OR REPLACE INTO sequential_tasks (id, prompt, status, created_at)
             VALUES (?, ?, 'running', ?)
@@ -402,7 +403,7 @@ class SequentialExecutor:
 
     def _update_task(self, task_id: str, status: str, result: str = None, error: str = None):
         """Update task status."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             UPDATE sequential_tasks
             SET status = ?, iterations = ?, completed_at = ?, final_result = ?, error = ?
@@ -413,7 +414,7 @@ class SequentialExecutor:
 
     def _record_tool(self, task_id: str, tool: ToolCall, result: Dict):
         """Record tool execution."""
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         conn.execute("""
             INSERT INTO tool_executions (task_id, iteration, tool_name, tool_input, tool_result, timestamp)
             VALUES (?, ?, ?, ?, ?, ?)
@@ -457,7 +458,7 @@ def main():
         print(result)
 
     elif args.action == 'status':
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         cursor = conn.execute("""
             SELECT id, status, iterations, created_at
             FROM sequential_tasks
@@ -49,6 +49,8 @@ from dataclasses import dataclass, asdict, field
 from enum import Enum
 import statistics
 
+import db_pool
+
 DB_PATH = Path(__file__).parent / "strategies.db"
 
 
@@ -158,7 +160,7 @@ class Moat:
 
 def init_db():
     """Initialize the strategies database with comprehensive schema."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Strategies table
@@ -310,7 +312,7 @@ def create_strategy(
         metadata=metadata or {}
     )
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''INSERT OR REPLACE INTO strategies
@@ -334,7 +336,7 @@ def create_strategy(
 def get_strategy(strategy_id: str = None, name: str = None) -> Optional[Strategy]:
     """Get a strategy by ID or name."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     if strategy_id:
@@ -373,7 +375,7 @@ def get_strategy(strategy_id: str = None, name: str = None) -> Optional[Strategy
 def update_strategy_status(strategy_id: str, status: str):
     """Update strategy status."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('UPDATE strategies SET status = ?, updated_at = ? WHERE strategy_id = ?',
               (status, datetime.now().isoformat(), strategy_id))
@@ -388,7 +390,7 @@ def list_strategies(
 ) -> List[Strategy]:
     """List strategies with optional filters."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     query = 'SELECT * FROM strategies WHERE 1=1'
@@ -447,7 +449,7 @@ def record_performance(
 
     record_id = f"perf_{datetime.now().strftime('%Y%m%d%H%M%S')}_{random.randint(1000,9999)}"
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''INSERT INTO performance
@@ -679,7 +681,7 @@ def _record_evolution(generation: int, parent_ids: List[str], child_id: str,
                      mutation_type: str, mutation_details: Dict,
                      fitness_before: float, fitness_after: float):
     """Record evolution event."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     evolution_id = f"evo_{datetime.now().strftime('%Y%m%d%H%M%S')}_{random.randint(100,999)}"
@@ -713,7 +715,7 @@ def create_ab_test(strategy_a: str, strategy_b: str, trials: int = 20,
 
     test_id = f"ab_{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''INSERT INTO ab_tests
@@ -732,7 +734,7 @@ def create_ab_test(strategy_a: str, strategy_b: str, trials: int = 20,
 def record_ab_result(test_id: str, strategy_name: str, result: str, duration_ms: int = 0):
     """Record a result for an A/B test."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Get test
@@ -825,7 +827,7 @@ def _norm_cdf(x: float) -> float:
 def get_ab_test_status(test_id: str) -> Dict:
     """Get A/B test status and results."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('SELECT * FROM ab_tests WHERE test_id = ?', (test_id,))
@@ -873,7 +875,7 @@ def create_moat(
     moat_id = f"moat_{hashlib.md5(name.encode()).hexdigest()[:12]}"
     now = datetime.now().isoformat()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''INSERT OR REPLACE INTO moats
@@ -911,7 +913,7 @@ def identify_moats() -> List[Dict]:
             })
 
     # Efficiency moat: Based on avg duration improvements
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''SELECT AVG(duration_ms) FROM performance
@@ -949,7 +951,7 @@ def identify_moats() -> List[Dict]:
 def get_moats() -> List[Dict]:
     """Get all defined moats."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('SELECT * FROM moats ORDER BY strength DESC')
@@ -1017,7 +1019,7 @@ def recommend_strategy(context: str, action_type: str = None) -> List[Dict]:
 def get_status() -> Dict:
     """Get comprehensive strategy system status."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Strategy counts by status
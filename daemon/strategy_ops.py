@@ -27,7 +27,6 @@ Usage:
     python daemon/strategy_ops.py dashboard
 """
 
-import sqlite3
 import json
 import hashlib
 import statistics
@@ -38,6 +37,8 @@ from typing import Dict, List, Optional, Tuple
 from dataclasses import dataclass, asdict
 import math
 
+import db_pool
+
 DB_PATH = Path(__file__).parent / "strategy_ops.db"
 STRATEGY_DB = Path(__file__).parent / "strategies.db"
 
@@ -116,7 +117,7 @@ class CompetitorInsight:
 
 def init_db():
     """Initialize operations database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Deployments
@@ -231,7 +232,7 @@ def _seed_kpis():
          0.6, 0.8, 0.95, "percentage", 0)
     ]
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     for kpi in kpis:
@@ -277,7 +278,7 @@ def deploy_strategy(
         last_health_check=datetime.now().isoformat()
     )
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''INSERT INTO deployments
@@ -300,7 +301,7 @@ def deploy_strategy(
 def _get_strategy_metrics(strategy_id: str) -> Dict:
     """Get metrics from strategy database."""
     try:
-        conn = sqlite3.connect(STRATEGY_DB)
+        conn = db_pool.connect(STRATEGY_DB)
         c = conn.cursor()
         c.execute('SELECT metrics FROM strategies WHERE strategy_id = ?', (strategy_id,))
         row = c.fetchone()
@@ -312,7 +313,7 @@ def _get_strategy_metrics(strategy_id: str) -> Dict:
 
 def pause_deployment(deployment_id: str):
     """Pause a deployment."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('UPDATE deployments SET status = "paused" WHERE deployment_id = ?',
               (deployment_id,))
@@ -322,7 +323,7 @@ def pause_deployment(deployment_id: str):
 
 def retire_deployment(deployment_id: str):
     """Retire a deployment."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('UPDATE deployments SET status = "retired" WHERE deployment_id = ?',
               (deployment_id,))
@@ -333,7 +334,7 @@ def retire_deployment(deployment_id: str):
 def list_deployments(environment: str = None, status: str = None) -> List[Dict]:
     """List deployments with optional filters."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     query = 'SELECT * FROM deployments WHERE 1=1'
@@ -381,7 +382,7 @@ def measure_strategy(
 
     # Get performance data from strategy DB
     try:
-        conn = sqlite3.connect(STRATEGY_DB)
+        conn = db_pool.connect(STRATEGY_DB)
         c = conn.cursor()
 
         c.execute('''SELECT result, duration_ms, tokens_used, quality_score
@@ -424,7 +425,7 @@ def measure_strategy(
 
     # Compute scores (normalized 0-100)
     scores = {}
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('SELECT name, target_value, higher_is_better FROM kpi_definitions')
 
@@ -456,7 +457,7 @@ def measure_strategy(
     # Store measurement
     measurement_id = f"meas_{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('''INSERT INTO measurements
         (measurement_id, strategy_id, deployment_id, period_start, period_end,
@@ -511,7 +512,7 @@ def _check_deployment_drift(
     """Check a single deployment for drift."""
 
     # Get baseline from deployment
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('SELECT metrics_baseline FROM deployments WHERE deployment_id = ?',
               (deployment_id,))
@@ -549,7 +550,7 @@ def _check_deployment_drift(
         drift_id = f"drift_{datetime.now().strftime('%Y%m%d%H%M%S')}"
 
         # Record drift event
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         c = conn.cursor()
         c.execute('''INSERT INTO drift_events
             (drift_id, strategy_id, deployment_id, drift_type, severity,
@@ -578,7 +579,7 @@ def _check_deployment_drift(
 def get_drift_history(strategy_id: str = None, resolved: bool = None) -> List[Dict]:
     """Get drift event history."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     query = 'SELECT * FROM drift_events WHERE 1=1'
@@ -613,7 +614,7 @@ def get_drift_history(strategy_id: str = None, resolved: bool = None) -> List[Di
 
 def resolve_drift(drift_id: str, notes: str = ""):
     """Mark a drift event as resolved."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('''UPDATE drift_events SET resolved = 1, resolved_at = ?
                  WHERE drift_id = ?''',
@@ -647,7 +648,7 @@ def analyze_competitor(repo: str) -> List[Dict]:
     for cat_type, cat_name in categories:
         insight_id = f"ins_{repo.replace('/', '_')}_{cat_type}"
 
-        conn = sqlite3.connect(DB_PATH)
+        conn = db_pool.connect(DB_PATH)
         c = conn.cursor()
 
         # Check if already analyzed
@@ -691,7 +692,7 @@ def add_competitor_insight(
 
     insight_id = f"ins_{hashlib.md5(f'{source_repo}{title}'.encode()).hexdigest()[:12]}"
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''INSERT OR REPLACE INTO competitor_insights
@@ -713,7 +714,7 @@ def get_competitor_insights(
 ) -> List[Dict]:
     """Get competitor insights."""
     init_db()
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     query = 'SELECT * FROM competitor_insights WHERE 1=1'
@@ -748,7 +749,7 @@ def get_competitor_insights(
 
 def apply_insight(insight_id: str, strategy_id: str):
     """Mark an insight as applied to a strategy."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('''UPDATE competitor_insights
                  SET applied = 1, applied_strategy = ?
@@ -775,7 +776,7 @@ def get_dashboard() -> Dict:
         "insights": {}
     }
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Deployment summary
@@ -827,7 +828,7 @@ def run_health_check(deployment_id: str) -> Dict:
     failed = 0
 
     # Get deployment info
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('SELECT strategy_id, metrics_baseline FROM deployments WHERE deployment_id = ?',
               (deployment_id,))
@@ -872,7 +873,7 @@ def run_health_check(deployment_id: str) -> Dict:
     check_id = f"hc_{datetime.now().strftime('%Y%m%d%H%M%S')}"
     status = "healthy" if failed == 0 else "degraded" if failed < 2 else "unhealthy"
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
     c.execute('''INSERT INTO health_checks
         (check_id, deployment_id, timestamp, status, checks_passed, checks_failed, details)
@@ -22,12 +22,14 @@ Usage:
 
 import argparse
 import json
-import sqlite3
 import time
 from pathlib import Path
-from datetime import datetime, timedelta
+from datetime import datetime
 from typing import Dict, Any, List, Optional
 
+import db_pool
+import kg_store
+
 # Add daemon to path
 import sys
 sys.path.insert(0, str(Path(__file__).parent))
@@ -41,12 +43,12 @@ except ImportError:
 # Paths
 BOOKS_DB = Path(__file__).parent.parent / ".claude" / "scripts" / "books.db"
 SYNTHESIS_DB = Path(__file__).parent / "synthesis.db"
-KG_FILE = Path.home() / ".claude" / "memory" / "knowledge-graph.jsonl"
+KG_FILE = kg_store.KG_PATH
 
 
 def init_synthesis_db():
     """Initialize synthesis database."""
-    conn = sqlite3.connect(SYNTHESIS_DB)
+    conn = db_pool.connect(SYNTHESIS_DB)
     conn.execute("""
         CREATE TABLE IF NOT EXISTS synthesis_runs (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -86,36 +88,19 @@ def init_synthesis_db():
 
 
 def get_recent_kg_entries(since_hours: int = 24) -> List[Dict]:
-    """Get KG entries added in the last N hours."""
-    entries = []
-    if not KG_FILE.exists():
-        return entries
-
-    cutoff = datetime.now() - timedelta(hours=since_hours)
-
-    with open(KG_FILE) as f:
-        for line in f:
-            try:
-                entry = json.loads(line)
-                # Check timestamp if present
-                if "timestamp" in entry:
-                    entry_time = datetime.fromisoformat(entry["timestamp"])
-                    if entry_time > cutoff:
-                        entries.append(entry)
-                else:
-                    entries.append(entry)  # Include if no timestamp
-            except:
-                pass
-
-    return entries
+    """Get KG entries added or updated in the last N hours."""
+    return [
+        {**entity, "content": f"{entity['name']}: " + "; ".join(entity["observations"])}
+        for entity in kg_store.recent(since_hours)
+    ]
 
 
 def get_book_summaries(limit: int = 10) -> List[Dict]:
     """Get recent book summaries for synthesis."""
-    if not BOOKS_DB.exists():
+    if not db_pool.exists(BOOKS_DB):
         return []
 
-    conn = sqlite3.connect(BOOKS_DB)
+    conn = db_pool.connect(BOOKS_DB)
     cursor = conn.execute("""
         SELECT book_id, level, content, created_at
         FROM summaries
@@ -244,7 +229,7 @@ Format as JSON array:
 
 def store_synthesis_results(run_id: int, synthesis: Dict, connections: List[Dict]):
     """Store synthesis results in database."""
-    conn = sqlite3.connect(SYNTHESIS_DB)
+    conn = db_pool.connect(SYNTHESIS_DB)
 
     # Store meta-learnings
     for learning in synthesis.get("meta_learnings", []):
@@ -299,37 +284,21 @@ def consolidate_kg(router: ModelRouter) -> Dict[str, Any]:
         print("    [SKIP] No KG file found")
         return results
 
-    # Load all KG entries
-    entries = []
-    with open(KG_FILE) as f:
-        for line in f:
-            try:
-                entries.append(json.loads(line))
-            except:
-                pass
-
-    if len(entries) < 10:
-        print(f"    [SKIP] Only {len(entries)} entries - no consolidation needed")
+    kg_stats = kg_store.stats()
+    if kg_stats["entities"] < 10:
+        print(f"    [SKIP] Only {kg_stats['entities']} entries - no consolidation needed")
         return results
 
-    print(f"    Loaded {len(entries)} entries")
-
-    # Group by entity type
-    by_type = {}
-    for e in entries:
-        etype = e.get("entityType", "unknown")
-        if etype not in by_type:
-            by_type[etype] = []
-        by_type[etype].append(e)
-
-    print(f"    Entity types: {list(by_type.keys())}")
+    print(f"    Loaded {kg_stats['entities']} entities")
+    print(f"    Entity types: {list(kg_stats['by_type'].keys())}")
 
-    # Find potential duplicates (same name or very similar observations)
+    # Find potential duplicates (same name apart from case; exact repeats
+    # are already merged by the KG store)
     seen_names = {}
     potential_dupes = []
 
-    for e in entries:
-        name = e.get("name", "").lower()
+    for e in kg_store.iter_entities():
+        name = e["name"].lower()
         if name in seen_names:
             potential_dupes.append((seen_names[name], e))
             results["duplicates_found"] += 1
@@ -344,7 +313,7 @@ def consolidate_kg(router: ModelRouter) -> Dict[str, Any]:
 
     # Identify consolidation opportunities
     # Group similar concepts for promotion to patterns
-    concept_entries = [e for e in entries if e.get("entityType") == "concept"]
+    concept_entries = list(kg_store.iter_entities("concept"))
     if len(concept_entries) >= 5:
         print(f"    {len(concept_entries)} concepts - checking for patterns...")
 
@@ -440,7 +409,7 @@ def run_synthesis_cycle(router: ModelRouter) -> Dict[str, Any]:
             print(f"    Connections: {results['connections_proposed']}")
 
         # Store results
-        conn = sqlite3.connect(SYNTHESIS_DB)
+        conn = db_pool.connect(SYNTHESIS_DB)
         cursor = conn.execute("""
             INSERT INTO synthesis_runs
             (timestamp, new_entries_processed, patterns_found, connections_proposed,
@@ -489,11 +458,11 @@ def run_synthesis_cycle(router: ModelRouter) -> Dict[str, Any]:
 
 def show_status():
     """Show synthesis status."""
-    if not SYNTHESIS_DB.exists():
+    if not db_pool.exists(SYNTHESIS_DB):
         print("[STATUS] No synthesis runs yet")
         return
 
-    conn = sqlite3.connect(SYNTHESIS_DB)
+    conn = db_pool.connect(SYNTHESIS_DB)
 
     # Recent runs
     cursor = conn.execute("""
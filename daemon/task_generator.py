@@ -21,7 +21,6 @@ Usage:
     python daemon/task_generator.py daemon --interval 3600
 """
 
-import sqlite3
 import json
 import argparse
 import subprocess
@@ -33,13 +32,15 @@ import glob
 import hashlib
 import time
 
+import db_pool
+
 DB_PATH = Path(__file__).parent / "generated_tasks.db"
 PROJECT_DIR = Path(__file__).parent.parent
 
 
 def init_db():
     """Initialize the generated tasks database."""
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''CREATE TABLE IF NOT EXISTS generated_tasks (
@@ -93,7 +94,7 @@ def add_generated_task(
 
     task_id = generate_task_id(title)
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Check for duplicate (same title in pending)
@@ -117,7 +118,7 @@ def log_opportunity_detection(detector: str, findings: Dict, tasks_generated: in
     """Log an opportunity detection run."""
     init_db()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     log_id = f"log_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{detector}"
@@ -255,15 +256,15 @@ def detect_schema_drift() -> List[Dict]:
     """Detect potential database schema issues."""
     tasks = []
 
-    # Look for ALTER TABLE commands in recent session
-    daemon_dir = PROJECT_DIR / "daemon"
-    db_files = list(daemon_dir.glob("*.db"))
+    # Per-module databases that db_consolidate has not merged yet
+    from db_consolidate import pending_sources
+    pending = pending_sources()
 
-    if len(db_files) > 3:
+    if len(pending) > 3:
         tasks.append({
             "category": "architecture",
             "title": "Consolidate database files",
-            "description": f"Found {len(db_files)} database files in daemon/. Consider consolidating or documenting the schema.",
+            "description": f"{len(pending)} database files in daemon/ are not consolidated yet. Run db_consolidate.py --plan, then --execute with the daemons stopped.",
             "rationale": "Multiple databases increase complexity and risk of inconsistency.",
             "priority": 4,
             "effort": "high"
@@ -356,7 +357,7 @@ def detect_knowledge_gaps() -> List[Dict]:
     tasks = []
 
     try:
-        conn = sqlite3.connect(PROJECT_DIR / "daemon" / "utf_knowledge.db")
+        conn = db_pool.connect(PROJECT_DIR / "daemon" / "utf_knowledge.db")
         c = conn.cursor()
 
         c.execute('SELECT COUNT(*) FROM sources')
@@ -437,7 +438,7 @@ def get_pending_tasks() -> List[Dict]:
     """Get all pending generated tasks."""
     init_db()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''SELECT task_id, category, title, description, rationale, priority, effort, source, created_at
@@ -467,7 +468,7 @@ def approve_task(task_id: str) -> bool:
     """Approve a generated task and add to execution queue."""
     init_db()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     # Get task details first
@@ -496,7 +497,8 @@ def approve_task(task_id: str) -> bool:
             pri_map = {1: TaskPriority.URGENT, 2: TaskPriority.HIGH, 3: TaskPriority.NORMAL, 4: TaskPriority.LOW, 5: TaskPriority.LOW}
             tq.add_task(
                 prompt=f"{title}\n\n{description}",
-                priority=pri_map.get(priority, TaskPriority.NORMAL)
+                priority=pri_map.get(priority, TaskPriority.NORMAL),
+                source="emergent"
             )
         except Exception as e:
             print(f"Warning: Could not add to task queue: {e}")
@@ -508,7 +510,7 @@ def reject_task(task_id: str, reason: str = "") -> bool:
     """Reject a generated task."""
     init_db()
 
-    conn = sqlite3.connect(DB_PATH)
+    conn = db_pool.connect(DB_PATH)
     c = conn.cursor()
 
     c.execute('''UPDATE generated_tasks SET status = 'rejected', reviewed_at = ?, rejection_reason = ?
@@ -3,17 +3,44 @@
 
 Based on sleepless-agent patterns but simplified.
 No over-engineering - just what we need.
+
+Workers take tasks with claim_next()/claim_many(): one UPDATE ... RETURNING
+marks the task in_progress and records a lease (worker_id + expiry), so
+concurrent workers never get the same task. A worker extends its lease with
+heartbeat() (or keep_alive() around the work); if it dies, the lease runs
+out and the task becomes claimable again - no periodic stale-task sweep.
+A task whose lease has run out max_attempts times is marked failed instead
+of being handed out again, so one poison task can't loop forever.
+
+add_task() wakes idle workers through task_wakeup; workers block in
+wait_for_task() instead of polling.
+
+Which task a claim gets is decided by fair_scheduler: weighted-fair across
+sources (interactive, scheduled, emergent, ingest), priority with aging,
+and per-type concurrency caps. wait_stats() reports queue wait times.
 """
 
 import sqlite3
 import json
+import os
+import socket
+import threading
+import time
 import uuid
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime
 from enum import Enum
 from typing import Optional, List, Dict, Any
 from dataclasses import dataclass, asdict
 
+import db_pool
+import task_wakeup
+from fair_scheduler import Candidate, FairScheduler, classify_source, wait_summary
+
+DEFAULT_LEASE_SECONDS = 300
+MAX_ATTEMPTS = 3  # Claims before a task whose lease keeps expiring is failed
+
 
 class TaskStatus(str, Enum):
     PENDING = "pending"
@@ -42,6 +69,11 @@ class Task:
     result: Optional[str] = None
     error: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
+    worker_id: Optional[str] = None
+    lease_expires_at: Optional[float] = None
+    attempts: int = 0
+    source: str = "interactive"
+    task_type: Optional[str] = None
 
     def to_dict(self) -> Dict[str, Any]:
         d = asdict(self)
@@ -51,6 +83,7 @@ class Task:
 
     @classmethod
     def from_row(cls, row: sqlite3.Row) -> 'Task':
+        keys = row.keys()
         return cls(
             id=row['id'],
             prompt=row['prompt'],
@@ -61,24 +94,39 @@ class Task:
             completed_at=row['completed_at'],
             result=row['result'],
             error=row['error'],
-            metadata=json.loads(row['metadata']) if row['metadata'] else None
+            metadata=json.loads(row['metadata']) if row['metadata'] else None,
+            worker_id=row['worker_id'] if 'worker_id' in keys else None,
+            lease_expires_at=row['lease_expires_at'] if 'lease_expires_at' in keys else None,
+            attempts=(row['attempts'] or 0) if 'attempts' in keys else 0,
+            source=(row['source'] or "interactive") if 'source' in keys else "interactive",
+            task_type=row['task_type'] if 'task_type' in keys else None
         )
 
 
+def default_worker_id(prefix: str = "worker") -> str:
+    """Worker id unique per host and process."""
+    return f"{prefix}-{socket.gethostname()}-{os.getpid()}"
+
+
 class TaskQueue:
     """Simple SQLite-backed task queue."""
 
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(self, db_path: Optional[Path] = None, scheduler: Optional[FairScheduler] = None,
+                 max_attempts: int = MAX_ATTEMPTS):
         if db_path is None:
             # Default to daemon directory
             db_path = Path(__file__).parent / "tasks.db"
 
         self.db_path = db_path
+        self.scheduler = scheduler or FairScheduler()
+        self.max_attempts = max_attempts
+        self.channel = task_wakeup.channel_for("tasks", db_path)
+        self._waiter: Optional[task_wakeup.Waiter] = None
         self._init_db()
 
     def _init_db(self):
         """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
 
         conn.execute("""
@@ -92,10 +140,29 @@ class TaskQueue:
                 completed_at TEXT,
                 result TEXT,
                 error TEXT,
-                metadata TEXT
+                metadata TEXT,
+                worker_id TEXT,
+                lease_expires_at REAL,
+                heartbeat_at REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                source TEXT NOT NULL DEFAULT 'interactive',
+                task_type TEXT
             )
         """)
 
+        # Lease/scheduling columns for queues created before they existed
+        columns = {row['name'] for row in conn.execute("PRAGMA table_info(tasks)")}
+        for column, decl in (
+            ("worker_id", "TEXT"),
+            ("lease_expires_at", "REAL"),
+            ("heartbeat_at", "REAL"),
+            ("attempts", "INTEGER NOT NULL DEFAULT 0"),
+            ("source", "TEXT NOT NULL DEFAULT 'interactive'"),
+            ("task_type", "TEXT"),
+        ):
+            if column not in columns:
+                conn.execute(f"ALTER TABLE tasks ADD COLUMN {column} {decl}")
+
         conn.execute("""
             CREATE INDEX IF NOT EXISTS idx_tasks_status
             ON tasks(status)
@@ -106,11 +173,31 @@ class TaskQueue:
             ON tasks(priority DESC, created_at ASC)
         """)
 
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tasks_claim
+            ON tasks(status, priority DESC, created_at ASC)
+        """)
+
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tasks_lease
+            ON tasks(status, lease_expires_at)
+        """)
+
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tasks_fair
+            ON tasks(status, source, task_type, priority, created_at)
+        """)
+
+        conn.execute("""
+            CREATE INDEX IF NOT EXISTS idx_tasks_started
+            ON tasks(started_at)
+        """)
+
         conn.commit()
         conn.close()
 
     def _get_conn(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
 
@@ -118,35 +205,58 @@ class TaskQueue:
         self,
         prompt: str,
         priority: TaskPriority = TaskPriority.NORMAL,
-        metadata: Optional[Dict[str, Any]] = None
+        metadata: Optional[Dict[str, Any]] = None,
+        source: Optional[str] = None,
+        task_type: Optional[str] = None
     ) -> Task:
-        """Add a new task to the queue."""
+        """Add a new task to the queue.
+
+        source (interactive/scheduled/emergent/ingest) defaults from
+        metadata["source"]; task_type (metadata["task_type"]) is what
+        concurrency caps apply to.
+        """
         task = Task(
             id=str(uuid.uuid4()),
             prompt=prompt,
             status=TaskStatus.PENDING,
             priority=priority,
             created_at=datetime.now().isoformat(),
-            metadata=metadata
+            metadata=metadata,
+            source=source or classify_source(metadata),
+            task_type=task_type or (metadata or {}).get("task_type")
         )
 
         conn = self._get_conn()
         conn.execute("""
-            INSERT INTO tasks (id, prompt, status, priority, created_at, metadata)
-            VALUES (?, ?, ?, ?, ?, ?)
+            INSERT INTO tasks (id, prompt, status, priority, created_at, metadata, source, task_type)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         """, (
             task.id,
             task.prompt,
             task.status.value,
             task.priority.value,
             task.created_at,
-            json.dumps(task.metadata) if task.metadata else None
+            json.dumps(task.metadata) if task.metadata else None,
+            task.source,
+            task.task_type
         ))
         conn.commit()
         conn.close()
 
+        task_wakeup.notify(self.channel)
         return task
 
+    def wait_for_task(self, timeout: float) -> bool:
+        """Block until a task is added (True) or timeout passes (False).
+
+        The first call only starts listening and returns True at once, so
+        the caller re-checks the queue and nothing added meanwhile is missed.
+        """
+        if self._waiter is None:
+            self._waiter = task_wakeup.Waiter(self.channel)
+            return True
+        return self._waiter.wait(timeout) > 0
+
     def get_next_pending(self) -> Optional[Task]:
         """Get the next pending task (highest priority, oldest first)."""
         conn = self._get_conn()
@@ -173,48 +283,267 @@ class TaskQueue:
 
         return [Task.from_row(row) for row in rows]
 
-    def mark_in_progress(self, task_id: str) -> bool:
-        """Mark a task as in progress."""
+    def claim_next(
+        self,
+        worker_id: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        prompt: Optional[str] = None
+    ) -> Optional[Task]:
+        """Atomically claim the next task chosen by the fair scheduler.
+
+        Pending tasks and in_progress tasks whose lease has expired are
+        claimable. The task is leased to worker_id for lease_seconds; keep
+        it alive with heartbeat() for longer work.
+        """
+        tasks = self.claim_many(worker_id, 1, lease_seconds, prompt)
+        return tasks[0] if tasks else None
+
+    def claim_many(
+        self,
+        worker_id: str,
+        n: int,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS,
+        prompt: Optional[str] = None
+    ) -> List[Task]:
+        """Atomically claim up to n tasks in one transaction (see claim_next).
+
+        prompt restricts the claim to tasks with that exact prompt (e.g. a
+        worker that only handles SUMMARIZE_FILE tasks). Every lease starts
+        now: a worker that processes the tasks one after another must
+        heartbeat all of them, or claim them one at a time with claim_next().
+        """
+        if n <= 0:
+            return []
+        now = time.time()
+        now_dt = datetime.now()
+
         conn = self._get_conn()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            self._fail_exhausted(conn, now, now_dt)
+            candidates = self._candidates(conn, now, now_dt, n, prompt)
+            picked = []
+            if candidates:
+                served = dict(conn.execute("""
+                    SELECT source, COUNT(*) FROM tasks
+                    WHERE started_at >= ?
+                    GROUP BY source
+                """, ((datetime.fromtimestamp(now - self.scheduler.window_seconds)).isoformat(),)).fetchall())
+                running = dict(conn.execute("""
+                    SELECT task_type, COUNT(*) FROM tasks
+                    WHERE status = 'in_progress' AND lease_expires_at >= ?
+                    AND task_type IS NOT NULL
+                    GROUP BY task_type
+                """, (now,)).fetchall())
+                picked = self.scheduler.select(candidates, served, running, n)
+
+            rows = []
+            if picked:
+                placeholders = ",".join("?" * len(picked))
+                rows = conn.execute(f"""
+                    UPDATE tasks
+                    SET status = 'in_progress', worker_id = ?, started_at = ?,
+                        lease_expires_at = ?, heartbeat_at = ?, attempts = attempts + 1
+                    WHERE id IN ({placeholders})
+                    AND (status = 'pending'
+                         OR (status = 'in_progress' AND lease_expires_at < ?))
+                    RETURNING *
+                """, [worker_id, now_dt.isoformat(), now + lease_seconds, now]
+                    + [c.id for c in picked] + [now]).fetchall()
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        order = {c.id: i for i, c in enumerate(picked)}
+        tasks = [Task.from_row(row) for row in rows]
+        tasks.sort(key=lambda t: order[t.id])
+        return tasks
+
+    def _fail_exhausted(self, conn, now: float, now_dt: datetime) -> int:
+        """Fail expired-lease tasks that have used up max_attempts claims."""
         cursor = conn.execute("""
             UPDATE tasks
-            SET status = 'in_progress', started_at = ?
-            WHERE id = ? AND status = 'pending'
-        """, (datetime.now().isoformat(), task_id))
+            SET status = 'failed', completed_at = ?, lease_expires_at = NULL,
+                error = 'Lease expired after ' || attempts || ' attempts'
+            WHERE status = 'in_progress' AND lease_expires_at < ? AND attempts >= ?
+        """, (now_dt.isoformat(), now, self.max_attempts))
+        return cursor.rowcount
+
+    def _candidates(self, conn, now: float, now_dt: datetime, n: int,
+                    prompt: Optional[str]) -> List[Candidate]:
+        """Claimable tasks the scheduler could pick: the oldest n of each
+        (source, type, priority) group, plus tasks with expired leases."""
+        prompt_filter = "AND prompt = ?" if prompt is not None else ""
+        extra = [prompt] if prompt is not None else []
+
+        rows = []
+        groups = conn.execute(f"""
+            SELECT DISTINCT source, task_type, priority FROM tasks
+            WHERE status = 'pending' {prompt_filter}
+        """, extra).fetchall()
+        for group in groups:
+            rows += conn.execute(f"""
+                SELECT id, source, task_type, priority, created_at FROM tasks
+                WHERE status = 'pending' AND source = ? AND task_type IS ? AND priority = ?
+                {prompt_filter}
+                ORDER BY created_at ASC
+                LIMIT ?
+            """, [group['source'], group['task_type'], group['priority']] + extra + [n]).fetchall()
+        rows += conn.execute(f"""
+            SELECT id, source, task_type, priority, created_at FROM tasks
+            WHERE status = 'in_progress' AND lease_expires_at < ? {prompt_filter}
+            ORDER BY lease_expires_at ASC
+            LIMIT 100
+        """, [now] + extra).fetchall()
+
+        return [
+            Candidate(
+                id=row['id'], source=row['source'], task_type=row['task_type'],
+                priority=row['priority'],
+                wait_seconds=(now_dt - datetime.fromisoformat(row['created_at'])).total_seconds()
+            )
+            for row in rows
+        ]
+
+    def heartbeat(
+        self,
+        task_id: str,
+        worker_id: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS
+    ) -> bool:
+        """Extend a claimed task's lease. False if the lease was lost."""
+        now = time.time()
+        conn = self._get_conn()
+        cursor = conn.execute("""
+            UPDATE tasks
+            SET lease_expires_at = ?, heartbeat_at = ?
+            WHERE id = ? AND worker_id = ? AND status = 'in_progress'
+        """, (now + lease_seconds, now, task_id, worker_id))
         conn.commit()
         affected = cursor.rowcount
         conn.close()
 
         return affected > 0
 
-    def mark_completed(self, task_id: str, result: str) -> bool:
-        """Mark a task as completed."""
+    @contextmanager
+    def keep_alive(
+        self,
+        task_id: str,
+        worker_id: str,
+        lease_seconds: float = DEFAULT_LEASE_SECONDS
+    ):
+        """Heartbeat a claimed task from a background thread while the block runs."""
+        stop = threading.Event()
+
+        def beat():
+            while not stop.wait(lease_seconds / 3):
+                try:
+                    if not self.heartbeat(task_id, worker_id, lease_seconds):
+                        return  # Lease lost (completed, cancelled or reclaimed)
+                except sqlite3.Error:
+                    pass  # Busy; retry on the next beat
+
+        thread = threading.Thread(target=beat, name=f"lease-{task_id[:8]}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def release(self, task_id: str, worker_id: str) -> bool:
+        """Give a claimed task back to the queue without finishing it."""
         conn = self._get_conn()
         cursor = conn.execute("""
             UPDATE tasks
-            SET status = 'completed', completed_at = ?, result = ?
-            WHERE id = ? AND status = 'in_progress'
-        """, (datetime.now().isoformat(), result, task_id))
+            SET status = 'pending', worker_id = NULL, started_at = NULL,
+                lease_expires_at = NULL, heartbeat_at = NULL
+            WHERE id = ? AND worker_id = ? AND status = 'in_progress'
+        """, (task_id, worker_id))
         conn.commit()
         affected = cursor.rowcount
         conn.close()
 
+        if affected:
+            task_wakeup.notify(self.channel)
         return affected > 0
 
-    def mark_failed(self, task_id: str, error: str) -> bool:
-        """Mark a task as failed."""
+    def mark_in_progress(self, task_id: str) -> bool:
+        """Mark a task as in progress (unowned; prefer claim_next)."""
+        now = time.time()
         conn = self._get_conn()
         cursor = conn.execute("""
             UPDATE tasks
-            SET status = 'failed', completed_at = ?, error = ?
-            WHERE id = ? AND status = 'in_progress'
-        """, (datetime.now().isoformat(), error, task_id))
+            SET status = 'in_progress', started_at = ?,
+                lease_expires_at = ?, heartbeat_at = ?, attempts = attempts + 1
+            WHERE id = ? AND status = 'pending'
+        """, (datetime.now().isoformat(), now + DEFAULT_LEASE_SECONDS, now, task_id))
+        conn.commit()
+        affected = cursor.rowcount
+        conn.close()
+
+        return affected > 0
+
+    def mark_completed(self, task_id: str, result: str, worker_id: Optional[str] = None) -> bool:
+        """Mark a task as completed (only by its lease holder, if worker_id is given)."""
+        return self._finish(task_id, "completed", "result", result, worker_id)
+
+    def mark_failed(self, task_id: str, error: str, worker_id: Optional[str] = None) -> bool:
+        """Mark a task as failed (only by its lease holder, if worker_id is given)."""
+        return self._finish(task_id, "failed", "error", error, worker_id)
+
+    def _finish(self, task_id: str, status: str, column: str, value: str,
+                worker_id: Optional[str]) -> bool:
+        owner_filter = "AND worker_id = ?" if worker_id is not None else ""
+        params = [status, datetime.now().isoformat(), value, task_id]
+        if worker_id is not None:
+            params.append(worker_id)
+
+        conn = self._get_conn()
+        cursor = conn.execute(f"""
+            UPDATE tasks
+            SET status = ?, completed_at = ?, {column} = ?, lease_expires_at = NULL
+            WHERE id = ? AND status = 'in_progress' {owner_filter}
+        """, params)
         conn.commit()
         affected = cursor.rowcount
         conn.close()
 
         return affected > 0
 
+    def wait_stats(self, hours: float = 1) -> Dict[str, Any]:
+        """Queue wait time per source: pending backlog and waits of recently started tasks."""
+        since = datetime.fromtimestamp(time.time() - hours * 3600).isoformat()
+        now = datetime.now()
+        conn = self._get_conn()
+        pending = conn.execute("""
+            SELECT source, COUNT(*) AS n, MIN(created_at) AS oldest
+            FROM tasks WHERE status = 'pending'
+            GROUP BY source
+        """).fetchall()
+        started = conn.execute("""
+            SELECT source, created_at, started_at
+            FROM tasks WHERE started_at >= ?
+        """, (since,)).fetchall()
+        conn.close()
+
+        stats: Dict[str, Any] = {}
+        for row in pending:
+            stats.setdefault(row['source'], {})["pending"] = row['n']
+            stats[row['source']]["oldest_wait_s"] = round(
+                (now - datetime.fromisoformat(row['oldest'])).total_seconds(), 3)
+        waits: Dict[str, List[float]] = {}
+        for row in started:
+            waits.setdefault(row['source'], []).append(
+                (datetime.fromisoformat(row['started_at'])
+                 - datetime.fromisoformat(row['created_at'])).total_seconds())
+        for source, values in waits.items():
+            stats.setdefault(source, {})["wait"] = wait_summary(values)
+        return stats
+
     def get_task(self, task_id: str) -> Optional[Task]:
         """Get a specific task by ID."""
         conn = self._get_conn()
@@ -267,18 +596,29 @@ class TaskQueue:
         return affected
 
     def reset_stale_tasks(self, minutes: int = 30) -> int:
-        """Reset in_progress tasks that have been stuck for too long."""
+        """Return expired-lease tasks to pending (failing those out of attempts).
+
+        Not needed for correctness any more (claim_next picks up expired
+        leases itself); kept for tasks started before leases existed and
+        so get_pending_tasks() shows abandoned work.
+        """
         conn = self._get_conn()
+        self._fail_exhausted(conn, time.time(), datetime.now())
         cursor = conn.execute("""
             UPDATE tasks
-            SET status = 'pending', started_at = NULL
+            SET status = 'pending', started_at = NULL, worker_id = NULL,
+                lease_expires_at = NULL, heartbeat_at = NULL
             WHERE status = 'in_progress'
-            AND datetime(started_at) < datetime('now', ? || ' minutes')
-        """, (f"-{minutes}",))
+            AND (lease_expires_at < ?
+                 OR (lease_expires_at IS NULL
+                     AND datetime(started_at) < datetime('now', 'localtime', ? || ' minutes')))
+        """, (time.time(), f"-{minutes}"))
         conn.commit()
         affected = cursor.rowcount
         conn.close()
 
+        if affected:
+            task_wakeup.notify(self.channel)
         return affected
 
 
@@ -294,6 +634,8 @@ if __name__ == "__main__":
     add_parser.add_argument("prompt", help="Task prompt")
     add_parser.add_argument("--priority", choices=["low", "normal", "high", "urgent"],
                            default="normal", help="Task priority")
+    add_parser.add_argument("--source", choices=["interactive", "scheduled", "emergent", "ingest"],
+                           default="interactive", help="Scheduling source")
 
     # List tasks
     list_parser = subparsers.add_parser("list", help="List tasks")
@@ -305,6 +647,10 @@ if __name__ == "__main__":
     get_parser = subparsers.add_parser("get", help="Get task details")
     get_parser.add_argument("task_id", help="Task ID")
 
+    # Wait-time stats
+    stats_parser = subparsers.add_parser("stats", help="Queue wait times per source")
+    stats_parser.add_argument("--hours", type=float, default=1, help="Window for started tasks")
+
     # Cancel task
     cancel_parser = subparsers.add_parser("cancel", help="Cancel a pending task")
     cancel_parser.add_argument("task_id", help="Task ID")
@@ -319,7 +665,7 @@ if __name__ == "__main__":
             "high": TaskPriority.HIGH,
             "urgent": TaskPriority.URGENT
         }
-        task = queue.add_task(args.prompt, priority_map[args.priority])
+        task = queue.add_task(args.prompt, priority_map[args.priority], source=args.source)
         print(f"Created task: {task.id}")
 
     elif args.command == "list":
@@ -337,6 +683,9 @@ if __name__ == "__main__":
         else:
             print(f"Task not found: {args.task_id}")
 
+    elif args.command == "stats":
+        print(json.dumps(queue.wait_stats(args.hours), indent=2))
+
     elif args.command == "cancel":
         if queue.cancel_task(args.task_id):
             print(f"Cancelled: {args.task_id}")
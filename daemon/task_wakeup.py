@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Task Wakeup - Cross-process "new work" notifications for queue workers.
+
+Workers used to sleep a fixed POLL_INTERVAL between queue checks: up to a
+full interval of pickup latency per task, and a DB query every interval
+while idle. Instead, producers call notify(channel) after committing work
+and workers block in Waiter.wait(timeout) until notified; the timeout is
+only a fallback (expired leases, rows written by other tools).
+
+Each waiter binds a Unix datagram socket in WAKEUP_DIR/<channel>/;
+notify() sends one byte to every socket there. Sends never block, and
+sockets left behind by dead processes are removed on the next notify.
+Notifications are coalesced - a waiter that was busy wakes immediately
+with everything that arrived meanwhile. Where Unix sockets are not
+available, wait() degrades to a plain sleep.
+
+Wakeups only reach processes that share WAKEUP_DIR (a local temp dir): a
+task added on the host doesn't wake a worker in the container, and on
+Windows nothing is signalled. Keep worker timeouts short enough to serve
+as the pickup latency in those setups.
+
+Usage:
+    import task_wakeup
+
+    channel = task_wakeup.channel_for("tasks", DB_PATH)
+
+    # producer, after commit
+    task_wakeup.notify(channel)
+
+    # worker
+    waiter = task_wakeup.Waiter(channel)
+    while running:
+        if not process_next():
+            waiter.wait(timeout=10)
+"""
+
+import hashlib
+import itertools
+import os
+import select
+import socket
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Optional
+
+import db_pool
+
+SUPPORTED = hasattr(socket, "AF_UNIX") and os.name != "nt"
+WAKEUP_DIR = Path(tempfile.gettempdir()) / f"daemon-wakeup-{os.getuid() if hasattr(os, 'getuid') else 0}"
+
+_ids = itertools.count(1)
+_sender: Optional[socket.socket] = None
+_sender_lock = threading.Lock()
+
+
+def channel_for(name: str, db_path) -> str:
+    """Channel name for a queue stored in db_path (one channel per DB file)."""
+    digest = hashlib.md5(db_pool.resolve(db_path).encode()).hexdigest()[:10]
+    return f"{name}-{digest}"
+
+
+def _get_sender() -> socket.socket:
+    global _sender
+    with _sender_lock:
+        if _sender is None:
+            _sender = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            _sender.setblocking(False)
+        return _sender
+
+
+def notify(channel: str) -> int:
+    """Wake every waiter on channel. Returns the number of waiters signalled."""
+    if not SUPPORTED:
+        return 0
+    directory = WAKEUP_DIR / channel
+    try:
+        names = os.listdir(directory)
+    except OSError:
+        return 0  # Nobody has ever waited on this channel
+
+    sender = _get_sender()
+    signalled = 0
+    for name in names:
+        path = str(directory / name)
+        try:
+            sender.sendto(b"\x01", path)
+            signalled += 1
+        except BlockingIOError:
+            signalled += 1  # Receive buffer full: a wakeup is already pending
+        except (ConnectionRefusedError, FileNotFoundError):
+            try:
+                os.unlink(path)  # Socket of a process that exited
+            except OSError:
+                pass
+        except OSError:
+            pass
+    return signalled
+
+
+class Waiter:
+    """Blocks until one of its channels is notified (or a timeout passes)."""
+
+    def __init__(self, *channels: str):
+        self.channels = channels
+        self._sockets = []
+        if not SUPPORTED:
+            return
+        for channel in channels:
+            directory = WAKEUP_DIR / channel
+            directory.mkdir(parents=True, exist_ok=True, mode=0o700)
+            path = directory / f"{os.getpid()}-{next(_ids)}"
+            if path.exists():
+                path.unlink()  # Left over from a recycled pid
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(str(path))
+            sock.setblocking(False)
+            self._sockets.append((sock, path))
+
+    def wait(self, timeout: float) -> int:
+        """Wait up to timeout seconds. Returns the number of notifications received."""
+        if not self._sockets:
+            time.sleep(timeout)
+            return 0
+        ready, _, _ = select.select([sock for sock, _ in self._sockets], [], [], max(timeout, 0))
+        received = 0
+        for sock in ready:
+            while True:
+                try:
+                    received += len(sock.recv(4096))
+                except (BlockingIOError, InterruptedError):
+                    break
+        return received
+
+    def close(self):
+        for sock, path in self._sockets:
+            sock.close()
+            try:
+                path.unlink()
+            except OSError:
+                pass
+        self._sockets = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+if __name__ == "__main__":
+    import sys
+
+    # Usage: task_wakeup.py notify CHANNEL | wait CHANNEL [TIMEOUT]
+    if len(sys.argv) >= 3 and sys.argv[1] == "notify":
+        print(f"Signalled {notify(sys.argv[2])} waiter(s)")
+    elif len(sys.argv) >= 3 and sys.argv[1] == "wait":
+        timeout = float(sys.argv[3]) if len(sys.argv) > 3 else 60.0
+        with Waiter(sys.argv[2]) as waiter:
+            start = time.time()
+            received = waiter.wait(timeout)
+            print(f"Received {received} notification(s) after {time.time() - start:.3f}s")
+    else:
+        print("Usage: task_wakeup.py notify CHANNEL | wait CHANNEL [TIMEOUT]")
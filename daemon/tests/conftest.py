@@ -0,0 +1,20 @@
+"""Test setup: daemon modules importable as top-level modules, scratch HOME."""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+
+@pytest.fixture(autouse=True)
+def scratch_home(tmp_path, monkeypatch):
+    """Keep ~/.atlas-cache, ~/.claude etc. out of the real home directory."""
+    home = tmp_path / "home"
+    home.mkdir()
+    monkeypatch.setenv("HOME", str(home))
+    # Resolved from the real home when cache_client was imported
+    monkeypatch.setattr("cache_client.FALLBACK_CACHE_DIR", home / ".atlas-cache")
+    monkeypatch.setattr("cache_client.FALLBACK_CACHE_DB", home / ".atlas-cache" / "cache.db")
+    return home
@@ -0,0 +1,125 @@
+"""cache_client: SQLite fallback semantics behind DragonflyCache."""
+
+import hashlib
+import json
+import os
+import time
+
+import pytest
+
+import cache_client
+from cache_client import DragonflyCache, SQLiteFallback
+from config import cfg
+
+
+@pytest.fixture
+def fallback(tmp_path):
+    return SQLiteFallback(tmp_path / "cache.db")
+
+
+@pytest.fixture
+def cache(fallback):
+    return DragonflyCache(client=fallback)
+
+
+def test_values_round_trip_and_expire(cache, fallback):
+    cache.set("plain", "v")
+    cache.set("doc", {"a": 1})
+    fallback.set("gone", "v", ex=-1)  # Already expired
+
+    assert cache.get("plain") == "v"
+    assert cache.get_json("doc") == {"a": 1}
+    assert cache.get("gone") is None
+    assert not cache.exists("gone")
+    assert fallback.dbsize() == 2
+
+
+def test_mget_mset_across_chunks(cache):
+    cache.mset({f"k{i}": i for i in range(1200)})
+
+    values = cache.mget([f"k{i}" for i in range(1200)] + ["missing"])
+
+    assert values[:3] == ["0", "1", "2"] and values[1199] == "1199"
+    assert values[-1] is None
+
+
+def test_hset_merges_fields_and_keeps_ttl(fallback):
+    assert fallback.hset("h", {"a": "1"}) == 1
+    fallback.expire("h", 600)
+    ttl_before = fallback._conn().execute("SELECT expires_at FROM entries WHERE key = 'h'").fetchone()[0]
+
+    assert fallback.hset("h", {"a": "2", "b": "3"}) == 1
+
+    assert fallback.hgetall("h") == {"a": "2", "b": "3"}
+    assert fallback.hget("h", "b") == "3"
+    ttl_after = fallback._conn().execute("SELECT expires_at FROM entries WHERE key = 'h'").fetchone()[0]
+    assert ttl_after == ttl_before
+
+
+def test_scan_iter_pages_through_prefix_range(fallback):
+    for key in ("file:a", "file:b", "file:c", "filex", "other:a"):
+        fallback.set(key, "v")
+
+    assert list(fallback.scan_iter("file:*", count=2)) == ["file:a", "file:b", "file:c"]
+    assert list(fallback.scan_iter("*:a", count=1)) == ["file:a", "other:a"]
+
+
+def test_pipeline_runs_in_one_batch(cache):
+    pipe = cache.pipeline()
+    pipe.set("a", "1").hset("h", {"x": 1}).get("a").hgetall("h")
+
+    assert pipe.execute() == [True, True, "1", {"x": "1"}]
+
+
+def test_instances_on_one_file_share_entries(tmp_path, fallback):
+    other = SQLiteFallback(tmp_path / "cache.db")
+    fallback.set("shared", "v")
+
+    assert other.get("shared") == "v"
+    assert other.delete("shared") == 1
+    assert fallback.get("shared") is None
+
+
+def test_fallback_follows_wal_setting(fallback):
+    journal = fallback._conn().execute("PRAGMA journal_mode").fetchone()[0]
+    assert journal == ("wal" if cfg.SQLITE_WAL else "delete")
+
+
+def test_store_is_opened_on_first_use(scratch_home):
+    db = scratch_home / ".atlas-cache" / "cache.db"
+    fallback = SQLiteFallback()
+    assert not db.exists()
+
+    fallback.set("k", "v")
+    assert db.exists()
+    assert fallback.path == cache_client.FALLBACK_CACHE_DB == db
+
+
+def _legacy(directory, key, payload, age=0.0):
+    file = directory / f"{hashlib.md5(key.encode()).hexdigest()}.json"
+    file.write_text(json.dumps({"key": key, **payload}))
+    then = time.time() - age
+    os.utime(file, (then, then))
+    return file
+
+
+def test_legacy_json_files_are_imported_and_removed(tmp_path):
+    files = [
+        _legacy(tmp_path, "plain", {"value": "v", "ttl": None}),
+        _legacy(tmp_path, "fresh", {"value": "f", "ttl": 3600}, age=60),
+        _legacy(tmp_path, "stale", {"value": "s", "ttl": 10}, age=60),
+        _legacy(tmp_path, "hash", {"mapping": {"a": "1"}}),
+    ]
+    unrelated = tmp_path / "notes.json"
+    unrelated.write_text("{}")
+
+    fallback = SQLiteFallback(tmp_path / "cache.db")
+    assert fallback.get("plain") == "v"
+    assert fallback.get("fresh") == "f"
+    (expires,) = fallback._conn().execute(
+        "SELECT expires_at FROM entries WHERE key = 'fresh'").fetchone()
+    assert expires == pytest.approx(time.time() + 3540, abs=5)
+    assert fallback.get("stale") is None
+    assert fallback.hgetall("hash") == {"a": "1"}
+    assert not any(f.exists() for f in files)
+    assert unrelated.exists()
@@ -0,0 +1,80 @@
+"""cache_compactor: eviction order per policy, run claims, compression."""
+
+import pytest
+
+import cache_compactor
+import db_pool
+
+# key, hit_count, last_hit, created_at, cost; 100 bytes each
+ROWS = [
+    ("k1", 10, "2026-01-01", "2026-01-01", 0),
+    ("k2", 0, None, "2026-01-05", 0),
+    ("k3", 3, "2026-01-02", "2026-01-01", 1000),
+    ("k4", 1, "2026-01-04", "2026-01-01", 10),
+    ("k5", 2, "2026-01-03", "2026-01-01", 0),
+]
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = db_pool.connect(tmp_path / "cache.db")
+    conn.execute("""
+        CREATE TABLE entries (key TEXT PRIMARY KEY, hit_count INTEGER, last_hit TEXT,
+                              created_at TEXT, cost INTEGER, size_bytes INTEGER)
+    """)
+    conn.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?, 100)", ROWS)
+    conn.commit()
+    yield conn
+    conn.close()
+
+
+def _keys(conn):
+    return {row[0] for row in conn.execute("SELECT key FROM entries")}
+
+
+@pytest.mark.parametrize("policy, survivors", [
+    ("lru", {"k2", "k4", "k5"}),   # Newest last_hit (created_at when never hit)
+    ("lfu", {"k1", "k3", "k5"}),   # Most hits
+    ("cost", {"k1", "k3", "k4"}),  # Hits x cost per byte
+])
+def test_evicts_down_to_low_water_in_policy_order(conn, policy, survivors):
+    # 500 stored, budget 350: evict until <= 315 (LOW_WATER), i.e. keep 3 rows
+    deleted = cache_compactor.evict_to_budget(conn, "entries", "key", 350, policy, cost_column="cost")
+
+    assert deleted == 2
+    assert _keys(conn) == survivors
+
+
+def test_table_within_budget_is_untouched(conn):
+    assert cache_compactor.evict_to_budget(conn, "entries", "key", 500) == 0
+    assert len(_keys(conn)) == 5
+
+
+def test_one_claim_per_interval(tmp_path):
+    db = tmp_path / "cache.db"
+
+    assert cache_compactor.claim_run(db, "job", interval=3600)
+    assert not cache_compactor.claim_run(db, "job", interval=3600)
+    assert cache_compactor.claim_run(db, "other", interval=3600)
+    assert cache_compactor.claim_run(db, "job", interval=0)
+
+
+def test_compress_round_trip():
+    small, encoding = cache_compactor.compress("short")
+    assert (small, encoding) == ("short", "")
+
+    text = "response " * 200
+    stored, encoding = cache_compactor.compress(text)
+    assert encoding in ("zstd", "zlib") and len(stored) < len(text)
+    assert cache_compactor.decompress(stored, encoding) == text
+
+
+def test_creating_a_cache_registers_without_starting(tmp_path, monkeypatch):
+    from llm_cache_l2 import LLMCacheL2
+
+    monkeypatch.setattr(cache_compactor, "_jobs", {})
+    monkeypatch.setattr(cache_compactor, "_thread", None)
+    LLMCacheL2(tmp_path / "l2.db")
+
+    assert list(cache_compactor._jobs) == ["llm_cache_l2:l2.db"]
+    assert cache_compactor._thread is None
@@ -0,0 +1,115 @@
+"""claim_similarity: incremental clustering matches brute force; saves merge."""
+
+import json
+import random
+
+import pytest
+
+from claim_similarity import ClaimIndex, ClaimSimilarityIndex, UnionFind, utf_closeness
+
+PARTS = ["cache", "lock", "wal", "shard", "queue", "lease", "vector", "index"]
+TAGS = ["systems", "storage", "ml", "ops"]
+
+
+def _claims(n, seed):
+    rng = random.Random(seed)
+    return [
+        ClaimIndex(
+            claim_id=f"c{seed}_{i}",
+            slug_code="-".join(rng.sample(PARTS, rng.randint(1, 4))),
+            statement=f"claim {i}",
+            source_id=f"paper{rng.randint(0, 5)}",
+            source_title="t",
+            taxonomy_tags=rng.sample(TAGS, rng.randint(0, 2)),
+            claim_form=rng.choice(["causal", "descriptive"]),
+        )
+        for i in range(n)
+    ]
+
+
+def _brute_force(claims, threshold):
+    components = UnionFind()
+    for i, a in enumerate(claims):
+        for b in claims[i + 1:]:
+            if utf_closeness(a, b)["composite"] >= threshold:
+                components.union(a.claim_id, b.claim_id)
+    groups = {}
+    for claim in claims:
+        groups.setdefault(components.find(claim.claim_id), set()).add(claim.claim_id)
+    return {frozenset(g) for g in groups.values() if len(g) > 1}
+
+
+def _clusters(index):
+    return {frozenset(c.claims) for c in index.clusters}
+
+
+@pytest.fixture
+def index(tmp_path):
+    return ClaimSimilarityIndex(db_path=tmp_path / "utf.db", index_path=tmp_path / "claim_index.json")
+
+
+@pytest.mark.parametrize("threshold", [0.15, 0.4, 0.6, 0.8])
+def test_clusters_match_brute_force(index, threshold):
+    claims = _claims(120, seed=1)
+    index.cluster_threshold = threshold
+
+    index.add_claims(claims)
+
+    assert _clusters(index) == _brute_force(claims, threshold)
+
+
+def test_incremental_adds_match_one_batch(index, tmp_path):
+    claims = _claims(150, seed=2)
+    for start in range(0, len(claims), 10):
+        index.add_claims(claims[start:start + 10])
+
+    batch = ClaimSimilarityIndex(index_path=tmp_path / "other.json")
+    batch.add_claims(claims)
+
+    assert _clusters(index) == _clusters(batch) == _brute_force(claims, index.cluster_threshold)
+    assert len({c.cluster_id for c in index.clusters}) == len(index.clusters)
+
+
+def test_save_load_round_trip_and_keeps_linking(index, tmp_path):
+    claims = _claims(80, seed=3)
+    index.add_claims(claims[:60])
+    index.save()
+
+    loaded = ClaimSimilarityIndex(index_path=index.index_path)
+    assert loaded.load()
+    loaded.add_claims(claims[60:])
+
+    assert "\n" not in index.index_path.read_text()  # Compact, not pretty-printed
+    assert _clusters(loaded) == _brute_force(claims, loaded.cluster_threshold)
+
+
+def test_concurrent_saves_keep_both_writers_claims(index):
+    index.save()
+    first = ClaimSimilarityIndex(index_path=index.index_path)
+    second = ClaimSimilarityIndex(index_path=index.index_path)
+    first.load()
+    second.load()
+    claims_a, claims_b = _claims(30, seed=4), _claims(30, seed=5)
+
+    first.add_claims(claims_a)
+    second.add_claims(claims_b)
+    first.save()
+    second.save()
+
+    saved = json.loads(index.index_path.read_text())
+    assert set(saved["claims"]) == {c.claim_id for c in claims_a + claims_b}
+    final = ClaimSimilarityIndex(index_path=index.index_path)
+    final.load()
+    assert _clusters(final) == _brute_force(claims_a + claims_b, final.cluster_threshold)
+
+
+def test_save_if_due_waits_for_the_interval(index):
+    assert not index.save_if_due(interval=0)  # Nothing added
+
+    index.add_claims(_claims(5, seed=6))
+    assert not index.save_if_due(interval=3600)
+    assert not index.index_path.exists()
+
+    assert index.save_if_due(interval=0)
+    assert index.index_path.exists()
+    assert not index.save_if_due(interval=0)
@@ -0,0 +1,96 @@
+"""db_consolidate: online merge, redirects, refusal while sources are open."""
+
+import os
+import sqlite3
+import subprocess
+import sys
+
+import pytest
+
+import db_consolidate
+import db_pool
+from config import cfg
+
+
+@pytest.fixture
+def daemon_dir(tmp_path, monkeypatch):
+    """Point db_consolidate and db_pool's redirects at a scratch daemon dir."""
+    monkeypatch.setattr(cfg, "DAEMON_DIR", tmp_path)
+    monkeypatch.setattr(db_pool, "REDIRECTS_FILE", tmp_path / "db_redirects.json")
+    monkeypatch.setattr(db_pool, "_redirects_mtime", None)
+    monkeypatch.setattr(db_consolidate, "DAEMON_DIR", tmp_path)
+    monkeypatch.setattr(db_consolidate, "REDIRECTS_FILE", tmp_path / "db_redirects.json")
+    monkeypatch.setattr(db_consolidate, "BACKUP_DIR", tmp_path / "db_backup")
+    monkeypatch.setattr(db_consolidate, "DAEMON_PID_FILE", tmp_path / "continuous_executor.pid")
+    monkeypatch.setattr(db_consolidate, "CONSOLIDATION", {"group.db": ["notes.db"]})
+    return tmp_path
+
+
+def _source(path):
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body TEXT)")
+    conn.executemany("INSERT INTO notes (body) VALUES (?)", [("a",), ("b",)])
+    conn.commit()
+    conn.close()
+
+
+def test_merge_redirects_old_path(daemon_dir):
+    _source(daemon_dir / "notes.db")
+    assert db_consolidate.pending_sources() == ["notes.db"]
+
+    status = db_consolidate.migrate_source("group.db", "notes.db", grace=0)
+
+    assert status == "merged"
+    assert not (daemon_dir / "notes.db").exists()
+    assert (daemon_dir / "db_backup" / "notes.db").exists()
+    assert db_consolidate.pending_sources() == []
+    assert db_pool.exists(daemon_dir / "notes.db")
+    conn = db_pool.connect(daemon_dir / "notes.db")
+    assert conn.execute("SELECT body FROM notes ORDER BY id").fetchall() == [("a",), ("b",)]
+    tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    conn.close()
+    assert "_consolidated" not in tables
+
+
+def test_group_journal_mode_follows_config(daemon_dir, monkeypatch):
+    monkeypatch.setattr(cfg, "SQLITE_WAL", False)
+    _source(daemon_dir / "notes.db")
+    db_consolidate.migrate_source("group.db", "notes.db", grace=0)
+
+    conn = sqlite3.connect(daemon_dir / "group.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    conn.close()
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_source_open_in_another_process_is_skipped(daemon_dir):
+    src = daemon_dir / "notes.db"
+    _source(src)
+    holder = subprocess.Popen(
+        [sys.executable, "-c",
+         "import sqlite3, sys; c = sqlite3.connect(sys.argv[1]);"
+         " c.execute('SELECT 1 FROM notes'); print('ready', flush=True); sys.stdin.read()",
+         str(src)],
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        assert holder.stdout.readline().strip() == "ready"
+        status = db_consolidate.migrate_source("group.db", "notes.db", grace=0)
+    finally:
+        holder.stdin.close()
+        holder.wait()
+
+    assert status.startswith(f"skipped: open in {holder.pid}")
+    assert src.exists()
+    assert not (daemon_dir / "group.db").exists()
+    assert db_consolidate.pending_sources() == ["notes.db"]
+
+
+def test_execute_refused_while_daemon_running(daemon_dir):
+    _source(daemon_dir / "notes.db")
+    (daemon_dir / "continuous_executor.pid").write_text(str(os.getpid()))
+
+    db_consolidate.run_consolidation(dry_run=False, grace=0)
+
+    assert (daemon_dir / "notes.db").exists()
+    assert not (daemon_dir / "db_backup").exists()
+    assert db_consolidate.pending_sources() == ["notes.db"]
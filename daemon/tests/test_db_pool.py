@@ -0,0 +1,93 @@
+"""db_pool: connection reuse, per-checkout transactions, pragmas."""
+
+import db_pool
+from config import cfg
+
+
+def _db(tmp_path):
+    path = tmp_path / "pool.db"
+    conn = db_pool.connect(path)
+    conn.execute("CREATE TABLE t (x INTEGER)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_released_connection_is_reused(tmp_path):
+    path = _db(tmp_path)
+    first = db_pool.connect(path)
+    raw = first._entry.conn
+    first.close()
+
+    second = db_pool.connect(path)
+    assert second._entry.conn is raw
+    second.close()
+
+
+def test_nested_checkout_does_not_commit_outer_transaction(tmp_path):
+    path = _db(tmp_path)
+    outer = db_pool.connect(path)
+    outer.execute("INSERT INTO t VALUES (1)")
+
+    inner = db_pool.connect(path)
+    assert inner._entry is not outer._entry
+    inner.execute("SELECT COUNT(*) FROM t").fetchone()
+    inner.commit()
+    inner.close()
+
+    outer.close()  # Uncommitted: rolled back, as with a plain connection
+    check = db_pool.connect(path)
+    assert check.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    check.close()
+
+
+def test_uncommitted_work_rolled_back_on_close(tmp_path):
+    path = _db(tmp_path)
+    conn = db_pool.connect(path)
+    conn.execute("INSERT INTO t VALUES (1)")
+    conn.close()
+
+    conn = db_pool.connect(path)
+    assert not conn.in_transaction
+    assert conn.execute("SELECT COUNT(*) FROM t").fetchone()[0] == 0
+    conn.close()
+
+
+def test_row_factory_is_per_checkout(tmp_path):
+    import sqlite3
+    path = _db(tmp_path)
+    conn = db_pool.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("INSERT INTO t VALUES (7)")
+    conn.commit()
+    assert conn.execute("SELECT x FROM t").fetchone()["x"] == 7
+    conn.close()
+
+    conn = db_pool.connect(path)
+    assert conn.execute("SELECT x FROM t").fetchone() == (7,)
+    conn.close()
+
+
+def test_wal_is_opt_in(tmp_path, monkeypatch):
+    monkeypatch.setattr(cfg, "SQLITE_WAL", False)
+    conn = db_pool.connect(tmp_path / "plain.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "delete"
+    assert conn.execute("PRAGMA synchronous").fetchone()[0] == 2  # FULL
+    conn.close()
+
+    monkeypatch.setattr(cfg, "SQLITE_WAL", True)
+    conn = db_pool.connect(tmp_path / "wal.db")
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_replaced_file_gets_a_fresh_connection(tmp_path):
+    path = _db(tmp_path)
+    db_pool.connect(path).close()
+    path.unlink()
+
+    conn = db_pool.connect(path)
+    conn.execute("CREATE TABLE u (y INTEGER)")
+    conn.commit()
+    conn.close()
+    assert db_pool.exists(path)
@@ -0,0 +1,118 @@
+"""EmbeddingCache: tier promotion, key normalization, batch misses, L2 budget."""
+
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+import write_behind
+from embedding_cache import EmbeddingCache, normalize_text, text_hash
+
+
+@pytest.fixture
+def db(tmp_path):
+    return tmp_path / "embedding_cache.db"
+
+
+def test_l2_hit_is_promoted_to_l1(db):
+    EmbeddingCache(db).put("m", "hello", [1.0, 2.0])
+
+    cache = EmbeddingCache(db)
+    assert cache.get("m", "hello") == [1.0, 2.0]
+    assert cache.get("m", "hello") == [1.0, 2.0]
+    assert (cache.l1_hits, cache.l2_hits, cache.misses) == (1, 1, 0)
+    assert cache.get("other-model", "hello") is None
+    assert cache.misses == 1
+
+
+def test_l1_is_bounded_lru(db):
+    cache = EmbeddingCache(db, l1_size=2)
+    cache.put_many("m", ["a", "b"], [[1.0], [2.0]])
+    cache.get("m", "a")
+    cache.put("m", "c", [3.0])
+
+    assert ("m", text_hash("b")) not in cache._l1
+    assert ("m", text_hash("a")) in cache._l1
+    assert cache.get("m", "b") == [2.0]  # still in L2
+    assert cache.l2_hits == 1
+
+
+def test_keys_are_normalized():
+    assert normalize_text("  café \n\t au  lait ") == "café au lait"
+    assert text_hash("café au lait") == text_hash(" café  au\nlait")
+    assert text_hash("a b") != text_hash("ab")
+
+
+def test_get_or_compute_many_only_computes_misses(db):
+    cache = EmbeddingCache(db)
+    cache.put("m", "known", [0.5])
+    calls = []
+
+    def compute(texts):
+        calls.append(list(texts))
+        return [None if t == "bad" else [float(len(t))] for t in texts]
+
+    result = cache.get_or_compute_many("m", ["new", "known", "bad", "new ", "other"], compute)
+
+    assert calls == [["new", "bad", "other"]]
+    assert result == [[3.0], [0.5], None, [3.0], [5.0]]
+    assert cache.get("m", "bad") is None
+    assert cache.get_or_compute_many("m", ["other", "new"], compute) == [[5.0], [3.0]]
+    assert len(calls) == 1
+
+
+def test_counters_are_consistent_under_threads(db):
+    cache = EmbeddingCache(db)
+    cache.put_many("m", [str(i) for i in range(10)], [[float(i)] for i in range(10)])
+
+    def reader():
+        for _ in range(200):
+            cache.get_many("m", [str(i) for i in range(12)])
+
+    threads = [threading.Thread(target=reader) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    stats = cache.stats()
+    assert stats["l1_hits"] + stats["l2_hits"] == 8 * 200 * 10
+    assert stats["misses"] == 8 * 200 * 2
+
+
+def _set_age(db, text, days):
+    import sqlite3
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE embeddings SET created_at = ?, last_hit = NULL WHERE text_hash = ?",
+                 ((datetime.now() - timedelta(days=days)).isoformat(), text_hash(text)))
+    conn.commit()
+    conn.close()
+
+
+def test_compact_evicts_least_recently_used_to_budget(db):
+    cache = EmbeddingCache(db)
+    texts = [f"t{i}" for i in range(10)]
+    cache.put_many("m", texts, [[float(i)] * 25 for i in range(10)])  # 100 bytes each
+    for i, text in enumerate(texts):
+        _set_age(db, text, 10 - i)
+
+    fresh = EmbeddingCache(db)
+    assert fresh.get("m", "t0") is not None  # oldest row, but just used
+    write_behind.flush(db)
+
+    assert fresh.evict(max_bytes=500) == 6
+    assert fresh.stats()["l2_bytes"] == 400
+    kept = [t for t in texts if EmbeddingCache(db).get("m", t) is not None]
+    assert kept == ["t0", "t7", "t8", "t9"]
+
+
+def test_cleanup_drops_rows_unused_past_ttl(db):
+    cache = EmbeddingCache(db)
+    cache.put_many("m", ["old", "used", "new"], [[1.0], [2.0], [3.0]])
+    _set_age(db, "old", 40)
+    _set_age(db, "used", 40)
+    EmbeddingCache(db).get("m", "used")
+
+    assert cache.cleanup_expired(ttl=0) == 0
+    assert cache.cleanup_expired(ttl=30 * 86400) == 1
+    assert EmbeddingCache(db).get_many("m", ["old", "used", "new"]) == [None, [2.0], [3.0]]
@@ -0,0 +1,63 @@
+"""fair_scheduler: strict priority classes, aging, weighted fairness, caps."""
+
+from fair_scheduler import Candidate, FairScheduler
+
+AGING = 100.0
+
+
+def _sched(**kwargs):
+    kwargs.setdefault("weights", {"interactive": 8.0, "ingest": 1.0})
+    kwargs.setdefault("caps", {})
+    return FairScheduler(aging_seconds=AGING, window_seconds=60, **kwargs)
+
+
+def _c(id, source="interactive", priority=1, wait=0.0, task_type=None):
+    return Candidate(id=id, source=source, task_type=task_type, priority=priority, wait_seconds=wait)
+
+
+def test_higher_priority_wins_over_source_weight():
+    picked = _sched().select([_c("light", "interactive", 1), _c("urgent", "ingest", 2)], n=2)
+    assert [c.id for c in picked] == ["urgent", "light"]
+
+
+def test_aged_task_joins_the_higher_class():
+    fresh_high = _c("high", "interactive", 2)
+    aged_normal = _c("aged", "interactive", 1, wait=AGING * 1.5)
+    assert _sched().priority_class(aged_normal, 2) == 2
+    assert _sched().priority_class(_c("x", priority=0, wait=AGING * 10), 2) == 2  # Capped at top
+
+    picked = _sched().select([fresh_high, aged_normal], n=1)
+    assert picked[0].id == "aged"  # Same class now, and it has waited longer
+
+
+def test_weighted_fairness_within_a_class():
+    candidates = ([_c(f"i{k}", "interactive", 1, wait=10 - k) for k in range(10)]
+                  + [_c(f"g{k}", "ingest", 1, wait=10 - k) for k in range(10)])
+
+    picked = _sched().select(candidates, served={"interactive": 0, "ingest": 0}, n=9)
+
+    sources = [c.source for c in picked]
+    assert sources.count("interactive") == 8 and sources.count("ingest") == 1
+    assert [c.id for c in picked if c.source == "interactive"] == [f"i{k}" for k in range(8)]
+
+
+def test_capped_top_class_falls_through_to_next_class():
+    sched = _sched(caps={"localai": 1})
+    candidates = [_c("gpu", "interactive", 3, task_type="localai"), _c("cpu", "ingest", 0)]
+
+    picked = sched.select(candidates, running={"localai": 1}, n=2)
+
+    assert [c.id for c in picked] == ["cpu"]
+
+
+def test_cap_counts_tasks_picked_in_the_same_batch():
+    sched = _sched(caps={"localai": 1})
+    candidates = [_c("a", task_type="localai"), _c("b", task_type="localai"), _c("c", priority=0)]
+
+    assert [c.id for c in sched.select(candidates, n=3)] == ["a", "c"]
+
+
+def test_max_running_limits_picks():
+    sched = _sched(max_running=1)
+    assert sched.select([_c("a"), _c("b")], running={"x": 1}, n=2) == []
+    assert len(sched.select([_c("a"), _c("b")], n=2)) == 1
@@ -0,0 +1,26 @@
+"""fts: free text -> FTS5 query, and recall through it."""
+
+from fts import fts_query
+from memory import SQLiteMemoryBackend
+
+WAL = "Enable WAL so concurrent readers don't block the writer"
+
+
+def test_only_long_terms_are_prefix_expanded():
+    assert fts_query("c++ -x") == '"c" OR "x"'
+    assert fts_query("The connection pool is full") == '"connection"* OR "pool"* OR "full"*'
+    assert fts_query("db db io") == '"db" OR "io"'
+
+
+def test_stop_words_and_punctuation_only_give_no_query():
+    assert fts_query("the of a") is None
+    assert fts_query('"*( )') is None
+
+
+def test_recall_ignores_one_letter_prefix_matches(tmp_path):
+    memory = SQLiteMemoryBackend(tmp_path / "memory.db", embeddings=False)
+    memory.store_learning(WAL, "sqlite tuning", ["sqlite"], "high")
+
+    assert memory.recall_learnings_scored("c++ -x") == []
+    assert memory.recall_learnings_scored("how do the readers block")[0][0].content == WAL
+    assert memory.recall_learnings_scored("concurr")[0][0].content == WAL
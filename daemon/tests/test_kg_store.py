@@ -0,0 +1,89 @@
+"""kg_store: tailing sync, rebuild on rewrite, malformed lines."""
+
+import json
+
+import pytest
+
+import kg_store
+
+
+@pytest.fixture
+def kg(tmp_path, monkeypatch):
+    monkeypatch.setattr(kg_store, "KG_DB", tmp_path / "kg.db")
+    monkeypatch.setattr(kg_store, "_schema_ready", False)
+    return tmp_path / "knowledge-graph.jsonl"
+
+
+def _append(path, *entries, raw=""):
+    with open(path, "a") as f:
+        for entry in entries:
+            f.write(json.dumps(entry) + "\n")
+        f.write(raw)
+
+
+def _entity(name, *observations, **extra):
+    return {"type": "entity", "name": name, "entityType": "note",
+            "observations": list(observations), **extra}
+
+
+def _names():
+    conn = kg_store._connect()
+    try:
+        return [r[0] for r in conn.execute("SELECT name FROM entities ORDER BY id")]
+    finally:
+        conn.close()
+
+
+def test_sync_imports_only_appended_lines(kg):
+    _append(kg, _entity("a", "one"))
+    assert kg_store.sync(kg) == 1
+    assert kg_store.sync(kg) == 0
+
+    _append(kg, _entity("a", "two"), _entity("b", "x"),
+            {"type": "relation", "from": "a", "to": "b", "relationType": "uses"})
+    assert kg_store.sync(kg) == 3
+
+    assert _names() == ["a", "b"]
+    conn = kg_store._connect()
+    observations = [r[0] for r in conn.execute("SELECT content FROM observations ORDER BY id")]
+    conn.close()
+    assert observations == ["one", "two", "x"]
+
+
+def test_partial_last_line_waits_for_the_writer(kg):
+    _append(kg, _entity("a"), raw='{"type": "entity", "na')
+    assert kg_store.sync(kg) == 1
+
+    _append(kg, raw='me": "b"}\n')
+    assert kg_store.sync(kg) == 1
+    assert _names() == ["a", "b"]
+
+
+def test_rewritten_file_is_reimported(kg):
+    _append(kg, _entity("old"))
+    kg_store.sync(kg)
+
+    kg.write_text(json.dumps(_entity("new")) + "\n")
+    kg_store.sync(kg)
+
+    assert _names() == ["new"]
+
+
+def test_numeric_timestamp_is_accepted(kg):
+    _append(kg, _entity("epoch", timestamp=12345), _entity("bogus", timestamp=[1]))
+
+    assert kg_store.sync(kg) == 2
+    conn = kg_store._connect()
+    created = dict(conn.execute("SELECT name, created_at FROM entities"))
+    conn.close()
+    assert created["epoch"].startswith("1970-01-01")
+
+
+def test_unimportable_line_is_skipped_and_later_syncs_continue(kg):
+    _append(kg, _entity("good"), _entity({"not": "a name"}, "obs"),
+            raw="not json\n")
+    assert kg_store.sync(kg) == 1
+
+    _append(kg, _entity("later"))
+    assert kg_store.sync(kg) == 1
+    assert _names() == ["good", "later"]
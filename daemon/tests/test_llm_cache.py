@@ -0,0 +1,89 @@
+"""llm_cache: two tiers and single-flight computation per key."""
+
+import threading
+import time
+import uuid
+
+import pytest
+
+from llm_cache import LLMCache
+from llm_cache_l2 import LLMCacheL2
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return LLMCache(f"test-{uuid.uuid4().hex[:8]}", ttl=600, l2=LLMCacheL2(tmp_path / "l2.db"))
+
+
+def _concurrently(n, fn):
+    barrier = threading.Barrier(n)
+    results, errors = [], []
+
+    def run():
+        barrier.wait()
+        try:
+            results.append(fn())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=run) for _ in range(n)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results, errors
+
+
+def test_concurrent_misses_compute_once(cache):
+    calls = []
+
+    def slow_llm():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+
+    results, errors = _concurrently(8, lambda: cache.get_or_compute("k", slow_llm))
+
+    assert not errors
+    assert len(calls) == 1
+    assert [value for value, _ in results] == ["answer"] * 8
+    assert sorted(cached for _, cached in results) == [False] + [True] * 7
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_waiters_share_the_leaders_exception(cache):
+    calls = []
+
+    def failing_llm():
+        calls.append(1)
+        time.sleep(0.2)
+        raise RuntimeError("backend down")
+
+    results, errors = _concurrently(4, lambda: cache.get_or_compute("k", failing_llm))
+
+    assert len(calls) == 1 and not results
+    assert [str(e) for e in errors] == ["backend down"] * 4
+
+
+def test_waiters_on_an_uncached_result_report_a_miss(cache):
+    def empty_llm():
+        time.sleep(0.2)
+        return ""
+
+    results, errors = _concurrently(4, lambda: cache.get_or_compute("k", empty_llm))
+
+    assert not errors
+    assert results == [("", False)] * 4
+
+
+def test_set_writes_both_tiers(cache, tmp_path):
+    cache.set("k", "stored")
+    fresh = LLMCache(cache.namespace, l2=LLMCacheL2(tmp_path / "l2.db"))
+
+    assert fresh.l2.lookup(f"{cache.namespace}:k")[0] == "stored"
+    assert fresh.get_or_compute("k", lambda: pytest.fail("should be cached")) == ("stored", True)
+
+
+def test_empty_response_is_not_cached(cache):
+    assert cache.get_or_compute("k", lambda: "") == ("", False)
+    assert cache.get_or_compute("k", lambda: "later") == ("later", False)
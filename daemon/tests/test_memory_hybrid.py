@@ -0,0 +1,106 @@
+"""SQLiteMemoryBackend hybrid recall with a deterministic embedder."""
+
+import math
+
+import pytest
+
+import memory
+from memory import MIN_SIMILARITY, VECTOR_WEIGHT, SQLiteMemoryBackend, bm25_relevance
+
+# Words sharing an axis are "paraphrases" of each other
+CONCEPTS = {
+    "feline": 0, "felines": 0, "kitten": 0, "cat": 0, "cats": 0,
+    "nap": 1, "naps": 1, "sleeping": 1, "sleep": 1,
+    "sqlite": 2, "database": 2, "storage": 2,
+    "tuning": 3, "performance": 3, "faster": 3,
+    "sunlight": 4, "sun": 4,
+}
+DIM = 6  # last axis collects every other word
+
+
+def _embed(text):
+    vector = [0.0] * DIM
+    for word in text.lower().replace(".", " ").split():
+        vector[CONCEPTS.get(word, DIM - 1)] += 1.0
+    return vector
+
+
+def _cosine(a, b):
+    dot = sum(x * y for x, y in zip(a, b))
+    return dot / (math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(x * x for x in b)))
+
+
+@pytest.fixture
+def embedder(monkeypatch):
+    calls = []
+
+    def embed_texts(texts):
+        calls.append(list(texts))
+        return [_embed(t) for t in texts]
+
+    monkeypatch.setattr(memory, "VECTORS_AVAILABLE", True)
+    monkeypatch.setattr(memory, "embed_texts", embed_texts)
+    return calls
+
+
+@pytest.fixture
+def backend(tmp_path, embedder):
+    return SQLiteMemoryBackend(tmp_path / "memory.db", embeddings=True)
+
+
+def _recall(backend, query, k=5):
+    return {l.content: score for l, score in backend.recall_learnings_scored(query, k)}
+
+
+def test_paraphrase_without_fts_hit_is_found_by_vector(backend):
+    backend.store_learning("Felines nap in sunlight", "", [], "high")
+    backend.store_learning("Use a faster sqlite build", "", [], "high")
+    backend.flush_embeddings()
+
+    scores = _recall(backend, "kitten sleeping")
+
+    text = "Felines nap in sunlight"
+    cosine = _cosine(_embed("kitten sleeping"), _embed(text))
+    assert cosine >= MIN_SIMILARITY
+    assert scores == {text: pytest.approx(VECTOR_WEIGHT * cosine)}
+
+
+def test_fts_and_vector_hit_gets_blended_score(backend):
+    text = "sqlite database tuning"
+    backend.store_learning(text, "", [], "high")
+    backend.store_learning("Felines nap in sunlight", "", [], "high")
+    backend.flush_embeddings()
+
+    scores = _recall(backend, "sqlite storage")
+
+    lexical = bm25_relevance([-1.0], [text], "sqlite storage")[0]
+    cosine = _cosine(_embed("sqlite storage"), _embed(text))
+    assert lexical == pytest.approx(0.75)
+    assert scores[text] == pytest.approx((1 - VECTOR_WEIGHT) * lexical + VECTOR_WEIGHT * cosine)
+    assert "Felines nap in sunlight" not in scores
+
+
+def test_rows_stored_before_embedder_started_are_backfilled(tmp_path, embedder):
+    db = tmp_path / "memory.db"
+    old = SQLiteMemoryBackend(db, embeddings=False)
+    old.store_learning("Felines nap in sunlight", "", [], "high")
+    old.store_decision("Keep cats indoors", "they sleep more", "cats")
+    assert embedder == []
+
+    backend = SQLiteMemoryBackend(db, embeddings=True)
+    backend.recall_learnings_scored("kitten sleeping")  # starts the writer
+    backend.flush_embeddings()
+
+    assert "Felines nap in sunlight" in _recall(backend, "kitten sleeping")
+    assert [d.decision for d, _ in backend.recall_decisions_scored("feline nap")] == ["Keep cats indoors"]
+
+
+def test_flush_makes_new_rows_visible_to_loaded_index(backend):
+    backend.store_learning("sqlite database tuning", "", [], "high")
+    backend.flush_embeddings()
+    assert "Felines nap in sunlight" not in _recall(backend, "kitten sleeping")
+
+    backend.store_learning("Felines nap in sunlight", "", [], "high")
+    backend.flush_embeddings()
+
+    assert "Felines nap in sunlight" in _recall(backend, "kitten sleeping")
@@ -0,0 +1,92 @@
+"""memory_router: parallel backend fan-out with deadlines and errors."""
+
+import time
+from types import SimpleNamespace
+
+import pytest
+
+import memory_router
+from memory_router import MemoryRouter, UnifiedResult
+
+
+@pytest.fixture
+def router(monkeypatch):
+    monkeypatch.setattr(memory_router, "Memory", lambda backend: None)
+    monkeypatch.setattr(MemoryRouter, "_init_cache", lambda self: None)
+    router = MemoryRouter()
+    cached = []
+    monkeypatch.setattr(router, "_cache_set", lambda *args, **kwargs: cached.append(args))
+    router.cached = cached
+    return router
+
+
+def _result(content, relevance=0.9):
+    return UnifiedResult(source="test", content=content, relevance=relevance, metadata={})
+
+
+def _fast(query, k):
+    return [_result("fast")]
+
+
+def _slow(query, k):
+    time.sleep(1.0)
+    return [_result("slow")]
+
+
+def _failing(query, k):
+    raise RuntimeError("backend down")
+
+
+def test_slow_and_failing_backends_are_reported_not_waited_for(router, monkeypatch):
+    monkeypatch.setattr(router, "_search_backends",
+                        lambda sources: {"fast": _fast, "slow": _slow, "broken": _failing})
+    report = {}
+
+    start = time.monotonic()
+    yielded = list(router.search_iter("q", deadline=0.2, report=report))
+
+    assert time.monotonic() - start < 0.8
+    assert [(name, [r.content for r in results]) for name, results in yielded] == [("fast", ["fast"])]
+    backends = router.last_search["backends"]
+    assert backends["fast"]["status"] == "ok" and backends["fast"]["results"] == 1
+    assert backends["slow"]["status"] == "timeout"
+    assert backends["broken"]["status"] == "error" and backends["broken"]["error"] == "backend down"
+    assert report["complete"] is False and router.last_search is report
+
+
+def test_partial_results_are_not_cached(router, monkeypatch):
+    monkeypatch.setattr(router, "_search_backends",
+                        lambda sources: {"fast": _fast, "slow": _slow, "broken": _failing})
+
+    assert [r.content for r in router.search("q", deadline=0.2)] == ["fast"]
+    assert router.cached == []
+
+
+def test_complete_results_are_cached(router, monkeypatch):
+    monkeypatch.setattr(router, "_search_backends", lambda sources: {"fast": _fast})
+
+    router.search("q", k=3)
+
+    assert router.last_search["complete"] is True
+    assert [(query, [r["content"] for r in results], k) for query, results, k in router.cached] \
+        == [("q", ["fast"], 3)]
+
+
+class _OneEntryCache:
+    """Holds one cached result list, stored for k=cached_k."""
+
+    def __init__(self, results, cached_k):
+        self.results, self.meta = results, {"k": cached_k}
+
+    def get(self, query, accept):
+        return SimpleNamespace(value=self.results) if accept(self.meta) else None
+
+
+def test_cache_hit_for_larger_k_is_trimmed(router, monkeypatch):
+    router._cache = _OneEntryCache([_result(f"r{i}").to_dict() for i in range(20)], cached_k=10)
+    monkeypatch.setattr(router, "_search_backends", lambda sources: pytest.fail("cache missed"))
+
+    assert [r.content for r in router.search("q", k=3)] == [f"r{i}" for i in range(6)]
+    ((backend, results),) = list(router.search_iter("q", k=2))
+    assert backend == "cache" and len(results) == 4
+    assert len(router.search("q", k=10)) == 20
@@ -0,0 +1,87 @@
+"""ModelRouter.embed_batch: output alignment, provider fallback, cache use."""
+
+import pytest
+
+import embedding_cache
+from embedding_cache import EmbeddingCache
+from model_router import ModelRouter
+
+
+def _vec(text):
+    return [float(len(text)), float(ord(text[0]))]
+
+
+class _Client:
+    def __init__(self, model, up=True, fail=False, drop=()):
+        self.embedding_model = model
+        self.up = up
+        self.fail = fail
+        self.drop = set(drop)
+        self.calls = []
+
+    def available(self):
+        return self.up
+
+    def embed_batch(self, texts, batch_size):
+        self.calls.append(list(texts))
+        if self.fail:
+            raise RuntimeError("provider down")
+        return [None if t in self.drop else _vec(t) for t in texts]
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    cache = EmbeddingCache(tmp_path / "embedding_cache.db")
+    monkeypatch.setattr(embedding_cache, "_cache", cache)
+    return cache
+
+
+def _router(localai, openai):
+    router = ModelRouter.__new__(ModelRouter)
+    router.localai, router.openai_client = localai, openai
+    return router
+
+
+def test_failed_texts_stay_aligned_as_none(cache):
+    localai = _Client("local", drop={"bb"})
+    result = _router(localai, _Client("oa")).embed_batch(["a", "bb", "ccc", "a"])
+
+    assert result["provider"] == "localai"
+    assert result["embeddings"] == [_vec("a"), None, _vec("ccc"), _vec("a")]
+    assert localai.calls == [["a", "bb", "ccc"]]
+    assert cache.get("local", "bb") is None
+
+
+def test_provider_error_falls_back_to_openai_in_order(cache):
+    localai = _Client("local", fail=True)
+    openai = _Client("oa")
+    result = _router(localai, openai).embed_batch(["x", "yy", "zzz"])
+
+    assert result["provider"] == "openai"
+    assert result["embeddings"] == [_vec("x"), _vec("yy"), _vec("zzz")]
+    assert cache.get("oa", "yy") == _vec("yy")
+    assert cache.get("local", "yy") is None
+
+
+def test_only_cache_misses_are_sent(cache):
+    cache.put("local", "hit one", [9.0, 9.0])
+    cache.put("local", "hit  two ", [8.0, 8.0])  # normalized key: "hit two"
+    localai = _Client("local")
+    result = _router(localai, _Client("oa")).embed_batch(["miss", "hit one", "other", "hit two"])
+
+    assert result["embeddings"] == [_vec("miss"), [9.0, 9.0], _vec("other"), [8.0, 8.0]]
+    assert localai.calls == [["miss", "other"]]
+
+
+def test_fully_cached_batch_needs_no_provider(cache):
+    cache.put_many("local", ["a", "b"], [[1.0], [2.0]])
+    result = _router(_Client("local", up=False), _Client("oa", up=False)).embed_batch(["b", "a"])
+
+    assert result == {"provider": "localai", "embeddings": [[2.0], [1.0]], "cached": 2}
+
+
+def test_no_provider_returns_aligned_nones(cache):
+    result = _router(_Client("local", up=False), _Client("oa", up=False)).embed_batch(["a", "b"])
+
+    assert result["provider"] is None
+    assert result["embeddings"] == [None, None]
@@ -0,0 +1,124 @@
+"""semantic_cache: exact, semantic and gray hits, expiry, entry cap, refresh."""
+
+import time
+
+import pytest
+
+from cache_client import SQLiteFallback
+from semantic_cache import SemanticCache
+
+# Cosine to "wal": near 0.95 (semantic), gray 0.7 (gray zone), far 0
+VECTORS = {
+    "wal": [1.0, 0.0, 0.0],
+    "wal near": [0.95, 0.312, 0.0],
+    "wal gray": [0.7, 0.714, 0.0],
+    "far": [0.0, 0.0, 1.0],
+    "pool": [0.0, 1.0, 0.0],
+    "pool near": [0.1, 1.0, 0.0],
+}
+
+
+def _embed(text):
+    return VECTORS[text]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SQLiteFallback(tmp_path / "cache.db")
+
+
+def _cache(store, **kwargs):
+    return SemanticCache("test", ttl=600, high=0.85, low=0.5, embedder=_embed,
+                         model_name="test-vectors", store=store, **kwargs)
+
+
+def test_exact_and_semantic_hits(store):
+    cache = _cache(store)
+    cache.set("wal", {"answer": 1}, meta={"k": 10})
+
+    exact = cache.get("wal")
+    semantic = cache.get("wal near")
+
+    assert (exact.kind, exact.similarity, exact.value) == ("exact", 1.0, {"answer": 1})
+    assert semantic.kind == "semantic" and semantic.query == "wal"
+    assert semantic.similarity == pytest.approx(0.95, abs=0.01)
+    assert cache.get("far") is None
+    assert cache.stats()["exact_hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_gray_zone_depends_on_gray_ok(store):
+    strict, lenient = _cache(store), _cache(store, gray_ok=True)
+    strict.set("wal", "v")
+    lenient.set("wal", "v")
+
+    assert strict.get("wal gray") is None
+    assert strict.stats()["gray_rejected"] == 1
+    assert lenient.get("wal gray").kind == "gray"
+
+
+def test_accept_filters_candidates(store):
+    cache = _cache(store)
+    cache.set("wal", "v", meta={"k": 5})
+
+    assert cache.get("wal", accept=lambda meta: meta["k"] >= 10) is None
+    assert cache.get("wal near", accept=lambda meta: meta["k"] >= 10) is None
+    assert cache.get("wal near", accept=lambda meta: meta["k"] >= 5).kind == "semantic"
+
+
+def test_expired_entries_miss_and_leave_the_index(store, monkeypatch):
+    cache = _cache(store)
+    cache.set("wal", "v", ttl=5)
+    later = time.time() + 60
+    monkeypatch.setattr(time, "time", lambda: later)
+
+    assert cache.get("wal") is None
+    assert cache.get("wal near") is None
+    assert cache.stats()["indexed"] == 0
+
+
+def test_full_index_evicts_the_entry_closest_to_expiry(store):
+    cache = _cache(store, max_entries=2)
+    cache.set("wal", "a", ttl=100)
+    cache.set("pool", "b", ttl=50)
+    cache.set("far", "c", ttl=200)
+
+    cache.set("pool", "b", ttl=10)  # Expires before both: not indexed
+
+    assert cache.stats()["indexed"] == 2
+    assert cache.get("pool near") is None     # Evicted from the index...
+    assert cache.get("pool").kind == "exact"  # ...still in the store
+    assert cache.get("wal near").kind == "semantic"
+    assert cache.stats()["indexed"] == 2      # Refresh doesn't bring it back
+
+
+def test_refresh_picks_up_other_processes_entries(store):
+    writer, reader = _cache(store), _cache(store)
+    writer.set("wal", "v")
+
+    hit = reader.get("wal near")
+
+    assert hit.kind == "semantic" and hit.value == "v"
+
+
+def test_entries_left_out_of_a_full_index_are_not_refetched(store, monkeypatch):
+    writer, reader = _cache(store), _cache(store, max_entries=1)
+    writer.set("wal", "a", ttl=100)
+    writer.set("pool", "b", ttl=50)
+    reader._refresh(force=True)
+    assert reader.stats()["indexed"] == 1
+
+    fetched = []
+    mget = store.mget
+    monkeypatch.setattr(store, "mget", lambda keys: fetched.extend(keys) or mget(keys))
+    reader._refresh(force=True)
+    assert fetched == []
+
+    writer.set("far", "c", ttl=200)  # New entry: still fetched, displaces "wal"
+    reader._refresh(force=True)
+    reader._refresh(force=True)
+    assert fetched == [writer.key("far")]
+    assert reader.get("wal near") is None
+
+    monkeypatch.setattr(time, "time", lambda: 10 ** 10)  # Everything skipped has expired
+    reader._refresh(force=True)
+    assert reader._skipped == {}
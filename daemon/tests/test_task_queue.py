@@ -0,0 +1,91 @@
+"""task_queue leases: exclusive claims, expiry, heartbeats, attempt cap."""
+
+import pytest
+
+import kg_summary_worker
+from task_queue import TaskQueue, TaskStatus
+
+
+@pytest.fixture
+def queue(tmp_path):
+    return TaskQueue(tmp_path / "tasks.db", max_attempts=2)
+
+
+def test_claimed_task_is_not_handed_out_twice(queue):
+    task_id = queue.add_task("work").id
+
+    assert queue.claim_next("w1").id == task_id
+    assert queue.claim_next("w2") is None
+
+
+def test_expired_lease_is_reclaimed_and_old_holder_loses_it(queue):
+    task_id = queue.add_task("work").id
+    queue.claim_next("w1", lease_seconds=-1)
+
+    task = queue.claim_next("w2")
+    assert task.id == task_id and task.worker_id == "w2" and task.attempts == 2
+    assert not queue.heartbeat(task_id, "w1")
+    assert not queue.mark_completed(task_id, "late", worker_id="w1")
+    assert queue.mark_completed(task_id, "done", worker_id="w2")
+
+
+def test_heartbeat_extends_lease(queue):
+    task_id = queue.add_task("work").id
+    task = queue.claim_next("w1", lease_seconds=1)
+
+    assert queue.heartbeat(task_id, "w1", lease_seconds=600)
+    assert queue.get_task(task_id).lease_expires_at > task.lease_expires_at + 500
+
+
+def test_finished_task_is_not_reclaimed(queue):
+    task_id = queue.add_task("work").id
+    queue.claim_next("w1", lease_seconds=-1)
+    queue.mark_completed(task_id, "done")
+
+    assert queue.claim_next("w2") is None
+    assert queue.get_task(task_id).status == TaskStatus.COMPLETED
+
+
+def test_task_failed_after_max_attempts(queue):
+    task_id = queue.add_task("poison").id
+    queue.claim_next("w1", lease_seconds=-1)
+    queue.claim_next("w2", lease_seconds=-1)
+
+    assert queue.claim_next("w3") is None
+    task = queue.get_task(task_id)
+    assert task.status == TaskStatus.FAILED
+    assert "2 attempts" in task.error
+
+
+def test_reset_stale_tasks_fails_exhausted_tasks(queue):
+    task_id = queue.add_task("poison").id
+    queue.claim_next("w1", lease_seconds=-1)
+    queue.claim_next("w2", lease_seconds=-1)
+
+    assert queue.reset_stale_tasks() == 0
+    assert queue.get_task(task_id).status == TaskStatus.FAILED
+
+
+def test_summary_worker_leases_only_the_task_in_hand(queue, monkeypatch):
+    ids = [queue.add_task("SUMMARIZE_FILE", metadata={"file_path": f"f{i}.py"}).id for i in range(3)]
+    in_progress_seen = []
+
+    class Router:
+        class localai:
+            @staticmethod
+            def available():
+                return False
+
+    def process(task, router):
+        in_progress_seen.append([t for t in ids
+                                 if queue.get_task(t).status == TaskStatus.IN_PROGRESS])
+        return True
+
+    monkeypatch.setattr(kg_summary_worker, "TaskQueue", lambda: queue)
+    monkeypatch.setattr(kg_summary_worker, "ModelRouter", Router)
+    monkeypatch.setattr(kg_summary_worker, "process_summarization_task", process)
+
+    kg_summary_worker.run_worker()
+
+    assert in_progress_seen == [[task_id] for task_id in ids]
+    assert all(queue.get_task(t).status == TaskStatus.COMPLETED for t in ids)
@@ -0,0 +1,81 @@
+"""task_wakeup: notify wakes waiters early, stale sockets go, wakeups coalesce."""
+
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+import task_wakeup
+from task_wakeup import Waiter, notify
+
+pytestmark = pytest.mark.skipif(not task_wakeup.SUPPORTED, reason="needs Unix sockets")
+
+
+@pytest.fixture(autouse=True)
+def wakeup_dir(tmp_path_factory, monkeypatch):
+    # Short path: Unix socket paths are limited to ~100 bytes
+    directory = tmp_path_factory.mktemp("wk")
+    monkeypatch.setattr(task_wakeup, "WAKEUP_DIR", directory)
+    return directory
+
+
+def test_notify_wakes_waiter_long_before_timeout():
+    with Waiter("jobs") as waiter:
+        timer = threading.Timer(0.05, notify, args=("jobs",))
+        timer.start()
+        start = time.monotonic()
+        received = waiter.wait(timeout=10)
+        elapsed = time.monotonic() - start
+        timer.join()
+
+    assert received == 1
+    assert elapsed < 2
+
+
+def test_wait_times_out_without_notify():
+    with Waiter("jobs") as waiter:
+        start = time.monotonic()
+        assert waiter.wait(timeout=0.1) == 0
+        assert time.monotonic() - start >= 0.09
+
+
+def test_notifications_collapse_into_one_wakeup():
+    with Waiter("jobs") as waiter, Waiter("other") as bystander:
+        assert notify("jobs") == 1
+        assert notify("jobs") == 1
+        assert notify("jobs") == 1
+
+        assert waiter.wait(timeout=1) == 3
+        assert waiter.wait(timeout=0.05) == 0
+        assert bystander.wait(timeout=0) == 0
+
+
+def test_waiter_on_several_channels():
+    with Waiter("a", "b") as waiter:
+        notify("b")
+        assert waiter.wait(timeout=1) == 1
+
+
+def test_sockets_of_exited_processes_are_unlinked(wakeup_dir):
+    channel_dir = wakeup_dir / "jobs"
+    channel_dir.mkdir()
+    dead = channel_dir / "999999-1"
+    subprocess.run([sys.executable, "-c",
+                    "import socket, sys; s = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM);"
+                    "s.bind(sys.argv[1])", str(dead)], check=True)
+    assert dead.exists()
+
+    with Waiter("jobs") as waiter:
+        assert notify("jobs") == 1
+        assert not dead.exists()
+        assert waiter.wait(timeout=1) == 1
+
+
+def test_close_removes_socket_and_unknown_channel_is_noop(wakeup_dir):
+    waiter = Waiter("jobs")
+    waiter.close()
+    assert list((wakeup_dir / "jobs").iterdir()) == []
+    assert notify("jobs") == 0
+    assert notify("never-used") == 0
@@ -0,0 +1,72 @@
+"""vector_bench: percentile helpers, corpus determinism, compare() on a tiny run."""
+
+import pytest
+
+from vector_bench import QUERY_METHODS, SyntheticCorpus, compare, latency_summary, percentile, run_benchmark
+
+
+def test_percentile_interpolates_linearly():
+    values = [5.0, 1.0, 4.0, 2.0, 3.0]
+    assert percentile(values, 0) == 1.0
+    assert percentile(values, 50) == 3.0
+    assert percentile(values, 100) == 5.0
+    assert percentile(values, 90) == pytest.approx(4.6)
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+def test_latency_summary():
+    summary = latency_summary([float(ms) for ms in range(1, 101)])
+    assert summary == {"queries": 100, "mean_ms": 50.5, "p50_ms": 50.5,
+                       "p95_ms": 95.05, "p99_ms": 99.01, "max_ms": 100.0}
+    assert latency_summary([])["p99_ms"] == 0.0
+
+
+def test_corpus_is_deterministic_per_document():
+    a = SyntheticCorpus(1500, dim=8, seed=3)
+    b = SyntheticCorpus(1500, dim=8, seed=3)
+    assert a.document(1200) == b.document(1200)
+    assert a.document(7) == b.document(7)
+    assert [d["doc_id"] for batch in a.batches(400) for d in batch] == \
+        [f"doc{i}" for i in range(1500)]
+    assert a.queries(5) == b.queries(5)
+    assert SyntheticCorpus(1500, dim=8, seed=4).document(7) != a.document(7)
+
+
+@pytest.fixture(scope="module")
+def tiny_run():
+    return run_benchmark(docs=300, dim=16, queries=20, k=5, batch_size=100)
+
+
+def test_run_benchmark_reports_every_section(tiny_run):
+    assert tiny_run["ingest"]["documents"] == 300
+    assert set(tiny_run["latency"]) == set(QUERY_METHODS)
+    assert all(tiny_run["latency"][m]["queries"] == 20 for m in QUERY_METHODS)
+    # Flat search is exact, so recall against exact search is perfect
+    assert tiny_run["recall"] == {"recall@5": 1.0}
+    assert tiny_run["memory"]["index"]["vectors"] == 300
+    assert tiny_run["meta"]["params"]["docs"] == 300
+
+
+def test_compare_reports_relative_changes(tiny_run):
+    baseline = {
+        "meta": {"commit": "abc123"},
+        "ingest": {"docs_per_s": tiny_run["ingest"]["docs_per_s"] / 2},
+        "index_load_s": tiny_run["index_load_s"] * 2 or 1.0,
+        "memory": {"peak_rss_mb": None},
+        "latency": {m: {"p50_ms": tiny_run["latency"][m]["p50_ms"],
+                        "p95_ms": tiny_run["latency"][m]["p95_ms"] * 2}
+                    for m in QUERY_METHODS},
+        "recall": {"recall@5": 0.9},
+    }
+
+    diff = compare(tiny_run, baseline)
+
+    assert diff["baseline_commit"] == "abc123"
+    assert diff["ingest_docs_per_s"] == pytest.approx(100.0, abs=0.1)
+    assert diff["peak_rss_mb"] is None
+    for method in QUERY_METHODS:
+        assert diff[f"{method}.p50_ms"] in (0.0, None)
+        assert diff[f"{method}.p95_ms"] in (-50.0, None)
+        assert diff[f"{method}.p99_ms"] is None
+    assert diff["recall@5"] == pytest.approx(0.1)
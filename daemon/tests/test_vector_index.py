@@ -0,0 +1,166 @@
+"""IVFIndex training/recall/snapshots; QuantizedIndex codes and rerank."""
+
+import numpy as np
+import pytest
+
+from vector_index import EmbeddingMatrix, IVFIndex, QuantizedIndex, quantize, recall_benchmark
+
+
+def _clustered(n, dim=16, clusters=8, seed=0):
+    rng = np.random.default_rng(seed)
+    centers = rng.normal(size=(clusters, dim))
+    points = centers[rng.integers(clusters, size=n)] + rng.normal(scale=0.1, size=(n, dim))
+    return {f"d{i}": row.tolist() for i, row in enumerate(points)}
+
+
+def _loaded(n=400, **params):
+    params = {"nlist": 8, "train_threshold": 100, "background_training": False, **params}
+    index = IVFIndex(**params)
+    for doc_id, vector in _clustered(n).items():
+        index.upsert(doc_id, vector)
+    return index
+
+
+def test_trains_at_threshold_and_assigns_every_vector():
+    index = IVFIndex(nlist=8, train_threshold=100, background_training=False)
+    vectors = _clustered(150)
+    for i, (doc_id, vector) in enumerate(vectors.items()):
+        index.upsert(doc_id, vector)
+        assert index.trained == (i + 1 >= 100)
+
+    assert set(index.assign) == set(vectors)
+    assert sum(len(members) for members in index.lists) == 150
+    assert all(doc_id in index.lists[c] for doc_id, c in index.assign.items())
+
+
+def test_background_training_does_not_block_upsert():
+    index = IVFIndex(nlist=8, train_threshold=100)
+    for doc_id, vector in _clustered(100).items():
+        index.upsert(doc_id, vector)
+
+    assert index.wait_for_training(timeout=10)
+    assert index.trained
+    assert len(index.assign) == 100
+
+
+def test_full_probe_matches_exact_search_and_partial_probe_recalls_most():
+    index = _loaded()
+    query = _clustered(1, seed=1)["d0"]
+
+    assert index.search(query, k=10, nprobe=index.nlist) == index.flat.search(query, k=10)
+
+    results = recall_benchmark(index, k=10, queries=30, nprobes=(2, 8))
+    recall = {row["nprobe"]: row["recall"] for row in results}
+    assert recall[8] == 1.0
+    assert recall[2] >= 0.8
+
+
+def test_upsert_and_remove_after_training_update_lists():
+    index = _loaded()
+    vector = index.vector("d0")
+
+    index.upsert("new", vector)
+    assert index.assign["new"] == index.assign["d0"]
+    assert "new" in {doc_id for doc_id, _ in index.search(vector, k=5, nprobe=1)}
+
+    index.remove("d0")
+    assert "d0" not in index.assign
+    assert all("d0" not in members for members in index.lists)
+    assert "d0" not in {doc_id for doc_id, _ in index.search(vector, k=5, nprobe=index.nlist)}
+
+
+def test_snapshot_round_trip_checks_generation(tmp_path):
+    index = _loaded()
+    path = tmp_path / "vectors.db.matrix"
+    index.save(path, generation=5)
+
+    assert IVFIndex.load(path, generation=6) is None
+
+    loaded = IVFIndex.load(path, generation=5, nprobe=3)
+    assert loaded.nprobe == 3
+    assert loaded.assign == index.assign
+    np.testing.assert_array_equal(loaded.centroids, index.centroids)
+    query = index.vector("d7")
+    assert loaded.search(query, k=5) == index.search(query, k=5, nprobe=3)
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_regrows_lists_after_retrain_growth(background):
+    index = _loaded(n=120, retrain_growth=2.0, background_training=background)
+    index.wait_for_training(timeout=10)
+    for doc_id, vector in _clustered(300, seed=2).items():
+        index.upsert(f"x{doc_id}", vector)
+
+    assert index.wait_for_training(timeout=10)
+    assert index.trained_size >= 240
+    assert len(index.assign) == len(index)
+
+
+# ---------------------------------------------------------------------------
+# QuantizedIndex
+# ---------------------------------------------------------------------------
+
+def test_quantize_codes():
+    code, scale = quantize([3.0, -4.0], "int8")
+    assert np.frombuffer(code, dtype=np.int8).tolist() == [95, -127]
+    assert scale == pytest.approx(0.8 / 127)
+
+    code, scale = quantize([1.0, -1.0, 0.5, -0.1, 0.2, 0.3, -0.3, 0.9, 0.4], "binary")
+    assert code == bytes([0b10101101, 0b10000000])
+    assert scale == 1.0
+
+    with pytest.raises(ValueError):
+        quantize([1.0], "int4")
+
+
+@pytest.mark.parametrize("mode", ["int8", "binary"])
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_quantized_search_reranks_with_exact_scores(mode, use_numpy):
+    # One cluster per point: tight clusters would give many identical sign codes
+    vectors = _clustered(300, dim=32, clusters=300)
+    fetched = []
+
+    def fetch(ids):
+        fetched.append(list(ids))
+        return {doc_id: vectors[doc_id] for doc_id in ids}
+
+    index = QuantizedIndex(mode, rerank_factor=4, fetch_vectors=fetch, use_numpy=use_numpy)
+    for doc_id, vector in vectors.items():
+        index.upsert(doc_id, vector)
+    exact = EmbeddingMatrix()
+    for doc_id, vector in vectors.items():
+        exact.upsert(doc_id, vector)
+
+    query = vectors["d5"]
+    hits = index.search(query, k=5)
+
+    assert len(fetched) == 1 and len(fetched[0]) == 20
+    assert hits[0][0] == "d5"
+    # Reranked scores are exact cosines, not code scores
+    expected = dict(exact.search(query, k=300))
+    assert [score for _, score in hits] == pytest.approx([expected[d] for d, _ in hits], abs=1e-5)
+    assert len({d for d, _ in hits} & {d for d, _ in exact.search(query, k=5)}) >= 4
+
+
+def test_quantized_bulk_load_matches_per_row_codes():
+    vectors = _clustered(50, dim=12)
+    blobs = [(doc_id, np.asarray(v, dtype=np.float32).tobytes()) for doc_id, v in vectors.items()]
+    for mode in ("int8", "binary"):
+        bulk = QuantizedIndex(mode)
+        bulk.load_blobs(blobs)
+        for doc_id, blob in blobs:
+            code, scale = quantize(np.frombuffer(blob, dtype=np.float32).tolist(), mode)
+            assert bulk.code(doc_id)[0] == code
+            assert bulk.code(doc_id)[1] == pytest.approx(scale)
+
+
+def test_quantized_remove_and_filter():
+    index = QuantizedIndex("int8")
+    index.upsert("a", [1.0, 0.0])
+    index.upsert("b", [0.9, 0.1])
+    index.upsert("c", [0.0, 1.0])
+
+    assert [d for d, _ in index.search([1.0, 0.0], k=3, allowed_ids={"b", "c"})] == ["b", "c"]
+    index.remove("a")
+    assert [d for d, _ in index.search([1.0, 0.0], k=1)] == ["b"]
+    assert index.code("a") is None
@@ -0,0 +1,35 @@
+"""ShardedVectorStore: routing and upserts across shards."""
+
+import pytest
+
+from vector_shards import ShardedVectorStore
+
+
+def _docs(n, source):
+    return [{"doc_id": f"d{i}", "content": f"doc {i}", "embedding": [1.0, float(i)],
+             "metadata": {"source": source}} for i in range(n)]
+
+
+@pytest.mark.parametrize("workers", [False, True])
+def test_source_change_moves_document_between_shards(tmp_path, workers):
+    with ShardedVectorStore(tmp_path / "vectors.db", num_shards=4, partition="source",
+                            workers=workers) as store:
+        sources = [f"book{i}" for i in range(8)]
+        old, new = next((a, b) for a in sources for b in sources
+                        if store._hash(a) != store._hash(b))
+        store.add_batch(_docs(50, old))
+        assert store.count() == 50
+
+        store.add("d0", "doc 0 moved", metadata={"source": new}, embedding=[1.0, 0.0])
+
+        assert store.count() == 50
+        assert store.get_document("d0")["metadata"] == {"source": new}
+        hits = store.search_vector([1.0, 0.0], k=50, filter_metadata={"source": old})
+        assert "d0" not in {r.doc_id for r in hits}
+
+
+def test_hash_partition_upsert_keeps_one_copy(tmp_path):
+    with ShardedVectorStore(tmp_path / "vectors.db", num_shards=3, workers=False) as store:
+        store.add_batch(_docs(10, "a"))
+        store.add_batch(_docs(10, "b"))
+        assert store.count() == 10
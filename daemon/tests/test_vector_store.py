@@ -0,0 +1,468 @@
+"""VectorStore: index consistency, BM25 postings, metadata filters, fusion."""
+
+import math
+import random
+import sqlite3
+from collections import Counter
+
+import pytest
+
+from vector_store import BM25, HybridCandidates, VectorStore, fuse_hits
+
+
+def test_second_instance_sees_rows_added_after_first_search(tmp_path):
+    db = tmp_path / "vectors.db"
+    a = VectorStore(db_path=db)
+    b = VectorStore(db_path=db)
+    a.add("old", "old doc", embedding=[1.0, 0.0, 0.0])
+
+    assert [r.doc_id for r in b.search_vector([1.0, 0.0, 0.0], k=5)] == ["old"]
+
+    a.add("new", "new doc", embedding=[0.0, 1.0, 0.0])
+    assert [r.doc_id for r in b.search_vector([0.0, 1.0, 0.0], k=1)] == ["new"]
+
+
+def test_second_instance_drops_deleted_rows(tmp_path):
+    db = tmp_path / "vectors.db"
+    a = VectorStore(db_path=db)
+    b = VectorStore(db_path=db)
+    a.add("x", "x", embedding=[1.0, 0.0])
+    a.add("y", "y", embedding=[0.0, 1.0])
+    assert len(b.search_vector([1.0, 0.0], k=5)) == 2
+
+    a.delete("x")
+    assert [r.doc_id for r in b.search_vector([1.0, 0.0], k=1)] == ["y"]
+
+
+def test_own_writes_update_loaded_index_without_reload(tmp_path):
+    store = VectorStore(db_path=tmp_path / "vectors.db")
+    store.add("a", "a", embedding=[1.0, 0.0])
+    index = store.index
+    store.add("b", "b", embedding=[0.0, 1.0])
+
+    assert store.index is index
+    assert "b" in index
+
+
+def test_other_writers_changes_are_applied_without_reload(tmp_path):
+    db = tmp_path / "vectors.db"
+    a = VectorStore(db_path=db)
+    b = VectorStore(db_path=db)
+    a.add("x", "x", embedding=[1.0, 0.0])
+    a.add("y", "y", embedding=[0.0, 1.0])
+    index = b.index
+
+    a.add("z", "z", embedding=[0.7, 0.7])
+    a.delete("x")
+    a.add("y", "y moved", embedding=[1.0, 0.1])
+
+    assert [r.doc_id for r in b.search_vector([1.0, 0.0], k=3)] == ["y", "z"]
+    assert b.index is index
+
+
+def test_trimmed_change_log_falls_back_to_full_reload(tmp_path, monkeypatch):
+    import vector_store
+    monkeypatch.setattr(vector_store, "CHANGE_LOG_GENERATIONS", 2)
+    db = tmp_path / "vectors.db"
+    a = VectorStore(db_path=db)
+    b = VectorStore(db_path=db)
+    a.add("x", "x", embedding=[1.0, 0.0])
+    index = b.index
+
+    for i in range(4):
+        a.add(f"d{i}", "d", embedding=[0.0, 1.0])
+
+    assert len(b.index) == 5
+    assert b.index is not index
+
+
+def test_quantized_store_applies_other_writers_changes(tmp_path):
+    db = tmp_path / "vectors.db"
+    a = VectorStore(db_path=db, index_type="int8")
+    b = VectorStore(db_path=db, index_type="int8")
+    a.add("x", "x", embedding=[1.0, 0.0])
+    index = b.index
+
+    a.add("y", "y", embedding=[0.0, 1.0])
+
+    assert [r.doc_id for r in b.search_vector([0.0, 1.0], k=1)] == ["y"]
+    assert b.index is index
+
+
+
+class _BatchRouter:
+    def __init__(self):
+        self.calls = []
+
+    def embed_batch(self, texts, batch_size):
+        self.calls.append((list(texts), batch_size))
+        return {"embeddings": [None if t == "fails" else [1.0, float(len(t))] for t in texts]}
+
+
+def test_add_batch_embeds_missing_and_keeps_alignment(tmp_path):
+    store = VectorStore(db_path=tmp_path / "vectors.db")
+    store._router = _BatchRouter()
+    store.add_batch([
+        {"doc_id": "a", "content": "aa"},
+        {"doc_id": "b", "content": "given", "embedding": [0.0, 1.0]},
+        {"doc_id": "c", "content": "fails"},
+        {"doc_id": "d", "content": "dddd"},
+    ], batch_size=16)
+
+    assert store._router.calls == [(["aa", "fails", "dddd"], 16)]
+    assert set(store.index.ids) == {"a", "b", "d"}
+    assert store.index.vector("d") == pytest.approx([1 / math.sqrt(17), 4 / math.sqrt(17)])
+    assert store.index.vector("b") == pytest.approx([0.0, 1.0])
+    assert store.count() == 4
+
+
+def test_add_batch_commits_in_one_transaction(tmp_path, monkeypatch):
+    db = tmp_path / "vectors.db"
+    store = VectorStore(db_path=db)
+    docs = [{"doc_id": f"d{i}", "content": f"doc {i}", "embedding": [1.0, float(i)]}
+            for i in range(5)]
+    store.add_batch(docs)
+
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT value FROM store_meta WHERE key = 'generation'").fetchone() == (1,)
+    assert conn.execute("SELECT COUNT(DISTINCT generation), COUNT(*) FROM doc_changes").fetchone() == (1, 5)
+    conn.close()
+
+    # A failure part-way through leaves none of the batch behind
+    index_document = store.metadata_index.add_document
+    def fail_on_third(c, doc_id, metadata):
+        if doc_id == "n2":
+            raise RuntimeError("disk full")
+        index_document(c, doc_id, metadata)
+    monkeypatch.setattr(store.metadata_index, "add_document", fail_on_third)
+    with pytest.raises(RuntimeError):
+        store.add_batch([{"doc_id": f"n{i}", "content": "x", "embedding": [1.0, 0.0]}
+                         for i in range(4)])
+    assert store.count() == 5
+    assert store.get_document("n0") is None
+
+# ---------------------------------------------------------------------------
+# BM25 postings
+# ---------------------------------------------------------------------------
+
+
+def _corpus(n=120, seed=3):
+    rng = random.Random(seed)
+    vocab = [f"w{i}" for i in range(40)]
+    # Zipf-ish term frequencies so postings lengths and max_tf vary
+    weights = [1 / (i + 1) for i in range(len(vocab))]
+    return {f"d{i}": " ".join(rng.choices(vocab, weights, k=rng.randint(3, 30)))
+            for i in range(n)}
+
+
+def _exhaustive(docs, query, k, k1=1.5, b=0.75):
+    tokenized = {doc_id: BM25().tokenize(text) for doc_id, text in docs.items()}
+    avg_len = max(sum(map(len, tokenized.values())) / len(tokenized), 1)
+    df = Counter(term for tokens in tokenized.values() for term in set(tokens))
+    scores = {}
+    for doc_id, tokens in tokenized.items():
+        tf = Counter(tokens)
+        score = 0.0
+        for term in dict.fromkeys(BM25().tokenize(query)):
+            if tf[term]:
+                idf = math.log((len(docs) - df[term] + 0.5) / (df[term] + 0.5) + 1)
+                score += idf * tf[term] * (k1 + 1) / (tf[term] + k1 * (1 - b + b * len(tokens) / avg_len))
+        if score:
+            scores[doc_id] = score
+    return sorted(scores.items(), key=lambda item: -item[1])[:k]
+
+
+def _assert_same_ranking(hits, expected):
+    """Same scores rank by rank; ids must agree wherever there is no tie at the cut."""
+    assert [score for _, score in hits] == pytest.approx([score for _, score in expected])
+    cut = expected[-1][1] if expected else 0.0
+    assert {d for d, s in hits if s > cut + 1e-9} == {d for d, s in expected if s > cut + 1e-9}
+
+
+def _meta(db):
+    conn = sqlite3.connect(db)
+    meta = dict(conn.execute('SELECT key, value FROM store_meta'))
+    conn.close()
+    return meta["bm25_docs"], meta["bm25_length"]
+
+
+def _store(db, docs):
+    store = VectorStore(db_path=db)
+    store.add_batch([{"doc_id": d, "content": text, "embedding": [1.0]} for d, text in docs.items()])
+    return store
+
+
+@pytest.mark.parametrize("query", ["w0 w1", "w0 w5 w30", "w2 w3 w4 w39", "w38 w0", "w1 w1 w7"])
+@pytest.mark.parametrize("k", [1, 3, 10])
+def test_pruned_bm25_matches_exhaustive_scoring(tmp_path, query, k):
+    docs = _corpus()
+    store = _store(tmp_path / "vectors.db", docs)
+
+    hits = [(r.doc_id, r.bm25_score) for r in store.keyword_search(query, k)]
+    _assert_same_ranking(hits, _exhaustive(docs, query, k))
+
+
+def test_running_totals_follow_readd_and_delete(tmp_path):
+    db = tmp_path / "vectors.db"
+    store = _store(db, {"a": "one two three", "b": "four five"})
+    assert _meta(db) == (2, 5)
+
+    store.add("a", "one two", embedding=[1.0])
+    assert _meta(db) == (2, 4)
+
+    store.delete("b")
+    store.delete("b")
+    assert _meta(db) == (1, 2)
+    assert [r.doc_id for r in store.keyword_search("one", 5)] == ["a"]
+    assert store.keyword_search("four", 5) == []
+
+    conn = sqlite3.connect(db)
+    assert conn.execute("SELECT df FROM bm25_terms WHERE term = 'one'").fetchone() == (1,)
+    assert conn.execute("SELECT 1 FROM bm25_terms WHERE term = 'three'").fetchone() is None
+    conn.close()
+
+
+def test_removing_a_document_only_touches_its_own_terms(tmp_path):
+    db = tmp_path / "vectors.db"
+    store = _store(db, {"a": "one two", "b": "two three"})
+    conn = sqlite3.connect(db)
+    # A stray zero-df row no document refers to: only a full-table sweep would drop it
+    conn.execute("INSERT INTO bm25_terms (term, df, max_tf) VALUES ('stray', 0, 1)")
+    conn.commit()
+
+    def terms():
+        return dict(conn.execute("SELECT term, df FROM bm25_terms"))
+
+    store.add("a", "one four", embedding=[1.0])
+    assert terms() == {"one": 1, "two": 1, "three": 1, "four": 1, "stray": 0}
+
+    store.delete_batch(["b"])
+    assert terms() == {"one": 1, "four": 1, "stray": 0}
+    conn.close()
+
+
+def test_old_db_is_indexed_once_on_open(tmp_path):
+    db = tmp_path / "vectors.db"
+    docs = _corpus(30)
+    conn = sqlite3.connect(db)
+    conn.execute('''CREATE TABLE documents (doc_id TEXT PRIMARY KEY, content TEXT,
+        embedding BLOB, metadata TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP)''')
+    conn.executemany('INSERT INTO documents (doc_id, content) VALUES (?, ?)', docs.items())
+    conn.commit()
+    conn.close()
+
+    store = VectorStore(db_path=db)
+    total_len = sum(len(text.split()) for text in docs.values())
+    assert _meta(db) == (30, total_len)
+
+    VectorStore(db_path=db)  # already built: no second rebuild
+    assert _meta(db) == (30, total_len)
+
+    store.add("d0", "w1", embedding=[1.0])
+    assert _meta(db) == (30, total_len - len(docs["d0"].split()) + 1)
+    hits = [(r.doc_id, r.bm25_score) for r in store.keyword_search("w0 w1", 5)]
+    _assert_same_ranking(hits, _exhaustive({**docs, "d0": "w1"}, "w0 w1", 5))
+
+
+# ---------------------------------------------------------------------------
+# Quantized codes
+# ---------------------------------------------------------------------------
+
+def _codes(db, mode="int8"):
+    conn = sqlite3.connect(db)
+    ids = {row[0] for row in conn.execute(
+        'SELECT doc_id FROM embedding_codes WHERE mode = ?', (mode,))}
+    meta = dict(conn.execute('SELECT key, value FROM store_meta'))
+    conn.close()
+    return ids, meta.get(f"codes_{mode}"), meta["generation"]
+
+
+def test_quantized_store_reranks_with_float_embeddings(tmp_path):
+    store = VectorStore(db_path=tmp_path / "vectors.db", index_type="binary")
+    store.add("a", "a", embedding=[1.0, 0.2, 0.0])
+    store.add("b", "b", embedding=[1.0, 0.1, 0.0])
+    store.add("c", "c", embedding=[-1.0, 0.0, 1.0])
+
+    hits = store.search_vector([1.0, 0.1, 0.0], k=2)
+
+    # Binary codes of a and b are identical; the float rerank separates them
+    assert [r.doc_id for r in hits] == ["b", "a"]
+    assert hits[0].score == pytest.approx(1.0)
+
+
+def test_fresh_codes_are_loaded_instead_of_floats(tmp_path):
+    db = tmp_path / "vectors.db"
+    store = VectorStore(db_path=db, index_type="int8")
+    store.add("a", "a", embedding=[1.0, 0.0])
+    store.index  # migrates to codes
+    store.add("b", "b", embedding=[0.0, 1.0])
+    ids, codes_gen, generation = _codes(db)
+    assert ids == {"a", "b"} and codes_gen == generation
+
+    # Floats gone: a reopened store can only have found b through its code
+    conn = sqlite3.connect(db)
+    conn.execute("UPDATE documents SET embedding = NULL WHERE doc_id = 'b'")
+    conn.commit()
+    conn.close()
+    assert "b" in VectorStore(db_path=db, index_type="int8").index
+
+
+def test_stale_codes_are_rewritten_on_load(tmp_path):
+    db = tmp_path / "vectors.db"
+    VectorStore(db_path=db, index_type="int8").add("a", "a", embedding=[1.0, 0.0])
+    VectorStore(db_path=db, index_type="int8").index
+    # A flat store writes without maintaining codes
+    VectorStore(db_path=db).add("b", "b", embedding=[0.0, 1.0])
+    ids, codes_gen, generation = _codes(db)
+    assert ids == {"a"} and codes_gen < generation
+
+    store = VectorStore(db_path=db, index_type="int8")
+    assert [r.doc_id for r in store.search_vector([0.0, 1.0], k=1)] == ["b"]
+    ids, codes_gen, generation = _codes(db)
+    assert ids == {"a", "b"} and codes_gen == generation
+
+
+# ---------------------------------------------------------------------------
+# Hybrid fusion
+# ---------------------------------------------------------------------------
+
+CANDIDATES = HybridCandidates(vector=[("a", 0.9), ("b", 0.6), ("c", 0.3)],
+                              keyword=[("c", 4.0), ("d", 2.0)])
+
+
+def test_weighted_fusion_blends_max_normalized_scores():
+    fused = fuse_hits(CANDIDATES, k=4, alpha=0.5)
+
+    assert [hit[0] for hit in fused] == ["c", "a", "b", "d"]
+    c = fused[0]
+    assert c[1:] == pytest.approx((0.5 * 1 / 3 + 0.5 * 1.0, 1 / 3, 1.0))
+    assert fuse_hits(CANDIDATES, k=1, alpha=1.0)[0][0] == "a"
+    assert fuse_hits(CANDIDATES, k=1, alpha=0.0)[0][0] == "c"
+
+
+def test_rrf_fusion_ranks_by_reciprocal_rank():
+    fused = fuse_hits(CANDIDATES, k=4, alpha=0.9, fusion="rrf", rrf_k=60)
+
+    assert [hit[0] for hit in fused] == ["c", "a", "b", "d"]
+    assert fused[0][1] == pytest.approx(0.9 / 63 + 0.1 / 61)
+    assert fused[3][1] == pytest.approx(0.1 / 62)
+    with pytest.raises(ValueError):
+        fuse_hits(CANDIDATES, fusion="borda")
+
+
+class _CountingRouter:
+    def __init__(self, embeddings):
+        self.embeddings = embeddings
+        self.calls = 0
+
+    def embed(self, text):
+        self.calls += 1
+        return {"embedding": self.embeddings.get(text)}
+
+
+def test_hybrid_search_shares_one_candidate_pass(tmp_path, monkeypatch):
+    store = VectorStore(db_path=tmp_path / "vectors.db")
+    store.add_batch([
+        {"doc_id": "cat", "content": "the cat sat", "embedding": [1.0, 0.0]},
+        {"doc_id": "dog", "content": "a dog barked at the cat", "embedding": [0.6, 0.8]},
+        {"doc_id": "car", "content": "red car", "embedding": [0.0, 1.0]},
+    ])
+    store._router = _CountingRouter({"cat": [1.0, 0.1]})
+    scans = []
+    monkeypatch.setattr(store.bm25, "search",
+                        lambda *args, _search=store.bm25.search: scans.append(1) or _search(*args))
+
+    candidates = store.hybrid_candidates("cat", n=3)
+    weighted = store.hybrid_search("cat", k=3, alpha=0.5, candidates=candidates)
+    rrf = store.hybrid_search("cat", k=3, alpha=0.5, fusion="rrf", candidates=candidates)
+
+    assert store._router.calls == 1 and len(scans) == 1
+    assert [r.doc_id for r in weighted] == ["cat", "dog", "car"]
+    assert [r.doc_id for r in rrf] == ["cat", "dog", "car"]
+    assert weighted[0].vector_score == pytest.approx(1.0)
+    assert weighted[0].bm25_score == pytest.approx(1.0)
+    assert weighted[2].bm25_score == 0.0
+    assert rrf[0].score == pytest.approx(0.5 / 61 + 0.5 / 61)
+
+    store.hybrid_search("cat", k=3)
+    assert store._router.calls == 2 and len(scans) == 2
+
+
+# ---------------------------------------------------------------------------
+# Metadata filters
+# ---------------------------------------------------------------------------
+
+@pytest.fixture
+def library(tmp_path):
+    store = VectorStore(db_path=tmp_path / "vectors.db")
+    store.add_batch([
+        {"doc_id": "p1", "content": "x", "embedding": [1.0, 0.0],
+         "metadata": {"source": "book", "page": 5, "tags": ["ml", "stats"], "info": {"lang": "en"}}},
+        {"doc_id": "p2", "content": "x", "embedding": [0.9, 0.1],
+         "metadata": {"source": "paper", "page": 12, "tags": ["ml"], "info": {"lang": "de"}}},
+        {"doc_id": "p3", "content": "x", "embedding": [0.8, 0.2],
+         "metadata": {"source": "book", "page": 40, "tags": ["db"]}},
+        {"doc_id": "p4", "content": "x", "embedding": [0.7, 0.3],
+         "metadata": {"source": "blog", "page": 12.0, "draft": True}},
+    ])
+    return store
+
+
+def _ids(store, filter_metadata):
+    return {r.doc_id for r in store.search_vector([1.0, 0.0], k=10, filter_metadata=filter_metadata)}
+
+
+@pytest.mark.parametrize("condition, expected", [
+    ({"source": "book"}, {"p1", "p3"}),
+    ({"source": {"$eq": "paper"}}, {"p2"}),
+    ({"source": {"$in": ["paper", "blog"]}}, {"p2", "p4"}),
+    ({"source": ["paper", "blog"]}, {"p2", "p4"}),
+    ({"page": {"$gt": 12}}, {"p3"}),
+    ({"page": {"$gte": 12}}, {"p2", "p3", "p4"}),
+    ({"page": {"$lt": 12}}, {"p1"}),
+    ({"page": {"$lte": 12}}, {"p1", "p2", "p4"}),
+    ({"page": 12}, {"p2", "p4"}),
+    ({"page": {"$in": [5, 40, "40"]}}, {"p1", "p3"}),
+    ({"tags": "ml"}, {"p1", "p2"}),
+    ({"tags": {"$in": ["stats", "db"]}}, {"p1", "p3"}),
+    ({"info.lang": "de"}, {"p2"}),
+    ({"draft": True}, {"p4"}),
+    ({"source": {"$in": []}}, set()),
+])
+def test_filter_operators(library, condition, expected):
+    assert _ids(library, condition) == expected
+
+
+def test_combined_keys_intersect(library):
+    assert _ids(library, {"source": "book", "tags": "ml"}) == {"p1"}
+    assert _ids(library, {"page": {"$gte": 10, "$lt": 40}, "tags": "ml"}) == {"p2"}
+    assert _ids(library, {"source": {"$in": ["book", "paper"]}, "page": {"$gt": 4, "$lte": 12}}) == {"p1", "p2"}
+    assert {r.doc_id for r in library.keyword_search("x", 10, {"source": "book", "page": 40})} == {"p3"}
+
+
+def test_unknown_operator_is_rejected(library):
+    with pytest.raises(ValueError):
+        _ids(library, {"page": {"$ne": 5}})
+
+
+def _metadata_rows(store, doc_id):
+    conn = sqlite3.connect(store.db_path)
+    rows = conn.execute('SELECT key, value_text, value_num FROM doc_metadata WHERE doc_id = ?',
+                        (doc_id,)).fetchall()
+    conn.close()
+    return sorted(rows, key=repr)
+
+
+def test_update_and_delete_replace_metadata_rows(library):
+    library.add("p1", "x", metadata={"source": "paper"}, embedding=[1.0, 0.0])
+
+    assert _metadata_rows(library, "p1") == [("source", "paper", None)]
+    assert _ids(library, {"tags": "stats"}) == set()
+    assert _ids(library, {"source": "paper"}) == {"p1", "p2"}
+
+    library.add("p2", "x", embedding=[1.0, 0.0])
+    assert _metadata_rows(library, "p2") == []
+
+    library.delete("p3")
+    assert _metadata_rows(library, "p3") == []
+    assert _ids(library, {"source": "book"}) == set()
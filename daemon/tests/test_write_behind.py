@@ -0,0 +1,82 @@
+"""write_behind: batching, per-row retry on failure, bounded buffer."""
+
+import threading
+
+import pytest
+
+import db_pool
+from write_behind import WriteBehindBuffer
+
+INSERT = "INSERT INTO events (id, name) VALUES (?, ?)"
+
+
+@pytest.fixture
+def db(tmp_path):
+    path = tmp_path / "telemetry.db"
+    conn = db_pool.connect(path)
+    conn.execute("CREATE TABLE events (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+    conn.commit()
+    conn.close()
+    return path
+
+
+@pytest.fixture
+def buffer():
+    # Long interval: only explicit flushes write
+    buf = WriteBehindBuffer(flush_rows=10_000, flush_seconds=3600, max_pending=5)
+    yield buf
+    buf.close()
+
+
+def _rows(path):
+    conn = db_pool.connect(path)
+    rows = conn.execute("SELECT id, name FROM events ORDER BY id").fetchall()
+    conn.close()
+    return rows
+
+
+def test_rows_are_written_on_flush(db, buffer):
+    buffer.submit(db, INSERT, (1, "a"))
+    buffer.submit(db, INSERT, (2, "b"))
+    assert _rows(db) == []
+
+    buffer.flush(db)
+
+    assert _rows(db) == [(1, "a"), (2, "b")]
+    assert buffer.stats()["written"] == 2
+
+
+def test_one_bad_row_does_not_discard_the_batch(db, buffer):
+    buffer.submit(db, INSERT, (1, "a"))
+    buffer.submit(db, INSERT, (2, None))                       # NOT NULL violation
+    buffer.submit(db, "INSERT INTO missing VALUES (?)", (3,))  # No such table
+    buffer.submit(db, INSERT, (4, "d"))
+
+    buffer.flush()
+
+    assert _rows(db) == [(1, "a"), (4, "d")]
+    stats = buffer.stats()
+    assert stats["written"] == 2 and stats["failed"] == 2 and stats["pending"] == 0
+
+
+def test_full_buffer_drops_new_rows(db, buffer):
+    results = [buffer.submit(db, INSERT, (i, "x")) for i in range(7)]
+
+    assert results == [True] * 5 + [False] * 2
+    assert buffer.stats()["dropped"] == 2
+
+
+def test_flush_timeout_when_another_flush_holds_the_lock(db, buffer):
+    buffer.submit(db, INSERT, (1, "a"))
+    buffer._write_lock.acquire()
+    try:
+        result = []
+        thread = threading.Thread(target=lambda: result.append(buffer.flush(timeout=0.05)))
+        thread.start()
+        thread.join()
+    finally:
+        buffer._write_lock.release()
+
+    assert result == [False]
+    assert buffer.flush() is True
+    assert _rows(db) == [(1, "a")]
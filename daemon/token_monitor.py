@@ -29,12 +29,13 @@ from datetime import datetime, date, timedelta
 from dataclasses import dataclass, field, asdict
 from typing import List, Dict, Optional, Tuple
 from collections import defaultdict
-import sqlite3
+
+import db_pool
+import kg_store
 
 
 # Paths
 CLAUDE_DIR = Path.home() / ".claude"
-KG_FILE = Path.home() / ".claude" / "memory" / "knowledge-graph.jsonl"
 MONITOR_DB = Path(__file__).parent / "token_monitor.db"
 
 
@@ -70,7 +71,7 @@ class TokenSpike:
 
 def init_db():
     """Initialize monitoring database."""
-    conn = sqlite3.connect(MONITOR_DB)
+    conn = db_pool.connect(MONITOR_DB)
     c = conn.cursor()
 
     # Spikes table
@@ -235,7 +236,7 @@ def detect_spikes(
 
 def log_spike_to_db(spike: TokenSpike):
     """Log a spike to the database."""
-    conn = sqlite3.connect(MONITOR_DB)
+    conn = db_pool.connect(MONITOR_DB)
     c = conn.cursor()
 
     c.execute("""
@@ -289,18 +290,15 @@ def log_spike_to_kg(spike: TokenSpike):
         ],
     }
 
-    # Append to KG
-    KG_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with open(KG_FILE, 'a', encoding='utf-8') as f:
-        f.write(json.dumps(entity) + "\n")
+    kg_store.add_entities([entity])
 
 
 def analyze_spike_patterns() -> Dict[str, any]:
     """Analyze logged spikes for patterns."""
-    if not MONITOR_DB.exists():
+    if not db_pool.exists(MONITOR_DB):
         return {}
 
-    conn = sqlite3.connect(MONITOR_DB)
+    conn = db_pool.connect(MONITOR_DB)
     c = conn.cursor()
 
     analysis = {}
@@ -18,7 +18,6 @@ Usage:
 
 import os
 import hashlib
-import sqlite3
 import json
 import re
 from datetime import datetime, timedelta
@@ -26,6 +25,11 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple, Any
 from dataclasses import dataclass
 
+import db_pool
+import write_behind
+import cache_compactor
+from config import cfg
+
 # Optional imports
 try:
     import redis
@@ -352,10 +356,13 @@ class TokenOptimizer:
                 self.redis = None
 
         self._init_db()
+        cache_compactor.register("pattern_cache", OPTIMIZER_DB, self.compact)
 
     def _init_db(self):
         """Initialize optimizer database."""
-        conn = sqlite3.connect(OPTIMIZER_DB)
+        conn = db_pool.connect(OPTIMIZER_DB)
+        # Only takes effect on a new file; existing ones are switched by the compactor
+        conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
         conn.executescript("""
             CREATE TABLE IF NOT EXISTS pattern_cache (
                 cache_key TEXT PRIMARY KEY,
@@ -392,6 +399,14 @@ class TokenOptimizer:
             CREATE INDEX IF NOT EXISTS idx_pattern_type ON pattern_cache(pattern_type);
             CREATE INDEX IF NOT EXISTS idx_cache_hits ON pattern_cache(hit_count DESC);
         """)
+        cache_compactor.add_columns(conn, "pattern_cache", {
+            "encoding": "TEXT DEFAULT ''",
+            "size_bytes": "INTEGER",
+        })
+        conn.execute("""
+            UPDATE pattern_cache SET size_bytes = length(CAST(response AS BLOB))
+            WHERE size_bytes IS NULL
+        """)
         conn.commit()
         conn.close()
 
@@ -462,20 +477,23 @@ class TokenOptimizer:
         cache_key = self._build_cache_key(prompt, content, pattern)
 
         tokens_saved = estimate_tokens(prompt) + estimate_tokens(content)
+        stored, encoding = cache_compactor.compress(response)
+        size = len(stored) if encoding else len(response.encode("utf-8"))
 
-        conn = sqlite3.connect(OPTIMIZER_DB)
+        conn = db_pool.connect(OPTIMIZER_DB)
         conn.execute("""
             INSERT OR REPLACE INTO pattern_cache
             (cache_key, pattern_type, prompt_hash, content_hash, response,
-             tokens_saved, hit_count, created_at, last_hit)
-            VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?)
+             tokens_saved, hit_count, created_at, last_hit, encoding, size_bytes)
+            VALUES (?, ?, ?, ?, ?, ?, 0, ?, ?, ?, ?)
         """, (
             cache_key, pattern or "unknown",
             hashlib.md5(prompt.encode()).hexdigest(),
             content_fingerprint(content),
-            response, tokens_saved,
+            stored, tokens_saved,
             datetime.now().isoformat(),
-            datetime.now().isoformat()
+            datetime.now().isoformat(),
+            encoding, size
         ))
         conn.commit()
         conn.close()
@@ -504,9 +522,9 @@ class TokenOptimizer:
                 return cached.decode()
 
         # Fall back to SQLite
-        conn = sqlite3.connect(OPTIMIZER_DB)
+        conn = db_pool.connect(OPTIMIZER_DB)
         cursor = conn.execute(
-            "SELECT response FROM pattern_cache WHERE cache_key = ?",
+            "SELECT response, encoding FROM pattern_cache WHERE cache_key = ?",
             (cache_key,)
         )
         row = cursor.fetchone()
@@ -514,26 +532,35 @@ class TokenOptimizer:
 
         if row:
             self._increment_hit_count(cache_key)
-            return row[0]
+            return cache_compactor.decompress(row[0], row[1])
 
         return None
 
     def _increment_hit_count(self, cache_key: str):
-        """Increment cache hit count."""
-        conn = sqlite3.connect(OPTIMIZER_DB)
-        conn.execute("""
+        """Increment cache hit count (buffered; see write_behind)."""
+        write_behind.submit(OPTIMIZER_DB, """
             UPDATE pattern_cache
             SET hit_count = hit_count + 1, last_hit = ?
             WHERE cache_key = ?
         """, (datetime.now().isoformat(), cache_key))
+
+    def compact(self) -> Dict[str, Any]:
+        """Evict pattern_cache to PATTERN_CACHE_MAX_BYTES, then vacuum (run by cache_compactor)."""
+        write_behind.flush(OPTIMIZER_DB)
+        conn = db_pool.connect(OPTIMIZER_DB)
+        evicted = cache_compactor.evict_to_budget(
+            conn, "pattern_cache", "cache_key",
+            cfg.PATTERN_CACHE_MAX_BYTES, cfg.LLM_CACHE_EVICTION,
+            cost_column="tokens_saved")
         conn.commit()
         conn.close()
+        return {"evicted": evicted, **cache_compactor.vacuum(OPTIMIZER_DB)}
 
     def _learn_pattern(self, prompt: str, pattern: str):
         """Learn a new pattern from usage."""
         pattern_hash = hashlib.md5(prompt[:100].lower().encode()).hexdigest()
 
-        conn = sqlite3.connect(OPTIMIZER_DB)
+        conn = db_pool.connect(OPTIMIZER_DB)
         conn.execute("""
             INSERT INTO learned_patterns (pattern_hash, pattern_text, frequency, avg_tokens, created_at, last_seen)
             VALUES (?, ?, 1, ?, ?, ?)
@@ -551,9 +578,8 @@ class TokenOptimizer:
 
     def _log_optimization(self, action: str, tokens_in: int, tokens_out: int,
                           tokens_saved: int, cache_hit: bool, compression_ratio: float):
-        """Log optimization action."""
-        conn = sqlite3.connect(OPTIMIZER_DB)
-        conn.execute("""
+        """Log optimization action (buffered; see write_behind)."""
+        write_behind.submit(OPTIMIZER_DB, """
             INSERT INTO optimization_stats
             (timestamp, action, tokens_input, tokens_output, tokens_saved, cache_hit, compression_ratio)
             VALUES (?, ?, ?, ?, ?, ?, ?)
@@ -562,12 +588,11 @@ class TokenOptimizer:
             tokens_in, tokens_out, tokens_saved,
             1 if cache_hit else 0, compression_ratio
         ))
-        conn.commit()
-        conn.close()
 
     def get_stats(self) -> Dict[str, Any]:
         """Get optimization statistics."""
-        conn = sqlite3.connect(OPTIMIZER_DB)
+        write_behind.flush(OPTIMIZER_DB)
+        conn = db_pool.connect(OPTIMIZER_DB)
 
         # Total savings
         cursor = conn.execute("""
@@ -137,7 +137,7 @@ class UnifiedSpine:
         generated = generate_from_strategies()
         results["tasks_generated"] = len(generated)
         for task in generated:
-            self.task_queue.add_task(task["prompt"], priority=TaskPriority.NORMAL)
+            self.task_queue.add_task(task["prompt"], priority=TaskPriority.NORMAL, source="emergent")
 
         # 3. Process pending tasks
         pending = self.task_queue.get_pending_tasks(limit=5)
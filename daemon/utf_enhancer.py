@@ -29,6 +29,8 @@ from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List
 
+import db_pool
+
 # Configuration
 LOCALAI_URL = os.environ.get("LOCALAI_URL", "http://localhost:8080/v1")
 LOCALAI_MODEL = "mistral-7b-instruct-v0.3"
@@ -55,7 +57,7 @@ ASSUMPTION_TYPES = ["Data", "Compute", "Distribution", "Causal", "Measurement",
 
 def init_utf_db() -> sqlite3.Connection:
     """Initialize UTF enhancement database."""
-    conn = sqlite3.connect(UTF_DB)
+    conn = db_pool.connect(UTF_DB)
     c = conn.cursor()
 
     # Enhancement tracking
@@ -123,8 +125,8 @@ def init_utf_db() -> sqlite3.Connection:
 
 def get_hirag_conn() -> Optional[sqlite3.Connection]:
     """Get connection to HiRAG database (created by autonomous_ingest)."""
-    if HIRAG_DB.exists():
-        return sqlite3.connect(HIRAG_DB)
+    if db_pool.exists(HIRAG_DB):
+        return db_pool.connect(HIRAG_DB)
     return None
 
 # ============================================================================
@@ -386,7 +388,7 @@ def run_enhancement(watch: bool = False, interval: int = 600):
 
     while True:
         # Reconnect if needed
-        if not hirag_conn and HIRAG_DB.exists():
+        if not hirag_conn and db_pool.exists(HIRAG_DB):
             hirag_conn = get_hirag_conn()
             print("[OK] Connected to HiRAG database")
 
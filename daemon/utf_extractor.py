@@ -25,12 +25,8 @@ from typing import Dict, List, Optional, Any
 from dataclasses import dataclass, asdict, field
 from pathlib import Path
 
-# Dragonfly/Redis cache (Phase 13.3)
-try:
-    import redis
-    REDIS_AVAILABLE = True
-except ImportError:
-    REDIS_AVAILABLE = False
+# Shared L1/L2 LLM response cache
+from llm_cache import LLMCache
 
 # ============================================================================
 # Configuration
@@ -38,51 +34,13 @@ except ImportError:
 
 LOCALAI_URL = os.environ.get("LOCALAI_URL", "http://localhost:8080/v1")
 LOCALAI_MODEL = "mistral-7b-instruct-v0.2"
-DRAGONFLY_URL = os.environ.get("DRAGONFLY_URL", "redis://localhost:6379")
 LLM_CACHE_TTL = 86400  # 24 hours
 
 # ============================================================================
-# Phase 13.3: Dragonfly LLM Cache
+# Phase 13.3: LLM Cache (llm_cache: in-process L1 + SQLite L2)
 # ============================================================================
 
-_dragonfly_client = None
-
-def get_dragonfly():
-    """Get or create Dragonfly connection."""
-    global _dragonfly_client
-    if _dragonfly_client is None and REDIS_AVAILABLE:
-        try:
-            _dragonfly_client = redis.from_url(DRAGONFLY_URL)
-            _dragonfly_client.ping()
-        except Exception:
-            _dragonfly_client = None
-    return _dragonfly_client
-
-def make_prompt_hash(prompt: str) -> str:
-    """Create deterministic hash for prompt caching."""
-    key = f"{LOCALAI_MODEL}:{prompt[:1000]}"
-    return hashlib.sha256(key.encode()).hexdigest()[:16]
-
-def cache_get(prompt_hash: str) -> Optional[str]:
-    """Get cached LLM response."""
-    client = get_dragonfly()
-    if client:
-        try:
-            result = client.get(f"llm:utf:{prompt_hash}")
-            if result:
-                return result.decode()
-        except Exception:
-            pass
-    return None
-
-def cache_set(prompt_hash: str, response: str):
-    """Cache LLM response."""
-    client = get_dragonfly()
-    if client:
-        try:
-            client.setex(f"llm:utf:{prompt_hash}", LLM_CACHE_TTL, response)
-        except Exception:
-            pass
+_llm_cache = LLMCache("utf", ttl=LLM_CACHE_TTL)
 
 # ============================================================================
 # UTF Data Classes (MVP Node Types)
@@ -194,41 +152,38 @@ class UTFExtractionResult:
 
 def localai_complete(prompt: str, max_tokens: int = 500, retries: int = 2) -> str:
     """Call LocalAI for completion with retry logic and caching."""
-    # Phase 13.3: Check cache first
-    prompt_hash = make_prompt_hash(prompt)
-    cached = cache_get(prompt_hash)
-    if cached:
-        print(f"[Cache HIT] {prompt_hash[:8]}...")
-        return cached
-
-    for attempt in range(retries + 1):
-        try:
-            response = requests.post(
-                f"{LOCALAI_URL}/chat/completions",
-                json={
-                    "model": LOCALAI_MODEL,
-                    "messages": [{"role": "user", "content": prompt}],
-                    "max_tokens": max_tokens,
-                    "temperature": 0.3
-                },
-                timeout=600  # 10 minutes for CPU inference on 7B model
-            )
-            response.raise_for_status()
-            content = response.json()["choices"][0]["message"]["content"]
-            # Cache successful response
-            cache_set(prompt_hash, content)
-            print(f"[Cache SET] {prompt_hash[:8]}...")
-            return content
-        except requests.exceptions.Timeout:
-            if attempt < retries:
-                print(f"[LocalAI] Timeout, retrying ({attempt + 1}/{retries})...")
-                continue
-            print(f"[LocalAI Error] Timeout after {retries + 1} attempts")
-            return ""
-        except Exception as e:
-            print(f"[LocalAI Error] {e}")
-            return ""
-    return ""
+    # Phase 13.3: Shared cache; concurrent identical prompts make one request
+    key = _llm_cache.key(prompt, LOCALAI_MODEL)
+
+    def complete() -> str:
+        for attempt in range(retries + 1):
+            try:
+                response = requests.post(
+                    f"{LOCALAI_URL}/chat/completions",
+                    json={
+                        "model": LOCALAI_MODEL,
+                        "messages": [{"role": "user", "content": prompt}],
+                        "max_tokens": max_tokens,
+                        "temperature": 0.3
+                    },
+                    timeout=600  # 10 minutes for CPU inference on 7B model
+                )
+                response.raise_for_status()
+                return response.json()["choices"][0]["message"]["content"]
+            except requests.exceptions.Timeout:
+                if attempt < retries:
+                    print(f"[LocalAI] Timeout, retrying ({attempt + 1}/{retries})...")
+                    continue
+                print(f"[LocalAI Error] Timeout after {retries + 1} attempts")
+                return ""
+            except Exception as e:
+                print(f"[LocalAI Error] {e}")
+                return ""
+
+    content, cached = _llm_cache.get_or_compute(key, complete, metadata={"model_id": LOCALAI_MODEL})
+    if content:
+        print(f"[Cache {'HIT' if cached else 'SET'}] {key[:8]}...")
+    return content or ""
 
 # ============================================================================
 # Extraction Prompts (Optimized for Mistral 7B)
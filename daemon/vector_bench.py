@@ -0,0 +1,376 @@
+#!/usr/bin/env python3
+"""
+Vector Bench - Reproducible VectorStore benchmarks on synthetic corpora
+
+Generates a deterministic corpus (clustered fake embeddings plus topic-biased
+word content, so no embedding model or LLM is needed), ingests it into a
+scratch VectorStore and measures:
+
+- Ingest throughput (docs/s through add_batch)
+- Cold index load time
+- p50/p95/p99 latency for search, keyword_search and hybrid_search
+- Memory: peak RSS, vector index bytes, DB file size
+- Recall@k of search against exact float32 search
+
+Results are JSON so runs can be diffed across commits (--compare).
+
+Usage:
+    python vector_bench.py --docs 10000
+    python vector_bench.py --docs 100000 --index ivf --out ivf.json
+    python vector_bench.py --docs 100000 --index int8 --compare ivf.json
+"""
+
+import itertools
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import db_pool
+from vector_index import NUMPY_AVAILABLE, QUANTIZATION_MODES, EmbeddingMatrix, INDEX_TYPES
+
+if NUMPY_AVAILABLE:
+    import numpy as np
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+BLOCK_SIZE = 1024
+QUERY_METHODS = ("search", "keyword_search", "hybrid_search")
+
+# ============================================================================
+# Synthetic Corpus
+# ============================================================================
+
+class SyntheticCorpus:
+    """
+    Deterministic corpus of n documents.
+
+    Each document belongs to one of `clusters` topics: its embedding is the
+    topic centroid plus gaussian noise, and its content mixes common words
+    with the topic's own words, so vector and keyword relevance agree.
+    Documents are generated in fixed blocks seeded by (seed, block), so any
+    document can be regenerated without the rest of the corpus.
+    """
+
+    def __init__(self, n: int, dim: int = 384, clusters: int = 64,
+                 vocab_size: int = 5000, topic_words: int = 50,
+                 noise: float = 0.35, seed: int = 42):
+        self.n = n
+        self.dim = dim
+        self.clusters = clusters
+        self.vocab_size = vocab_size
+        self.topic_words = topic_words
+        self.noise = noise
+        self.seed = seed
+        self.use_numpy = NUMPY_AVAILABLE
+        self._block_cache: Tuple[int, List[Dict]] = (-1, [])
+
+        rng = random.Random(seed)
+        self.centroids = [[rng.gauss(0, 1) for _ in range(dim)] for _ in range(clusters)]
+        # Zipf-like cumulative weights over the shared vocabulary
+        self._vocab_cum_weights = list(itertools.accumulate(
+            1.0 / (rank + 1) for rank in range(vocab_size)))
+
+    def _block(self, block: int) -> List[Dict]:
+        if self._block_cache[0] == block:
+            return self._block_cache[1]
+
+        start = block * BLOCK_SIZE
+        count = min(BLOCK_SIZE, self.n - start)
+        rng = random.Random(self.seed * 1_000_003 + block)
+        topics = [rng.randrange(self.clusters) for _ in range(count)]
+
+        if self.use_numpy:
+            noise = np.random.default_rng((self.seed, block)).normal(
+                0, self.noise, (count, self.dim)).astype(np.float32)
+            centroids = np.asarray(self.centroids, dtype=np.float32)
+            embeddings = (centroids[topics] + noise).tolist()
+        else:
+            embeddings = [[c + rng.gauss(0, self.noise) for c in self.centroids[t]]
+                          for t in topics]
+
+        docs = []
+        for offset, topic in enumerate(topics):
+            length = rng.randint(40, 120)
+            common = rng.choices(range(self.vocab_size), cum_weights=self._vocab_cum_weights,
+                                 k=length * 3 // 4)
+            specific = [rng.randrange(self.topic_words) for _ in range(length - len(common))]
+            words = [f"w{w}" for w in common] + [f"t{topic}x{w}" for w in specific]
+            rng.shuffle(words)
+            docs.append({
+                "doc_id": f"doc{start + offset}",
+                "content": " ".join(words),
+                "metadata": {"topic": topic, "source": f"src{(start + offset) % 97}"},
+                "embedding": embeddings[offset],
+            })
+
+        self._block_cache = (block, docs)
+        return docs
+
+    def document(self, i: int) -> Dict:
+        return self._block(i // BLOCK_SIZE)[i % BLOCK_SIZE]
+
+    def batches(self, batch_size: int) -> Iterator[List[Dict]]:
+        batch = []
+        for block in range(math.ceil(self.n / BLOCK_SIZE)):
+            for doc in self._block(block):
+                batch.append(doc)
+                if len(batch) >= batch_size:
+                    yield batch
+                    batch = []
+        if batch:
+            yield batch
+
+    def queries(self, count: int, noise: float = 0.1,
+                words: int = 3) -> List[Tuple[str, List[float]]]:
+        """(query text, query embedding) pairs derived from random documents."""
+        rng = random.Random(self.seed + 1)
+        queries = []
+        for i in sorted(rng.sample(range(self.n), min(count, self.n))):
+            doc = self.document(i)
+            terms = doc["content"].split()
+            text = " ".join(rng.sample(terms, min(words, len(terms))))
+            queries.append((f"{text} q{len(queries)}",
+                            [x + rng.gauss(0, noise) for x in doc["embedding"]]))
+        rng.shuffle(queries)
+        return queries
+
+
+class SyntheticRouter:
+    """Stand-in for ModelRouter: fixed embeddings for known query texts."""
+
+    def __init__(self, embeddings: Dict[str, List[float]], dim: int):
+        self.embeddings = embeddings
+        self.dim = dim
+
+    def _vector(self, text: str) -> List[float]:
+        if text in self.embeddings:
+            return self.embeddings[text]
+        rng = random.Random(text)
+        return [rng.gauss(0, 1) for _ in range(self.dim)]
+
+    def embed(self, text: str) -> Dict:
+        return {"provider": "synthetic", "embedding": self._vector(text)}
+
+    def embed_batch(self, texts: List[str], batch_size: int = 64) -> Dict:
+        return {"provider": "synthetic", "embeddings": [self._vector(t) for t in texts]}
+
+# ============================================================================
+# Measurements
+# ============================================================================
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Linear-interpolated percentile of values (pct in 0..100)."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    low = math.floor(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+def latency_summary(samples_ms: Sequence[float]) -> Dict:
+    return {
+        "queries": len(samples_ms),
+        "mean_ms": round(sum(samples_ms) / len(samples_ms), 3) if samples_ms else 0.0,
+        "p50_ms": round(percentile(samples_ms, 50), 3),
+        "p95_ms": round(percentile(samples_ms, 95), 3),
+        "p99_ms": round(percentile(samples_ms, 99), 3),
+        "max_ms": round(max(samples_ms), 3) if samples_ms else 0.0,
+    }
+
+
+def time_queries(fn: Callable[[str], object], texts: Sequence[str],
+                 warmup: int = 5) -> Dict:
+    for text in texts[:warmup]:
+        fn(text)
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        fn(text)
+        samples.append((time.perf_counter() - start) * 1000)
+    return latency_summary(samples)
+
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB (None if unavailable)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KB, macOS bytes
+    return round(peak / (1024 * 1024 if platform.system() == "Darwin" else 1024), 1)
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"],
+                              cwd=Path(__file__).parent, capture_output=True,
+                              text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+# ============================================================================
+# Benchmark
+# ============================================================================
+
+def run_benchmark(docs: int = 10000, dim: int = 384, queries: int = 200, k: int = 10,
+                  index_type: str = "flat", index_params: Dict = None,
+                  batch_size: int = 500, fusion: str = "weighted",
+                  db_path: Path = None, seed: int = 42) -> Dict:
+    """Ingest a synthetic corpus into a scratch store and measure it."""
+    from vector_store import VectorStore
+
+    corpus = SyntheticCorpus(docs, dim=dim, seed=seed)
+    query_set = corpus.queries(queries)
+    router = SyntheticRouter(dict(query_set), dim)
+    texts = [text for text, _ in query_set]
+
+    scratch = None
+    if db_path is None:
+        scratch = tempfile.mkdtemp(prefix="vector_bench_")
+        db_path = Path(scratch) / "bench.db"
+
+    try:
+        store = VectorStore(db_path, index_type=index_type, index_params=index_params)
+        store._router = router
+
+        start = time.perf_counter()
+        ingested = sum(store.add_batch(batch, batch_size) for batch in corpus.batches(batch_size))
+        ingest_s = time.perf_counter() - start
+        rss_after_ingest = peak_rss_mb()
+
+        # Cold load from SQLite in a fresh store
+        store = VectorStore(db_path, index_type=index_type, index_params=index_params)
+        store._router = router
+        start = time.perf_counter()
+        index = store.index
+        load_s = time.perf_counter() - start
+
+        latency = {
+            "search": time_queries(lambda q: store.search(q, k), texts),
+            "keyword_search": time_queries(lambda q: store.keyword_search(q, k), texts),
+            "hybrid_search": time_queries(
+                lambda q: store.hybrid_search(q, k, fusion=fusion), texts),
+        }
+
+        # Ground truth: exact float32 search over the stored embeddings
+        exact = EmbeddingMatrix()
+        conn = db_pool.connect(db_path)
+        exact.load_blobs(conn.execute(
+            'SELECT doc_id, embedding FROM documents WHERE embedding IS NOT NULL'))
+        conn.close()
+        hits = expected_total = 0
+        for text, embedding in query_set:
+            expected = {doc_id for doc_id, _ in exact.search(embedding, k)}
+            found = {r.doc_id for r in store.search(text, k)}
+            hits += len(expected & found)
+            expected_total += len(expected)
+
+        return {
+            "meta": {
+                "timestamp": datetime.now().isoformat(),
+                "commit": git_commit(),
+                "python": platform.python_version(),
+                "numpy": NUMPY_AVAILABLE,
+                "params": {"docs": docs, "dim": dim, "queries": len(query_set), "k": k,
+                           "index": index_type, "index_params": index_params or {},
+                           "batch_size": batch_size, "fusion": fusion, "seed": seed},
+            },
+            "ingest": {
+                "documents": ingested,
+                "seconds": round(ingest_s, 3),
+                "docs_per_s": round(ingested / ingest_s, 1) if ingest_s else None,
+            },
+            "index_load_s": round(load_s, 3),
+            "latency": latency,
+            "recall": {f"recall@{k}": round(hits / expected_total, 4) if expected_total else None},
+            "memory": {
+                "peak_rss_after_ingest_mb": rss_after_ingest,
+                "peak_rss_mb": peak_rss_mb(),
+                "index": index.stats(),
+                "db_bytes": os.path.getsize(db_path),
+            },
+        }
+    finally:
+        if scratch:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+def compare(current: Dict, baseline: Dict) -> Dict:
+    """Relative change (%) of the headline numbers against a baseline run."""
+    def change(new, old):
+        if new is None or not old:
+            return None
+        return round((new - old) / old * 100, 1)
+
+    diff = {
+        "baseline_commit": baseline.get("meta", {}).get("commit"),
+        "ingest_docs_per_s": change(current["ingest"]["docs_per_s"],
+                                    baseline.get("ingest", {}).get("docs_per_s")),
+        "index_load_s": change(current["index_load_s"], baseline.get("index_load_s")),
+        "peak_rss_mb": change(current["memory"]["peak_rss_mb"],
+                              baseline.get("memory", {}).get("peak_rss_mb")),
+    }
+    for method in QUERY_METHODS:
+        old = baseline.get("latency", {}).get(method, {})
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            diff[f"{method}.{key}"] = change(current["latency"][method][key], old.get(key))
+    for key, value in current["recall"].items():
+        old = baseline.get("recall", {}).get(key)
+        diff[key] = round(value - old, 4) if value is not None and old is not None else None
+    return diff
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Vector Store Benchmark')
+    parser.add_argument('--docs', type=int, default=10000, help='Corpus size (10k-1M)')
+    parser.add_argument('--dim', type=int, default=384, help='Embedding dimension')
+    parser.add_argument('--queries', type=int, default=200, help='Timed queries per method')
+    parser.add_argument('-k', type=int, default=10, help='Results per query')
+    parser.add_argument('--index', type=str, default='flat', choices=list(INDEX_TYPES) + list(QUANTIZATION_MODES))
+    parser.add_argument('--nprobe', type=int, help='IVF lists probed per query')
+    parser.add_argument('--batch-size', type=int, default=500, help='Documents per add_batch')
+    parser.add_argument('--fusion', type=str, default='weighted', choices=['weighted', 'rrf'])
+    parser.add_argument('--db', type=str, help='Keep the benchmark DB at this path (must not exist)')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--out', type=str, help='Write JSON results to file')
+    parser.add_argument('--compare', type=str, help='Baseline JSON to diff against')
+
+    args = parser.parse_args()
+    if args.db and Path(args.db).exists():
+        parser.error(f"{args.db} already exists")
+
+    index_params = {"nprobe": args.nprobe} if args.nprobe and args.index == 'ivf' else None
+    results = run_benchmark(
+        docs=args.docs, dim=args.dim, queries=args.queries, k=args.k,
+        index_type=args.index, index_params=index_params, batch_size=args.batch_size,
+        fusion=args.fusion, db_path=Path(args.db) if args.db else None, seed=args.seed)
+
+    if args.compare:
+        with open(args.compare) as f:
+            results["comparison"] = compare(results, json.load(f))
+
+    output = json.dumps(results, indent=2)
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(output + "\n")
+    print(output)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1187 @@
+#!/usr/bin/env python3
+"""
+Vector Index - In-memory embedding matrix for fast similarity search
+
+Replaces the per-row deserialize + pure-Python cosine loop in VectorStore.search:
+- Embeddings are L2-normalized once and kept in one contiguous float32 matrix
+- A query is scored with a single matrix-vector product
+- Top-k uses argpartition (partial selection) instead of sorting every score
+- Optional memory-mapped snapshot (.npy) so large stores open without a full load
+- Pure-Python fallback (array('f') rows + heapq) when NumPy is not installed
+- IVFIndex: k-means coarse quantizer for approximate search (tunable nprobe)
+- QuantizedIndex: int8 / binary codes in RAM with exact float rerank
+
+Usage:
+    from vector_index import EmbeddingMatrix
+    index = EmbeddingMatrix()
+    index.upsert("doc1", [0.1, 0.2, 0.3])
+    hits = index.search([0.1, 0.2, 0.3], k=5)   # [(doc_id, cosine), ...]
+"""
+
+import heapq
+import json
+import math
+import operator
+import threading
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+_INITIAL_CAPACITY = 1024
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def normalize(vector: Iterable[float]) -> List[float]:
+    """Return the L2-normalized vector (zero vectors stay zero)."""
+    values = [float(x) for x in vector]
+    norm = math.sqrt(sum(x * x for x in values))
+    if norm == 0:
+        return values
+    return [x / norm for x in values]
+
+
+def _snapshot_paths(path: Path) -> Tuple[Path, Path]:
+    """Matrix (.npy) and sidecar (.json) paths for a snapshot base path."""
+    path = Path(path)
+    return path.parent / (path.name + ".npy"), path.parent / (path.name + ".json")
+
+# ============================================================================
+# Embedding Matrix
+# ============================================================================
+
+class EmbeddingMatrix:
+    """
+    Contiguous matrix of pre-normalized embeddings keyed by doc_id.
+
+    Rows are packed densely: deleting a doc moves the last row into its slot,
+    so the live region is always rows [0, size). Vectors whose dimension does
+    not match the first vector added are rejected (a model change needs a
+    rebuild, not silent zero scores).
+    """
+
+    kind = "flat"
+
+    def __init__(self, dim: Optional[int] = None, use_numpy: Optional[bool] = None):
+        self.dim = dim
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else (use_numpy and NUMPY_AVAILABLE)
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.rejected = 0
+        self._lock = threading.RLock()
+        self._matrix = None      # numpy (capacity, dim) float32
+        self._vectors: List[array] = []  # fallback rows
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.rows
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def _ensure_capacity(self, needed: int):
+        """Grow the numpy buffer geometrically so appends stay amortized O(d)."""
+        if self._matrix is None:
+            capacity = max(_INITIAL_CAPACITY, needed)
+            self._matrix = np.zeros((capacity, self.dim), dtype=np.float32)
+            return
+        capacity = self._matrix.shape[0]
+        if needed <= capacity and self._matrix.flags.writeable:
+            return
+        while capacity < needed:
+            capacity *= 2
+        grown = np.zeros((capacity, self.dim), dtype=np.float32)
+        live = min(len(self.ids), self._matrix.shape[0])
+        grown[:live] = self._matrix[:live]
+        self._matrix = grown
+
+    def upsert(self, doc_id: str, embedding: List[float]) -> bool:
+        """Insert or replace a document vector. Returns False if rejected."""
+        if not embedding:
+            self.remove(doc_id)
+            return False
+
+        with self._lock:
+            if self.dim is None:
+                self.dim = len(embedding)
+            if len(embedding) != self.dim:
+                self.rejected += 1
+                self.remove(doc_id)
+                return False
+
+            vector = normalize(embedding)
+            row = self.rows.get(doc_id)
+            if row is None:
+                row = len(self.ids)
+                self.ids.append(doc_id)
+                self.rows[doc_id] = row
+                if self.use_numpy:
+                    self._ensure_capacity(row + 1)
+                else:
+                    self._vectors.append(array('f', vector))
+                    return True
+            elif self.use_numpy:
+                self._ensure_capacity(len(self.ids))
+
+            if self.use_numpy:
+                self._matrix[row] = vector
+            else:
+                self._vectors[row] = array('f', vector)
+            return True
+
+    def remove(self, doc_id: str) -> bool:
+        """Remove a document vector (swap-with-last, O(d))."""
+        with self._lock:
+            row = self.rows.pop(doc_id, None)
+            if row is None:
+                return False
+
+            last = len(self.ids) - 1
+            if row != last:
+                moved = self.ids[last]
+                self.ids[row] = moved
+                self.rows[moved] = row
+                if self.use_numpy:
+                    self._ensure_capacity(len(self.ids))
+                    self._matrix[row] = self._matrix[last]
+                else:
+                    self._vectors[row] = self._vectors[last]
+            self.ids.pop()
+            if not self.use_numpy:
+                self._vectors.pop()
+            return True
+
+    def clear(self):
+        """Drop all vectors (dimension is reset too)."""
+        with self._lock:
+            self.ids = []
+            self.rows = {}
+            self._matrix = None
+            self._vectors = []
+            self.dim = None
+
+    def load_blobs(self, rows: Iterable[Tuple[str, bytes]]):
+        """
+        Bulk load (doc_id, float32 blob) rows as produced by serialize_embedding.
+
+        With NumPy the blobs are decoded in one frombuffer call and normalized
+        as a block instead of one struct.unpack per row.
+        """
+        with self._lock:
+            if not self.use_numpy:
+                for doc_id, blob in rows:
+                    if blob:
+                        self.upsert(doc_id, array('f', blob).tolist())
+                return
+
+            ids, blobs = [], []
+            for doc_id, blob in rows:
+                if not blob:
+                    continue
+                if self.dim is None:
+                    self.dim = len(blob) // 4
+                if len(blob) != self.dim * 4:
+                    self.rejected += 1
+                    continue
+                ids.append(doc_id)
+                blobs.append(blob)
+            if not ids:
+                return
+
+            block = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(ids), self.dim)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            block = block / norms
+
+            self._ensure_capacity(len(self.ids) + len(ids))
+            for doc_id, vector in zip(ids, block):
+                row = self.rows.get(doc_id)
+                if row is None:
+                    row = len(self.ids)
+                    self.ids.append(doc_id)
+                    self.rows[doc_id] = row
+                self._matrix[row] = vector
+
+    def vector(self, doc_id: str) -> Optional[List[float]]:
+        """Normalized vector stored for doc_id (None if absent)."""
+        row = self.rows.get(doc_id)
+        if row is None:
+            return None
+        if self.use_numpy:
+            return self._matrix[row].tolist()
+        return self._vectors[row].tolist()
+
+    def live(self):
+        """Live rows [0, size): a numpy view, or the list of array('f') rows."""
+        if self.use_numpy:
+            if self._matrix is None:
+                return np.zeros((0, self.dim or 0), dtype=np.float32)
+            return self._matrix[:len(self.ids)]
+        return self._vectors
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def search(self, query: List[float], k: int = 5,
+               allowed_ids: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """
+        Top-k cosine search. Returns [(doc_id, score)] best first.
+
+        allowed_ids restricts scoring to a pre-filtered subset (metadata filters).
+        """
+        if k <= 0 or not self.ids or self.dim is None or len(query) != self.dim:
+            return []
+
+        q = normalize(query)
+        with self._lock:
+            if self.use_numpy:
+                return self._search_numpy(q, k, allowed_ids)
+            return self._search_python(q, k, allowed_ids)
+
+    def _search_numpy(self, q: List[float], k: int,
+                      allowed_ids: Optional[Set[str]]) -> List[Tuple[str, float]]:
+        qv = np.asarray(q, dtype=np.float32)
+        if allowed_ids is not None:
+            rows = np.fromiter((self.rows[d] for d in allowed_ids if d in self.rows), dtype=np.int64)
+            if rows.size == 0:
+                return []
+            scores = self._matrix[rows] @ qv
+        else:
+            rows = None
+            scores = self._matrix[:len(self.ids)] @ qv
+
+        k = min(k, scores.shape[0])
+        if k < scores.shape[0]:
+            top = np.argpartition(-scores, k - 1)[:k]
+        else:
+            top = np.arange(scores.shape[0])
+        top = top[np.argsort(-scores[top], kind="stable")]
+
+        if rows is not None:
+            return [(self.ids[rows[i]], float(scores[i])) for i in top]
+        return [(self.ids[i], float(scores[i])) for i in top]
+
+    def _search_python(self, q: List[float], k: int,
+                       allowed_ids: Optional[Set[str]]) -> List[Tuple[str, float]]:
+        if allowed_ids is not None:
+            candidates = [self.rows[d] for d in allowed_ids if d in self.rows]
+        else:
+            candidates = range(len(self.ids))
+
+        vectors = self._vectors
+        mul = operator.mul
+        scored = ((sum(map(mul, q, vectors[i])), i) for i in candidates)
+        return [(self.ids[i], score) for score, i in heapq.nlargest(k, scored)]
+
+    # ------------------------------------------------------------------
+    # Persistence (memory-mapped snapshot)
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path, generation: int = 0):
+        """
+        Write a snapshot: <path>.npy (float32 rows) + <path>.json (ids, generation).
+
+        The generation lets the owner detect a stale snapshot on reopen.
+        """
+        if not self.use_numpy:
+            return
+        matrix_path, meta_path = _snapshot_paths(path)
+        with self._lock:
+            live = self._matrix[:len(self.ids)] if self._matrix is not None else \
+                np.zeros((0, self.dim or 0), dtype=np.float32)
+            np.save(matrix_path, np.ascontiguousarray(live))
+            meta_path.write_text(json.dumps({
+                "ids": self.ids,
+                "dim": self.dim,
+                "generation": generation,
+            }))
+
+    @classmethod
+    def load(cls, path: Path, generation: Optional[int] = None,
+             mmap: bool = True) -> Optional["EmbeddingMatrix"]:
+        """
+        Open a snapshot written by save(). Returns None if missing or stale.
+
+        With mmap=True the matrix is mapped copy-on-write, so opening is O(1)
+        and pages are faulted in on first search; the first append copies it.
+        """
+        if not NUMPY_AVAILABLE:
+            return None
+        matrix_path, meta_path = _snapshot_paths(path)
+        if not matrix_path.exists() or not meta_path.exists():
+            return None
+        try:
+            meta = json.loads(meta_path.read_text())
+            if generation is not None and meta.get("generation") != generation:
+                return None
+            matrix = np.load(matrix_path, mmap_mode="c" if mmap else None)
+        except (OSError, ValueError):
+            return None
+        if matrix.shape[0] != len(meta["ids"]):
+            return None
+
+        index = cls(dim=meta["dim"], use_numpy=True)
+        index.ids = list(meta["ids"])
+        index.rows = {doc_id: i for i, doc_id in enumerate(index.ids)}
+        if matrix.shape[0]:
+            index._matrix = matrix
+        return index
+
+    def stats(self) -> Dict:
+        """Index statistics."""
+        return {
+            "vectors": len(self.ids),
+            "dim": self.dim,
+            "backend": "numpy" if self.use_numpy else "python",
+            "rejected": self.rejected,
+            "bytes": len(self.ids) * (self.dim or 0) * 4,
+        }
+
+# ============================================================================
+# IVF-Flat (approximate) Index
+# ============================================================================
+
+def _kmeans_numpy(data, nlist: int, iterations: int, seed: int):
+    """Spherical k-means over normalized rows; returns normalized centroids."""
+    rng = np.random.default_rng(seed)
+    centroids = data[rng.choice(data.shape[0], nlist, replace=False)].copy()
+    for _ in range(iterations):
+        assign = np.argmax(data @ centroids.T, axis=1)
+        sums = np.zeros_like(centroids)
+        np.add.at(sums, assign, data)
+        counts = np.bincount(assign, minlength=nlist)
+        empty = counts == 0
+        if empty.any():
+            # Re-seed empty clusters from random points
+            sums[empty] = data[rng.choice(data.shape[0], int(empty.sum()))]
+        norms = np.linalg.norm(sums, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        centroids = (sums / norms).astype(np.float32)
+    return centroids
+
+
+def _kmeans_python(data: List[List[float]], nlist: int, iterations: int,
+                   seed: int) -> List[List[float]]:
+    """Pure-Python spherical k-means (used on a sample, so n stays small)."""
+    import random
+    rng = random.Random(seed)
+    centroids = [list(v) for v in rng.sample(data, nlist)]
+    mul = operator.mul
+    for _ in range(iterations):
+        sums = [[0.0] * len(centroids[0]) for _ in range(nlist)]
+        counts = [0] * nlist
+        for v in data:
+            c = max(range(nlist), key=lambda j: sum(map(mul, v, centroids[j])))
+            counts[c] += 1
+            acc = sums[c]
+            for i, x in enumerate(v):
+                acc[i] += x
+        for c in range(nlist):
+            centroids[c] = normalize(sums[c]) if counts[c] else list(rng.choice(data))
+    return centroids
+
+
+class IVFIndex:
+    """
+    Inverted-file index: k-means coarse quantizer over an EmbeddingMatrix.
+
+    Each vector is assigned to its nearest centroid ("list"). A query scores
+    the centroids, probes the nprobe closest lists and runs the exact matrix
+    search only over their members, so cost is O(nlist*d + candidates*d)
+    instead of O(n*d). nprobe trades recall for speed (nprobe == nlist is exact).
+
+    Until train_threshold vectors exist the index is untrained and searches
+    are exact. Training happens automatically at the threshold and again when
+    the corpus has grown by retrain_growth since the last training, so
+    clusters track the corpus; add/delete between trainings only assign or
+    unassign the one vector.
+
+    Automatic training runs k-means on a background thread over a copied
+    sample, so upsert() never waits for it; searches keep using the previous
+    lists (or exact search) until the new centroids are swapped in. Only the
+    final reassignment of every vector holds the lock. Pass
+    background_training=False to train inline on the writer instead.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, nlist: Optional[int] = None, nprobe: int = 8,
+                 train_threshold: int = 2048, retrain_growth: float = 4.0,
+                 iterations: int = 10, seed: int = 42,
+                 background_training: bool = True,
+                 use_numpy: Optional[bool] = None):
+        self.flat = EmbeddingMatrix(use_numpy=use_numpy)
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.train_threshold = train_threshold
+        self.retrain_growth = retrain_growth
+        self.iterations = iterations
+        self.seed = seed
+        self.centroids = None
+        self.lists: List[Set[str]] = []
+        self.assign: Dict[str, int] = {}
+        self.trained_size = 0
+        self.background_training = background_training
+        self._trainer: Optional[threading.Thread] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self.flat)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.flat
+
+    @property
+    def dim(self) -> Optional[int]:
+        return self.flat.dim
+
+    @property
+    def use_numpy(self) -> bool:
+        return self.flat.use_numpy
+
+    @property
+    def trained(self) -> bool:
+        return self.centroids is not None
+
+    # ------------------------------------------------------------------
+    # Training / assignment
+    # ------------------------------------------------------------------
+
+    def train(self, nlist: Optional[int] = None):
+        """(Re)train centroids on a sample and reassign every vector."""
+        with self._lock:
+            n = len(self.flat)
+            if n == 0:
+                return
+            nlist = nlist or self.nlist or max(1, int(math.sqrt(n)))
+            nlist = min(nlist, n)
+            sample_size = min(n, max(nlist * 64, 4096))
+
+            # Copy the sample so k-means can run without the lock
+            if self.use_numpy:
+                data = self.flat.live()
+                if sample_size < n:
+                    rng = np.random.default_rng(self.seed)
+                    data = data[rng.choice(n, sample_size, replace=False)]
+                else:
+                    data = np.array(data)
+            else:
+                import random
+                rows = self.flat.live()
+                sample = random.Random(self.seed).sample(range(n), sample_size)
+                data = [rows[i].tolist() for i in sample]
+
+        if self.use_numpy:
+            centroids = _kmeans_numpy(data, nlist, self.iterations, self.seed)
+        else:
+            centroids = [array('f', c) for c in
+                         _kmeans_python(data, nlist, self.iterations, self.seed)]
+
+        with self._lock:
+            if not len(self.flat):
+                return  # cleared while training
+            self.centroids = centroids
+            self.nlist = nlist
+            self.trained_size = n
+            self._assign_all()
+
+    def _assign_all(self):
+        self.lists = [set() for _ in range(self.nlist)]
+        self.assign = {}
+        ids = self.flat.ids
+        if self.use_numpy:
+            data = self.flat.live()
+            for start in range(0, len(ids), 8192):
+                nearest = np.argmax(data[start:start + 8192] @ self.centroids.T, axis=1)
+                for offset, c in enumerate(nearest.tolist()):
+                    self.assign[ids[start + offset]] = c
+                    self.lists[c].add(ids[start + offset])
+        else:
+            for doc_id, vector in zip(ids, self.flat.live()):
+                c = self._nearest(vector)
+                self.assign[doc_id] = c
+                self.lists[c].add(doc_id)
+
+    def _centroid_scores(self, vector) -> List[float]:
+        if self.use_numpy:
+            return (self.centroids @ np.asarray(vector, dtype=np.float32)).tolist()
+        mul = operator.mul
+        return [sum(map(mul, vector, c)) for c in self.centroids]
+
+    def _nearest(self, vector) -> int:
+        scores = self._centroid_scores(vector)
+        return max(range(len(scores)), key=scores.__getitem__)
+
+    def _maybe_train(self):
+        """Start a (re)training if the corpus crossed a threshold and none is running."""
+        n = len(self.flat)
+        if not self.trained:
+            if n < self.train_threshold:
+                return
+            nlist = None
+        elif n >= self.trained_size * self.retrain_growth:
+            nlist = max(self.nlist, int(math.sqrt(n)))
+        else:
+            return
+
+        if not self.background_training:
+            self.train(nlist)
+            return
+        if self._trainer is not None and self._trainer.is_alive():
+            return
+        self._trainer = threading.Thread(target=self.train, args=(nlist,),
+                                         name="ivf-train", daemon=True)
+        self._trainer.start()
+
+    def wait_for_training(self, timeout: Optional[float] = None) -> bool:
+        """Block until a background training finishes. False on timeout."""
+        trainer = self._trainer
+        if trainer is None:
+            return True
+        trainer.join(timeout)
+        return not trainer.is_alive()
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def _unassign(self, doc_id: str):
+        c = self.assign.pop(doc_id, None)
+        if c is not None:
+            self.lists[c].discard(doc_id)
+
+    def upsert(self, doc_id: str, embedding: List[float]) -> bool:
+        with self._lock:
+            self._unassign(doc_id)
+            if not self.flat.upsert(doc_id, embedding):
+                return False
+            if self.trained:
+                c = self._nearest(self.flat.vector(doc_id))
+                self.assign[doc_id] = c
+                self.lists[c].add(doc_id)
+            self._maybe_train()
+            return True
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            self._unassign(doc_id)
+            return self.flat.remove(doc_id)
+
+    def clear(self):
+        with self._lock:
+            self.flat.clear()
+            self.centroids = None
+            self.lists = []
+            self.assign = {}
+            self.trained_size = 0
+
+    def load_blobs(self, rows: Iterable[Tuple[str, bytes]]):
+        with self._lock:
+            self.flat.load_blobs(rows)
+            if self.trained:
+                self._assign_all()
+            self._maybe_train()
+
+    def vector(self, doc_id: str) -> Optional[List[float]]:
+        return self.flat.vector(doc_id)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _expected_candidates(self, nprobe: Optional[int] = None) -> float:
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        return len(self.flat) * nprobe / max(self.nlist, 1)
+
+    def probe(self, query: List[float], nprobe: Optional[int] = None) -> Set[str]:
+        """Doc ids in the nprobe lists whose centroids are closest to query."""
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        scores = self._centroid_scores(normalize(query))
+        nearest = heapq.nlargest(nprobe, range(len(scores)), key=scores.__getitem__)
+        return set().union(*(self.lists[c] for c in nearest))
+
+    def search(self, query: List[float], k: int = 5,
+               allowed_ids: Optional[Set[str]] = None,
+               nprobe: Optional[int] = None) -> List[Tuple[str, float]]:
+        """Approximate top-k: exact search restricted to the nprobe nearest lists."""
+        if not self.trained or self.dim is None or len(query) != self.dim:
+            return self.flat.search(query, k, allowed_ids)
+
+        with self._lock:
+            if allowed_ids is not None and len(allowed_ids) <= self._expected_candidates(nprobe):
+                # Selective filter: exact scan of the allowed set is cheaper and lossless
+                return self.flat.search(query, k, allowed_ids)
+            candidates = self.probe(query, nprobe)
+            if allowed_ids is not None:
+                candidates &= allowed_ids if isinstance(allowed_ids, set) else set(allowed_ids)
+            return self.flat.search(query, k, candidates)
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path, generation: int = 0):
+        """Flat snapshot plus <path>.ivf.json (centroids + list assignment)."""
+        if not self.use_numpy:
+            return
+        with self._lock:
+            self.flat.save(path, generation)
+            ivf_path = Path(str(path) + ".ivf.json")
+            ivf_path.write_text(json.dumps({
+                "generation": generation,
+                "nlist": self.nlist,
+                "trained_size": self.trained_size,
+                "centroids": self.centroids.tolist() if self.trained else None,
+                "assign": [self.assign.get(doc_id, -1) for doc_id in self.flat.ids],
+            }))
+
+    @classmethod
+    def load(cls, path: Path, generation: Optional[int] = None,
+             mmap: bool = True, **params) -> Optional["IVFIndex"]:
+        """Open a snapshot written by save(). Returns None if missing or stale."""
+        flat = EmbeddingMatrix.load(path, generation, mmap)
+        ivf_path = Path(str(path) + ".ivf.json")
+        if flat is None or not ivf_path.exists():
+            return None
+        try:
+            meta = json.loads(ivf_path.read_text())
+        except (OSError, ValueError):
+            return None
+        if meta.get("generation") != generation and generation is not None:
+            return None
+
+        index = cls(**params)
+        index.flat = flat
+        index.trained_size = meta.get("trained_size", 0)
+        if meta.get("centroids"):
+            index.nlist = meta["nlist"]
+            index.centroids = np.asarray(meta["centroids"], dtype=np.float32)
+            index.lists = [set() for _ in range(index.nlist)]
+            for doc_id, c in zip(flat.ids, meta["assign"]):
+                if c < 0:
+                    c = index._nearest(flat.vector(doc_id))
+                index.assign[doc_id] = c
+                index.lists[c].add(doc_id)
+        return index
+
+    def stats(self) -> Dict:
+        sizes = [len(members) for members in self.lists]
+        stats = self.flat.stats()
+        stats.update({
+            "backend": f"ivf/{stats['backend']}",
+            "trained": self.trained,
+            "training": self._trainer is not None and self._trainer.is_alive(),
+            "nlist": self.nlist if self.trained else None,
+            "nprobe": self.nprobe,
+            "trained_size": self.trained_size,
+            "largest_list": max(sizes) if sizes else 0,
+        })
+        return stats
+
+# ============================================================================
+# Quantized Index (int8 / binary) with full-precision rerank
+# ============================================================================
+
+QUANTIZATION_MODES = ("int8", "binary")
+
+if NUMPY_AVAILABLE:
+    _POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+def quantize(embedding: List[float], mode: str) -> Tuple[bytes, float]:
+    """
+    Encode a vector as (code bytes, scale) after L2 normalization.
+
+    int8:   symmetric scalar quantization, code = round(v / scale), scale = max|v| / 127
+    binary: one sign bit per dimension (packed, MSB first); scale is unused (1.0)
+    """
+    v = normalize(embedding)
+    if mode == "int8":
+        peak = max((abs(x) for x in v), default=0.0)
+        scale = peak / 127 if peak else 1.0
+        return array('b', [max(-127, min(127, round(x / scale))) for x in v]).tobytes(), scale
+    if mode == "binary":
+        bits = 0
+        for x in v:
+            bits = (bits << 1) | (1 if x > 0 else 0)
+        pad = (-len(v)) % 8
+        return (bits << pad).to_bytes((len(v) + pad) // 8, "big"), 1.0
+    raise ValueError(f"Unknown quantization mode: {mode} (expected one of {QUANTIZATION_MODES})")
+
+
+class QuantizedIndex:
+    """
+    Compact in-memory codes with a two-stage search.
+
+    Stage 1 scores every (allowed) vector on its code: int8 codes with an
+    asymmetric float-query dot product, binary codes by Hamming distance to
+    the query's sign bits. Stage 2 takes the best k * rerank_factor
+    candidates, fetches their full-precision embeddings through
+    fetch_vectors(doc_ids) -> {doc_id: embedding} and re-scores them exactly.
+
+    RAM per vector: d bytes (int8) or d/8 bytes (binary) instead of 4*d.
+    Without fetch_vectors the stage-1 scores are returned as-is.
+    """
+
+    kind = "quantized"
+
+    def __init__(self, mode: str = "int8", rerank_factor: int = 4,
+                 fetch_vectors: Optional[Callable[[List[str]], Dict[str, List[float]]]] = None,
+                 use_numpy: Optional[bool] = None):
+        if mode not in QUANTIZATION_MODES:
+            raise ValueError(f"Unknown quantization mode: {mode} (expected one of {QUANTIZATION_MODES})")
+        self.mode = mode
+        self.rerank_factor = rerank_factor
+        self.fetch_vectors = fetch_vectors
+        self.use_numpy = NUMPY_AVAILABLE if use_numpy is None else (use_numpy and NUMPY_AVAILABLE)
+        self.dim: Optional[int] = None
+        self.ids: List[str] = []
+        self.rows: Dict[str, int] = {}
+        self.rejected = 0
+        self._lock = threading.RLock()
+        self._codes = None        # numpy (capacity, width) int8/uint8
+        self._scales = None       # numpy (capacity,) float32
+        self._code_list: List = []  # fallback: array('b') rows or ints
+        self._scale_list: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, doc_id: str) -> bool:
+        return doc_id in self.rows
+
+    @property
+    def width(self) -> int:
+        """Bytes per code."""
+        if self.dim is None:
+            return 0
+        return self.dim if self.mode == "int8" else (self.dim + 7) // 8
+
+    # ------------------------------------------------------------------
+    # Mutation
+    # ------------------------------------------------------------------
+
+    def _ensure_capacity(self, needed: int):
+        dtype = np.int8 if self.mode == "int8" else np.uint8
+        if self._codes is None:
+            capacity = max(_INITIAL_CAPACITY, needed)
+            self._codes = np.zeros((capacity, self.width), dtype=dtype)
+            self._scales = np.ones(capacity, dtype=np.float32)
+            return
+        capacity = self._codes.shape[0]
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        codes = np.zeros((capacity, self.width), dtype=dtype)
+        scales = np.ones(capacity, dtype=np.float32)
+        live = min(len(self.ids), self._codes.shape[0])
+        codes[:live] = self._codes[:live]
+        scales[:live] = self._scales[:live]
+        self._codes, self._scales = codes, scales
+
+    def upsert_code(self, doc_id: str, code: bytes, scale: float, dim: int) -> bool:
+        """Insert or replace a pre-encoded vector (as produced by quantize)."""
+        with self._lock:
+            if self.dim is None:
+                self.dim = dim
+            if dim != self.dim or len(code) != self.width:
+                self.rejected += 1
+                self.remove(doc_id)
+                return False
+
+            row = self.rows.get(doc_id)
+            if row is None:
+                row = len(self.ids)
+                self.ids.append(doc_id)
+                self.rows[doc_id] = row
+                if not self.use_numpy:
+                    self._code_list.append(None)
+                    self._scale_list.append(1.0)
+
+            if self.use_numpy:
+                self._ensure_capacity(row + 1)
+                dtype = np.int8 if self.mode == "int8" else np.uint8
+                self._codes[row] = np.frombuffer(code, dtype=dtype)
+                self._scales[row] = scale
+            else:
+                self._code_list[row] = (array('b', code) if self.mode == "int8"
+                                        else int.from_bytes(code, "big"))
+                self._scale_list[row] = scale
+            return True
+
+    def upsert(self, doc_id: str, embedding: List[float]) -> bool:
+        if not embedding:
+            self.remove(doc_id)
+            return False
+        code, scale = quantize(embedding, self.mode)
+        return self.upsert_code(doc_id, code, scale, len(embedding))
+
+    def remove(self, doc_id: str) -> bool:
+        with self._lock:
+            row = self.rows.pop(doc_id, None)
+            if row is None:
+                return False
+            last = len(self.ids) - 1
+            if row != last:
+                moved = self.ids[last]
+                self.ids[row] = moved
+                self.rows[moved] = row
+                if self.use_numpy:
+                    self._codes[row] = self._codes[last]
+                    self._scales[row] = self._scales[last]
+                else:
+                    self._code_list[row] = self._code_list[last]
+                    self._scale_list[row] = self._scale_list[last]
+            self.ids.pop()
+            if not self.use_numpy:
+                self._code_list.pop()
+                self._scale_list.pop()
+            return True
+
+    def clear(self):
+        with self._lock:
+            self.ids, self.rows = [], {}
+            self._codes = self._scales = None
+            self._code_list, self._scale_list = [], []
+            self.dim = None
+
+    def load_blobs(self, rows: Iterable[Tuple[str, bytes]]):
+        """Bulk load float32 blobs (quantized as one block with NumPy)."""
+        if not self.use_numpy:
+            for doc_id, blob in rows:
+                if blob:
+                    self.upsert(doc_id, array('f', blob).tolist())
+            return
+
+        with self._lock:
+            ids, blobs = [], []
+            for doc_id, blob in rows:
+                if not blob:
+                    continue
+                if self.dim is None:
+                    self.dim = len(blob) // 4
+                if len(blob) != self.dim * 4:
+                    self.rejected += 1
+                    continue
+                ids.append(doc_id)
+                blobs.append(blob)
+            if not ids:
+                return
+
+            block = np.frombuffer(b"".join(blobs), dtype=np.float32).reshape(len(ids), self.dim)
+            norms = np.linalg.norm(block, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            block = block / norms
+            if self.mode == "int8":
+                scales = np.abs(block).max(axis=1) / 127
+                scales[scales == 0] = 1.0
+                codes = np.clip(np.rint(block / scales[:, None]), -127, 127).astype(np.int8)
+            else:
+                scales = np.ones(len(ids), dtype=np.float32)
+                codes = np.packbits(block > 0, axis=1)
+
+            self._ensure_capacity(len(self.ids) + len(ids))
+            for doc_id, code, scale in zip(ids, codes, scales):
+                row = self.rows.get(doc_id)
+                if row is None:
+                    row = len(self.ids)
+                    self.ids.append(doc_id)
+                    self.rows[doc_id] = row
+                self._codes[row] = code
+                self._scales[row] = scale
+
+    def code(self, doc_id: str) -> Optional[Tuple[bytes, float]]:
+        """Stored (code bytes, scale) for doc_id."""
+        row = self.rows.get(doc_id)
+        if row is None:
+            return None
+        if self.use_numpy:
+            return self._codes[row].tobytes(), float(self._scales[row])
+        code = self._code_list[row]
+        if self.mode == "int8":
+            return code.tobytes(), self._scale_list[row]
+        return code.to_bytes(self.width, "big"), self._scale_list[row]
+
+    def load_codes(self, rows: Iterable[Tuple[str, bytes, float, int]]):
+        """Bulk load persisted (doc_id, code, scale, dim) rows."""
+        for doc_id, code, scale, dim in rows:
+            self.upsert_code(doc_id, code, scale, dim)
+
+    # ------------------------------------------------------------------
+    # Search
+    # ------------------------------------------------------------------
+
+    def _coarse_numpy(self, q: List[float], rows) -> "np.ndarray":
+        if self.mode == "int8":
+            qv = np.asarray(q, dtype=np.float32)
+            scores = np.empty(len(rows), dtype=np.float32)
+            for start in range(0, len(rows), 16384):
+                block = rows[start:start + 16384]
+                scores[start:start + len(block)] = \
+                    (self._codes[block].astype(np.float32) @ qv) * self._scales[block]
+            return scores
+        qcode = np.frombuffer(quantize(q, "binary")[0], dtype=np.uint8)
+        distances = _POPCOUNT[self._codes[rows] ^ qcode].sum(axis=1, dtype=np.int32)
+        return -distances.astype(np.float32)
+
+    def _coarse_python(self, q: List[float], rows) -> List[Tuple[float, int]]:
+        if self.mode == "int8":
+            mul = operator.mul
+            codes, scales = self._code_list, self._scale_list
+            return [(sum(map(mul, q, codes[i])) * scales[i], i) for i in rows]
+        qbits = int.from_bytes(quantize(q, "binary")[0], "big")
+        codes = self._code_list
+        return [(-bin(codes[i] ^ qbits).count("1"), i) for i in rows]
+
+    def coarse_search(self, query: List[float], n: int,
+                      allowed_ids: Optional[Set[str]] = None) -> List[Tuple[str, float]]:
+        """Stage 1 only: top-n by code score (approximate)."""
+        if n <= 0 or not self.ids or self.dim is None or len(query) != self.dim:
+            return []
+        q = normalize(query)
+        with self._lock:
+            if allowed_ids is not None:
+                rows = [self.rows[d] for d in allowed_ids if d in self.rows]
+            else:
+                rows = range(len(self.ids))
+            if not len(rows):
+                return []
+
+            if self.use_numpy:
+                rows = np.asarray(rows, dtype=np.int64)
+                scores = self._coarse_numpy(q, rows)
+                n = min(n, scores.shape[0])
+                top = np.argpartition(-scores, n - 1)[:n] if n < scores.shape[0] \
+                    else np.arange(scores.shape[0])
+                top = top[np.argsort(-scores[top], kind="stable")]
+                return [(self.ids[rows[i]], float(scores[i])) for i in top]
+
+            scored = heapq.nlargest(n, self._coarse_python(q, rows))
+            return [(self.ids[i], float(score)) for score, i in scored]
+
+    def search(self, query: List[float], k: int = 5,
+               allowed_ids: Optional[Set[str]] = None,
+               rerank: bool = True) -> List[Tuple[str, float]]:
+        """Two-stage top-k: code scan, then exact rerank of k * rerank_factor."""
+        if not rerank or self.fetch_vectors is None:
+            return self.coarse_search(query, k, allowed_ids)
+
+        candidates = self.coarse_search(query, k * max(1, self.rerank_factor), allowed_ids)
+        if not candidates:
+            return []
+        vectors = self.fetch_vectors([doc_id for doc_id, _ in candidates])
+        q = normalize(query)
+        mul = operator.mul
+        exact = []
+        for doc_id, _ in candidates:
+            vector = vectors.get(doc_id)
+            if vector is not None and len(vector) == len(q):
+                exact.append((doc_id, sum(map(mul, q, normalize(vector)))))
+        return heapq.nlargest(k, exact, key=lambda hit: hit[1])
+
+    # ------------------------------------------------------------------
+    # Persistence (codes live in the store's SQLite DB, not a snapshot)
+    # ------------------------------------------------------------------
+
+    def save(self, path: Path, generation: int = 0):
+        return
+
+    def stats(self) -> Dict:
+        code_bytes = len(self.ids) * (self.width + 4)
+        float_bytes = len(self.ids) * (self.dim or 0) * 4
+        return {
+            "vectors": len(self.ids),
+            "dim": self.dim,
+            "backend": f"{self.mode}/{'numpy' if self.use_numpy else 'python'}",
+            "rejected": self.rejected,
+            "bytes": code_bytes,
+            "float32_bytes": float_bytes,
+            "saved_pct": round(100 * (1 - code_bytes / float_bytes), 1) if float_bytes else 0.0,
+            "rerank_factor": self.rerank_factor,
+        }
+
+
+def quantization_report(blobs: List[Tuple[str, bytes]], mode: str, k: int = 10,
+                        queries: int = 100, rerank_factor: int = 4,
+                        noise: float = 0.05, seed: int = 7) -> Dict:
+    """
+    Memory saved and recall@k lost by quantizing the given float32 blobs.
+
+    Queries are stored vectors plus gaussian noise; ground truth is exact
+    float search. Reports recall without rerank and with rerank.
+    """
+    import random
+
+    exact = EmbeddingMatrix()
+    exact.load_blobs(blobs)
+    vectors = {doc_id: array('f', blob).tolist() for doc_id, blob in blobs if blob}
+    index = QuantizedIndex(mode, rerank_factor,
+                           fetch_vectors=lambda ids: {d: vectors[d] for d in ids if d in vectors})
+    index.load_blobs(blobs)
+    if not exact.ids:
+        return {"mode": mode, "vectors": 0}
+
+    rng = random.Random(seed)
+    sample = [exact.vector(d) for d in rng.sample(exact.ids, min(queries, len(exact.ids)))]
+    probes = [[x + rng.gauss(0, noise) for x in v] for v in sample]
+
+    hits = {"coarse": 0, "rerank": 0}
+    total = 0
+    for q in probes:
+        truth = {doc_id for doc_id, _ in exact.search(q, k)}
+        total += len(truth)
+        hits["coarse"] += len(truth & {d for d, _ in index.search(q, k, rerank=False)})
+        hits["rerank"] += len(truth & {d for d, _ in index.search(q, k)})
+
+    stats = index.stats()
+    return {
+        "mode": mode,
+        "vectors": stats["vectors"],
+        "dim": stats["dim"],
+        "float32_bytes": stats["float32_bytes"],
+        "code_bytes": stats["bytes"],
+        "saved_pct": stats["saved_pct"],
+        f"recall@{k}_coarse": round(hits["coarse"] / max(1, total), 4),
+        f"recall@{k}_rerank": round(hits["rerank"] / max(1, total), 4),
+        "rerank_factor": rerank_factor,
+    }
+
+# ============================================================================
+# Factory / Benchmark
+# ============================================================================
+
+INDEX_TYPES = {
+    EmbeddingMatrix.kind: EmbeddingMatrix,
+    IVFIndex.kind: IVFIndex,
+}
+
+
+def make_index(kind: str = "flat", **params):
+    """Create an empty index of the given kind ("flat", "ivf", "int8" or "binary")."""
+    if kind in QUANTIZATION_MODES:
+        return QuantizedIndex(mode=kind, **params)
+    if kind not in INDEX_TYPES:
+        raise ValueError(f"Unknown index type: {kind} (expected one of "
+                         f"{sorted(INDEX_TYPES) + list(QUANTIZATION_MODES)})")
+    if kind == EmbeddingMatrix.kind:
+        return EmbeddingMatrix(use_numpy=params.get("use_numpy"))
+    return INDEX_TYPES[kind](**params)
+
+
+def load_index(kind: str, path: Path, generation: Optional[int] = None,
+               mmap: bool = True, **params):
+    """Open a persisted index of the given kind, or None if missing/stale."""
+    if kind in QUANTIZATION_MODES:
+        return None  # codes are persisted in the store DB
+    if kind == EmbeddingMatrix.kind:
+        return EmbeddingMatrix.load(path, generation, mmap)
+    return INDEX_TYPES[kind].load(path, generation, mmap, **params)
+
+
+def recall_benchmark(index: IVFIndex, k: int = 10, queries: int = 100,
+                     nprobes: Iterable[int] = (1, 2, 4, 8, 16, 32),
+                     noise: float = 0.05, seed: int = 7) -> List[Dict]:
+    """
+    Recall@k of an IVF index against exact search, per nprobe setting.
+
+    Queries are stored vectors with gaussian noise, so no embedding model is
+    needed. Returns [{"nprobe", "recall", "avg_ms", "avg_candidates"}].
+    """
+    import random
+    import time
+
+    rng = random.Random(seed)
+    ids = index.flat.ids
+    if not ids or not index.trained:
+        return []
+    sample = [index.vector(doc_id) for doc_id in rng.sample(ids, min(queries, len(ids)))]
+    probes = [[x + rng.gauss(0, noise) for x in v] for v in sample]
+    truth = [{doc_id for doc_id, _ in index.flat.search(q, k)} for q in probes]
+
+    results = []
+    for nprobe in nprobes:
+        nprobe = min(nprobe, index.nlist)
+        hits, elapsed, candidates = 0, 0.0, 0
+        for q, expected in zip(probes, truth):
+            start = time.perf_counter()
+            found = index.search(q, k, nprobe=nprobe)
+            elapsed += time.perf_counter() - start
+            hits += len(expected & {doc_id for doc_id, _ in found})
+            candidates += len(index.probe(q, nprobe))
+        avg_candidates = candidates / len(probes)
+        results.append({
+            "nprobe": nprobe,
+            "recall": round(hits / max(1, sum(len(t) for t in truth)), 4),
+            "avg_ms": round(elapsed / len(probes) * 1000, 3),
+            "avg_candidates": round(avg_candidates, 1),
+        })
+        if nprobe == index.nlist:
+            break
+    return results
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    import argparse
+
+    import db_pool
+
+    parser = argparse.ArgumentParser(description='Vector Index')
+    parser.add_argument('--db', type=str, help='Vector store DB (default: vectors.db)')
+    parser.add_argument('--recall', action='store_true', help='IVF recall@k vs exact search')
+    parser.add_argument('-k', type=int, default=10, help='k for recall@k')
+    parser.add_argument('--nlist', type=int, help='IVF list count (default sqrt(n))')
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--queries', type=int, default=100)
+    parser.add_argument('--quantize', type=str, choices=QUANTIZATION_MODES,
+                        help='Write int8/binary codes for existing rows and report memory/recall')
+    parser.add_argument('--report-only', action='store_true', help='With --quantize: do not write codes')
+    parser.add_argument('--rerank-factor', type=int, default=4)
+
+    args = parser.parse_args()
+    db_path = Path(args.db) if args.db else Path(__file__).parent / "vectors.db"
+
+    if args.quantize:
+        conn = db_pool.connect(db_path)
+        blobs = conn.execute(
+            'SELECT doc_id, embedding FROM documents WHERE embedding IS NOT NULL').fetchall()
+        conn.close()
+        report = quantization_report(blobs, args.quantize, args.k, args.queries, args.rerank_factor)
+        if not args.report_only:
+            from vector_store import VectorStore
+            store = VectorStore(db_path, index_type=args.quantize)
+            report["codes_written"] = store.write_codes()
+        print(json.dumps(report, indent=2))
+        return
+
+    if args.recall:
+        index = IVFIndex(nlist=args.nlist, train_threshold=1 << 62)
+        conn = db_pool.connect(db_path)
+        index.load_blobs(conn.execute(
+            'SELECT doc_id, embedding FROM documents WHERE embedding IS NOT NULL'))
+        conn.close()
+        index.train()
+        print(json.dumps({
+            "index": index.stats(),
+            "results": recall_benchmark(index, args.k, args.queries, args.nprobe),
+        }, indent=2))
+    else:
+        parser.print_help()
+
+if __name__ == "__main__":
+    main()
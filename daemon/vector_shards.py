@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Vector Shards - Partitioned VectorStore with parallel query fan-out
+
+A single VectorStore over one SQLite file scores every query on one core.
+ShardedVectorStore splits documents across N shard files and keeps one
+worker process per shard with that shard's VectorStore (and its loaded
+vector index) resident:
+
+- Partitioning: by doc_id hash (even spread) or by a metadata source key
+  (all chunks of one book/paper on one shard; source-filtered queries hit
+  only that shard)
+- Queries: the query is embedded once in the caller, sent to every shard
+  worker in parallel, and the per-shard top-k lists are merged
+- Writes: embeddings are generated in the caller (batched) and each shard's
+  rows are sent to its worker, so the worker's index stays in sync
+
+Keyword scores use per-shard BM25 statistics (like most sharded search
+engines); with hash partitioning the shards are statistically similar.
+
+Usage:
+    from vector_shards import ShardedVectorStore
+    with ShardedVectorStore(num_shards=4) as store:
+        store.add_batch([{"doc_id": "a", "content": "...", "metadata": {"source": "book1"}}])
+        results = store.search("query", k=5)
+        results = store.hybrid_search("query", k=5, fusion="rrf")
+"""
+
+import heapq
+import json
+import multiprocessing
+import os
+import threading
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from vector_store import (VECTOR_DB, HybridCandidates, SearchResult, VectorStore,
+                          fuse_hits)
+
+PARTITION_MODES = ("hash", "source")
+
+# ============================================================================
+# Shard Workers
+# ============================================================================
+
+_SHARD_OPS = {"add_batch", "delete", "delete_batch", "search_vector", "keyword_search",
+              "hybrid_candidates", "get_rows", "get_document", "count", "stats",
+              "save_index"}
+
+
+def _shard_worker(conn, db_path: str, store_kwargs: Dict):
+    """Worker process main loop: own one shard's VectorStore, serve requests."""
+    store = VectorStore(Path(db_path), **store_kwargs)
+    store.index  # Preload so the first query doesn't pay for it
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        op, args = message
+        try:
+            if op not in _SHARD_OPS:
+                raise ValueError(f"Unsupported shard op: {op}")
+            conn.send((True, getattr(store, op)(*args)))
+        except Exception as e:
+            conn.send((False, f"{type(e).__name__}: {e}"))
+    conn.close()
+
+
+class _ShardProcess:
+    """Parent-side handle for a shard worker process (one request at a time)."""
+
+    def __init__(self, db_path: Path, store_kwargs: Dict, ctx):
+        self.db_path = db_path
+        self.conn, child = ctx.Pipe()
+        self.process = ctx.Process(target=_shard_worker,
+                                   args=(child, str(db_path), store_kwargs),
+                                   daemon=True)
+        self.process.start()
+        child.close()
+        self._lock = threading.Lock()
+
+    def send(self, op: str, *args):
+        self._lock.acquire()
+        try:
+            self.conn.send((op, args))
+        except Exception:
+            self._lock.release()
+            raise
+
+    def recv(self) -> Any:
+        try:
+            ok, result = self.conn.recv()
+        finally:
+            self._lock.release()
+        if not ok:
+            raise RuntimeError(f"Shard {self.db_path.name}: {result}")
+        return result
+
+    def close(self):
+        with self._lock:
+            try:
+                self.conn.send(None)
+            except (OSError, BrokenPipeError):
+                pass
+        self.process.join(timeout=5)
+        if self.process.is_alive():
+            self.process.terminate()
+        self.conn.close()
+
+
+class _LocalShard:
+    """In-process shard with the same send/recv interface (workers disabled)."""
+
+    def __init__(self, db_path: Path, store_kwargs: Dict):
+        self.db_path = db_path
+        self.store = VectorStore(db_path, **store_kwargs)
+        self._pending = None
+
+    def send(self, op: str, *args):
+        if op not in _SHARD_OPS:
+            raise ValueError(f"Unsupported shard op: {op}")
+        self._pending = getattr(self.store, op)(*args)
+
+    def recv(self) -> Any:
+        result, self._pending = self._pending, None
+        return result
+
+    def close(self):
+        pass
+
+# ============================================================================
+# Sharded Store
+# ============================================================================
+
+class ShardedVectorStore:
+    """
+    VectorStore partitioned across num_shards SQLite files.
+
+    Shard i lives at <base>.shard<i>.db next to the base DB path. With
+    workers=True (default) each shard is served by its own process;
+    workers=False runs shards in-process (same results, no parallelism).
+    """
+
+    def __init__(self, db_path: Path = None, num_shards: int = None,
+                 partition: str = "hash", source_key: str = "source",
+                 workers: bool = True, **store_kwargs):
+        if partition not in PARTITION_MODES:
+            raise ValueError(f"Unknown partition mode: {partition} (expected one of {PARTITION_MODES})")
+        base = Path(db_path or VECTOR_DB)
+        self.num_shards = num_shards or max(1, min(os.cpu_count() or 1, 8))
+        self.partition = partition
+        self.source_key = source_key
+        self.shard_paths = [base.with_name(f"{base.stem}.shard{i}{base.suffix or '.db'}")
+                            for i in range(self.num_shards)]
+        self._router = None
+
+        if workers:
+            ctx = multiprocessing.get_context()
+            self.shards = [_ShardProcess(path, store_kwargs, ctx) for path in self.shard_paths]
+        else:
+            self.shards = [_LocalShard(path, store_kwargs) for path in self.shard_paths]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Stop shard workers."""
+        for shard in self.shards:
+            shard.close()
+
+    @property
+    def router(self):
+        """Lazy-load model router (embeddings are generated in the caller)."""
+        if self._router is None:
+            from model_router import ModelRouter
+            self._router = ModelRouter()
+        return self._router
+
+    # ------------------------------------------------------------------
+    # Routing
+    # ------------------------------------------------------------------
+
+    def _hash(self, key: str) -> int:
+        return zlib.crc32(key.encode("utf-8")) % self.num_shards
+
+    def shard_for(self, doc_id: str, metadata: Dict = None) -> int:
+        """Shard index owning a document."""
+        if self.partition == "source" and metadata and metadata.get(self.source_key) is not None:
+            return self._hash(str(metadata[self.source_key]))
+        return self._hash(doc_id)
+
+    def _target_shards(self, filter_metadata: Dict = None) -> List[int]:
+        """Shards a query must visit (one, for an equality filter on the source key)."""
+        if self.partition == "source" and filter_metadata:
+            value = filter_metadata.get(self.source_key)
+            if value is not None and not isinstance(value, (dict, list, tuple, set)):
+                return [self._hash(str(value))]
+        return list(range(self.num_shards))
+
+    def _fanout(self, shard_ids: List[int], op: str, *args) -> List[Tuple[int, Any]]:
+        """Send op to shards (in ascending order), then gather (shard, result)."""
+        return self._fanout_each({i: args for i in shard_ids}, op)
+
+    def _fanout_each(self, per_shard: Dict[int, tuple], op: str) -> List[Tuple[int, Any]]:
+        """
+        Send op with per-shard args, then gather (shard, result).
+
+        Every reply is drained before a shard error is re-raised so no worker
+        is left holding an unread response.
+        """
+        sent, results, error = [], [], None
+        for i in sorted(per_shard):
+            try:
+                self.shards[i].send(op, *per_shard[i])
+                sent.append(i)
+            except Exception as e:
+                error = error or e
+        for i in sent:
+            try:
+                results.append((i, self.shards[i].recv()))
+            except Exception as e:
+                error = error or e
+        if error is not None:
+            raise error
+        return results
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def add(self, doc_id: str, content: str, metadata: Dict = None,
+            embedding: List[float] = None) -> bool:
+        doc = {"doc_id": doc_id, "content": content, "metadata": metadata}
+        if embedding is not None:
+            doc["embedding"] = embedding
+        return self.add_batch([doc]) == 1
+
+    def add_batch(self, documents: List[Dict], batch_size: int = 64) -> int:
+        """
+        Embed missing vectors once (batched), then write each shard's rows.
+
+        Under source partitioning a re-added document may have moved shard
+        (its source changed), so it is deleted from every other shard.
+        """
+        pending = [doc for doc in documents if doc.get("embedding") is None]
+        generated = {}
+        if pending:
+            result = self.router.embed_batch(
+                [doc["content"][:8000] for doc in pending], batch_size)
+            for doc, embedding in zip(pending, result.get("embeddings") or []):
+                generated[id(doc)] = embedding
+
+        by_shard: Dict[int, List[Dict]] = {}
+        for doc in documents:
+            embedding = doc.get("embedding")
+            if embedding is None:
+                # [] marks "no embedding available" so the shard won't re-embed
+                embedding = generated.get(id(doc)) or []
+            by_shard.setdefault(self.shard_for(doc["doc_id"], doc.get("metadata")), []).append(
+                {**doc, "embedding": embedding})
+
+        if self.partition == "source":
+            stale = {i: ([doc["doc_id"] for j, docs in by_shard.items() if j != i for doc in docs],)
+                     for i in range(self.num_shards)}
+            self._fanout_each({i: ids for i, ids in stale.items() if ids[0]}, "delete_batch")
+
+        return sum(count for _, count in self._fanout_each(
+            {i: (docs, batch_size) for i, docs in by_shard.items()}, "add_batch"))
+
+    def delete(self, doc_id: str) -> bool:
+        """Delete a document (all shards are asked under source partitioning)."""
+        if self.partition == "hash":
+            shard_ids = [self._hash(doc_id)]
+        else:
+            shard_ids = list(range(self.num_shards))
+        return any(deleted for _, deleted in self._fanout(shard_ids, "delete", doc_id))
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def _embed_query(self, query: str) -> Optional[List[float]]:
+        return self.router.embed(query).get("embedding")
+
+    @staticmethod
+    def _merge(per_shard: List[Tuple[int, List[SearchResult]]], k: int) -> List[SearchResult]:
+        return heapq.nlargest(k, (r for _, results in per_shard for r in results),
+                              key=lambda r: r.score)
+
+    def search(self, query: str, k: int = 5,
+               filter_metadata: Dict = None) -> List[SearchResult]:
+        """Vector search fanned out to shards; per-shard top-k merged."""
+        embedding = self._embed_query(query)
+        if not embedding:
+            return self.keyword_search(query, k, filter_metadata)
+        return self.search_vector(embedding, k, filter_metadata)
+
+    def search_vector(self, query_embedding: List[float], k: int = 5,
+                      filter_metadata: Dict = None) -> List[SearchResult]:
+        shard_ids = self._target_shards(filter_metadata)
+        return self._merge(self._fanout(shard_ids, "search_vector",
+                                        query_embedding, k, filter_metadata), k)
+
+    def keyword_search(self, query: str, k: int = 5,
+                       filter_metadata: Dict = None) -> List[SearchResult]:
+        shard_ids = self._target_shards(filter_metadata)
+        return self._merge(self._fanout(shard_ids, "keyword_search",
+                                        query, k, filter_metadata), k)
+
+    def hybrid_search(self, query: str, k: int = 5, alpha: float = 0.7,
+                      filter_metadata: Dict = None, fusion: str = "weighted",
+                      rrf_k: int = 60) -> List[SearchResult]:
+        """
+        Hybrid search: shards return candidate ids/scores only, fusion runs
+        once over the merged lists, and just the final top-k are hydrated
+        from their owning shards.
+        """
+        n = k * 2
+        embedding = self._embed_query(query)
+        shard_ids = self._target_shards(filter_metadata)
+        per_shard = self._fanout(shard_ids, "hybrid_candidates",
+                                 query, n, filter_metadata, embedding)
+
+        owner: Dict[str, int] = {}
+        vector, keyword = [], []
+        for i, candidates in per_shard:
+            for doc_id, score in candidates.vector:
+                owner[doc_id] = i
+                vector.append((doc_id, score))
+            for doc_id, score in candidates.keyword:
+                owner[doc_id] = i
+                keyword.append((doc_id, score))
+        merged = HybridCandidates(
+            vector=heapq.nlargest(n, vector, key=lambda hit: hit[1]),
+            keyword=heapq.nlargest(n, keyword, key=lambda hit: hit[1]))
+
+        fused = fuse_hits(merged, k, alpha, fusion, rrf_k)
+        wanted: Dict[int, List[str]] = {}
+        for doc_id, *_ in fused:
+            wanted.setdefault(owner[doc_id], []).append(doc_id)
+        rows = {}
+        for _, shard_rows in self._fanout_each(
+                {i: (ids,) for i, ids in wanted.items()}, "get_rows"):
+            rows.update(shard_rows)
+
+        results = []
+        for doc_id, score, vector_score, bm25_score in fused:
+            if doc_id not in rows:
+                continue
+            content, meta_json = rows[doc_id]
+            results.append(SearchResult(
+                doc_id=doc_id,
+                content=content,
+                score=score,
+                vector_score=vector_score,
+                bm25_score=bm25_score,
+                metadata=json.loads(meta_json) if meta_json else {}
+            ))
+        return results
+
+    def get_document(self, doc_id: str) -> Optional[Dict]:
+        if self.partition == "hash":
+            shard_ids = [self._hash(doc_id)]
+        else:
+            shard_ids = list(range(self.num_shards))
+        for _, doc in self._fanout(shard_ids, "get_document", doc_id):
+            if doc:
+                return doc
+        return None
+
+    def count(self) -> int:
+        return sum(count for _, count in self._fanout(list(range(self.num_shards)), "count"))
+
+    def save_index(self):
+        """Persist every shard's vector index snapshot."""
+        self._fanout(list(range(self.num_shards)), "save_index")
+
+    def stats(self) -> Dict:
+        shards = self._fanout(list(range(self.num_shards)), "stats")
+        return {
+            "num_shards": self.num_shards,
+            "partition": self.partition,
+            "total_documents": sum(s["total_documents"] for _, s in shards),
+            "with_embeddings": sum(s["with_embeddings"] for _, s in shards),
+            "shards": [dict(s, path=str(self.shard_paths[i])) for i, s in shards],
+        }
+
+# ============================================================================
+# CLI
+# ============================================================================
+
+def main():
+    import argparse
+    parser = argparse.ArgumentParser(description='Sharded Vector Store')
+    parser.add_argument('--shards', type=int, help='Number of shards (default: cores, max 8)')
+    parser.add_argument('--partition', type=str, default='hash', choices=PARTITION_MODES)
+    parser.add_argument('--stats', action='store_true', help='Show stats')
+    parser.add_argument('--search', type=str, help='Search query')
+    parser.add_argument('--hybrid', type=str, help='Hybrid search query')
+    parser.add_argument('-k', type=int, default=5, help='Number of results')
+
+    args = parser.parse_args()
+    with ShardedVectorStore(num_shards=args.shards, partition=args.partition) as store:
+        if args.stats:
+            print(json.dumps(store.stats(), indent=2))
+        elif args.search:
+            for r in store.search(args.search, args.k):
+                print(f"[{r.score:.3f}] {r.doc_id}: {r.content[:100]}...")
+        elif args.hybrid:
+            for r in store.hybrid_search(args.hybrid, args.k):
+                print(f"[{r.score:.3f}] (v:{r.vector_score:.2f} b:{r.bm25_score:.2f}) {r.doc_id}: {r.content[:100]}...")
+        else:
+            parser.print_help()
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@ Vector Store - Semantic search with embeddings
 
 Fixes the missing RAG components:
 - Embeddings: Via model_router (LocalAI → OpenAI → fallback)
-- Vector Search: Cosine similarity over stored embeddings
+- Vector Search: Cosine similarity over an in-memory float32 matrix (vector_index)
 - Reranking: BM25 + vector hybrid scoring
 
 Storage: SQLite with numpy serialization (no external vector DB needed)
@@ -21,10 +21,23 @@ Usage:
 
     # Hybrid search (vector + keyword)
     results = store.hybrid_search("query", k=5, alpha=0.7)
+
+    # Indexed metadata filters: multiple keys, $in, ranges
+    results = store.search("query", filter_metadata={
+        "source": {"$in": ["book", "paper"]}, "page": {"$gte": 10, "$lt": 50}})
+
+    # Large stores: persist the embedding matrix and mmap it on next open
+    store.save_index()
+    store = VectorStore(mmap_index=True)
+
+    # Approximate search (IVF-flat): nprobe trades recall for speed
+    store = VectorStore(index_type="ivf", index_params={"nprobe": 8})
+
+    # Quantized codes in RAM (int8 = 4x, binary = 32x smaller) + exact rerank
+    store = VectorStore(index_type="int8")
 """
 
 import json
-import sqlite3
 import math
 import re
 from dataclasses import dataclass
@@ -32,9 +45,16 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from collections import Counter
 import struct
+import heapq
+
+import db_pool
+from vector_index import EmbeddingMatrix, QUANTIZATION_MODES, make_index, load_index, quantize
 
 VECTOR_DB = Path(__file__).parent / "vectors.db"
 
+# Generations kept in doc_changes; a loaded index further behind than this reloads
+CHANGE_LOG_GENERATIONS = 10000
+
 # ============================================================================
 # Data Models
 # ============================================================================
@@ -81,57 +101,354 @@ def cosine_similarity(a: List[float], b: List[float]) -> float:
 # ============================================================================
 
 class BM25:
-    """BM25 ranking for keyword search."""
+    """
+    Persistent BM25 over SQLite postings tables (lives in the store's DB).
+
+    - bm25_postings: (term, doc_id, tf) - one row per term occurrence per doc
+    - bm25_doclen:   doc_id -> token count
+    - bm25_terms:    term -> document frequency, max tf (for score upper bounds)
+    - store_meta:    running totals (bm25_docs, bm25_length)
+
+    A query walks only the postings of its terms. Terms are processed in
+    descending upper-bound order (MaxScore): once the remaining terms can no
+    longer lift an unseen document into the top-k, the rest are only looked
+    up for documents that can still make it.
+
+    All methods take the caller's cursor so index updates share the
+    document write's transaction.
+    """
 
     def __init__(self, k1: float = 1.5, b: float = 0.75):
         self.k1 = k1
         self.b = b
-        self.doc_freqs: Dict[str, int] = {}
-        self.doc_lengths: Dict[str, int] = {}
-        self.avg_doc_length: float = 0.0
-        self.total_docs: int = 0
-        self.inverted_index: Dict[str, List[Tuple[str, int]]] = {}
 
     def tokenize(self, text: str) -> List[str]:
         """Simple tokenization."""
         return re.findall(r'\w+', text.lower())
 
-    def add_document(self, doc_id: str, content: str):
-        """Index a document."""
-        tokens = self.tokenize(content)
-        self.doc_lengths[doc_id] = len(tokens)
-        self.total_docs += 1
-        self.avg_doc_length = sum(self.doc_lengths.values()) / self.total_docs
+    def init_schema(self, c):
+        c.execute('''CREATE TABLE IF NOT EXISTS bm25_postings (
+            term TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            tf INTEGER NOT NULL,
+            PRIMARY KEY (term, doc_id)
+        ) WITHOUT ROWID''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_postings_doc
+            ON bm25_postings(doc_id)''')
+        c.execute('''CREATE TABLE IF NOT EXISTS bm25_doclen (
+            doc_id TEXT PRIMARY KEY,
+            length INTEGER NOT NULL
+        )''')
+        c.execute('''CREATE TABLE IF NOT EXISTS bm25_terms (
+            term TEXT PRIMARY KEY,
+            df INTEGER NOT NULL,
+            max_tf INTEGER NOT NULL
+        ) WITHOUT ROWID''')
+
+    @staticmethod
+    def _meta(c, key: str) -> int:
+        c.execute('SELECT value FROM store_meta WHERE key = ?', (key,))
+        row = c.fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _add_meta(c, key: str, delta: int):
+        c.execute('''INSERT INTO store_meta (key, value) VALUES (?, ?)
+            ON CONFLICT(key) DO UPDATE SET value = value + excluded.value''',
+            (key, delta))
 
+    def is_built(self, c) -> bool:
+        c.execute("SELECT 1 FROM store_meta WHERE key = 'bm25_docs'")
+        return c.fetchone() is not None
+
+    def total_docs(self, c) -> int:
+        return self._meta(c, 'bm25_docs')
+
+    def avg_doc_length(self, c) -> float:
+        docs = self._meta(c, 'bm25_docs')
+        return self._meta(c, 'bm25_length') / docs if docs else 0.0
+
+    def add_document(self, c, doc_id: str, content: str):
+        """Index a document (replacing any previous version)."""
+        self.remove_document(c, doc_id)
+
+        tokens = self.tokenize(content or "")
         token_counts = Counter(tokens)
-        for token, count in token_counts.items():
-            if token not in self.inverted_index:
-                self.inverted_index[token] = []
-                self.doc_freqs[token] = 0
-            self.inverted_index[token].append((doc_id, count))
-            self.doc_freqs[token] += 1
-
-    def score(self, query: str, doc_id: str, doc_content: str) -> float:
-        """Score a document against a query."""
-        query_tokens = self.tokenize(query)
-        doc_tokens = self.tokenize(doc_content)
-        doc_token_counts = Counter(doc_tokens)
-        doc_length = len(doc_tokens)
-
-        score = 0.0
-        for token in query_tokens:
-            if token not in doc_token_counts:
+        c.execute('INSERT INTO bm25_doclen (doc_id, length) VALUES (?, ?)',
+                  (doc_id, len(tokens)))
+        c.executemany('INSERT INTO bm25_postings (term, doc_id, tf) VALUES (?, ?, ?)',
+                      [(term, doc_id, tf) for term, tf in token_counts.items()])
+        c.executemany('''INSERT INTO bm25_terms (term, df, max_tf) VALUES (?, 1, ?)
+            ON CONFLICT(term) DO UPDATE SET df = df + 1,
+                max_tf = MAX(max_tf, excluded.max_tf)''',
+            list(token_counts.items()))
+        self._add_meta(c, 'bm25_docs', 1)
+        self._add_meta(c, 'bm25_length', len(tokens))
+
+    def remove_document(self, c, doc_id: str) -> bool:
+        """Drop a document's postings (max_tf is left as a valid upper bound)."""
+        c.execute('SELECT length FROM bm25_doclen WHERE doc_id = ?', (doc_id,))
+        row = c.fetchone()
+        if row is None:
+            return False
+
+        c.execute('SELECT term FROM bm25_postings WHERE doc_id = ?', (doc_id,))
+        terms = [(term,) for term, in c.fetchall()]
+        c.executemany('UPDATE bm25_terms SET df = df - 1 WHERE term = ?', terms)
+        c.executemany('DELETE FROM bm25_terms WHERE term = ? AND df <= 0', terms)
+        c.execute('DELETE FROM bm25_postings WHERE doc_id = ?', (doc_id,))
+        c.execute('DELETE FROM bm25_doclen WHERE doc_id = ?', (doc_id,))
+        self._add_meta(c, 'bm25_docs', -1)
+        self._add_meta(c, 'bm25_length', -row[0])
+        return True
+
+    def rebuild(self, c):
+        """Re-index every stored document (one-time migration for old DBs)."""
+        for table in ('bm25_postings', 'bm25_doclen', 'bm25_terms'):
+            c.execute(f'DELETE FROM {table}')
+        c.execute("DELETE FROM store_meta WHERE key IN ('bm25_docs', 'bm25_length')")
+        self._add_meta(c, 'bm25_docs', 0)
+        self._add_meta(c, 'bm25_length', 0)
+        docs = c.connection.execute('SELECT doc_id, content FROM documents')
+        for doc_id, content in docs:
+            self.add_document(c, doc_id, content)
+
+    def search(self, c, query: str, k: int = 5,
+               allowed_ids: Optional[set] = None) -> List[Tuple[str, float]]:
+        """Top-k (doc_id, score) for query, best first."""
+        terms = list(dict.fromkeys(self.tokenize(query)))
+        total_docs = self.total_docs(c)
+        if not terms or k <= 0 or total_docs == 0:
+            return []
+        avg_len = max(self.avg_doc_length(c), 1)
+
+        placeholders = ",".join("?" * len(terms))
+        c.execute(f'SELECT term, df, max_tf FROM bm25_terms WHERE term IN ({placeholders})',
+                  terms)
+        plan = []
+        for term, df, max_tf in c.fetchall():
+            idf = math.log((total_docs - df + 0.5) / (df + 0.5) + 1)
+            # Upper bound: doc length -> 0 minimizes the denominator
+            bound = idf * max_tf * (self.k1 + 1) / (max_tf + self.k1 * (1 - self.b))
+            plan.append((bound, idf, term))
+        if not plan:
+            return []
+        plan.sort(reverse=True)
+
+        remaining = [0.0] * (len(plan) + 1)
+        for i in range(len(plan) - 1, -1, -1):
+            remaining[i] = remaining[i + 1] + plan[i][0]
+
+        scores: Dict[str, float] = {}
+        for i, (bound, idf, term) in enumerate(plan):
+            threshold = heapq.nlargest(k, scores.values())[-1] if len(scores) >= k else 0.0
+            if len(scores) >= k and remaining[i] <= threshold:
+                # Unseen docs can't reach the top-k: score only live candidates
+                live = [d for d, s in scores.items() if s + remaining[i] > threshold]
+                if not live:
+                    break
+                rows = []
+                for start in range(0, len(live), 900):
+                    chunk = live[start:start + 900]
+                    c.execute(f'''SELECT p.doc_id, p.tf, d.length FROM bm25_postings p
+                        JOIN bm25_doclen d ON d.doc_id = p.doc_id
+                        WHERE p.term = ? AND p.doc_id IN ({",".join("?" * len(chunk))})''',
+                        [term] + chunk)
+                    rows.extend(c.fetchall())
+            else:
+                c.execute('''SELECT p.doc_id, p.tf, d.length FROM bm25_postings p
+                    JOIN bm25_doclen d ON d.doc_id = p.doc_id
+                    WHERE p.term = ?''', (term,))
+                rows = c.fetchall()
+
+            for doc_id, tf, length in rows:
+                if allowed_ids is not None and doc_id not in allowed_ids:
+                    continue
+                numerator = tf * (self.k1 + 1)
+                denominator = tf + self.k1 * (1 - self.b + self.b * length / avg_len)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * numerator / denominator
+
+        return heapq.nlargest(k, scores.items(), key=lambda item: item[1])
+
+# ============================================================================
+# Metadata Filtering
+# ============================================================================
+
+FILTER_OPERATORS = {"$eq": "=", "$gt": ">", "$gte": ">=", "$lt": "<", "$lte": "<=", "$in": "IN"}
+
+
+class MetadataIndex:
+    """
+    Indexed metadata side table for filtered search.
+
+    Each document's metadata is flattened into doc_metadata rows
+    (doc_id, key, value_text | value_num); nested dicts use dotted keys and
+    list values get one row per element (so {"tags": {"$in": [...]}} matches
+    membership). Filters resolve to doc ids through the (key, value) indexes
+    instead of evaluating json_extract on every document.
+
+    Filter syntax (all keys ANDed):
+        {"book": "xyz"}                         equality
+        {"source": {"$in": ["a", "b"]}}         membership
+        {"page": {"$gte": 10, "$lt": 20}}       range ($gt/$gte/$lt/$lte)
+
+    Like BM25, methods take the caller's cursor.
+    """
+
+    def init_schema(self, c):
+        c.execute('''CREATE TABLE IF NOT EXISTS doc_metadata (
+            doc_id TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value_text TEXT,
+            value_num REAL
+        )''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_meta_text
+            ON doc_metadata(key, value_text) WHERE value_text IS NOT NULL''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_meta_num
+            ON doc_metadata(key, value_num) WHERE value_num IS NOT NULL''')
+        c.execute('''CREATE INDEX IF NOT EXISTS idx_meta_doc
+            ON doc_metadata(doc_id)''')
+
+    def is_built(self, c) -> bool:
+        c.execute("SELECT 1 FROM store_meta WHERE key = 'metadata_indexed'")
+        return c.fetchone() is not None
+
+    def rebuild(self, c):
+        """Re-index every stored document's metadata (one-time migration)."""
+        c.execute('DELETE FROM doc_metadata')
+        docs = c.connection.execute(
+            'SELECT doc_id, metadata FROM documents WHERE metadata IS NOT NULL')
+        for doc_id, meta_json in docs:
+            try:
+                self.add_document(c, doc_id, json.loads(meta_json))
+            except (ValueError, TypeError):
                 continue
+        c.execute("INSERT OR REPLACE INTO store_meta (key, value) VALUES ('metadata_indexed', 1)")
+
+    @staticmethod
+    def _split(value) -> Tuple[Optional[str], Optional[float]]:
+        """Typed column pair for a scalar value (bools index as numbers)."""
+        if isinstance(value, (bool, int, float)):
+            return None, float(value)
+        return str(value), None
+
+    def _flatten(self, metadata: Dict, prefix: str = ""):
+        for key, value in metadata.items():
+            path = f"{prefix}{key}"
+            if isinstance(value, dict):
+                yield from self._flatten(value, f"{path}.")
+            elif isinstance(value, (list, tuple)):
+                for item in value:
+                    if item is not None and not isinstance(item, (dict, list)):
+                        yield (path,) + self._split(item)
+            elif value is not None:
+                yield (path,) + self._split(value)
+
+    def add_document(self, c, doc_id: str, metadata: Optional[Dict]):
+        """Index a document's metadata (replacing previous rows)."""
+        self.remove_document(c, doc_id)
+        if metadata:
+            c.executemany('''INSERT INTO doc_metadata (doc_id, key, value_text, value_num)
+                VALUES (?, ?, ?, ?)''',
+                [(doc_id,) + row for row in self._flatten(metadata)])
+
+    def remove_document(self, c, doc_id: str):
+        c.execute('DELETE FROM doc_metadata WHERE doc_id = ?', (doc_id,))
+
+    def _clause(self, key: str, op: str, operand) -> Tuple[str, list]:
+        if op not in FILTER_OPERATORS:
+            raise ValueError(f"Unsupported filter operator: {op} (expected one of {sorted(FILTER_OPERATORS)})")
+
+        base = 'SELECT doc_id FROM doc_metadata WHERE key = ? AND '
+        if op == "$in":
+            values = list(operand)
+            texts = [v for v in values if self._split(v)[0] is not None]
+            nums = [float(v) for v in values if self._split(v)[1] is not None]
+            parts, params = [], []
+            if texts:
+                parts.append(f'value_text IN ({",".join("?" * len(texts))})')
+                params.extend(str(v) for v in texts)
+            if nums:
+                parts.append(f'value_num IN ({",".join("?" * len(nums))})')
+                params.extend(nums)
+            if not parts:
+                return base + '0', [key]
+            return base + f'({" OR ".join(parts)})', [key] + params
+
+        text, num = self._split(operand)
+        if num is not None:
+            return base + f'value_num {FILTER_OPERATORS[op]} ?', [key, num]
+        return base + f'value_text {FILTER_OPERATORS[op]} ?', [key, text]
+
+    def matching_ids(self, c, filter_metadata: Dict) -> set:
+        """Doc ids satisfying every clause in filter_metadata."""
+        clauses, params = [], []
+        for key, condition in filter_metadata.items():
+            if isinstance(condition, dict):
+                items = condition.items()
+            elif isinstance(condition, (list, tuple, set)):
+                items = [("$in", condition)]
+            else:
+                items = [("$eq", condition)]
+            for op, operand in items:
+                sql, clause_params = self._clause(key, op, operand)
+                clauses.append(sql)
+                params.extend(clause_params)
+
+        if not clauses:
+            return set()
+        c.execute(" INTERSECT ".join(clauses), params)
+        return {row[0] for row in c.fetchall()}
+
+# ============================================================================
+# Hybrid Fusion
+# ============================================================================
 
-            tf = doc_token_counts[token]
-            df = self.doc_freqs.get(token, 1)
-            idf = math.log((self.total_docs - df + 0.5) / (df + 0.5) + 1)
+FUSION_STRATEGIES = ("weighted", "rrf")
 
-            numerator = tf * (self.k1 + 1)
-            denominator = tf + self.k1 * (1 - self.b + self.b * doc_length / max(self.avg_doc_length, 1))
-            score += idf * numerator / denominator
 
-        return score
+@dataclass
+class HybridCandidates:
+    """Scored candidate lists from one hybrid pass (no content loaded yet)."""
+    vector: List[Tuple[str, float]]
+    keyword: List[Tuple[str, float]]
+
+
+def fuse_hits(candidates: HybridCandidates, k: int = 5, alpha: float = 0.7,
+              fusion: str = "weighted", rrf_k: int = 60) -> List[Tuple[str, float, float, float]]:
+    """
+    Fuse vector and keyword candidate lists into top-k
+    (doc_id, score, vector_score, bm25_score); the component scores are
+    max-normalized to [0, 1].
+
+    fusion="weighted": alpha * vector + (1-alpha) * BM25 (max-normalized)
+    fusion="rrf":      alpha / (rrf_k + vector_rank) + (1-alpha) / (rrf_k + bm25_rank)
+
+    Pure in-memory: re-fusing the same candidates with another alpha or
+    strategy costs no I/O.
+    """
+    if fusion not in FUSION_STRATEGIES:
+        raise ValueError(f"Unknown fusion strategy: {fusion} (expected one of {FUSION_STRATEGIES})")
+
+    max_v = max((score for _, score in candidates.vector), default=0) or 1
+    max_b = max((score for _, score in candidates.keyword), default=0) or 1
+    vector = {doc_id: (rank, score / max_v)
+              for rank, (doc_id, score) in enumerate(candidates.vector, 1)}
+    keyword = {doc_id: (rank, score / max_b)
+               for rank, (doc_id, score) in enumerate(candidates.keyword, 1)}
+
+    fused = []
+    for doc_id in dict.fromkeys(list(vector) + list(keyword)):
+        v_rank, v_score = vector.get(doc_id, (None, 0.0))
+        b_rank, b_score = keyword.get(doc_id, (None, 0.0))
+        if fusion == "rrf":
+            score = (alpha / (rrf_k + v_rank) if v_rank else 0.0) + \
+                    ((1 - alpha) / (rrf_k + b_rank) if b_rank else 0.0)
+        else:
+            score = alpha * v_score + (1 - alpha) * b_score
+        fused.append((doc_id, score, v_score, b_score))
+
+    return heapq.nlargest(k, fused, key=lambda hit: hit[1])
 
 # ============================================================================
 # Vector Store
@@ -143,21 +460,27 @@ class VectorStore:
 
     Features:
     - Embeddings via model_router (LocalAI/OpenAI)
-    - Cosine similarity search
-    - BM25 keyword search
-    - Hybrid ranking (configurable alpha)
+    - Cosine similarity search (batched over an EmbeddingMatrix, or IVF-approximate)
+    - BM25 keyword search (SQLite postings, scores only matching docs)
+    - Hybrid ranking (weighted or reciprocal-rank fusion, configurable alpha)
     """
 
-    def __init__(self, db_path: Path = None):
+    def __init__(self, db_path: Path = None, mmap_index: bool = False,
+                 index_type: str = "flat", index_params: Dict = None):
         self.db_path = db_path or VECTOR_DB
         self.bm25 = BM25()
+        self.metadata_index = MetadataIndex()
+        self.mmap_index = mmap_index
+        self.index_type = index_type
+        self.index_params = index_params or {}
         self._router = None  # Lazy load
+        self._index = None  # Lazy load (EmbeddingMatrix or IVFIndex)
+        self._index_generation = None  # store_meta generation the index reflects
         self._init_db()
-        self._load_bm25_index()
 
     def _init_db(self):
         """Initialize database schema."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
 
         c.execute('''CREATE TABLE IF NOT EXISTS documents (
@@ -171,17 +494,209 @@ class VectorStore:
         c.execute('''CREATE INDEX IF NOT EXISTS idx_doc_created
             ON documents(created_at)''')
 
+        # Bumped on every write so persisted index snapshots can detect staleness
+        c.execute('''CREATE TABLE IF NOT EXISTS store_meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER
+        )''')
+        c.execute("INSERT OR IGNORE INTO store_meta (key, value) VALUES ('generation', 0)")
+
+        # doc_ids touched by each generation, so other instances can apply the
+        # difference to a loaded index; changes_floor = oldest generation whose
+        # successors are all still logged
+        c.execute('''CREATE TABLE IF NOT EXISTS doc_changes (
+            generation INTEGER NOT NULL,
+            doc_id TEXT NOT NULL,
+            PRIMARY KEY (generation, doc_id)
+        ) WITHOUT ROWID''')
+        c.execute('''INSERT OR IGNORE INTO store_meta (key, value)
+            SELECT 'changes_floor', value FROM store_meta WHERE key = ?''', ('generation',))
+
+        self.bm25.init_schema(c)
+        if not self.bm25.is_built(c):
+            self.bm25.rebuild(c)
+
+        self.metadata_index.init_schema(c)
+        if not self.metadata_index.is_built(c):
+            self.metadata_index.rebuild(c)
+
+        # Quantized codes (index_type int8/binary); float column stays for rerank
+        c.execute('''CREATE TABLE IF NOT EXISTS embedding_codes (
+            mode TEXT NOT NULL,
+            doc_id TEXT NOT NULL,
+            code BLOB NOT NULL,
+            scale REAL NOT NULL,
+            dim INTEGER NOT NULL,
+            PRIMARY KEY (mode, doc_id)
+        ) WITHOUT ROWID''')
+
         conn.commit()
         conn.close()
 
-    def _load_bm25_index(self):
-        """Load existing documents into BM25 index."""
-        conn = sqlite3.connect(self.db_path)
+    @property
+    def index_path(self) -> Path:
+        """Base path for the persisted embedding matrix snapshot."""
+        return Path(str(self.db_path) + ".matrix")
+
+    def _generation(self, c) -> int:
+        c.execute("SELECT value FROM store_meta WHERE key = 'generation'")
+        row = c.fetchone()
+        return row[0] if row else 0
+
+    def _bump_generation(self, c, doc_ids: List[str]):
+        """Advance the generation and log which documents it changed."""
+        c.execute("UPDATE store_meta SET value = value + 1 WHERE key = 'generation'")
+        generation = self._generation(c)
+        c.executemany('INSERT OR IGNORE INTO doc_changes (generation, doc_id) VALUES (?, ?)',
+                      [(generation, doc_id) for doc_id in doc_ids])
+        floor = generation - CHANGE_LOG_GENERATIONS
+        if floor > 0:
+            c.execute('DELETE FROM doc_changes WHERE generation <= ?', (floor,))
+            c.execute("UPDATE store_meta SET value = MAX(value, ?) WHERE key = 'changes_floor'",
+                      (floor,))
+
+    def _apply_changes(self, c, generation: int) -> bool:
+        """
+        Bring the loaded index from _index_generation up to generation by
+        re-reading only the logged doc_ids. False if the log was trimmed
+        past the index (caller does a full reload).
+        """
+        c.execute("SELECT value FROM store_meta WHERE key = 'changes_floor'")
+        row = c.fetchone()
+        if row is None or row[0] > self._index_generation:
+            return False
+        c.execute('''SELECT DISTINCT doc_id FROM doc_changes
+            WHERE generation > ? AND generation <= ?''', (self._index_generation, generation))
+        changed = [doc_id for doc_id, in c.fetchall()]
+        # Rows may already be newer than generation; re-applying them later is idempotent
+        embeddings = self._fetch_embeddings(changed)
+        for doc_id in changed:
+            if doc_id in embeddings:
+                self._index.upsert(doc_id, embeddings[doc_id])
+            else:
+                self._index.remove(doc_id)
+        self._index_generation = generation
+        return True
+
+    def _index_in_sync(self, c) -> bool:
+        """Loaded index reflects every write so far (call before bumping)."""
+        return self._index is not None and self._generation(c) == self._index_generation
+
+    @property
+    def quantized(self) -> bool:
+        return self.index_type in QUANTIZATION_MODES
+
+    def _codes_generation(self, c) -> Optional[int]:
+        c.execute('SELECT value FROM store_meta WHERE key = ?', (f'codes_{self.index_type}',))
+        row = c.fetchone()
+        return row[0] if row else None
+
+    def _write_codes(self, c, rows: List[Tuple[str, Optional[List[float]]]]):
+        """
+        Keep embedding_codes in step with a write (quantized stores only).
+
+        Called before the generation bump; codes that were in sync stay in
+        sync, stale codes are left for the next index load to rebuild.
+        """
+        if not self.quantized or self._codes_generation(c) != self._generation(c):
+            return
+        mode = self.index_type
+        for doc_id, embedding in rows:
+            if embedding:
+                code, scale = quantize(embedding, mode)
+                c.execute('''INSERT OR REPLACE INTO embedding_codes
+                    (mode, doc_id, code, scale, dim) VALUES (?, ?, ?, ?, ?)''',
+                    (mode, doc_id, code, scale, len(embedding)))
+            else:
+                c.execute('DELETE FROM embedding_codes WHERE mode = ? AND doc_id = ?',
+                          (mode, doc_id))
+        c.execute('''UPDATE store_meta SET value = value + 1 WHERE key = ?''',
+                  (f'codes_{mode}',))
+
+    def write_codes(self) -> int:
+        """(Re)write quantized codes for every embedded document (migration)."""
+        if not self.quantized:
+            return 0
+        index = self.index
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
-        c.execute('SELECT doc_id, content FROM documents')
-        for doc_id, content in c.fetchall():
-            self.bm25.add_document(doc_id, content)
+        c.execute('DELETE FROM embedding_codes WHERE mode = ?', (self.index_type,))
+        c.executemany('''INSERT INTO embedding_codes (mode, doc_id, code, scale, dim)
+            VALUES (?, ?, ?, ?, ?)''',
+            [(self.index_type, doc_id) + index.code(doc_id) + (index.dim,)
+             for doc_id in list(index.ids)])
+        c.execute('''INSERT OR REPLACE INTO store_meta (key, value) VALUES (?, ?)''',
+                  (f'codes_{self.index_type}', self._generation(c)))
+        conn.commit()
+        conn.close()
+        return len(index)
+
+    def _fetch_embeddings(self, doc_ids: List[str]) -> Dict[str, List[float]]:
+        """Full-precision embeddings for rerank."""
+        vectors = {}
+        conn = db_pool.connect(self.db_path)
+        for start in range(0, len(doc_ids), 900):
+            chunk = doc_ids[start:start + 900]
+            placeholders = ",".join("?" * len(chunk))
+            for doc_id, blob in conn.execute(f'''SELECT doc_id, embedding FROM documents
+                    WHERE doc_id IN ({placeholders}) AND embedding IS NOT NULL''', chunk):
+                vectors[doc_id] = deserialize_embedding(blob)
         conn.close()
+        return vectors
+
+    @property
+    def index(self) -> EmbeddingMatrix:
+        """
+        Lazy-load the vector index.
+
+        Sources, in order: a fresh mmap snapshot, persisted quantized codes
+        (int8/binary), else the float embeddings in the documents table.
+
+        When another VectorStore instance or process has written since the
+        load, only the documents it changed (doc_changes) are re-read; the
+        index is rebuilt from scratch only if that log was trimmed past it.
+        """
+        if self._index is not None:
+            conn = db_pool.connect(self.db_path)
+            c = conn.cursor()
+            generation = self._generation(c)
+            if generation != self._index_generation and not self._apply_changes(c, generation):
+                self._index = None
+            conn.close()
+        if self._index is None:
+            conn = db_pool.connect(self.db_path)
+            c = conn.cursor()
+            generation = self._generation(c)
+            index = None
+            codes_fresh = False
+            if self.mmap_index:
+                index = load_index(self.index_type, self.index_path,
+                                   self._generation(c), **self.index_params)
+            if index is None:
+                index = make_index(self.index_type, **self.index_params)
+                if self.quantized:
+                    index.fetch_vectors = self._fetch_embeddings
+                codes_fresh = self.quantized and self._codes_generation(c) == self._generation(c)
+                if codes_fresh:
+                    c.execute('''SELECT doc_id, code, scale, dim FROM embedding_codes
+                        WHERE mode = ?''', (self.index_type,))
+                    index.load_codes(c)
+                else:
+                    c.execute('''SELECT doc_id, embedding FROM documents
+                        WHERE embedding IS NOT NULL''')
+                    index.load_blobs(c)
+            conn.close()
+            self._index = index
+            self._index_generation = generation
+            if self.quantized and not codes_fresh:
+                self.write_codes()  # migrate existing rows to codes
+        return self._index
+
+    def save_index(self) -> bool:
+        """Persist the vector index next to the DB for mmap reopening."""
+        index = self.index
+        index.save(self.index_path, self._index_generation)
+        return index.use_numpy
 
     @property
     def router(self):
@@ -207,36 +722,68 @@ class VectorStore:
                 # No embedding available - store without
                 embedding = None
 
-        # Store
-        conn = sqlite3.connect(self.db_path)
+        return self._write([(doc_id, content, metadata, embedding)]) == 1
+
+    def _write(self, rows: List[Tuple[str, str, Optional[Dict], Optional[List[float]]]]) -> int:
+        """Store (doc_id, content, metadata, embedding) rows in one transaction."""
+        if not rows:
+            return 0
+
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
 
-        c.execute('''INSERT OR REPLACE INTO documents
+        c.executemany('''INSERT OR REPLACE INTO documents
             (doc_id, content, embedding, metadata)
             VALUES (?, ?, ?, ?)''',
-            (doc_id, content,
-             serialize_embedding(embedding) if embedding else None,
-             json.dumps(metadata) if metadata else None))
+            [(doc_id, content,
+              serialize_embedding(embedding) if embedding else None,
+              json.dumps(metadata) if metadata else None)
+             for doc_id, content, metadata, embedding in rows])
+        for doc_id, content, metadata, _ in rows:
+            self.bm25.add_document(c, doc_id, content)
+            self.metadata_index.add_document(c, doc_id, metadata)
+        self._write_codes(c, [(doc_id, embedding) for doc_id, _, _, embedding in rows])
+        synced = self._index_in_sync(c)
+        self._bump_generation(c, [doc_id for doc_id, *_ in rows])
 
         conn.commit()
         conn.close()
 
-        # Update BM25 index
-        self.bm25.add_document(doc_id, content)
+        # Keep the embedding matrix in sync (only if loaded and current;
+        # otherwise the next search reloads it)
+        if synced:
+            for doc_id, _, _, embedding in rows:
+                if embedding:
+                    self._index.upsert(doc_id, embedding)
+                else:
+                    self._index.remove(doc_id)
+            self._index_generation += 1
 
-        return True
+        return len(rows)
 
-    def add_batch(self, documents: List[Dict]) -> int:
+    def add_batch(self, documents: List[Dict], batch_size: int = 64) -> int:
         """
         Add multiple documents.
 
-        Each dict: {"doc_id": str, "content": str, "metadata": dict}
+        Each dict: {"doc_id": str, "content": str, "metadata": dict,
+                    "embedding": optional list}
+
+        Missing embeddings are generated with router.embed_batch (batch_size
+        texts per request) and every row is written in one transaction.
         """
-        count = 0
-        for doc in documents:
-            if self.add(doc["doc_id"], doc["content"], doc.get("metadata")):
-                count += 1
-        return count
+        pending = [doc for doc in documents if doc.get("embedding") is None]
+        generated = {}
+        if pending:
+            result = self.router.embed_batch(
+                [doc["content"][:8000] for doc in pending], batch_size)
+            for doc, embedding in zip(pending, result.get("embeddings") or []):
+                generated[id(doc)] = embedding
+
+        return self._write([
+            (doc["doc_id"], doc["content"], doc.get("metadata"),
+             doc.get("embedding") if doc.get("embedding") is not None else generated.get(id(doc)))
+            for doc in documents
+        ])
 
     def search(self, query: str, k: int = 5,
                filter_metadata: Dict = None) -> List[SearchResult]:
@@ -249,121 +796,145 @@ class VectorStore:
             # Fallback to BM25 only
             return self.keyword_search(query, k, filter_metadata)
 
-        query_embedding = result["embedding"]
+        return self.search_vector(result["embedding"], k, filter_metadata)
 
-        # Fetch all documents with embeddings
-        conn = sqlite3.connect(self.db_path)
+    def search_vector(self, query_embedding: List[float], k: int = 5,
+                      filter_metadata: Dict = None) -> List[SearchResult]:
+        """Vector search with a precomputed query embedding."""
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
 
-        if filter_metadata:
-            # Simple metadata filter (exact match on one key)
-            key, value = list(filter_metadata.items())[0]
-            c.execute('''SELECT doc_id, content, embedding, metadata
-                FROM documents WHERE embedding IS NOT NULL
-                AND json_extract(metadata, ?) = ?''',
-                (f'$.{key}', value))
-        else:
-            c.execute('''SELECT doc_id, content, embedding, metadata
-                FROM documents WHERE embedding IS NOT NULL''')
-
-        # Score all documents
-        scores = []
-        for doc_id, content, emb_bytes, meta_json in c.fetchall():
-            doc_embedding = deserialize_embedding(emb_bytes)
-            sim = cosine_similarity(query_embedding, doc_embedding)
-            scores.append(SearchResult(
+        allowed_ids = self._allowed_ids(c, filter_metadata)
+
+        # One batched scoring pass, then hydrate only the top-k rows
+        hits = self.index.search(query_embedding, k, allowed_ids)
+        results = self._hydrate(c, hits)
+        conn.close()
+        return results
+
+    def _allowed_ids(self, c, filter_metadata: Dict = None) -> Optional[set]:
+        """Doc ids matching filter_metadata (None = no filter)."""
+        if not filter_metadata:
+            return None
+        return self.metadata_index.matching_ids(c, filter_metadata)
+
+    def _fetch_rows(self, c, doc_ids: List[str]) -> Dict[str, Tuple[str, Optional[str]]]:
+        """doc_id -> (content, metadata JSON) for the given ids."""
+        rows = {}
+        for start in range(0, len(doc_ids), 900):
+            chunk = doc_ids[start:start + 900]
+            placeholders = ",".join("?" * len(chunk))
+            c.execute(f'''SELECT doc_id, content, metadata FROM documents
+                WHERE doc_id IN ({placeholders})''', chunk)
+            for doc_id, content, meta_json in c.fetchall():
+                rows[doc_id] = (content, meta_json)
+        return rows
+
+    def _hydrate(self, c, hits: List[Tuple[str, float]],
+                 field: str = "vector_score") -> List[SearchResult]:
+        """Fetch content/metadata for scored (doc_id, score) hits, keeping order."""
+        if not hits:
+            return []
+        rows = self._fetch_rows(c, [doc_id for doc_id, _ in hits])
+
+        results = []
+        for doc_id, sim in hits:
+            if doc_id not in rows:
+                continue
+            content, meta_json = rows[doc_id]
+            results.append(SearchResult(
                 doc_id=doc_id,
                 content=content,
                 score=sim,
-                vector_score=sim,
-                metadata=json.loads(meta_json) if meta_json else {}
+                metadata=json.loads(meta_json) if meta_json else {},
+                **{field: sim}
             ))
-
-        conn.close()
-
-        # Sort by score and return top-k
-        scores.sort(key=lambda x: x.score, reverse=True)
-        return scores[:k]
+        return results
 
     def keyword_search(self, query: str, k: int = 5,
                        filter_metadata: Dict = None) -> List[SearchResult]:
-        """BM25 keyword search."""
-        conn = sqlite3.connect(self.db_path)
+        """BM25 keyword search over the postings index."""
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
 
-        if filter_metadata:
-            key, value = list(filter_metadata.items())[0]
-            c.execute('''SELECT doc_id, content, metadata
-                FROM documents WHERE json_extract(metadata, ?) = ?''',
-                (f'$.{key}', value))
-        else:
-            c.execute('SELECT doc_id, content, metadata FROM documents')
-
-        scores = []
-        for doc_id, content, meta_json in c.fetchall():
-            bm25_score = self.bm25.score(query, doc_id, content)
-            if bm25_score > 0:
-                scores.append(SearchResult(
-                    doc_id=doc_id,
-                    content=content,
-                    score=bm25_score,
-                    bm25_score=bm25_score,
-                    metadata=json.loads(meta_json) if meta_json else {}
-                ))
+        allowed_ids = self._allowed_ids(c, filter_metadata)
 
+        hits = self.bm25.search(c, query, k, allowed_ids)
+        results = self._hydrate(c, hits, field="bm25_score")
         conn.close()
+        return results
 
-        scores.sort(key=lambda x: x.score, reverse=True)
-        return scores[:k]
+    def hybrid_candidates(self, query: str, n: int = 10,
+                          filter_metadata: Dict = None,
+                          query_embedding: List[float] = None) -> HybridCandidates:
+        """
+        Top-n vector and top-n BM25 candidates from one pass over the indexes.
+
+        The query is embedded once (or query_embedding is used), the metadata
+        filter is resolved once, and no content or metadata is loaded.
+        """
+        if query_embedding is None:
+            query_embedding = self.router.embed(query).get("embedding")
+        conn = db_pool.connect(self.db_path)
+        c = conn.cursor()
+        allowed_ids = self._allowed_ids(c, filter_metadata)
+        vector_hits = []
+        if query_embedding:
+            vector_hits = self.index.search(query_embedding, n, allowed_ids)
+        keyword_hits = self.bm25.search(c, query, n, allowed_ids)
+        conn.close()
+        return HybridCandidates(vector=vector_hits, keyword=keyword_hits)
 
     def hybrid_search(self, query: str, k: int = 5,
                       alpha: float = 0.7,
-                      filter_metadata: Dict = None) -> List[SearchResult]:
+                      filter_metadata: Dict = None,
+                      fusion: str = "weighted",
+                      rrf_k: int = 60,
+                      candidates: HybridCandidates = None) -> List[SearchResult]:
         """
         Hybrid search: alpha * vector + (1-alpha) * BM25
 
         alpha=1.0 = pure vector search
         alpha=0.0 = pure keyword search
         alpha=0.7 = recommended default (favor semantic)
+
+        fusion="rrf" fuses by reciprocal rank instead of normalized score.
+        Pass candidates (from hybrid_candidates) to re-fuse without re-querying;
+        only the final top-k rows are read from the documents table.
         """
-        # Get both result sets
-        vector_results = self.search(query, k * 2, filter_metadata)
-        keyword_results = self.keyword_search(query, k * 2, filter_metadata)
-
-        # Normalize scores
-        if vector_results:
-            max_v = max(r.vector_score for r in vector_results) or 1
-            for r in vector_results:
-                r.vector_score /= max_v
-
-        if keyword_results:
-            max_b = max(r.bm25_score for r in keyword_results) or 1
-            for r in keyword_results:
-                r.bm25_score /= max_b
-
-        # Merge by doc_id
-        merged = {}
-        for r in vector_results:
-            merged[r.doc_id] = r
-
-        for r in keyword_results:
-            if r.doc_id in merged:
-                merged[r.doc_id].bm25_score = r.bm25_score
-            else:
-                merged[r.doc_id] = r
+        if candidates is None:
+            candidates = self.hybrid_candidates(query, k * 2, filter_metadata)
+        fused = fuse_hits(candidates, k, alpha, fusion, rrf_k)
+        if not fused:
+            return []
+
+        rows = self.get_rows([doc_id for doc_id, *_ in fused])
 
-        # Compute hybrid score
         results = []
-        for r in merged.values():
-            r.score = alpha * r.vector_score + (1 - alpha) * r.bm25_score
-            results.append(r)
+        for doc_id, score, vector_score, bm25_score in fused:
+            if doc_id not in rows:
+                continue
+            content, meta_json = rows[doc_id]
+            results.append(SearchResult(
+                doc_id=doc_id,
+                content=content,
+                score=score,
+                vector_score=vector_score,
+                bm25_score=bm25_score,
+                metadata=json.loads(meta_json) if meta_json else {}
+            ))
+        return results
 
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results[:k]
+    def get_rows(self, doc_ids: List[str]) -> Dict[str, Tuple[str, Optional[str]]]:
+        """doc_id -> (content, metadata JSON) for many ids in one query."""
+        conn = db_pool.connect(self.db_path)
+        rows = self._fetch_rows(conn.cursor(), doc_ids)
+        conn.close()
+        return rows
 
     def get_document(self, doc_id: str) -> Optional[Dict]:
         """Get a document by ID."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
         c.execute('SELECT content, metadata FROM documents WHERE doc_id = ?', (doc_id,))
         row = c.fetchone()
@@ -379,17 +950,36 @@ class VectorStore:
 
     def delete(self, doc_id: str) -> bool:
         """Delete a document."""
-        conn = sqlite3.connect(self.db_path)
+        return self.delete_batch([doc_id]) == 1
+
+    def delete_batch(self, doc_ids: List[str]) -> int:
+        """Delete documents in one transaction; returns how many existed."""
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
-        c.execute('DELETE FROM documents WHERE doc_id = ?', (doc_id,))
-        deleted = c.rowcount > 0
+        deleted = []
+        for doc_id in doc_ids:
+            c.execute('DELETE FROM documents WHERE doc_id = ?', (doc_id,))
+            if c.rowcount > 0:
+                deleted.append(doc_id)
+        synced = False
+        if deleted:
+            self._write_codes(c, [(doc_id, None) for doc_id in deleted])
+            synced = self._index_in_sync(c)
+            self._bump_generation(c, deleted)
+            for doc_id in deleted:
+                self.bm25.remove_document(c, doc_id)
+                self.metadata_index.remove_document(c, doc_id)
         conn.commit()
         conn.close()
-        return deleted
+        if synced:
+            for doc_id in deleted:
+                self._index.remove(doc_id)
+            self._index_generation += 1
+        return len(deleted)
 
     def count(self) -> int:
         """Count documents."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
         c.execute('SELECT COUNT(*) FROM documents')
         count = c.fetchone()[0]
@@ -398,7 +988,7 @@ class VectorStore:
 
     def stats(self) -> Dict:
         """Get store statistics."""
-        conn = sqlite3.connect(self.db_path)
+        conn = db_pool.connect(self.db_path)
         c = conn.cursor()
 
         c.execute('SELECT COUNT(*) FROM documents')
@@ -407,13 +997,15 @@ class VectorStore:
         c.execute('SELECT COUNT(*) FROM documents WHERE embedding IS NOT NULL')
         with_embeddings = c.fetchone()[0]
 
+        bm25_indexed = self.bm25.total_docs(c)
         conn.close()
 
         return {
             "total_documents": total,
             "with_embeddings": with_embeddings,
             "without_embeddings": total - with_embeddings,
-            "bm25_indexed": self.bm25.total_docs
+            "bm25_indexed": bm25_indexed,
+            "vector_index": self._index.stats() if self._index is not None else None
         }
 
 # ============================================================================
@@ -429,18 +1021,28 @@ def main():
     parser.add_argument('-k', type=int, default=5, help='Number of results')
     parser.add_argument('--add', type=str, help='Add document (content)')
     parser.add_argument('--id', type=str, help='Document ID for add')
+    parser.add_argument('--mmap', action='store_true', help='Open index from mmap snapshot')
+    parser.add_argument('--save-index', action='store_true', help='Persist embedding matrix snapshot')
+    parser.add_argument('--index', type=str, default='flat', choices=['flat', 'ivf', 'int8', 'binary'], help='Vector index type')
+    parser.add_argument('--nprobe', type=int, default=8, help='IVF lists probed per query')
+    parser.add_argument('--fusion', type=str, default='weighted', choices=['weighted', 'rrf'], help='Hybrid fusion strategy')
+    parser.add_argument('--alpha', type=float, default=0.7, help='Hybrid vector weight')
 
     args = parser.parse_args()
-    store = VectorStore()
+    index_params = {"nprobe": args.nprobe} if args.index == 'ivf' else {}
+    store = VectorStore(mmap_index=args.mmap, index_type=args.index, index_params=index_params)
 
     if args.stats:
         print(json.dumps(store.stats(), indent=2))
+    elif args.save_index:
+        saved = store.save_index()
+        print(f"Index snapshot {'saved to ' + str(store.index_path) if saved else 'skipped (NumPy not installed)'}")
     elif args.search:
         results = store.search(args.search, args.k)
         for r in results:
             print(f"[{r.score:.3f}] {r.doc_id}: {r.content[:100]}...")
     elif args.hybrid:
-        results = store.hybrid_search(args.hybrid, args.k)
+        results = store.hybrid_search(args.hybrid, args.k, alpha=args.alpha, fusion=args.fusion)
         for r in results:
             print(f"[{r.score:.3f}] (v:{r.vector_score:.2f} b:{r.bm25_score:.2f}) {r.doc_id}: {r.content[:100]}...")
     elif args.add and args.id:
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Write-Behind - Batched background writes for high-frequency telemetry.
+
+Telemetry helpers (routing stats, error log, metrics...) used to open a
+connection, INSERT one row and commit on every call - a commit per event
+on hot paths. submit() only appends the statement to an in-memory buffer;
+a background thread writes each database's pending rows in a single
+transaction (consecutive identical statements as one executemany) when
+TELEMETRY_FLUSH_ROWS rows are waiting or TELEMETRY_FLUSH_SECONDS have
+passed, and everything left is flushed at interpreter exit (the daemons
+also flush on their shutdown path). If the batch fails, its rows are
+retried one by one, so a bad statement only loses its own row.
+
+Never flush from a signal handler: it runs on the main thread, which may
+have been interrupted inside submit() holding the (non-reentrant) buffer
+lock. Handlers only stop the loop; the flush happens after it exits.
+
+Callers never block on SQLite. The buffer is bounded
+(TELEMETRY_MAX_PENDING); when full, new rows are dropped and counted
+rather than stalling the caller. Readers that need their own recent
+writes call flush(db_path) first. TELEMETRY_BUFFER=0 writes synchronously.
+
+Usage:
+    import write_behind
+
+    write_behind.submit(ROUTER_DB, "INSERT INTO routing_stats (...) VALUES (?, ?)", (a, b))
+
+    write_behind.flush(ROUTER_DB)   # before reading routing_stats
+    print(write_behind.stats())
+"""
+
+import atexit
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import db_pool
+from config import cfg
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehindBuffer:
+    """Per-process buffer of pending statements, grouped by database."""
+
+    def __init__(
+        self,
+        flush_rows: Optional[int] = None,
+        flush_seconds: Optional[float] = None,
+        max_pending: Optional[int] = None
+    ):
+        self.flush_rows = flush_rows or cfg.TELEMETRY_FLUSH_ROWS
+        self.flush_seconds = flush_seconds or cfg.TELEMETRY_FLUSH_SECONDS
+        self.max_pending = max_pending or cfg.TELEMETRY_MAX_PENDING
+        self._pending: Dict[str, List[Tuple[str, Sequence]]] = {}
+        self._count = 0
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._stats = {"submitted": 0, "written": 0, "dropped": 0, "failed": 0, "flushes": 0}
+        self._thread = threading.Thread(target=self._run, name="write-behind", daemon=True)
+        self._thread.start()
+
+    def submit(self, db_path, sql: str, params: Sequence = ()) -> bool:
+        """Queue one statement; False if the buffer is full and the row was dropped."""
+        key = os.fspath(db_path)
+        with self._lock:
+            if self._count >= self.max_pending:
+                self._stats["dropped"] += 1
+                return False
+            self._pending.setdefault(key, []).append((sql, params))
+            self._count += 1
+            self._stats["submitted"] += 1
+            full = self._count >= self.flush_rows
+        if full:
+            self._wake.set()
+        return True
+
+    def _take(self, db_path: Optional[str] = None) -> Dict[str, List[Tuple[str, Sequence]]]:
+        with self._lock:
+            if db_path is None:
+                batches, self._pending = self._pending, {}
+            else:
+                batch = self._pending.pop(db_path, None)
+                batches = {db_path: batch} if batch else {}
+            self._count -= sum(len(rows) for rows in batches.values())
+        return batches
+
+    def _flush(self, db_path: Optional[str] = None, timeout: float = -1) -> bool:
+        # Take and write under one lock: when flush() returns, every row
+        # submitted before it (including any batch already in flight) is written
+        if not self._write_lock.acquire(timeout=timeout):
+            return False
+        try:
+            for db_path, rows in self._take(db_path).items():
+                written, error = self._write(db_path, rows)
+                with self._lock:
+                    self._stats["written"] += written
+                    self._stats["failed"] += len(rows) - written
+                    if written:
+                        self._stats["flushes"] += 1
+                if error is not None:
+                    logger.warning(f"Write-behind flush to {os.path.basename(db_path)}: "
+                                   f"{len(rows) - written} of {len(rows)} rows failed: {error}")
+        finally:
+            self._write_lock.release()
+        return True
+
+    def _write(self, db_path: str, rows: List[Tuple[str, Sequence]]) -> Tuple[int, Optional[Exception]]:
+        """Write rows in one transaction; if that fails, retry them one by
+        one so only the failing statements are lost. (rows written, error)"""
+        try:
+            conn = db_pool.connect(db_path)
+        except Exception as e:
+            return 0, e
+        try:
+            try:
+                for sql, group in itertools.groupby(rows, key=lambda row: row[0]):
+                    conn.executemany(sql, [params for _, params in group])
+                conn.commit()
+                return len(rows), None
+            except Exception:
+                conn.rollback()
+
+            written, error = 0, None
+            for sql, params in rows:
+                try:
+                    conn.execute(sql, params)
+                    written += 1
+                except Exception as e:
+                    error = e
+            try:
+                conn.commit()
+            except Exception as e:
+                conn.rollback()
+                return 0, e
+            return written, error
+        finally:
+            conn.close()
+
+    def flush(self, db_path=None, timeout: float = -1) -> bool:
+        """Write pending rows now (all databases, or just db_path) and wait for them.
+
+        timeout bounds the wait for a flush already in progress (False if it
+        expired). Not safe in a signal handler (see module docstring).
+        """
+        return self._flush(os.fspath(db_path) if db_path is not None else None, timeout)
+
+    def _run(self):
+        while not self._stopped:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            self._flush()
+
+    def close(self):
+        """Stop the background thread and flush everything still pending."""
+        self._stopped = True
+        self._wake.set()
+        self._thread.join(timeout=5)
+        self.flush()
+
+    def stats(self) -> Dict:
+        with self._lock:
+            return dict(self._stats, pending=self._count)
+
+
+_buffer: Optional[WriteBehindBuffer] = None
+_buffer_pid: Optional[int] = None
+_buffer_lock = threading.Lock()
+
+
+def _get_buffer() -> WriteBehindBuffer:
+    """This process's buffer (a forked child starts its own thread and buffer)."""
+    global _buffer, _buffer_pid
+    pid = os.getpid()
+    if _buffer is None or _buffer_pid != pid:
+        with _buffer_lock:
+            if _buffer is None or _buffer_pid != pid:
+                _buffer = WriteBehindBuffer()
+                _buffer_pid = pid
+    return _buffer
+
+
+def submit(db_path, sql: str, params: Sequence = ()) -> bool:
+    """Queue a telemetry write (or run it now when TELEMETRY_BUFFER is off)."""
+    if not cfg.TELEMETRY_BUFFER:
+        conn = db_pool.connect(db_path)
+        conn.execute(sql, params)
+        conn.commit()
+        conn.close()
+        return True
+    return _get_buffer().submit(db_path, sql, params)
+
+
+def flush(db_path=None, timeout: float = -1) -> bool:
+    """Write out pending telemetry (for db_path, or everything) before reading it."""
+    if _buffer is not None and _buffer_pid == os.getpid():
+        return _buffer.flush(db_path, timeout)
+    return True
+
+
+def stats() -> Dict:
+    if _buffer is None or _buffer_pid != os.getpid():
+        return {"submitted": 0, "written": 0, "dropped": 0, "failed": 0, "flushes": 0, "pending": 0}
+    return _buffer.stats()
+
+
+def _shutdown():
+    if _buffer is not None and _buffer_pid == os.getpid():
+        _buffer.close()
+
+
+atexit.register(_shutdown)
+
+
+if __name__ == "__main__":
+    import json
+    import sys
+    import tempfile
+
+    # Benchmark: per-row commits vs write-behind on a scratch database
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    with tempfile.TemporaryDirectory() as tmp:
+        db = os.path.join(tmp, "bench.db")
+        conn = db_pool.connect(db)
+        conn.execute("CREATE TABLE events (ts REAL, name TEXT, value REAL)")
+        conn.commit()
+        sql = "INSERT INTO events (ts, name, value) VALUES (?, ?, ?)"
+
+        start = time.perf_counter()
+        for i in range(n):
+            conn.execute(sql, (time.time(), "direct", i))
+            conn.commit()
+        direct = time.perf_counter() - start
+        conn.close()
+
+        start = time.perf_counter()
+        for i in range(n):
+            submit(db, sql, (time.time(), "buffered", i))
+        enqueue = time.perf_counter() - start
+        flush()
+        total = time.perf_counter() - start
+
+        print(json.dumps({
+            "rows": n,
+            "direct_commit_us_per_row": round(direct / n * 1e6, 2),
+            "write_behind_enqueue_us_per_row": round(enqueue / n * 1e6, 2),
+            "write_behind_total_s": round(total, 4),
+            "stats": stats(),
+        }, indent=2))